@@ -28,6 +28,7 @@ import {
   ObservacaoAulaResponse,
   RelatorioWellhub,
   RelatorioExAlunosPendencias,
+  ProgressoCampanhaPush,
 } from '../types';
 import { NavigationProps } from '../types';
 import CONFIG from '../config';
@@ -161,6 +162,8 @@ const DashboardGerenteScreen: React.FC<DashboardGerenteProps> = ({
     dispositivos_no_servidor?: number;
   } | null>(null);
   const [sendingNotif, setSendingNotif] = useState(false);
+  const [campanhaPushId, setCampanhaPushId] = useState<number | null>(null);
+  const [campanhaPush, setCampanhaPush] = useState<ProgressoCampanhaPush | null>(null);
   const [aumentoMensalidadeValor, setAumentoMensalidadeValor] = useState('');
   const [aumentoMensalidadeLoading, setAumentoMensalidadeLoading] = useState(false);
 
@@ -241,6 +244,32 @@ const DashboardGerenteScreen: React.FC<DashboardGerenteProps> = ({
     };
   }, [activeSection, relatorioPainelAberto, filtroPresencaTurmaId, filtroObservacaoData, user]);
 
+  // Acompanha a última campanha enviada enquanto o servidor ainda está disparando os lotes
+  useEffect(() => {
+    if (campanhaPushId == null) return;
+    let cancelled = false;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    const consultar = async () => {
+      try {
+        const p = await usuarioService.getProgressoCampanhaPush(campanhaPushId);
+        if (cancelled) return;
+        setCampanhaPush(p);
+        if (p.status === 'pendente' || p.status === 'enviando') {
+          timer = setTimeout(consultar, 3000);
+        } else {
+          void loadNotifStats();
+        }
+      } catch {
+        if (!cancelled) timer = setTimeout(consultar, 10000);
+      }
+    };
+    void consultar();
+    return () => {
+      cancelled = true;
+      if (timer) clearTimeout(timer);
+    };
+  }, [campanhaPushId]);
+
   const loadNotifStats = async () => {
     try {
       const s = await usuarioService.getNotificacaoAppEstatisticas();
@@ -409,11 +438,12 @@ const DashboardGerenteScreen: React.FC<DashboardGerenteProps> = ({
     try {
       setSendingNotif(true);
       const r = await usuarioService.enviarNotificacaoAlunosApp(t, m);
-      const okCount = (r as any).tickets_enviados_ok ?? r.destinatarios_tokens ?? 0;
       Alert.alert(
-        'Enviado',
-        `Notificação aceita pela Expo para ${okCount} envio(s). Dispositivos com token: ${r.destinatarios_tokens ?? 0}.`
+        'Envio iniciado',
+        `A notificação está sendo enviada para ${r.destinatarios_tokens ?? 0} dispositivo(s).`
       );
+      setCampanhaPush(null);
+      setCampanhaPushId(r.campanha_id ?? null);
       setNotifTitulo('');
       setNotifMensagem('');
       await loadNotifStats();
@@ -983,6 +1013,17 @@ const DashboardGerenteScreen: React.FC<DashboardGerenteProps> = ({
                 )}
             </>
           )}
+          {campanhaPush != null && (
+            <Text style={campanhaPush.status === 'falhou' ? styles.notifStatsWarn : styles.notifStatsText}>
+              Último envio: {campanhaPush.enviados} de {campanhaPush.destinatarios_tokens} dispositivo(s)
+              {` (${campanhaPush.percentual}%)`}
+              {campanhaPush.status === 'pendente' || campanhaPush.status === 'enviando'
+                ? ' — enviando...'
+                : campanhaPush.status === 'falhou'
+                  ? ' — falhou, tente novamente mais tarde.'
+                  : ` — concluído${campanhaPush.tickets_erro ? `, ${campanhaPush.tickets_erro} com erro` : ''}.`}
+            </Text>
+          )}
           <TextInput
             style={styles.input}
             placeholder="Título (ex.: Aula cancelada)"
@@ -31,6 +31,7 @@ import {
   WellhubReserva,
   RelatorioWellhub,
   RelatorioExAlunosPendencias,
+  ProgressoCampanhaPush,
 } from '../types';
 import CONFIG from '../config';
 
@@ -660,8 +661,14 @@ export const usuarioService = {
   enviarNotificacaoAlunosApp: async (
     titulo: string,
     mensagem: string
-  ): Promise<{ ok?: boolean; destinatarios_tokens?: number; detalhes?: unknown }> => {
-    const response = await api.post('usuarios/notificacoes-app/enviar/', { titulo, mensagem }, { timeout: 120000 });
+  ): Promise<{ ok?: boolean; campanha_id?: number; destinatarios_tokens?: number; progresso?: string }> => {
+    // Resposta imediata (202): o envio roda em segundo plano no servidor
+    const response = await api.post('usuarios/notificacoes-app/enviar/', { titulo, mensagem });
+    return response.data;
+  },
+
+  getProgressoCampanhaPush: async (campanhaId: number): Promise<ProgressoCampanhaPush> => {
+    const response = await api.get(`usuarios/notificacoes-app/campanhas/${campanhaId}/`);
     return response.data;
   },
 };
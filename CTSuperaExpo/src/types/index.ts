@@ -435,6 +435,17 @@ export interface RelatorioExAlunosPendencias {
   itens: RelatorioExAlunoItem[];
 }
 
+/** Progresso de uma campanha de push (envio em segundo plano no servidor). */
+export interface ProgressoCampanhaPush {
+  status: 'pendente' | 'enviando' | 'aguardando_recibos' | 'concluida' | 'falhou';
+  destinatarios_tokens: number;
+  enviados: number;
+  percentual: number;
+  tickets_ok: number;
+  tickets_erro: number;
+  tokens_removidos: number;
+}
+
 export interface PainelGerente {
   alunos_ativos: number;
   alunos_inativos: number;
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AlunosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'alunos'
+
+    def ready(self):
+        from alunos.signals import conectar_signals_painel_aluno
+        conectar_signals_painel_aluno()
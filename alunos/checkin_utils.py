@@ -7,7 +7,7 @@ from typing import Optional, Tuple
 
 from django.utils import timezone
 
-# Alinhado a alunos.views._DIAS_SEMANA_NOMES
+# Nomes de DiaSemana por weekday() (também usados pelo painel e histórico do aluno)
 _DIAS_SEMANA_NOMES = (
     "Segunda-feira",
     "Terça-feira",
@@ -38,6 +38,9 @@ def encontrar_data_aula_checkin(
     aluno,
     turma,
     agora: Optional[datetime] = None,
+    *,
+    dias_turma: Optional[set] = None,
+    dias_aluno: Optional[set] = None,
 ) -> Optional[Tuple[date, datetime]]:
     """
     Se estivermos dentro da janela de check-in para alguma ocorrência da turma,
@@ -45,6 +48,7 @@ def encontrar_data_aula_checkin(
 
     Janela: [início_da_aula - 24h, início_da_aula) — check-in encerra no horário de início da aula.
     Escolhe a primeira data (mais próxima) que satisfaz turma + dias habilitados do aluno.
+    `dias_turma`/`dias_aluno` (nomes) evitam as consultas quando já foram carregados.
     """
     if not turma:
         return None
@@ -52,8 +56,10 @@ def encontrar_data_aula_checkin(
     agora = agora or timezone.localtime()
     tz = timezone.get_current_timezone()
 
-    dias_turma = set(turma.dias_semana.values_list("nome", flat=True))
-    dias_aluno = set(aluno.dias_habilitados.values_list("nome", flat=True))
+    if dias_turma is None:
+        dias_turma = set(turma.dias_semana.values_list("nome", flat=True))
+    if dias_aluno is None:
+        dias_aluno = set(aluno.dias_habilitados.values_list("nome", flat=True))
 
     hoje = agora.date()
     for offset in range(_DIAS_BUSCA_AULA):
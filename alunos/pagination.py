@@ -0,0 +1,23 @@
+"""
+Paginação dos históricos do painel do aluno: cursor (keyset), mais recentes primeiro.
+
+Sem OFFSET/COUNT: abrir o app custa uma página, não o histórico inteiro. ``next`` na
+resposta já traz o cursor da página seguinte.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class HistoricoAulasPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    # id desempata presenças do mesmo dia (turmas diferentes)
+    ordering = ("-data", "-id")
+
+
+class HistoricoPagamentosPagination(CursorPagination):
+    page_size = 12
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-data_vencimento", "-id")
@@ -0,0 +1,262 @@
+"""
+Painel do aluno (app): núcleo "status_hoje" e históricos paginados.
+
+O núcleo sai de um número fixo de consultas, independente do histórico do aluno:
+turma ativa (+ CT e dias da semana), dias habilitados do aluno, uma verificação de
+mensalidade em atraso e as presenças do intervalo que importa (hoje e a semana da aula
+de check-in). As regras de check-in rodam em memória sobre esses dados.
+
+Os históricos de aulas e de pagamentos são sub-recursos paginados por cursor. Cada
+página fica no cache do Django sob uma versão por aluno; gravações em Presenca e
+Mensalidade trocam a versão (alunos.signals e chamadas explícitas nos lotes bulk_*),
+e as páginas antigas deixam de ser lidas. PAINEL_ALUNO_CACHE_TTL limita a idade de uma
+página quando o cache não é compartilhado entre processos (LocMemCache).
+"""
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from app.date_api import format_data_api
+from financeiro.models import Mensalidade
+from funcionarios.models import Presenca
+from turmas.models import Turma
+
+from .checkin_utils import _DIAS_SEMANA_NOMES, encontrar_data_aula_checkin
+
+SECAO_AULAS = "aulas"
+SECAO_PAGAMENTOS = "pagamentos"
+
+MOTIVO_PENDENCIA = "Você possui pendências de pagamento."
+MOTIVO_VINCULO_ENCERRADO = (
+    "Seu vínculo com o CT foi encerrado. Você ainda pode acessar o financeiro "
+    "para quitar pendências."
+)
+MOTIVO_SEM_TURMA = "Você não está matriculado em nenhuma turma ativa."
+MOTIVO_FORA_DA_JANELA = (
+    "Check-in disponível apenas entre 24 horas antes e até o horário de início da aula."
+)
+
+
+def motivo_suspensao(usuario) -> str:
+    ate = usuario.suspenso_ate.strftime("%d/%m/%Y") if usuario.suspenso_ate else ""
+    return (
+        f"Seu contrato está suspenso até {ate}." if ate
+        else "Seu contrato está temporariamente suspenso."
+    )
+
+
+def _semana(data_ref):
+    inicio = data_ref - timedelta(days=data_ref.weekday())
+    return inicio, inicio + timedelta(days=6)
+
+
+def validar_regras_checkin(data_ref, *, dias_aluno, dias_turma=None, checkins_semana=0):
+    """
+    Regras de plano para o check-in em `data_ref`, sem consultas: `dias_aluno` e
+    `dias_turma` são nomes de dias (None = não checa a turma) e `checkins_semana` os
+    check-ins já feitos na semana da aula. Retorna (pode, motivo).
+    """
+    if not dias_aluno:
+        return False, "Dias habilitados do aluno não configurados."
+
+    dia_nome = _DIAS_SEMANA_NOMES[data_ref.weekday()]
+    if dia_nome not in dias_aluno:
+        return False, "Este dia não está habilitado para este aluno no plano."
+
+    if dias_turma is not None and dia_nome not in dias_turma:
+        return False, "A turma não tem aula neste dia da semana."
+
+    if checkins_semana >= len(dias_aluno):
+        return False, "Limite semanal de check-ins atingido."
+
+    return True, None
+
+
+def regras_checkin(aluno, turma, data_ref):
+    """validar_regras_checkin carregando dias e check-ins da semana do banco."""
+    inicio, fim = _semana(data_ref)
+    return validar_regras_checkin(
+        data_ref,
+        dias_aluno=set(aluno.dias_habilitados.values_list("nome", flat=True)),
+        dias_turma={d.nome for d in turma.dias_semana.all()} if turma else None,
+        checkins_semana=Presenca.objects.filter(
+            usuario=aluno, data__range=(inicio, fim), checkin_realizado=True
+        ).count(),
+    )
+
+
+def turma_ativa_do_aluno(usuario):
+    """Turma ativa do aluno com CT e dias carregados (str(turma) sem consultas extras)."""
+    return (
+        Turma.objects.filter(alunos=usuario, ativo=True)
+        .select_related("ct")
+        .prefetch_related("dias_semana")
+        .first()
+    )
+
+
+def tem_mensalidade_atrasada(usuario, hoje) -> bool:
+    return (
+        Mensalidade.objects.filter(aluno=usuario, data_vencimento__lt=hoje)
+        .exclude(status="pago")
+        .exists()
+    )
+
+
+def calcular_status_hoje(usuario, *, agora=None) -> dict:
+    """
+    Núcleo do painel: turma, idade, pagamento em dia e status de check-in.
+
+    Cinco consultas no máximo (turma, dias da turma, dias do aluno, atraso, presenças),
+    mais a gravação da reativação automática quando a suspensão já expirou.
+    """
+    agora = agora or timezone.localtime()
+    # Calendário do fuso configurado (mesmo de Mensalidade.status_efetivo)
+    hoje = agora.date()
+    # Reativação automática se a suspensão já expirou
+    if getattr(usuario, "contrato_suspenso", False) and not usuario.esta_suspenso():
+        usuario.limpar_suspensao(save=True)
+
+    turma = turma_ativa_do_aluno(usuario)
+    dias_turma = {d.nome for d in turma.dias_semana.all()} if turma else set()
+    dias_aluno = set(usuario.dias_habilitados.values_list("nome", flat=True))
+    atrasado = tem_mensalidade_atrasada(usuario, hoje)
+
+    aula_checkin = (
+        encontrar_data_aula_checkin(
+            usuario, turma, agora, dias_turma=dias_turma, dias_aluno=dias_aluno
+        )
+        if turma else None
+    )
+    data_aula_checkin = aula_checkin[0] if aula_checkin else None
+
+    # Uma leitura cobre a presença de hoje, a da aula alvo e os check-ins da semana dela
+    inicio, fim = _semana(data_aula_checkin) if data_aula_checkin else (hoje, hoje)
+    presencas = list(
+        Presenca.objects.filter(
+            usuario=usuario, data__range=(min(inicio, hoje), max(fim, hoje))
+        ).order_by("id")
+    )
+    if data_aula_checkin is not None:
+        alvo = next(
+            (p for p in presencas if p.turma_id == turma.id and p.data == data_aula_checkin), None
+        )
+    else:
+        alvo = next((p for p in presencas if p.data == hoje), None)
+
+    if atrasado:
+        pode_fazer_checkin, motivo = False, MOTIVO_PENDENCIA
+    elif not getattr(usuario, "ativo", True):
+        pode_fazer_checkin, motivo = False, MOTIVO_VINCULO_ENCERRADO
+    elif hasattr(usuario, "esta_suspenso") and usuario.esta_suspenso():
+        pode_fazer_checkin, motivo = False, motivo_suspensao(usuario)
+    elif not turma:
+        pode_fazer_checkin, motivo = False, MOTIVO_SEM_TURMA
+    elif data_aula_checkin is None:
+        pode_fazer_checkin, motivo = False, MOTIVO_FORA_DA_JANELA
+    else:
+        pode_fazer_checkin, motivo = validar_regras_checkin(
+            data_aula_checkin,
+            dias_aluno=dias_aluno,
+            dias_turma=dias_turma,
+            checkins_semana=sum(
+                1 for p in presencas if p.checkin_realizado and inicio <= p.data <= fim
+            ),
+        )
+
+    nascimento = usuario.data_nascimento
+    idade = (
+        hoje.year - nascimento.year - ((hoje.month, hoje.day) < (nascimento.month, nascimento.day))
+        if nascimento else None
+    )
+
+    return {
+        "pagamento_ok": not atrasado,
+        "idade": idade,
+        "turma": str(turma) if turma else None,
+        "status_hoje": {
+            "checkin_realizado": alvo.checkin_realizado if alvo else False,
+            "presenca_confirmada": alvo.presenca_confirmada if alvo else False,
+            "ausencia_registrada": bool(alvo.ausencia_registrada) if alvo else False,
+            "pode_fazer_checkin": pode_fazer_checkin,
+            "motivo_checkin_bloqueado": motivo,
+            "data_aula_checkin": format_data_api(data_aula_checkin) if data_aula_checkin else None,
+            "horario_aula_checkin": (
+                timezone.localtime(aula_checkin[1]).strftime("%H:%M") if aula_checkin else None
+            ),
+        },
+    }
+
+
+def historico_aulas(usuario):
+    return (
+        Presenca.objects.filter(usuario=usuario)
+        .select_related("turma", "turma__ct")
+        .prefetch_related("turma__professores", "turma__dias_semana")
+    )
+
+
+def historico_pagamentos(usuario):
+    return Mensalidade.objects.filter(aluno=usuario)
+
+
+# --- Cache por aluno ---------------------------------------------------------------
+
+
+def _chave_versao(aluno_id) -> str:
+    return f"painel_aluno:{aluno_id}:versao"
+
+
+def _versao(aluno_id) -> str:
+    chave = _chave_versao(aluno_id)
+    versao = cache.get(chave)
+    if versao is None:
+        # Versão aleatória: se a chave for despejada do cache, nenhuma página antiga volta
+        cache.add(chave, uuid.uuid4().hex, None)
+        versao = cache.get(chave)
+    return versao
+
+
+def invalidar_painel_aluno(*aluno_ids):
+    """
+    Descarta as páginas de histórico em cache dos alunos (troca a versão de cada um).
+
+    Troca na hora e de novo no commit: uma leitura concorrente antes do commit não deixa
+    dados velhos guardados sob a versão nova.
+    """
+    ids = {a for a in aluno_ids if a}
+    if not ids:
+        return
+
+    def trocar():
+        cache.set_many({_chave_versao(a): uuid.uuid4().hex for a in ids}, None)
+
+    trocar()
+    transaction.on_commit(trocar)
+
+
+def obter_pagina_historico(aluno_id, secao, url, montar):
+    """
+    Página de histórico em cache por (aluno, versão, seção, dia, url); `montar()` gera
+    o conteúdo quando ausente. O dia entra na chave porque o status das mensalidades
+    (pendente/atrasado) depende de hoje.
+    """
+    chave = "painel_aluno:{}:{}:{}:{}:{}".format(
+        aluno_id,
+        _versao(aluno_id),
+        secao,
+        timezone.localdate().isoformat(),
+        hashlib.sha1(url.encode("utf-8")).hexdigest(),
+    )
+    dados = cache.get(chave)
+    if dados is None:
+        dados = montar()
+        cache.set(chave, dados, getattr(settings, "PAINEL_ALUNO_CACHE_TTL", 300))
+    return dados
@@ -0,0 +1,26 @@
+"""
+Signals do módulo alunos: invalidação do cache do painel do aluno.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from financeiro.models import Mensalidade
+from funcionarios.models import Presenca
+
+from .painel import invalidar_painel_aluno
+
+# Campo que aponta para o aluno em cada modelo que aparece nos históricos do painel
+_CAMPO_ALUNO = {
+    Presenca: "usuario_id",
+    Mensalidade: "aluno_id",
+}
+
+
+def invalidar_cache_painel_aluno(sender, instance=None, **kwargs):
+    invalidar_painel_aluno(getattr(instance, _CAMPO_ALUNO[sender], None))
+
+
+def conectar_signals_painel_aluno():
+    for model in _CAMPO_ALUNO:
+        uid = f"painel_aluno_{model._meta.label_lower}"
+        post_save.connect(invalidar_cache_painel_aluno, sender=model, dispatch_uid=f"{uid}_save")
+        post_delete.connect(invalidar_cache_painel_aluno, sender=model, dispatch_uid=f"{uid}_delete")
@@ -1,3 +1,107 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from alunos.painel import calcular_status_hoje
+from ct.models import CentroDeTreinamento
+from financeiro.models import Mensalidade
+from funcionarios.lista_presenca import registrar_presencas_em_lote
+from funcionarios.models import Presenca
+from turmas.models import DiaSemana, Turma
+from usuarios.models import Usuario
+
+# Segunda-feira, 10h: dentro da janela de check-in da aula das 19h
+AGORA = timezone.make_aware(datetime(2030, 3, 4, 10, 0))
+SEGUNDA = AGORA.date()
+
+
+class PainelAlunoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seg, _ = DiaSemana.objects.get_or_create(nome="Segunda-feira")
+        qua, _ = DiaSemana.objects.get_or_create(nome="Quarta-feira")
+        ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        self.turma = Turma.objects.create(ct=ct, horario=time(19, 0), capacidade_maxima=20, ativo=True)
+        self.turma.dias_semana.set([seg, qua])
+        self.aluno = Usuario.objects.create_user(
+            username="11111111101", password="x", tipo="aluno", first_name="Ana", email="ana@test.com",
+            cpf="11111111101", telefone_emergencia="21999990000",
+        )
+        self.aluno.dias_habilitados.set([seg, qua])
+        self.turma.alunos.add(self.aluno)
+        self.client = APIClient()
+        self.client.force_authenticate(self.aluno)
+
+    def _presencas(self, n, inicio=SEGUNDA - timedelta(days=7)):
+        for i in range(n):
+            Presenca.objects.create(
+                usuario=self.aluno, turma=self.turma, data=inicio - timedelta(days=7 * i), presenca_confirmada=True
+            )
+
+    def test_nucleo_com_numero_fixo_de_consultas(self):
+        self._presencas(10)
+        for mes in range(1, 7):
+            Mensalidade.objects.create(
+                aluno=self.aluno, valor=Decimal("160.00"), data_vencimento=date(2030, mes, 1), status="pago"
+            )
+        with self.assertNumQueries(5):
+            dados = calcular_status_hoje(self.aluno, agora=AGORA)
+        self.assertTrue(dados["pagamento_ok"])
+        self.assertEqual(dados["status_hoje"]["data_aula_checkin"], "04-03-2030")
+        self.assertTrue(dados["status_hoje"]["pode_fazer_checkin"])
+
+        # Dois check-ins na semana da aula esgotam o plano de 2 dias
+        Presenca.objects.create(
+            usuario=self.aluno, turma=self.turma, data=SEGUNDA + timedelta(days=2), checkin_realizado=True
+        )
+        Presenca.objects.create(usuario=self.aluno, turma=self.turma, data=SEGUNDA, checkin_realizado=True)
+        status_hoje = calcular_status_hoje(self.aluno, agora=AGORA)["status_hoje"]
+        self.assertTrue(status_hoje["checkin_realizado"])
+        self.assertEqual(status_hoje["motivo_checkin_bloqueado"], "Limite semanal de check-ins atingido.")
+
+        Mensalidade.objects.create(aluno=self.aluno, valor=Decimal("160.00"), data_vencimento=date(2029, 12, 10))
+        dados = calcular_status_hoje(self.aluno, agora=AGORA)
+        self.assertFalse(dados["pagamento_ok"])
+        self.assertEqual(dados["status_hoje"]["motivo_checkin_bloqueado"], "Você possui pendências de pagamento.")
+
+    def test_v2_aponta_historicos_paginados(self):
+        self._presencas(3)
+        resp = self.client.get("/api/alunos/painel-aluno/v2/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("historico_aulas", resp.data)
+
+        resp = self.client.get(resp.data["historicos"]["aulas"], {"page_size": 2})
+        datas = [p["data"] for p in resp.data["results"]]
+        resp = self.client.get(resp.data["next"])
+        datas += [p["data"] for p in resp.data["results"]]
+        self.assertEqual(datas, ["25-02-2030", "18-02-2030", "11-02-2030"])
+        self.assertEqual(resp.data["results"][0]["professor"], "-")
+
+        # O painel original continua com os históricos completos
+        resp = self.client.get("/api/alunos/painel-aluno/")
+        self.assertEqual(len(resp.data["historico_aulas"]), 3)
+
+    def test_historico_em_cache_invalidado_por_gravacoes(self):
+        url = "/api/alunos/painel-aluno/v2/historico-aulas/"
+        self._presencas(1)
+        resp = self.client.get(url)
+        self.assertEqual(len(resp.data["results"]), 1)
+        with self.assertNumQueries(0):
+            resp_304 = self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp_304.status_code, 304)
+
+        Presenca.objects.create(usuario=self.aluno, turma=self.turma, data=SEGUNDA - timedelta(days=2))
+        self.assertEqual(len(self.client.get(url).data["results"]), 2)
+
+        # Gravação em lote (sem post_save) também invalida
+        registrar_presencas_em_lote(self.turma, SEGUNDA, alunos_presentes=[self.aluno.id])
+        self.assertEqual(len(self.client.get(url).data["results"]), 3)
 
-# Create your tests here.
+        pagamentos = "/api/alunos/painel-aluno/v2/historico-pagamentos/"
+        self.assertEqual(self.client.get(pagamentos).data["results"], [])
+        Mensalidade.objects.create(aluno=self.aluno, valor=Decimal("160.00"), data_vencimento=date(2031, 3, 10))
+        self.assertEqual(len(self.client.get(pagamentos).data["results"]), 1)
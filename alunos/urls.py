@@ -1,7 +1,8 @@
 from django.urls import path
 from .views import (
     HistoricoPagamentosAPIView, RealizarPagamentoAPIView, PagamentoEmDiaAPIView,
-    PainelAlunoAPIView, RealizarCheckinAPIView
+    PainelAlunoAPIView, RealizarCheckinAPIView, PainelAlunoV2APIView,
+    HistoricoAulasPainelAPIView, HistoricoPagamentosPainelAPIView,
 )
 
 urlpatterns = [
@@ -17,6 +18,11 @@ urlpatterns = [
     # Painel do aluno
     path('painel-aluno/', PainelAlunoAPIView.as_view(), name='painel_aluno_api'),
 
+    # Painel do aluno v2: núcleo + históricos paginados por cursor (?cursor=)
+    path('painel-aluno/v2/', PainelAlunoV2APIView.as_view(), name='painel_aluno_v2_api'),
+    path('painel-aluno/v2/historico-aulas/', HistoricoAulasPainelAPIView.as_view(), name='painel_aluno_historico_aulas_api'),
+    path('painel-aluno/v2/historico-pagamentos/', HistoricoPagamentosPainelAPIView.as_view(), name='painel_aluno_historico_pagamentos_api'),
+
     # Realizar check-in
     path('realizar-checkin/', RealizarCheckinAPIView.as_view(), name='realizar_checkin_api'),
 ]
\ No newline at end of file
@@ -1,27 +1,29 @@
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from financeiro.models import Mensalidade
-from datetime import timedelta
 from funcionarios.models import Presenca
 from turmas.models import Turma
 
-from .checkin_utils import encontrar_data_aula_checkin
+from .checkin_utils import _DIAS_SEMANA_NOMES, encontrar_data_aula_checkin
+from .pagination import HistoricoAulasPagination, HistoricoPagamentosPagination
+from .painel import (
+    SECAO_AULAS,
+    SECAO_PAGAMENTOS,
+    calcular_status_hoje,
+    historico_aulas,
+    historico_pagamentos,
+    obter_pagina_historico,
+    regras_checkin,
+)
+from rest_framework.generics import ListAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .serializers import MensalidadeSerializer, UsuarioSerializer
 from rest_framework import status
 from app.date_api import format_data_api
-
-_DIAS_SEMANA_NOMES = (
-    "Segunda-feira",
-    "Terça-feira",
-    "Quarta-feira",
-    "Quinta-feira",
-    "Sexta-feira",
-    "Sábado",
-    "Domingo",
-)
+from app.etag import resposta_condicional
 
 
 def _serialize_presenca_historico_aluno(presenca: Presenca) -> dict:
@@ -30,7 +32,8 @@ def _serialize_presenca_historico_aluno(presenca: Presenca) -> dict:
     da data (calendário local do servidor), alinhado ao que o app já espera.
     """
     turma = presenca.turma
-    prof = turma.professores.first() if turma else None
+    # Menor id em memória: .first() ignoraria o prefetch e consultaria por presença
+    prof = min(turma.professores.all(), key=lambda p: p.pk, default=None) if turma else None
     if prof:
         professor_nome = (prof.get_full_name() or "").strip() or prof.username
     else:
@@ -109,140 +112,95 @@ class PagamentoEmDiaAPIView(APIView):
 
 
 class PainelAlunoAPIView(APIView):
-    """API para exibir o painel do aluno."""
-    permission_classes = [IsAuthenticated]
+    """API para exibir o painel do aluno.
 
-    def _dia_semana_nome(self, data):
-        return _DIAS_SEMANA_NOMES[data.weekday()]
-
-    def _validar_regras_checkin(self, aluno, turma, data_ref):
-        if not aluno.dias_habilitados.exists():
-            return False, "Dias habilitados do aluno não configurados."
+    Formato original, com os históricos completos embutidos; mantido para as versões do
+    app que ainda não usam o painel v2 (PainelAlunoV2APIView).
+    """
+    permission_classes = [IsAuthenticated]
 
-        dia_nome = self._dia_semana_nome(data_ref)
-        if not aluno.dias_habilitados.filter(nome=dia_nome).exists():
-            return False, "Este dia não está habilitado para este aluno no plano."
+    def get(self, request):
+        usuario = request.user
+        nucleo = calcular_status_hoje(usuario)
+        return Response({
+            "usuario": UsuarioSerializer(usuario).data,
+            "historico_aulas": [
+                _serialize_presenca_historico_aluno(p)
+                for p in historico_aulas(usuario).order_by("-data")
+            ],
+            "historico_pagamentos": MensalidadeSerializer(
+                historico_pagamentos(usuario).order_by('-data_vencimento'), many=True
+            ).data,
+            **nucleo,
+        })
 
-        if turma and not turma.dias_semana.filter(nome=dia_nome).exists():
-            return False, "A turma não tem aula neste dia da semana."
 
-        limite = aluno.dias_habilitados.count()
-        inicio_semana = data_ref - timedelta(days=data_ref.weekday())
-        fim_semana = inicio_semana + timedelta(days=6)
-        checkins_semana = Presenca.objects.filter(
-            usuario=aluno,
-            data__range=(inicio_semana, fim_semana),
-            checkin_realizado=True
-        ).count()
-        if checkins_semana >= limite:
-            return False, "Limite semanal de check-ins atingido."
+class PainelAlunoV2APIView(APIView):
+    """Painel do aluno v2: só o núcleo (status de hoje), com número fixo de consultas.
 
-        return True, None
+    Os históricos saem do painel e viram sub-recursos paginados por cursor
+    (``historicos.aulas`` / ``historicos.pagamentos`` trazem as URLs).
+    """
+    permission_classes = [IsAuthenticated]
 
     def get(self, request):
         usuario = request.user
-        # Reativação automática se a suspensão já expirou
-        if getattr(usuario, "contrato_suspenso", False) and not usuario.esta_suspenso():
-            usuario.limpar_suspensao(save=True)
-
-        historico_aulas = (
-            Presenca.objects.filter(usuario=usuario)
-            .select_related("turma", "turma__ct")
-            .prefetch_related("turma__professores", "turma__dias_semana")
-            .order_by("-data")
-        )
-        historico_pagamentos = Mensalidade.objects.filter(aluno=usuario).order_by('-data_vencimento')
-        turma = Turma.objects.filter(alunos=usuario, ativo=True).prefetch_related("dias_semana").first()
-        turma_nome = str(turma) if turma else None
+        nucleo = calcular_status_hoje(usuario)
+        return Response({
+            "usuario": UsuarioSerializer(usuario).data,
+            **nucleo,
+            "historicos": {
+                "aulas": request.build_absolute_uri(reverse('painel_aluno_historico_aulas_api')),
+                "pagamentos": request.build_absolute_uri(reverse('painel_aluno_historico_pagamentos_api')),
+            },
+        })
 
-        # Verificar status de hoje (mesmo calendário BR que Mensalidade.status_efetivo)
-        hoje = timezone.localdate()
-        presenca_hoje = Presenca.objects.filter(usuario=usuario, data=hoje).first()
 
-        aula_checkin = encontrar_data_aula_checkin(usuario, turma) if turma else None
-        data_aula_checkin = aula_checkin[0] if aula_checkin else None
-        horario_aula_checkin = (
-            timezone.localtime(aula_checkin[1]).strftime("%H:%M") if aula_checkin else None
+class _HistoricoPainelAlunoAPIView(ListAPIView):
+    """Base dos históricos do painel v2: página por cursor, em cache por aluno, com ETag.
+
+    A página é guardada sob a versão do aluno (trocada a cada gravação de Presenca ou
+    Mensalidade, ver alunos.painel); com ``If-None-Match`` igual, devolve 304 sem corpo.
+    """
+    permission_classes = [IsAuthenticated]
+    secao = None
+
+    def serializar(self, itens):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        def montar():
+            pagina = self.paginate_queryset(self.get_queryset())
+            return self.get_paginated_response(self.serializar(pagina)).data
+
+        dados = obter_pagina_historico(
+            request.user.pk, self.secao, request.build_absolute_uri(), montar
         )
+        return resposta_condicional(request, dados)
 
-        if data_aula_checkin is not None:
-            presenca_alvo = Presenca.objects.filter(
-                usuario=usuario, turma=turma, data=data_aula_checkin
-            ).first()
-            checkin_realizado = presenca_alvo.checkin_realizado if presenca_alvo else False
-            presenca_confirmada = presenca_alvo.presenca_confirmada if presenca_alvo else False
-            ausencia_registrada = (
-                bool(presenca_alvo.ausencia_registrada) if presenca_alvo else False
-            )
-        else:
-            checkin_realizado = presenca_hoje.checkin_realizado if presenca_hoje else False
-            presenca_confirmada = presenca_hoje.presenca_confirmada if presenca_hoje else False
-            ausencia_registrada = (
-                bool(presenca_hoje.ausencia_registrada) if presenca_hoje else False
-            )
 
-        # Calcular a idade do aluno
-        if usuario.data_nascimento:
-            idade = hoje.year - usuario.data_nascimento.year - (
-                (hoje.month, hoje.day) < (usuario.data_nascimento.month, usuario.data_nascimento.day)
-            )
-        else:
-            idade = None
+class HistoricoAulasPainelAPIView(_HistoricoPainelAlunoAPIView):
+    """Histórico de aulas do aluno (painel v2), mais recentes primeiro."""
+    pagination_class = HistoricoAulasPagination
+    secao = SECAO_AULAS
 
-        mensalidades_atrasadas = Mensalidade.objects.filter(
-            aluno=usuario
-        ).exclude(status="pago").filter(data_vencimento__lt=hoje)
-
-        if mensalidades_atrasadas.exists():
-            pode_fazer_checkin = False
-            motivo_checkin_bloqueado = "Você possui pendências de pagamento."
-        elif not getattr(usuario, "ativo", True):
-            pode_fazer_checkin = False
-            motivo_checkin_bloqueado = (
-                "Seu vínculo com o CT foi encerrado. Você ainda pode acessar o financeiro "
-                "para quitar pendências."
-            )
-        elif hasattr(usuario, "esta_suspenso") and usuario.esta_suspenso():
-            ate = usuario.suspenso_ate.strftime("%d/%m/%Y") if usuario.suspenso_ate else ""
-            pode_fazer_checkin = False
-            motivo_checkin_bloqueado = (
-                f"Seu contrato está suspenso até {ate}." if ate
-                else "Seu contrato está temporariamente suspenso."
-            )
-        elif not turma:
-            pode_fazer_checkin = False
-            motivo_checkin_bloqueado = "Você não está matriculado em nenhuma turma ativa."
-        elif data_aula_checkin is None:
-            pode_fazer_checkin = False
-            motivo_checkin_bloqueado = (
-                "Check-in disponível apenas entre 24 horas antes e até o horário de início da aula."
-            )
-        else:
-            pode_fazer_checkin, motivo_checkin_bloqueado = self._validar_regras_checkin(
-                usuario, turma, data_aula_checkin
-            )
+    def get_queryset(self):
+        return historico_aulas(self.request.user)
 
-        return Response({
-            "usuario": UsuarioSerializer(usuario).data,
-            "historico_aulas": [
-                _serialize_presenca_historico_aluno(p) for p in historico_aulas
-            ],
-            "historico_pagamentos": MensalidadeSerializer(historico_pagamentos, many=True).data,
-            "pagamento_ok": not Mensalidade.objects.filter(
-                aluno=usuario
-            ).exclude(status="pago").filter(data_vencimento__lt=hoje).exists(),
-            "idade": idade,
-            "turma": turma_nome,
-            "status_hoje": {
-                "checkin_realizado": checkin_realizado,
-                "presenca_confirmada": presenca_confirmada,
-                "ausencia_registrada": ausencia_registrada,
-                "pode_fazer_checkin": pode_fazer_checkin,
-                "motivo_checkin_bloqueado": motivo_checkin_bloqueado,
-                "data_aula_checkin": format_data_api(data_aula_checkin) if data_aula_checkin else None,
-                "horario_aula_checkin": horario_aula_checkin,
-            }
-        })
+    def serializar(self, itens):
+        return [_serialize_presenca_historico_aluno(p) for p in itens]
+
+
+class HistoricoPagamentosPainelAPIView(_HistoricoPainelAlunoAPIView):
+    """Histórico de mensalidades do aluno (painel v2), vencimento mais recente primeiro."""
+    pagination_class = HistoricoPagamentosPagination
+    secao = SECAO_PAGAMENTOS
+
+    def get_queryset(self):
+        return historico_pagamentos(self.request.user)
+
+    def serializar(self, itens):
+        return MensalidadeSerializer(itens, many=True).data
 
 
 class RealizarCheckinAPIView(APIView):
@@ -312,8 +270,7 @@ class RealizarCheckinAPIView(APIView):
             )
 
         # Regras de plano e dias habilitados (semana da data da aula)
-        painel = PainelAlunoAPIView()
-        pode_checkin, motivo = painel._validar_regras_checkin(usuario, turma, data_aula)
+        pode_checkin, motivo = regras_checkin(usuario, turma, data_aula)
         if not pode_checkin:
             return Response({"error": motivo}, status=status.HTTP_403_FORBIDDEN)
 
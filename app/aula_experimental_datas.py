@@ -5,14 +5,14 @@ from __future__ import annotations
 from calendar import monthrange
 from datetime import date
 
-import holidays
 from django.utils import timezone
 
+from app.calendario_br import eh_feriado_nacional
+
 
 def eh_feriado_nacional_br(d: date) -> bool:
     """Retorna True se a data for feriado nacional no Brasil."""
-    cal = holidays.country_holidays("BR", years=d.year)
-    return d in cal
+    return eh_feriado_nacional(d)
 
 
 def meses_janela_agendamento(ref: date) -> tuple[tuple[int, int], tuple[int, int]]:
@@ -0,0 +1,175 @@
+"""
+Calendário de dias úteis do Brasil (feriados nacionais), compartilhado pelo processo.
+
+Os feriados de uma faixa de anos são expandidos uma única vez em tabelas por dia
+(índice = dias desde 1º de janeiro do primeiro ano):
+
+- `util`: bytearray com 1 nos dias úteis (segunda a sexta, fora de feriado nacional);
+- `feriado`: bytearray com 1 nos feriados nacionais;
+- `proximo`: array com o índice do próximo dia útil a partir de cada dia;
+- `acumulado`: array com a contagem de dias úteis antes de cada dia.
+
+Assim todas as consultas são O(1). Uma data fora da faixa reconstrói o calendário
+cobrindo a faixa nova (raro: a faixa inicial vai de 5 anos atrás a 5 anos à frente).
+
+Micro-benchmark (custo por chamada, calendário novo x memoizado):
+    python -m app.calendario_br
+"""
+from __future__ import annotations
+
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Iterable
+
+import holidays
+
+ANOS_ANTES = 5
+ANOS_DEPOIS = 5
+
+
+class CalendarioDiasUteisBR:
+    """Tabelas imutáveis de dias úteis/feriados para os anos [ano_inicio, ano_fim]."""
+
+    def __init__(self, ano_inicio: int, ano_fim: int):
+        self.ano_inicio = ano_inicio
+        self.ano_fim = ano_fim
+        self._base = date(ano_inicio, 1, 1).toordinal()
+        total = date(ano_fim, 12, 31).toordinal() - self._base + 1
+
+        feriados = holidays.country_holidays("BR", years=range(ano_inicio, ano_fim + 1))
+        self._feriado = bytearray(total)
+        for d in feriados:
+            i = d.toordinal() - self._base
+            if 0 <= i < total:
+                self._feriado[i] = 1
+
+        # date(ano_inicio, 1, 1).weekday() dá o dia da semana do índice 0
+        semana0 = date(ano_inicio, 1, 1).weekday()
+        self._util = bytearray(
+            1 if (semana0 + i) % 7 < 5 and not self._feriado[i] else 0 for i in range(total)
+        )
+
+        self._acumulado = array("I", [0]) * (total + 1)
+        for i in range(total):
+            self._acumulado[i + 1] = self._acumulado[i] + self._util[i]
+
+        # Sentinela `total` para os últimos dias não úteis da faixa (tratado em _indice_proximo)
+        self._proximo = array("I", [total]) * total
+        seguinte = total
+        for i in range(total - 1, -1, -1):
+            if self._util[i]:
+                seguinte = i
+            self._proximo[i] = seguinte
+        self._total = total
+
+    def cobre(self, d: date) -> bool:
+        return 0 <= d.toordinal() - self._base < self._total
+
+    def _indice(self, d: date) -> int:
+        return d.toordinal() - self._base
+
+    def eh_feriado_nacional(self, d: date) -> bool:
+        return bool(self._feriado[self._indice(d)])
+
+    def eh_dia_util(self, d: date) -> bool:
+        return bool(self._util[self._indice(d)])
+
+    def _indice_proximo(self, d: date) -> int | None:
+        j = self._proximo[self._indice(d)]
+        return None if j == self._total else j
+
+    def proximo_dia_util(self, d: date) -> date | None:
+        """`d` se for dia útil; senão o próximo. None se cair além do fim da faixa."""
+        j = self._indice_proximo(d)
+        return None if j is None else date.fromordinal(self._base + j)
+
+    def dias_uteis_entre(self, inicio: date, fim: date) -> int:
+        """Quantidade de dias úteis no intervalo semiaberto [inicio, fim)."""
+        if fim <= inicio:
+            return 0
+        return self._acumulado[self._indice(fim)] - self._acumulado[self._indice(inicio)]
+
+
+_calendario: CalendarioDiasUteisBR | None = None
+_lock = threading.Lock()
+
+
+def calendario_br(*datas: date) -> CalendarioDiasUteisBR:
+    """
+    Calendário do processo, garantindo cobertura das `datas` informadas
+    (e do ano seguinte à maior delas, para o próximo dia útil nunca sair da faixa).
+    """
+    global _calendario
+    cal = _calendario
+    if cal is not None and all(cal.ano_inicio <= d.year and d.year + 1 <= cal.ano_fim for d in datas):
+        return cal
+    with _lock:
+        cal = _calendario
+        hoje = date.today()
+        anos = [hoje.year - ANOS_ANTES, hoje.year + ANOS_DEPOIS]
+        if cal is not None:
+            anos += [cal.ano_inicio, cal.ano_fim]
+        for d in datas:
+            anos += [d.year, d.year + 1]
+        ano_inicio, ano_fim = min(anos), max(anos)
+        if cal is None or ano_inicio < cal.ano_inicio or ano_fim > cal.ano_fim:
+            cal = _calendario = CalendarioDiasUteisBR(ano_inicio, ano_fim)
+        return cal
+
+
+def eh_feriado_nacional(d: date) -> bool:
+    return calendario_br(d).eh_feriado_nacional(d)
+
+
+def eh_dia_util(d: date) -> bool:
+    return calendario_br(d).eh_dia_util(d)
+
+
+def proximo_dia_util(d: date) -> date:
+    """`d` se for dia útil (segunda a sexta, fora de feriado nacional); senão o próximo dia útil."""
+    return calendario_br(d).proximo_dia_util(d)
+
+
+def dias_uteis_entre(inicio: date, fim: date) -> int:
+    """Quantidade de dias úteis em [inicio, fim)."""
+    return calendario_br(inicio, fim).dias_uteis_entre(inicio, fim)
+
+
+def proximos_dias_uteis(datas: Iterable[date]) -> list[date]:
+    """Versão em lote de proximo_dia_util (uma verificação de faixa para todas as datas)."""
+    datas = list(datas)
+    if not datas:
+        return []
+    cal = calendario_br(min(datas), max(datas))
+    return [cal.proximo_dia_util(d) for d in datas]
+
+
+def _benchmark(n: int = 2000) -> None:
+    import timeit
+
+    datas = [date(2026, 1, 1) + timedelta(days=i % 730) for i in range(n)]
+
+    def sem_memo():
+        for d in datas:
+            br = holidays.country_holidays("BR", years=range(d.year - 1, d.year + 4))
+            while d.weekday() >= 5 or d in br:
+                d += timedelta(days=1)
+
+    def com_memo():
+        for d in datas:
+            proximo_dia_util(d)
+
+    calendario_br(*datas)  # construção fora da medição
+    construcao = timeit.timeit(lambda: CalendarioDiasUteisBR(2021, 2031), number=1)
+    t_sem = min(timeit.repeat(sem_memo, number=1, repeat=3)) / n
+    t_com = min(timeit.repeat(com_memo, number=1, repeat=5)) / n
+    t_lote = min(timeit.repeat(lambda: proximos_dias_uteis(datas), number=1, repeat=5)) / n
+    print(f"construção do calendário (11 anos): {construcao * 1e3:.1f} ms")
+    print(f"proximo_dia_util, calendário por chamada: {t_sem * 1e6:10.1f} µs/chamada")
+    print(f"proximo_dia_util, memoizado:              {t_com * 1e6:10.2f} µs/chamada")
+    print(f"proximos_dias_uteis (lote):               {t_lote * 1e6:10.2f} µs/data")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,29 @@
+"""
+Respostas condicionais (ETag fraco + 304) das telas que o app consulta em polling.
+
+O ETag é o SHA-1 do JSON do conteúdo (chaves ordenadas): o app reenvia em
+``If-None-Match`` e, se nada mudou, recebe 304 sem corpo. ``Cache-Control: private,
+no-cache`` obriga a revalidar sempre, sem guardar em caches compartilhados.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def etag_fraco(payload) -> str:
+    """ETag fraco do conteúdo (mesmo payload → mesmo ETag, independente da ordem das chaves)."""
+    bruto = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return 'W/"%s"' % hashlib.sha1(bruto.encode("utf-8")).hexdigest()
+
+
+def resposta_condicional(request, payload) -> Response:
+    """200 com ``payload`` e ETag, ou 304 sem corpo se o ``If-None-Match`` do app já é este ETag."""
+    etag = etag_fraco(payload)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(payload, status=status.HTTP_200_OK, headers=headers)
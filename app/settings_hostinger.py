@@ -194,6 +194,23 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache em disco dos PDFs de boleto (financeiro.boleto_pdf_cache). Com o prefixo X-Accel definido,
+# o nginx serve o arquivo (location `internal` apontando para este diretório); vazio = FileResponse.
+BOLETO_PDF_CACHE_DIR = os.path.join(MEDIA_ROOT, 'boletos')
+BOLETO_PDF_X_ACCEL_PREFIX = os.getenv('BOLETO_PDF_X_ACCEL_PREFIX', '')
+
+# Páginas de histórico do painel do aluno em cache (s). Gravações em Presenca/Mensalidade
+# invalidam na hora; sem cache compartilhado entre workers (LocMemCache), este é o atraso máximo.
+PAINEL_ALUNO_CACHE_TTL = int(os.getenv('PAINEL_ALUNO_CACHE_TTL', '300'))
+
+# Push Expo (usuarios.campanhas_push): requisições simultâneas por campanha e espera (s)
+# antes de consultar os recibos (a Expo recomenda ~15 min após o envio)
+EXPO_PUSH_WORKERS = int(os.getenv('EXPO_PUSH_WORKERS', '4'))
+EXPO_PUSH_RECIBOS_ATRASO = int(os.getenv('EXPO_PUSH_RECIBOS_ATRASO', '900'))
+
+# Fila de e-mails (usuarios.fila_email): e-mails enviados por conexão SMTP em cada lote do worker
+EMAIL_FILA_LOTE = int(os.getenv('EMAIL_FILA_LOTE', '50'))
+
 # Upload de fotos: 10MB para evitar TemporaryUploadedFile (BufferedRandom) que causa
 # "cannot pickle 'BufferedRandom' instances" em arquivos > 2.5MB (padrão Django)
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
@@ -255,6 +272,18 @@ else:  # sandbox (padrão)
 C6_BANK_SANDBOX_URL = os.getenv('C6_BANK_SANDBOX_URL', 'https://baas-api-sandbox.c6bank.info')
 C6_BANK_PRODUCTION_URL = os.getenv('C6_BANK_PRODUCTION_URL', 'https://baas-api.c6bank.info')
 
+# Cliente HTTP do C6 Bank: conexões keep-alive por processo e retentativas em 429/503/504
+C6_BANK_HTTP_POOL_MAXSIZE = int(os.getenv('C6_BANK_HTTP_POOL_MAXSIZE', '10'))
+C6_BANK_MAX_RETRIES = int(os.getenv('C6_BANK_MAX_RETRIES', '3'))
+C6_BANK_RETRY_BACKOFF = float(os.getenv('C6_BANK_RETRY_BACKOFF', '0.5'))  # segundos (dobra a cada tentativa)
+# Tempo total (s) que uma chamada pode gastar entre tentativas; fica bem abaixo do timeout do gunicorn (30s)
+C6_BANK_RETRY_ORCAMENTO = float(os.getenv('C6_BANK_RETRY_ORCAMENTO', '8'))
+
+# Reconciliação em lote (sincronizar_*_c6): threads simultâneas e limite de taxa (token bucket)
+C6_BANK_RECONCILIACAO_WORKERS = int(os.getenv('C6_BANK_RECONCILIACAO_WORKERS', '4'))
+C6_BANK_RECONCILIACAO_TAXA = float(os.getenv('C6_BANK_RECONCILIACAO_TAXA', '5'))  # requisições/segundo
+C6_BANK_RECONCILIACAO_RAJADA = int(os.getenv('C6_BANK_RECONCILIACAO_RAJADA', '10'))
+
 # Wellhub (Gympass) Booking API
 WELLHUB_API_BASE_URL = os.getenv(
     'WELLHUB_API_BASE_URL',
@@ -266,6 +295,14 @@ WELLHUB_WEBHOOK_SECRET = os.getenv('WELLHUB_WEBHOOK_SECRET', '')
 WELLHUB_PRODUCT_ID = int(os.getenv('WELLHUB_PRODUCT_ID', '1') or '1')
 WELLHUB_HTTP_TIMEOUT = int(os.getenv('WELLHUB_HTTP_TIMEOUT', '30') or '30')
 WELLHUB_HTTP_MAX_RETRIES = int(os.getenv('WELLHUB_HTTP_MAX_RETRIES', '2') or '2')
+# Espera base (s) do backoff exponencial com jitter entre retentativas; Retry-After tem prioridade
+WELLHUB_HTTP_RETRY_BACKOFF = float(os.getenv('WELLHUB_HTTP_RETRY_BACKOFF', '0.5') or '0.5')
+# Conexões keep-alive mantidas com a API (>= WELLHUB_SYNC_WORKERS)
+WELLHUB_HTTP_POOL_MAXSIZE = int(os.getenv('WELLHUB_HTTP_POOL_MAXSIZE', '10') or '10')
+# Chamadas simultâneas à API na sincronização de slots (criação/PATCH)
+WELLHUB_SYNC_WORKERS = int(os.getenv('WELLHUB_SYNC_WORKERS', '4') or '4')
+# Janela (s) em que reservas do mesmo slot são agrupadas num único PATCH de cotas
+WELLHUB_SLOT_PUSH_WINDOW = float(os.getenv('WELLHUB_SLOT_PUSH_WINDOW', '2') or '2')
 
 # Configurações de logging para produção
 LOGGING = {
@@ -0,0 +1,57 @@
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import holidays
+
+from app import calendario_br
+from app.calendario_br import (
+    CalendarioDiasUteisBR,
+    dias_uteis_entre,
+    eh_dia_util,
+    eh_feriado_nacional,
+    proximo_dia_util,
+    proximos_dias_uteis,
+)
+
+
+def _proximo_dia_util_ingenuo(d):
+    br = holidays.country_holidays("BR", years=range(d.year - 1, d.year + 2))
+    while d.weekday() >= 5 or d in br:
+        d += timedelta(days=1)
+    return d
+
+
+class CalendarioBRTests(unittest.TestCase):
+    def test_confere_com_holidays_dia_a_dia(self):
+        br = holidays.country_holidays("BR", years=range(2025, 2028))
+        d = date(2025, 1, 1)
+        while d <= date(2027, 12, 31):
+            self.assertEqual(eh_feriado_nacional(d), d in br, d)
+            self.assertEqual(eh_dia_util(d), d.weekday() < 5 and d not in br, d)
+            self.assertEqual(proximo_dia_util(d), _proximo_dia_util_ingenuo(d), d)
+            d += timedelta(days=1)
+
+    def test_exemplos(self):
+        self.assertEqual(proximo_dia_util(date(2026, 4, 21)), date(2026, 4, 22))  # Tiradentes (terça)
+        self.assertEqual(proximo_dia_util(date(2031, 5, 31)), date(2031, 6, 2))  # sábado
+        self.assertEqual(proximo_dia_util(date(2026, 3, 10)), date(2026, 3, 10))
+
+    def test_dias_uteis_entre_intervalo_semiaberto(self):
+        # 20/04/2026 (seg) a 27/04/2026 (seg): 21/04 é feriado
+        self.assertEqual(dias_uteis_entre(date(2026, 4, 20), date(2026, 4, 27)), 4)
+        self.assertEqual(dias_uteis_entre(date(2026, 4, 27), date(2026, 4, 20)), 0)
+        self.assertEqual(dias_uteis_entre(date(2026, 4, 20), date(2026, 4, 20)), 0)
+
+    def test_lote_igual_a_chamadas_individuais(self):
+        datas = [date(2026, 12, 20) + timedelta(days=i) for i in range(20)]
+        self.assertEqual(proximos_dias_uteis(datas), [proximo_dia_util(d) for d in datas])
+        self.assertEqual(proximos_dias_uteis([]), [])
+
+    def test_data_fora_da_faixa_amplia_o_calendario(self):
+        with mock.patch.object(calendario_br, "_calendario", CalendarioDiasUteisBR(2026, 2026)):
+            self.assertEqual(proximo_dia_util(date(2026, 12, 31)), date(2026, 12, 31))
+            # 01/01/2060 (feriado) exige reconstruir até 2061
+            self.assertEqual(proximo_dia_util(date(2060, 1, 1)), date(2060, 1, 2))
+            self.assertLessEqual(calendario_br._calendario.ano_inicio, 2026)
+            self.assertGreaterEqual(calendario_br._calendario.ano_fim, 2061)
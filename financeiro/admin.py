@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Mensalidade, Despesa
+from .models import Mensalidade, Despesa, TarefaFinanceira, ExecucaoReconciliacaoC6, EventoWebhookC6
 
 @admin.register(Mensalidade)
 class MensalidadeAdmin(admin.ModelAdmin):
@@ -25,3 +25,30 @@ class DespesaAdmin(admin.ModelAdmin):
     ordering = ["-data"]
     date_hierarchy = "data"
     list_per_page = 20
+
+
+@admin.register(TarefaFinanceira)
+class TarefaFinanceiraAdmin(admin.ModelAdmin):
+    list_display = ("chave", "tipo", "status", "tentativas", "executar_apos", "concluida_em", "worker")
+    list_filter = ["tipo", "status"]
+    search_fields = ("chave",)
+    ordering = ["-criada_em"]
+    readonly_fields = ("iniciada_em", "concluida_em", "worker", "resultado", "erro", "criada_em", "atualizada_em")
+
+
+@admin.register(ExecucaoReconciliacaoC6)
+class ExecucaoReconciliacaoC6Admin(admin.ModelAdmin):
+    list_display = ("tipo", "status", "iniciada_em", "processadas", "candidatas", "erros", "duracao_segundos", "retomadas")
+    list_filter = ["tipo", "status"]
+    ordering = ["-iniciada_em"]
+    readonly_fields = [f.name for f in ExecucaoReconciliacaoC6._meta.fields]
+
+
+@admin.register(EventoWebhookC6)
+class EventoWebhookC6Admin(admin.ModelAdmin):
+    list_display = ("chave", "servico", "status", "tentativas", "recebimentos", "recebido_em", "concluido_em")
+    list_filter = ["servico", "status"]
+    search_fields = ("chave", "txid")
+    ordering = ["-recebido_em"]
+    raw_id_fields = ("mensalidade",)
+    readonly_fields = ("payload", "iniciado_em", "concluido_em", "worker", "resultado", "erro", "recebido_em", "atualizado_em")
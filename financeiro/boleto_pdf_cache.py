@@ -0,0 +1,125 @@
+"""
+Cache em disco dos PDFs de boleto do C6.
+
+get_bank_slip_pdf pode levar dezenas de segundos (retentativas com espera e fallback
+para o base64 da consulta), então o PDF é baixado uma vez e guardado sob
+settings.BOLETO_PDF_CACHE_DIR (dentro de MEDIA_ROOT), endereçado pelo conteúdo:
+``<sha256[:2]>/<sha256>.pdf``. A transação guarda o sha256 (boleto_pdf_sha256): o mesmo
+PDF baixado de novo cai no mesmo arquivo, e o hash serve de ETag.
+
+O download é servido por FileResponse ou, com settings.BOLETO_PDF_X_ACCEL_PREFIX
+definido, pelo nginx (X-Accel-Redirect para uma location ``internal``), sem passar os
+bytes pelo worker do gunicorn. O PDF é pré-baixado em segundo plano (fila
+TarefaFinanceira) assim que o boleto é criado e descartado ao alterar/cancelar o boleto.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+
+from .models import TarefaFinanceira, TransacaoC6Bank
+
+logger = logging.getLogger(__name__)
+
+_PARTNER = {'partner_software_name': 'CT Supera', 'partner_software_version': '1.0.0'}
+
+
+def _caminho_relativo(sha256: str) -> str:
+    return f'{sha256[:2]}/{sha256}.pdf'
+
+
+def caminho_pdf_boleto(sha256: str) -> str:
+    return os.path.join(settings.BOLETO_PDF_CACHE_DIR, _caminho_relativo(sha256))
+
+
+def pdf_boleto_em_cache(transacao: TransacaoC6Bank) -> str | None:
+    """Caminho do PDF em cache da transação, ou None se não houver (ou o arquivo sumiu)."""
+    if not transacao.boleto_pdf_sha256:
+        return None
+    caminho = caminho_pdf_boleto(transacao.boleto_pdf_sha256)
+    return caminho if os.path.exists(caminho) else None
+
+
+def guardar_pdf_boleto(transacao: TransacaoC6Bank, conteudo: bytes) -> str:
+    """Grava o PDF (escrita atômica) e associa o hash à transação. Retorna o sha256."""
+    sha256 = hashlib.sha256(conteudo).hexdigest()
+    caminho = caminho_pdf_boleto(sha256)
+    if not os.path.exists(caminho):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+    TransacaoC6Bank.objects.filter(pk=transacao.pk).update(boleto_pdf_sha256=sha256)
+    transacao.boleto_pdf_sha256 = sha256
+    return sha256
+
+
+def obter_pdf_boleto(transacao: TransacaoC6Bank) -> str:
+    """Caminho do PDF da transação; baixa do C6 e guarda no cache se ainda não houver."""
+    from .c6_client import c6_client
+
+    caminho = pdf_boleto_em_cache(transacao)
+    if caminho:
+        return caminho
+    conteudo = c6_client.get_bank_slip_pdf(transacao.txid, **_PARTNER)
+    return caminho_pdf_boleto(guardar_pdf_boleto(transacao, conteudo))
+
+
+def ler_pdf_boleto_em_cache(transacao: TransacaoC6Bank) -> bytes | None:
+    caminho = pdf_boleto_em_cache(transacao)
+    if not caminho:
+        return None
+    with open(caminho, 'rb') as f:
+        return f.read()
+
+
+def invalidar_pdf_boleto(transacao: TransacaoC6Bank) -> None:
+    """Descarta o PDF em cache (boleto alterado/cancelado: o PDF antigo não vale mais)."""
+    sha256 = transacao.boleto_pdf_sha256
+    if not sha256:
+        return
+    TransacaoC6Bank.objects.filter(pk=transacao.pk).update(boleto_pdf_sha256='')
+    transacao.boleto_pdf_sha256 = ''
+    # Só apaga o arquivo se nenhuma outra transação aponta para o mesmo conteúdo
+    if not TransacaoC6Bank.objects.filter(boleto_pdf_sha256=sha256).exists():
+        try:
+            os.remove(caminho_pdf_boleto(sha256))
+        except FileNotFoundError:
+            pass
+
+
+def enfileirar_prefetch_pdf_boleto(transacao: TransacaoC6Bank) -> None:
+    """Agenda o download do PDF no worker da fila financeira (não bloqueia a requisição)."""
+    from .tarefas import enfileirar_tarefa
+
+    enfileirar_tarefa(
+        TarefaFinanceira.TIPO_BAIXAR_PDF_BOLETO,
+        f'{TarefaFinanceira.TIPO_BAIXAR_PDF_BOLETO}:{transacao.pk}',
+        {'transacao_id': transacao.pk},
+        reabrir=True,
+    )
+
+
+def resposta_pdf_boleto(request, transacao: TransacaoC6Bank, caminho: str):
+    """Resposta de download do PDF em cache (304 se o cliente já tem o mesmo conteúdo)."""
+    sha256 = transacao.boleto_pdf_sha256
+    etag = f'"{sha256}"'
+    if request.headers.get('If-None-Match') == etag:
+        resposta = HttpResponseNotModified()
+    elif settings.BOLETO_PDF_X_ACCEL_PREFIX:
+        resposta = HttpResponse(content_type='application/pdf')
+        resposta['X-Accel-Redirect'] = settings.BOLETO_PDF_X_ACCEL_PREFIX.rstrip('/') + '/' + _caminho_relativo(sha256)
+    else:
+        resposta = FileResponse(open(caminho, 'rb'), content_type='application/pdf')
+    resposta['Content-Disposition'] = f'attachment; filename="boleto_{transacao.txid}.pdf"'
+    resposta['ETag'] = etag
+    resposta['Cache-Control'] = 'private, max-age=3600'
+    return resposta
@@ -22,14 +22,23 @@ def sincronizar_transacao_boleto_c6(transacao: TransacaoC6Bank) -> dict:
     Returns:
         dict com keys: transacao (objeto atualizado), boleto_data (dict da API C6).
     """
+    return aplicar_boleto_c6(transacao, consultar_boleto_c6(transacao))
+
+
+def consultar_boleto_c6(transacao: TransacaoC6Bank) -> dict:
+    """Só a consulta HTTP ao C6 (sem tocar no banco de dados)."""
     if not transacao.txid:
         raise ValueError('Transação de boleto sem ID (txid) do C6.')
 
-    boleto_data = c6_client.get_bank_slip(
+    return c6_client.get_bank_slip(
         transacao.txid,
         partner_software_name=_PARTNER_NAME,
         partner_software_version=_PARTNER_VERSION,
     )
+
+
+def aplicar_boleto_c6(transacao: TransacaoC6Bank, boleto_data: dict) -> dict:
+    """Aplica na transação e na mensalidade o boleto já consultado no C6."""
     status_boleto = str(boleto_data.get('status', '') or '').upper().strip()
 
     transacao.resposta_api = boleto_data
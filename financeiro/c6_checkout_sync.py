@@ -19,10 +19,19 @@ def sincronizar_transacao_checkout_c6(transacao: TransacaoC6Bank) -> dict:
     Returns:
         dict com keys: transacao (objeto atualizado), checkout_data (dict da API C6).
     """
+    return aplicar_checkout_c6(transacao, consultar_checkout_c6(transacao))
+
+
+def consultar_checkout_c6(transacao: TransacaoC6Bank) -> dict:
+    """Só a consulta HTTP ao C6 (sem tocar no banco de dados)."""
     if not transacao.txid:
         raise ValueError('Transação de checkout sem ID (txid) do C6.')
 
-    checkout_data = c6_client.get_checkout(transacao.txid)
+    return c6_client.get_checkout(transacao.txid)
+
+
+def aplicar_checkout_c6(transacao: TransacaoC6Bank, checkout_data: dict) -> dict:
+    """Aplica na transação e na mensalidade o checkout já consultado no C6."""
     status_checkout = str(checkout_data.get('status', '') or '').upper().strip()
 
     transacao.resposta_api = checkout_data
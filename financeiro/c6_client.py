@@ -8,15 +8,25 @@ import requests
 import json
 import logging
 import base64
+import threading
 import time
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 import os
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+TOKEN_CACHE_KEY = 'c6_bank_access_token'
+# Trava de renovação do token: só um processo/thread autentica de cada vez (single-flight)
+TOKEN_LOCK_CACHE_KEY = 'c6_bank_access_token:renovando'
+TOKEN_LOCK_TIMEOUT = 30  # segundos
+TOKEN_ESPERA_MAX = 10  # quanto quem não renova espera o token novo aparecer no cache
+
+_token_lock = threading.Lock()
+
 
 def _path_exists_safe(path: Path) -> bool:
     """Evita PermissionError em CI (ex.: paths sob /root inacessíveis ao runner)."""
@@ -127,10 +137,20 @@ class C6BankMethodNotAllowedError(C6BankError):
     pass
 
 
+# Erros transitórios (limite de taxa / indisponibilidade) em que vale repetir a chamada
+ERROS_RETENTAVEIS = (C6BankTooManyRequestsError, C6BankServiceUnavailableError, C6BankGatewayTimeoutError)
+# POST não é idempotente: num 504 o C6 pode ter processado a criação, então não repete
+ERROS_RETENTAVEIS_POST = (C6BankTooManyRequestsError, C6BankServiceUnavailableError)
+
+
 class C6BankClient:
     """
     Cliente para comunicação com a API do C6 Bank
     Gerencia autenticação OAuth2 e requisições HTTP seguras
+
+    As chamadas usam uma requests.Session por processo (recriada após fork do gunicorn),
+    com pool de conexões keep-alive e o certificado mTLS associado à sessão: o handshake
+    TCP + TLS acontece uma vez por conexão do pool, não a cada chamada.
     """
     
     def __init__(self):
@@ -153,7 +173,54 @@ class C6BankClient:
         
         # Configuração de certificados SSL
         self.cert_config = self._setup_certificates()
-        
+
+        # Pool HTTP e política de retentativa (429/503/504)
+        self.pool_maxsize = getattr(settings, 'C6_BANK_HTTP_POOL_MAXSIZE', 10)
+        self.max_retries = getattr(settings, 'C6_BANK_MAX_RETRIES', 3)
+        self.retry_backoff = getattr(settings, 'C6_BANK_RETRY_BACKOFF', 0.5)
+        self.retry_orcamento = getattr(settings, 'C6_BANK_RETRY_ORCAMENTO', 8)
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+    def _http(self):
+        """
+        requests.Session keep-alive deste processo, com o certificado mTLS já configurado.
+        Um processo filho (fork) nunca herda as conexões do pai: a sessão é recriada.
+        """
+        if self._session is None or self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.cert = self.cert_config.get('cert') or None
+                    self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    def _espera_retentativa(self, method, erro, response, tentativa, restante):
+        """
+        Segundos até a próxima tentativa, ou None se não deve repetir.
+        Respeita Retry-After (em segundos) e, sem ele, usa backoff exponencial. Se a espera
+        não cabe no que `restante` do orçamento de retentativas (C6_BANK_RETRY_ORCAMENTO),
+        desiste e o erro original (ex.: C6BankTooManyRequestsError) sobe para quem chamou,
+        em vez de segurar o worker do gunicorn além do timeout.
+        """
+        if tentativa >= self.max_retries:
+            return None
+        retentaveis = ERROS_RETENTAVEIS_POST if method.upper() == 'POST' else ERROS_RETENTAVEIS
+        if not isinstance(erro, retentaveis):
+            return None
+        try:
+            espera = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            espera = self.retry_backoff * (2 ** tentativa)
+        espera = max(0.0, espera)
+        if espera > restante:
+            return None
+        return espera
+
     def _setup_certificates(self):
         """
         Configura os certificados SSL para comunicação segura
@@ -427,14 +494,38 @@ class C6BankClient:
     def _get_access_token(self):
         """
         Obtém token de acesso OAuth2 do C6 Bank
+
+        Renovação single-flight: dentro do processo, só uma thread autentica; entre processos,
+        só quem consegue o cache.add da trava autentica e os demais aguardam o token novo
+        aparecer no cache (efetivo entre workers quando o cache é compartilhado).
         """
-        cache_key = 'c6_bank_access_token'
-        
-        # Verifica se já existe um token válido no cache
-        cached_token = cache.get(cache_key)
+        cached_token = cache.get(TOKEN_CACHE_KEY)
         if cached_token:
             return cached_token
-            
+
+        with _token_lock:
+            cached_token = cache.get(TOKEN_CACHE_KEY)
+            if cached_token:
+                return cached_token
+            if not cache.add(TOKEN_LOCK_CACHE_KEY, os.getpid(), TOKEN_LOCK_TIMEOUT):
+                limite = time.monotonic() + TOKEN_ESPERA_MAX
+                while time.monotonic() < limite:
+                    time.sleep(0.2)
+                    cached_token = cache.get(TOKEN_CACHE_KEY)
+                    if cached_token:
+                        return cached_token
+                logger.warning("Renovação do token C6 em outro processo não concluiu; renovando aqui")
+            try:
+                return self._renovar_access_token()
+            finally:
+                cache.delete(TOKEN_LOCK_CACHE_KEY)
+
+    def _renovar_access_token(self):
+        """
+        Autentica no C6 Bank (client_credentials) e guarda o token no cache
+        """
+        cache_key = TOKEN_CACHE_KEY
+
         try:
             # Dados para autenticação - APENAS grant_type conforme documentação C6 Bank
             auth_data = {
@@ -455,20 +546,17 @@ class C6BankClient:
             logger.info(f"Client ID: {self.client_id}")
             logger.info(f"Ambiente: {self.environment}")
             
-            # Prepara os certificados mTLS (obrigatórios para autenticação C6 Bank)
-            cert_tuple = None
+            # Certificados mTLS (obrigatórios para autenticação C6 Bank) vão na sessão
             if self.cert_config.get('cert'):
-                cert_tuple = self.cert_config.get('cert')
                 logger.info("Usando certificados SSL mTLS para autenticação")
             else:
                 logger.warning("Certificados SSL não encontrados - autenticação pode falhar")
             
             # Faz a requisição de autenticação
-            response = requests.post(
+            response = self._http().post(
                 self.auth_url,
                 data=auth_data,
                 headers=headers,
-                cert=cert_tuple,
                 timeout=30
             )
             
@@ -511,7 +599,9 @@ class C6BankClient:
             if not self.cert_config.get('cert'):
                 logger.warning("Certificados não configurados, tentando re-verificar...")
                 self.cert_config = self._setup_certificates()
-                if not self.cert_config.get('cert'):
+                if self.cert_config.get('cert'):
+                    self._session = None  # próxima sessão já sai com o certificado
+                else:
                     logger.error("❌ ATENÇÃO: Certificados SSL não encontrados! A autenticação mTLS pode falhar.")
                     logger.error(f"   Cert path configurado: {self.cert_path}")
                     logger.error(f"   Key path configurado: {self.key_path}")
@@ -539,52 +629,61 @@ class C6BankClient:
             if headers_extra:
                 headers.update(headers_extra)
             
-            # Prepara os certificados
-            cert_tuple = self.cert_config.get('cert') if self.cert_config.get('cert') else None
-            
             logger.info(f"Fazendo requisição {method} para: {url}")
             logger.info(f"Endpoint recebido: {endpoint}")
             logger.info(f"URL final: {url}")
             logger.info(f"Headers: {dict(headers)}")
-            logger.info(f"Certificados configurados: {bool(cert_tuple)}")
+            logger.info(f"Certificados configurados: {bool(self.cert_config.get('cert'))}")
             if data:
                 logger.info(f"Dados do payload (resumido): {json.dumps(data, indent=2, ensure_ascii=False)[:500]}...")
             
-            # Faz a requisição
-            try:
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=data,
-                    params=params,
-                    cert=cert_tuple,
-                    timeout=30
-                )
-            except Exception as e:
-                logger.error(f"Erro na requisição HTTP: {str(e)}")
-                logger.error(f"URL: {url}")
-                logger.error(f"Método: {method}")
-                raise
-            
-            # Log da resposta
-            logger.info(f"Resposta recebida: {response.status_code}")
-            if response.status_code >= 400:
-                logger.error(f"Erro na resposta: Status {response.status_code}")
-                logger.error(f"URL da requisição: {url}")
-                logger.error(f"Método HTTP: {method}")
-                logger.error(f"Headers Allow (métodos permitidos): {response.headers.get('Allow', 'N/A')}")
-                logger.error(f"Resposta completa: {response.text[:1000]}")
-                if response.status_code == 405:
-                    logger.error(f"[ERRO 405] Método não permitido. Método usado: {method}, URL: {url}")
-                    logger.error(f"[ERRO 405] Métodos permitidos segundo o servidor: {response.headers.get('Allow', 'Não informado')}")
-            
-            # Verifica se a resposta não foi bem-sucedida (não é 2XX)
-            if not (200 <= response.status_code < 300):
+            # Faz a requisição (repete em 429/503/504 conforme _espera_retentativa)
+            tentativa = 0
+            inicio = time.monotonic()
+            while True:
+                try:
+                    response = self._http().request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        json=data,
+                        params=params,
+                        timeout=30
+                    )
+                except Exception as e:
+                    logger.error(f"Erro na requisição HTTP: {str(e)}")
+                    logger.error(f"URL: {url}")
+                    logger.error(f"Método: {method}")
+                    raise
+
+                # Log da resposta
+                logger.info(f"Resposta recebida: {response.status_code}")
+                if response.status_code >= 400:
+                    logger.error(f"Erro na resposta: Status {response.status_code}")
+                    logger.error(f"URL da requisição: {url}")
+                    logger.error(f"Método HTTP: {method}")
+                    logger.error(f"Headers Allow (métodos permitidos): {response.headers.get('Allow', 'N/A')}")
+                    logger.error(f"Resposta completa: {response.text[:1000]}")
+                    if response.status_code == 405:
+                        logger.error(f"[ERRO 405] Método não permitido. Método usado: {method}, URL: {url}")
+                        logger.error(f"[ERRO 405] Métodos permitidos segundo o servidor: {response.headers.get('Allow', 'Não informado')}")
+
+                # Verifica se a resposta foi bem-sucedida (2XX)
+                if 200 <= response.status_code < 300:
+                    return response
+
                 # Trata erros RFC 7807
-                raise self._parse_rfc7807_error(response)
-            
-            return response
+                erro = self._parse_rfc7807_error(response)
+                restante = self.retry_orcamento - (time.monotonic() - inicio)
+                espera = self._espera_retentativa(method, erro, response, tentativa, restante)
+                if espera is None:
+                    raise erro
+                tentativa += 1
+                logger.warning(
+                    f"C6 respondeu {response.status_code} em {method} {url}; "
+                    f"tentativa {tentativa}/{self.max_retries} em {espera:.1f}s"
+                )
+                time.sleep(espera)
             
         except C6BankError:
             # Re-lança erros RFC 7807
@@ -800,7 +899,7 @@ class C6BankClient:
     
     def list_pix_immediate_charges(self, inicio, fim, cpf=None, cnpj=None, 
                                    location_presente=None, status=None, 
-                                   pagina=1, itens_por_pagina=10):
+                                   pagina=0, itens_por_pagina=100):
         """
         Lista cobranças PIX imediatas por período
         Conforme documentação: pix-api.yaml linha 206-270
@@ -812,8 +911,8 @@ class C6BankClient:
             cnpj (str): Filtro pelo CNPJ do devedor (14 dígitos, opcional)
             location_presente (bool): Filtro pela existência de location vinculada (opcional)
             status (str): Filtro pelo status da cobrança (opcional)
-            pagina (int): Página atual (padrão: 1)
-            itens_por_pagina (int): Itens por página (padrão: 10)
+            pagina (int): Página atual, a partir de 0 (padrão: 0)
+            itens_por_pagina (int): Itens por página, até 1000 (padrão: 100)
             
         Returns:
             dict: Lista de cobranças imediatas
@@ -828,11 +927,12 @@ class C6BankClient:
             
             endpoint = f"{self.pix_base_url}/cob"
             
+            # Paginação conforme pix-api.yaml: paginacao.paginaAtual (0-based) e paginacao.itensPorPagina
             params = {
                 'inicio': inicio,
                 'fim': fim,
-                'paginaAtual': pagina,
-                'itensPorPagina': itens_por_pagina
+                'paginacao.paginaAtual': pagina,
+                'paginacao.itensPorPagina': itens_por_pagina
             }
             
             if cpf:
@@ -992,7 +1092,7 @@ class C6BankClient:
     
     def list_pix_charges_with_due_date(self, inicio, fim, cpf=None, cnpj=None,
                                       location_presente=None, status=None,
-                                      lote_cobv_id=None, pagina=1, itens_por_pagina=10):
+                                      lote_cobv_id=None, pagina=0, itens_por_pagina=100):
         """
         Lista cobranças PIX com vencimento por período
         Conforme documentação: pix-api.yaml linha 496-567
@@ -1005,8 +1105,8 @@ class C6BankClient:
             location_presente (bool): Filtro pela existência de location vinculada (opcional)
             status (str): Filtro pelo status da cobrança (opcional)
             lote_cobv_id (int): Filtro pelo ID do lote de cobrança com vencimento (opcional)
-            pagina (int): Página atual (padrão: 1)
-            itens_por_pagina (int): Itens por página (padrão: 10)
+            pagina (int): Página atual, a partir de 0 (padrão: 0)
+            itens_por_pagina (int): Itens por página, até 1000 (padrão: 100)
             
         Returns:
             dict: Lista de cobranças com vencimento
@@ -1021,11 +1121,12 @@ class C6BankClient:
             
             endpoint = f"{self.pix_base_url}/cobv"
             
+            # Paginação conforme pix-api.yaml: paginacao.paginaAtual (0-based) e paginacao.itensPorPagina
             params = {
                 'inicio': inicio,
                 'fim': fim,
-                'paginaAtual': pagina,
-                'itensPorPagina': itens_por_pagina
+                'paginacao.paginaAtual': pagina,
+                'paginacao.itensPorPagina': itens_por_pagina
             }
             
             if cpf:
@@ -1768,11 +1869,9 @@ class C6BankClient:
                     'Accept': 'application/pdf',
                 }
                 headers.update(headers_extra)
-                cert_tuple = self.cert_config.get('cert') if self.cert_config.get('cert') else None
-                response = requests.get(
+                response = self._http().get(
                     url,
                     headers=headers,
-                    cert=cert_tuple,
                     timeout=60,
                 )
                 if not (200 <= response.status_code < 300):
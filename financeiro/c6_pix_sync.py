@@ -3,10 +3,15 @@ Sincronização de cobranças PIX (C6 / BACEN) com TransacaoC6Bank e Mensalidade
 Usado pelo webhook, pelas APIs de consulta de status e por fluxos de reconciliação.
 """
 import logging
+from datetime import timedelta, timezone as dt_timezone
 from typing import Any
 
+from django.db import transaction
 from django.utils import timezone
 
+from alunos.painel import invalidar_painel_aluno
+from funcionarios.painel_gerente import SECAO_ATIVIDADES, SECAO_MENSALIDADES, marcar_secoes_desatualizadas
+
 from .c6_client import c6_client
 from .models import Mensalidade, TransacaoC6Bank
 
@@ -54,11 +59,21 @@ def sincronizar_transacao_pix_c6(transacao: TransacaoC6Bank) -> dict | None:
         return None
 
     try:
-        status_response = c6_client.get_pix_payment_status(transacao.txid)
+        status_response = consultar_cobranca_pix_c6(transacao)
     except Exception as e:
         logger.warning("Erro ao consultar cobrança PIX no C6 (txid=%s): %s", transacao.txid, e)
         return None
 
+    return aplicar_cobranca_pix_c6(transacao, status_response)
+
+
+def consultar_cobranca_pix_c6(transacao: TransacaoC6Bank) -> dict:
+    """Só a consulta HTTP da cobrança no C6 (sem tocar no banco de dados)."""
+    return c6_client.get_pix_payment_status(transacao.txid)
+
+
+def aplicar_cobranca_pix_c6(transacao: TransacaoC6Bank, status_response: dict) -> dict:
+    """Aplica na transação e na mensalidade a cobrança já consultada no C6."""
     status_pix = status_response.get("status")
 
     if status_pix == "CONCLUIDA" and transacao.status != "aprovado":
@@ -103,3 +118,128 @@ def sincronizar_transacao_pix_c6(transacao: TransacaoC6Bank) -> dict | None:
         transacao.save(update_fields=["status"])
 
     return status_response
+
+
+# Listagem por período (GET /cob e /cobv): máximo de itens por página aceito (pix-api.yaml)
+ITENS_POR_PAGINA_LISTA = 1000
+_TXIDS_POR_CONSULTA = 500
+
+
+def _iso_utc(dt) -> str:
+    return dt.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def paginas_cobrancas_pix_c6(inicio, fim, *, com_vencimento: bool = False):
+    """Gera, página a página, as cobranças (cob ou cobv) criadas entre `inicio` e `fim`."""
+    listar = (
+        c6_client.list_pix_charges_with_due_date if com_vencimento
+        else c6_client.list_pix_immediate_charges
+    )
+    pagina = 0
+    while True:
+        resposta = listar(
+            _iso_utc(inicio), _iso_utc(fim), pagina=pagina, itens_por_pagina=ITENS_POR_PAGINA_LISTA
+        )
+        cobs = resposta.get("cobs") or []
+        yield cobs
+        paginacao = (resposta.get("parametros") or {}).get("paginacao") or {}
+        pagina += 1
+        if not cobs or pagina >= int(paginacao.get("quantidadeDePaginas") or 0):
+            return
+
+
+def conciliar_pix_c6_por_janela(horas: int = 24, *, incluir_cobv: bool = True) -> dict:
+    """
+    Reconciliação em lote pelas listas do C6: pagina GET /cob (e /cobv) das últimas `horas`,
+    indexa as cobranças por txid e liquida numa única transação de banco todas as
+    TransacaoC6Bank PIX abertas que aparecem na lista (mesmas regras de
+    aplicar_cobranca_pix_c6). Transações criadas antes da janela não são vistas: para elas
+    continua valendo a consulta por txid (sincronizar_pix_c6 sem --janela-horas).
+
+    Returns:
+        dict com chamadas, cobrancas, conciliadas, aprovadas, canceladas e expiradas.
+    """
+    agora = timezone.now()
+    inicio = agora - timedelta(hours=horas)
+    indice = {}
+    chamadas = 0
+    for com_vencimento in (False, True) if incluir_cobv else (False,):
+        for cobs in paginas_cobrancas_pix_c6(inicio, agora, com_vencimento=com_vencimento):
+            chamadas += 1
+            for cob in cobs:
+                if cob.get("txid"):
+                    indice[cob["txid"]] = cob
+
+    resumo = {
+        "chamadas": chamadas,
+        "cobrancas": len(indice),
+        "conciliadas": 0,
+        "aprovadas": 0,
+        "canceladas": 0,
+        "expiradas": 0,
+    }
+    if not indice:
+        return resumo
+
+    txids = list(indice)
+    with transaction.atomic():
+        transacoes = []
+        for i in range(0, len(txids), _TXIDS_POR_CONSULTA):
+            transacoes.extend(
+                TransacaoC6Bank.objects.select_for_update()
+                .select_related("mensalidade")
+                .filter(
+                    tipo="pix",
+                    status__in=_STATUS_PIX_CONSULTAVEL,
+                    txid__in=txids[i:i + _TXIDS_POR_CONSULTA],
+                )
+            )
+
+        mensalidades_pagas = {}
+        for transacao in transacoes:
+            cob = indice[transacao.txid]
+            status_pix = cob.get("status")
+            transacao.resposta_api = cob
+            if status_pix == "CONCLUIDA":
+                transacao.status = "aprovado"
+                transacao.data_aprovacao = agora
+                resumo["aprovadas"] += 1
+                mensalidade = transacao.mensalidade
+                if mensalidade.status != "pago":
+                    mensalidade.status = "pago"
+                    mensalidade.valor_pago = transacao.valor
+                    mensalidade.data_pagamento = mensalidade.data_pagamento or agora
+                    mensalidades_pagas[mensalidade.id] = mensalidade
+            elif status_pix == "REMOVIDA_PELO_USUARIO_RECEBEDOR":
+                transacao.status = "cancelado"
+                transacao.data_cancelamento = agora
+                resumo["canceladas"] += 1
+            elif transacao.status == "pendente" and agora > transacao.data_expiracao:
+                transacao.status = "expirado"
+                resumo["expiradas"] += 1
+
+        TransacaoC6Bank.objects.bulk_update(
+            transacoes,
+            ["status", "data_aprovacao", "data_cancelamento", "resposta_api"],
+            batch_size=_TXIDS_POR_CONSULTA,
+        )
+        Mensalidade.objects.bulk_update(
+            mensalidades_pagas.values(), ["status", "valor_pago", "data_pagamento"]
+        )
+        if mensalidades_pagas:
+            # bulk_update não dispara post_save: avisa os painéis do gerente e dos alunos explicitamente.
+            marcar_secoes_desatualizadas(SECAO_MENSALIDADES, SECAO_ATIVIDADES)
+            invalidar_painel_aluno(*(m.aluno_id for m in mensalidades_pagas.values()))
+        for mensalidade in mensalidades_pagas.values():
+            proxima = Mensalidade.criar_proxima_mensalidade(mensalidade)
+            if proxima:
+                logger.info(
+                    "Mensalidade %s criada para %s/%s após pagamento PIX (lote)",
+                    proxima.id,
+                    str(proxima.data_vencimento.month).zfill(2),
+                    proxima.data_vencimento.year,
+                )
+        resumo["conciliadas"] = len(transacoes)
+
+    logger.info("Conciliação PIX em lote (%sh): %s", horas, resumo)
+    return resumo
@@ -0,0 +1,221 @@
+"""
+Reconciliação em lote das transações C6 ainda abertas (fallback ao webhook).
+
+Usado pelos comandos sincronizar_pix_c6, sincronizar_boletos_c6 e
+sincronizar_checkouts_cartao_c6. As consultas HTTP ao C6 rodam num pool de threads
+limitado e passam por um token bucket (taxa + rajada) para não estourar o limite da API;
+a gravação no banco (aplicar_*) fica na thread principal, na ordem em que as respostas
+chegam, então as threads nunca abrem conexão com o banco.
+
+As transações saem por prioridade: primeiro as nunca consultadas, depois as consultadas
+há mais tempo (assim PIX expirados parados não tomam o `limite` de toda rodada e o
+backlog gira); no empate, expiração mais próxima e vencimento mais antigo. Cada transação processada grava um checkpoint
+(TransacaoC6Bank.reconciliada_em) e atualiza o resumo da execução
+(ExecucaoReconciliacaoC6); se o processo morrer, a próxima rodada do mesmo tipo retoma
+a execução e pula as transações já consultadas por ela.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .c6_boleto_sync import aplicar_boleto_c6, consultar_boleto_c6
+from .c6_checkout_sync import aplicar_checkout_c6, consultar_checkout_c6
+from .c6_pix_sync import aplicar_cobranca_pix_c6, consultar_cobranca_pix_c6
+from .models import ExecucaoReconciliacaoC6, TransacaoC6Bank
+from .tarefas import identificar_worker
+
+logger = logging.getLogger(__name__)
+
+# Execução "executando" sem checkpoint há mais que isso é considerada abandonada e é retomada
+TIMEOUT_EXECUCAO = timedelta(minutes=10)
+
+RECONCILIADORES = {
+    'pix': {
+        'status': ('pendente', 'expirado', 'processando'),
+        'consultar': consultar_cobranca_pix_c6,
+        'aplicar': aplicar_cobranca_pix_c6,
+    },
+    'boleto': {
+        'status': ('pendente',),
+        'consultar': consultar_boleto_c6,
+        'aplicar': aplicar_boleto_c6,
+    },
+    'cartao': {
+        'status': ('pendente',),
+        'consultar': consultar_checkout_c6,
+        'aplicar': aplicar_checkout_c6,
+    },
+}
+
+
+class ReconciliacaoEmAndamento(Exception):
+    """Outra execução do mesmo tipo está ativa (checkpoint recente)."""
+
+
+class LimitadorTaxa:
+    """
+    Token bucket thread-safe: até `rajada` chamadas seguidas e, depois, `taxa` por segundo.
+    taxa <= 0 desliga o limite.
+    """
+
+    def __init__(self, taxa: float, rajada: int = 1):
+        self.taxa = taxa
+        self.capacidade = max(1, rajada)
+        self._fichas = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self) -> float:
+        """Bloqueia até haver ficha disponível. Retorna quanto tempo esperou (segundos)."""
+        if self.taxa <= 0:
+            return 0.0
+        esperou = 0.0
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return esperou
+                falta = (1 - self._fichas) / self.taxa
+            time.sleep(falta)
+            esperou += falta
+
+
+def iniciar_execucao(tipo: str, *, workers: int, taxa: float) -> ExecucaoReconciliacaoC6:
+    """
+    Cria a execução do tipo, ou retoma a que ficou abandonada.
+    Levanta ReconciliacaoEmAndamento se outra execução do tipo ainda está ativa.
+    """
+    agora = timezone.now()
+    aberta = (
+        ExecucaoReconciliacaoC6.objects.filter(tipo=tipo, status=ExecucaoReconciliacaoC6.STATUS_EXECUTANDO)
+        .order_by('-iniciada_em')
+        .first()
+    )
+    if aberta is not None:
+        if aberta.atualizada_em > agora - TIMEOUT_EXECUCAO:
+            raise ReconciliacaoEmAndamento(
+                f'Reconciliação {tipo} #{aberta.pk} em andamento ({aberta.worker}).'
+            )
+        aberta.retomadas += 1
+        aberta.worker = identificar_worker()
+        aberta.workers = workers
+        aberta.taxa_por_segundo = taxa
+        aberta.atualizada_em = agora
+        aberta.save(update_fields=['retomadas', 'worker', 'workers', 'taxa_por_segundo', 'atualizada_em'])
+        logger.warning('Retomando reconciliação %s #%s (abandonada)', tipo, aberta.pk)
+        return aberta
+    return ExecucaoReconciliacaoC6.objects.create(
+        tipo=tipo, worker=identificar_worker(), workers=workers, taxa_por_segundo=taxa
+    )
+
+
+def transacoes_para_reconciliar(execucao: ExecucaoReconciliacaoC6, limite: int):
+    """Transações abertas do tipo, por prioridade (ver o módulo), sem as já consultadas nesta execução."""
+    return list(
+        TransacaoC6Bank.objects.filter(
+            tipo=execucao.tipo,
+            status__in=RECONCILIADORES[execucao.tipo]['status'],
+            txid__isnull=False,
+        )
+        .exclude(txid='')
+        .exclude(reconciliada_em__gte=execucao.iniciada_em)
+        .select_related('mensalidade')
+        .order_by(
+            F('reconciliada_em').asc(nulls_first=True), 'data_expiracao', 'mensalidade__data_vencimento', 'id'
+        )[:limite]
+    )
+
+
+def reconciliar_transacoes_c6(
+    tipo: str,
+    *,
+    limite: int = 200,
+    workers: int | None = None,
+    taxa: float | None = None,
+    rajada: int | None = None,
+) -> ExecucaoReconciliacaoC6:
+    """
+    Consulta no C6 até `limite` transações abertas do `tipo` ('pix', 'boleto' ou 'cartao')
+    e aplica o resultado. Retorna a execução concluída, com o resumo da rodada.
+    """
+    reconciliador = RECONCILIADORES[tipo]
+    workers = max(1, workers or settings.C6_BANK_RECONCILIACAO_WORKERS)
+    taxa = settings.C6_BANK_RECONCILIACAO_TAXA if taxa is None else taxa
+    rajada = rajada or settings.C6_BANK_RECONCILIACAO_RAJADA
+    limitador = LimitadorTaxa(taxa, rajada)
+
+    execucao = iniciar_execucao(tipo, workers=workers, taxa=taxa)
+    transacoes = transacoes_para_reconciliar(execucao, limite)
+    execucao.candidatas = execucao.processadas + len(transacoes)
+    erros_por_tipo = Counter(execucao.erros_por_tipo)
+    transicoes = Counter(execucao.transicoes)
+    inicio = time.monotonic()
+    duracao_anterior = execucao.duracao_segundos
+
+    def consultar(transacao):
+        limitador.adquirir()
+        return reconciliador['consultar'](transacao)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'c6-{tipo}') as pool:
+        futuros = {pool.submit(consultar, t): t for t in transacoes}
+        for futuro in as_completed(futuros):
+            transacao = futuros[futuro]
+            status_anterior = transacao.status
+            try:
+                reconciliador['aplicar'](transacao, futuro.result())
+            except Exception as e:
+                logger.warning('Reconciliação %s: transação %s: %s', tipo, transacao.id, e)
+                erros_por_tipo[type(e).__name__] += 1
+                execucao.erros += 1
+            else:
+                if transacao.status != status_anterior:
+                    transicoes[f'{status_anterior}->{transacao.status}'] += 1
+
+            # Checkpoint: a transação não é consultada de novo se esta execução for retomada
+            agora = timezone.now()
+            TransacaoC6Bank.objects.filter(pk=transacao.pk).update(reconciliada_em=agora)
+            execucao.processadas += 1
+            execucao.erros_por_tipo = dict(erros_por_tipo)
+            execucao.transicoes = dict(transicoes)
+            execucao.duracao_segundos = duracao_anterior + time.monotonic() - inicio
+            execucao.atualizada_em = agora
+            execucao.save(update_fields=[
+                'candidatas', 'processadas', 'erros', 'erros_por_tipo', 'transicoes',
+                'duracao_segundos', 'atualizada_em',
+            ])
+
+    execucao.status = ExecucaoReconciliacaoC6.STATUS_CONCLUIDA
+    execucao.duracao_segundos = duracao_anterior + time.monotonic() - inicio
+    execucao.concluida_em = execucao.atualizada_em = timezone.now()
+    execucao.save()
+    logger.info(
+        'Reconciliação %s #%s: %s processada(s), %s erro(s), %.1f/s',
+        tipo, execucao.pk, execucao.processadas, execucao.erros, execucao.por_segundo,
+    )
+    return execucao
+
+
+def resumo_execucao(execucao: ExecucaoReconciliacaoC6) -> str:
+    """Resumo de uma linha para a saída dos comandos."""
+    partes = [
+        f'{execucao.processadas}/{execucao.candidatas} consultada(s)',
+        f'{execucao.erros} erro(s)',
+        f'{execucao.duracao_segundos:.1f}s ({execucao.por_segundo:.1f}/s, {execucao.workers} thread(s))',
+    ]
+    if execucao.transicoes:
+        partes.append('transições: ' + ', '.join(f'{k}={v}' for k, v in sorted(execucao.transicoes.items())))
+    if execucao.erros_por_tipo:
+        partes.append('erros: ' + ', '.join(f'{k}={v}' for k, v in sorted(execucao.erros_por_tipo.items())))
+    if execucao.retomadas:
+        partes.append(f'retomada {execucao.retomadas}x')
+    return '; '.join(partes)
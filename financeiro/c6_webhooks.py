@@ -0,0 +1,266 @@
+"""
+Caixa de entrada dos webhooks do C6 (tabela EventoWebhookC6).
+
+Os webhooks PIX, BANK_SLIP e CHECKOUT só extraem o identificador da notificação, gravam o
+evento e respondem; a reconsulta ao C6, a baixa da mensalidade e a criação da próxima
+(criar_proxima_mensalidade) rodam no worker `manage.py processar_webhooks_c6`.
+
+Deduplicação: a chave do evento é o endToEndId (PIX) ou o id do boleto/checkout com o
+status notificado; o banco reenvia a mesma notificação até receber 2xx, e cada reenvio
+só incrementa `recebimentos` em vez de gerar outra consulta ao C6.
+
+Ordem: um evento só é reservado quando nenhum evento anterior da mesma mensalidade está
+pendente ou executando, então duas notificações da mesma mensalidade nunca são aplicadas
+em paralelo (nem fora de ordem). A reserva é um UPDATE condicional, como na fila
+TarefaFinanceira, portanto vários workers podem drenar a caixa juntos.
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from app.date_api import format_datetime_api
+
+from .c6_boleto_sync import sincronizar_transacao_boleto_c6
+from .c6_checkout_sync import sincronizar_transacao_checkout_c6
+from .c6_pix_sync import _STATUS_PIX_CONSULTAVEL, aplicar_cobranca_pix_c6, consultar_cobranca_pix_c6
+from .models import EventoWebhookC6, TransacaoC6Bank
+from .tarefas import _backoff, identificar_worker
+
+logger = logging.getLogger(__name__)
+
+# Evento "executando" há mais que isso é considerado órfão (worker morto) e volta à fila
+TIMEOUT_EXECUCAO = timedelta(minutes=10)
+
+_ABERTOS = (EventoWebhookC6.STATUS_PENDENTE, EventoWebhookC6.STATUS_EXECUTANDO)
+
+
+def extrair_id_notificacao_c6(data: dict) -> str | None:
+    """ID do boleto/checkout numa WebhookNotification (``external_id``, ``id`` ou ``information``)."""
+    external_id = data.get('external_id') or data.get('id')
+    if not external_id and data.get('information'):
+        try:
+            info = data['information']
+            if isinstance(info, str):
+                info = json.loads(info)
+            if isinstance(info, dict):
+                external_id = info.get('id') or info.get('external_id')
+        except (json.JSONDecodeError, TypeError, ValueError):
+            pass
+    return str(external_id).strip() if external_id else None
+
+
+def chave_evento_pix(pix_data: dict) -> str | None:
+    """endToEndId identifica o pagamento; sem ele, txid + horário."""
+    end_to_end_id = pix_data.get('endToEndId')
+    if end_to_end_id:
+        return f'pix:{end_to_end_id}'
+    if pix_data.get('txid'):
+        return f"pix:{pix_data['txid']}:{pix_data.get('horario') or ''}"
+    return None
+
+
+def chave_evento_notificacao(servico: str, external_id: str, status: str) -> str:
+    return f'{servico}:{external_id}:{status}'
+
+
+def enfileirar_eventos_webhook_c6(servico: str, eventos: list[tuple[str, str, dict]]) -> dict:
+    """
+    Grava os eventos (chave, txid, payload) do `servico` ('pix', 'boleto' ou 'cartao').
+    Chaves já conhecidas contam como reenvio; um evento que falhou volta para a fila.
+    Retorna {'novos': n, 'duplicados': n}.
+    """
+    if not eventos:
+        return {'novos': 0, 'duplicados': 0}
+    chaves = [chave for chave, _, _ in eventos]
+    existentes = set(EventoWebhookC6.objects.filter(chave__in=chaves).values_list('chave', flat=True))
+    mensalidades = dict(
+        TransacaoC6Bank.objects.filter(txid__in={txid for _, txid, _ in eventos if txid})
+        .values_list('txid', 'mensalidade_id')
+    )
+    novos = {}
+    for chave, txid, payload in eventos:
+        if chave not in existentes and chave not in novos:
+            novos[chave] = EventoWebhookC6(
+                servico=servico,
+                chave=chave,
+                txid=txid or '',
+                mensalidade_id=mensalidades.get(txid),
+                payload=payload,
+            )
+    EventoWebhookC6.objects.bulk_create(novos.values(), ignore_conflicts=True)
+
+    duplicados = [chave for chave in chaves if chave in existentes]
+    if duplicados:
+        EventoWebhookC6.objects.filter(chave__in=duplicados).update(
+            recebimentos=F('recebimentos') + 1, atualizado_em=timezone.now()
+        )
+        EventoWebhookC6.objects.filter(chave__in=duplicados, status=EventoWebhookC6.STATUS_FALHOU).update(
+            status=EventoWebhookC6.STATUS_PENDENTE,
+            tentativas=0,
+            executar_apos=timezone.now(),
+        )
+    return {'novos': len(novos), 'duplicados': len(duplicados)}
+
+
+def recuperar_eventos_orfaos() -> int:
+    """Devolve à fila eventos presos em 'executando' por um worker que morreu."""
+    return EventoWebhookC6.objects.filter(
+        status=EventoWebhookC6.STATUS_EXECUTANDO,
+        iniciado_em__lt=timezone.now() - TIMEOUT_EXECUCAO,
+    ).update(
+        status=EventoWebhookC6.STATUS_PENDENTE,
+        executar_apos=timezone.now(),
+        atualizado_em=timezone.now(),
+    )
+
+
+def reservar_proximo_evento(worker: str) -> EventoWebhookC6 | None:
+    """Reserva o próximo evento elegível para `worker` (ou None)."""
+    agora = timezone.now()
+    anterior_aberto = EventoWebhookC6.objects.filter(
+        mensalidade_id=OuterRef('mensalidade_id'),
+        id__lt=OuterRef('id'),
+        status__in=_ABERTOS,
+    )
+    candidatos = list(
+        EventoWebhookC6.objects.filter(
+            status=EventoWebhookC6.STATUS_PENDENTE,
+            executar_apos__lte=agora,
+        )
+        .exclude(Exists(anterior_aberto))
+        .order_by('id')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidatos:
+        reservado = EventoWebhookC6.objects.filter(
+            pk=pk, status=EventoWebhookC6.STATUS_PENDENTE
+        ).update(
+            status=EventoWebhookC6.STATUS_EXECUTANDO,
+            tentativas=F('tentativas') + 1,
+            iniciado_em=agora,
+            worker=worker,
+            atualizado_em=agora,
+        )
+        if reservado:
+            return EventoWebhookC6.objects.get(pk=pk)
+    return None
+
+
+def _registrar_pix_recebido(transacao: TransacaoC6Bank, pix_info: dict) -> None:
+    """Anexa metadados do PIX recebido em ``resposta_api`` para auditoria (não altera status)."""
+    if not transacao.resposta_api:
+        transacao.resposta_api = {}
+    recebidos = transacao.resposta_api.setdefault('pix_recebidos', [])
+    for existente in recebidos:
+        if existente.get('endToEndId') == pix_info.get('endToEndId'):
+            existente.update(pix_info)
+            break
+    else:
+        recebidos.append(pix_info)
+    transacao.save(update_fields=['resposta_api'])
+
+
+def _aplicar_pix(evento: EventoWebhookC6) -> dict:
+    """
+    SEGURANÇA: o corpo do webhook NÃO é confiável para dar baixa (um atacante poderia
+    POSTar um txid válido com valor forjado). A cobrança é reconsultada no C6, que só marca
+    a mensalidade como paga com status ``CONCLUIDA``; o corpo serve para localizar a
+    transação (txid) e para auditoria.
+    """
+    pix_data = evento.payload
+    if not evento.txid:
+        # PIX espontâneo (sem cobrança associada)
+        return {'ignorado': 'sem_txid'}
+    transacao = TransacaoC6Bank.objects.filter(txid=evento.txid).select_related('mensalidade').first()
+    if transacao is None:
+        return {'ignorado': 'transacao_nao_encontrada'}
+
+    status_anterior = transacao.status
+    if transacao.tipo == 'pix' and transacao.status in _STATUS_PIX_CONSULTAVEL:
+        # Erro na consulta sobe: o evento é reagendado com backoff
+        aplicar_cobranca_pix_c6(transacao, consultar_cobranca_pix_c6(transacao))
+        transacao.refresh_from_db()
+
+    _registrar_pix_recebido(
+        transacao,
+        {
+            'endToEndId': pix_data.get('endToEndId'),
+            'txid': evento.txid,
+            'valor': pix_data.get('valor'),
+            'horario': pix_data.get('horario'),
+            'infoPagador': pix_data.get('infoPagador'),
+            'data_recebimento': format_datetime_api(evento.recebido_em),
+        },
+    )
+    if transacao.status == 'aprovado' and status_anterior != 'aprovado':
+        logger.info('PIX confirmado com o C6 e mensalidade baixada (txid=%s).', evento.txid)
+    return {'transacao_id': transacao.id, 'status_anterior': status_anterior, 'status': transacao.status}
+
+
+def _aplicar_notificacao(sincronizar):
+    def aplicar(evento: EventoWebhookC6) -> dict:
+        transacao = (
+            TransacaoC6Bank.objects.filter(tipo=evento.servico, txid=evento.txid)
+            .select_related('mensalidade')
+            .first()
+        )
+        if transacao is None:
+            return {'ignorado': 'transacao_nao_encontrada'}
+        status_anterior = transacao.status
+        transacao = sincronizar(transacao)['transacao']
+        return {'transacao_id': transacao.id, 'status_anterior': status_anterior, 'status': transacao.status}
+
+    return aplicar
+
+
+APLICADORES = {
+    'pix': _aplicar_pix,
+    'boleto': _aplicar_notificacao(sincronizar_transacao_boleto_c6),
+    'cartao': _aplicar_notificacao(sincronizar_transacao_checkout_c6),
+}
+
+
+def executar_evento(evento: EventoWebhookC6) -> None:
+    """Aplica um evento já reservado e registra o resultado, o reagendamento ou a falha."""
+    try:
+        resultado = APLICADORES[evento.servico](evento)
+    except Exception as e:
+        definitivo = evento.tentativas >= evento.max_tentativas
+        logger.exception(
+            'Webhook C6 %s falhou (tentativa %s/%s): %s',
+            evento.chave, evento.tentativas, evento.max_tentativas, e,
+        )
+        evento.erro = traceback.format_exc()[-4000:]
+        if definitivo:
+            evento.status = EventoWebhookC6.STATUS_FALHOU
+            evento.concluido_em = timezone.now()
+        else:
+            evento.status = EventoWebhookC6.STATUS_PENDENTE
+            evento.executar_apos = timezone.now() + _backoff(evento.tentativas)
+        evento.save(update_fields=['erro', 'status', 'concluido_em', 'executar_apos', 'atualizado_em'])
+        return
+
+    evento.status = EventoWebhookC6.STATUS_CONCLUIDO
+    evento.resultado = resultado
+    evento.erro = ''
+    evento.concluido_em = timezone.now()
+    evento.save(update_fields=['status', 'resultado', 'erro', 'concluido_em', 'atualizado_em'])
+    logger.info('Webhook C6 %s processado: %s', evento.chave, resultado)
+
+
+def processar_eventos_webhook_c6(worker: str | None = None, limite: int | None = None) -> int:
+    """Drena a caixa de entrada até esvaziar (ou até `limite` eventos). Retorna quantos processou."""
+    worker = worker or identificar_worker()
+    recuperar_eventos_orfaos()
+    processados = 0
+    while limite is None or processados < limite:
+        evento = reservar_proximo_evento(worker)
+        if evento is None:
+            break
+        executar_evento(evento)
+        processados += 1
+    return processados
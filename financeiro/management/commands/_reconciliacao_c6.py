@@ -0,0 +1,47 @@
+"""Base dos comandos sincronizar_*_c6 (reconciliação em lote via financeiro.c6_reconciliacao)."""
+from django.core.management.base import BaseCommand
+
+from financeiro.c6_reconciliacao import (
+    ReconciliacaoEmAndamento,
+    reconciliar_transacoes_c6,
+    resumo_execucao,
+)
+
+
+class ComandoReconciliacaoC6(BaseCommand):
+    tipo = None  # 'pix', 'boleto' ou 'cartao'
+    rotulo = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=200,
+            help='Número máximo de transações a processar por execução (default: 200).',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Consultas simultâneas ao C6 (default: settings.C6_BANK_RECONCILIACAO_WORKERS).',
+        )
+        parser.add_argument(
+            '--taxa',
+            type=float,
+            default=None,
+            help='Máximo de requisições por segundo ao C6 (default: settings.C6_BANK_RECONCILIACAO_TAXA; 0 = sem limite).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            execucao = reconciliar_transacoes_c6(
+                self.tipo,
+                limite=max(1, options['limit']),
+                workers=options['workers'],
+                taxa=options['taxa'],
+            )
+        except ReconciliacaoEmAndamento as e:
+            self.stdout.write(self.style.WARNING(str(e)))
+            return
+        estilo = self.style.SUCCESS if not execucao.erros else self.style.WARNING
+        self.stdout.write(estilo(f'{self.rotulo} (execução #{execucao.pk}): {resumo_execucao(execucao)}'))
@@ -0,0 +1,122 @@
+"""
+Micro-benchmark do cliente HTTP do C6 Bank contra um servidor stub local.
+
+Compara o mesmo C6BankClient abrindo uma conexão nova por chamada (como fazia com
+requests.request) e usando a sessão keep-alive do processo. Com --tls o stub usa HTTPS (certificado
+autoassinado gerado com o openssl da máquina), o que inclui o handshake TLS na conta.
+"""
+import json
+import logging
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import urllib3
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from financeiro.c6_client import TOKEN_CACHE_KEY, C6BankClient
+
+
+class _StubC6(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em dois write(); sem isso, Nagle + ACK atrasado somam ~40 ms por
+    # resposta numa conexão reaproveitada e o benchmark mediria o stub, não o cliente.
+    disable_nagle_algorithm = True
+
+    def _json(self, payload):
+        corpo = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self._json({'access_token': 'stub', 'expires_in': 3600})
+
+    def do_GET(self):
+        self._json({'txid': 'bench', 'status': 'ATIVA'})
+
+    def log_message(self, *args):
+        pass
+
+
+class _ClienteStub(C6BankClient):
+    """C6BankClient apontado para o stub, sem certificado mTLS e sem verificar o TLS do stub."""
+
+    def __init__(self, base, conexao_nova_por_chamada):
+        self.conexao_nova_por_chamada = conexao_nova_por_chamada
+        super().__init__()
+        self.base_url, self.auth_url = base, f'{base}/v1/auth/'
+
+    def _setup_certificates(self):
+        return {}
+
+    def _http(self):
+        session = requests.Session() if self.conexao_nova_por_chamada else super()._http()
+        session.verify = False
+        session.trust_env = False  # REQUESTS_CA_BUNDLE no ambiente sobrepõe verify=False
+        return session
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência por chamada do cliente C6 (conexão nova x sessão keep-alive) contra um stub local.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chamadas', type=int, default=200)
+        parser.add_argument('--tls', action='store_true', help='Stub em HTTPS (requer openssl no PATH).')
+
+    def handle(self, *args, **options):
+        n = options['chamadas']
+        servidor = ThreadingHTTPServer(('127.0.0.1', 0), _StubC6)
+        esquema = 'http'
+        with tempfile.TemporaryDirectory() as tmp:
+            if options['tls']:
+                cert, chave = os.path.join(tmp, 'cert.pem'), os.path.join(tmp, 'key.pem')
+                try:
+                    subprocess.run(
+                        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                         '-subj', '/CN=127.0.0.1', '-keyout', chave, '-out', cert],
+                        check=True, capture_output=True,
+                    )
+                except (OSError, subprocess.CalledProcessError) as e:
+                    raise CommandError(f'Não foi possível gerar o certificado do stub: {e}')
+                contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                contexto.load_cert_chain(cert, chave)
+                servidor.socket = contexto.wrap_socket(servidor.socket, server_side=True)
+                esquema = 'https'
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            base = f'{esquema}://127.0.0.1:{servidor.server_address[1]}'
+            logging.getLogger('financeiro.c6_client').setLevel(logging.WARNING)
+            try:
+                tempos = []
+                for conexao_nova in (True, False):
+                    client = _ClienteStub(base, conexao_nova)
+                    cache.delete(TOKEN_CACHE_KEY)
+                    client._make_request('GET', '/v2/pix/cob/bench')  # aquece token (e pool)
+                    tempos.append(self._medir(lambda: client._make_request('GET', '/v2/pix/cob/bench'), n))
+                t_nova, t_sessao = tempos
+            finally:
+                servidor.shutdown()
+                cache.delete(TOKEN_CACHE_KEY)
+
+        self.stdout.write(f'Stub {esquema.upper()}, {n} chamadas GET')
+        self.stdout.write(f'  conexão nova por chamada: {t_nova * 1e3:8.2f} ms/chamada')
+        self.stdout.write(f'  sessão keep-alive:        {t_sessao * 1e3:8.2f} ms/chamada')
+        self.stdout.write(self.style.SUCCESS(f'  redução: {(1 - t_sessao / t_nova) * 100:.0f}%'))
+
+    @staticmethod
+    def _medir(chamada, n):
+        inicio = time.perf_counter()
+        for _ in range(n):
+            chamada()
+        return (time.perf_counter() - inicio) / n
@@ -1,18 +1,62 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
-from financeiro.services import gerar_mensalidades_para_mes
+from financeiro.services import gerar_mensalidades_para_mes, planejar_mensalidades_do_mes
+from financeiro.tarefas import enfileirar_geracao_mensalidades
 
 
 class Command(BaseCommand):
-    help = 'Gera mensalidades do mês atual para alunos ativos. Também executado automaticamente na virada de mês via signal.'
+    help = (
+        'Enfileira a geração das mensalidades do mês atual para alunos ativos '
+        '(executada pelo worker processar_tarefas_financeiras). Use --sync para gerar na hora. '
+        'Também enfileirada automaticamente na virada de mês via signal.'
+    )
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--ano', type=int, help='Ano de referência (default: ano atual).')
+        parser.add_argument('--mes', type=int, help='Mês de referência 1-12 (default: mês atual).')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Lista as mensalidades que seriam criadas, sem gravar nada.',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Gera as mensalidades neste processo em vez de enfileirar para o worker.',
+        )
+
+    def handle(self, *args, **options):
         hoje = timezone.localdate()
-        total_geradas = gerar_mensalidades_para_mes(ano=hoje.year, mes=hoje.month)
+        ano = options.get('ano') or hoje.year
+        mes = options.get('mes') or hoje.month
+        if not 1 <= mes <= 12:
+            raise CommandError('--mes deve estar entre 1 e 12.')
+
+        if options['dry_run']:
+            plano = planejar_mensalidades_do_mes(ano, mes)
+            for m in plano:
+                self.stdout.write(
+                    f'  aluno={m.aluno_id} {m.aluno.get_full_name()} — '
+                    f'R$ {m.valor} venc. {m.data_vencimento:%d/%m/%Y} ({m.status})'
+                )
+            self.stdout.write(
+                self.style.WARNING(
+                    f'[dry-run] {len(plano)} mensalidade(s) seriam geradas para {ano}/{mes:02d}.'
+                )
+            )
+            return
+
+        if not options['sync']:
+            # reabrir: a execução diária do cron reprocessa o mês para pegar alunos novos
+            chave = enfileirar_geracao_mensalidades(ano=ano, mes=mes, reabrir=True)
+            self.stdout.write(self.style.SUCCESS(f'Tarefa {chave} enfileirada.'))
+            return
+
+        total_geradas = gerar_mensalidades_para_mes(ano=ano, mes=mes)
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'{total_geradas} mensalidade(s) gerada(s) para {hoje.year}/{hoje.month:02d}.'
+                f'{total_geradas} mensalidade(s) gerada(s) para {ano}/{mes:02d}.'
             )
         )
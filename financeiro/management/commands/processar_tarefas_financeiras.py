@@ -0,0 +1,41 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from financeiro.tarefas import identificar_worker, processar_tarefas
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker da fila TarefaFinanceira (ex.: geração de mensalidades da virada de mês). '
+        'Fica em laço consultando a fila; rode um processo por worker (systemd). '
+        'Use --uma-vez para drenar a fila e sair (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true', help='Drena a fila uma vez e sai.')
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre consultas quando a fila está vazia (default: 5).',
+        )
+
+    def handle(self, *args, **options):
+        worker = identificar_worker()
+        if options['uma_vez']:
+            total = processar_tarefas(worker)
+            self.stdout.write(self.style.SUCCESS(f'{total} tarefa(s) executada(s).'))
+            return
+
+        parar = []
+        signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+        self.stdout.write(f'Worker {worker} aguardando tarefas...')
+        try:
+            while not parar:
+                if not processar_tarefas(worker):
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Worker {worker} encerrado.')
@@ -0,0 +1,42 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from financeiro.c6_webhooks import processar_eventos_webhook_c6
+from financeiro.tarefas import identificar_worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker da caixa de entrada dos webhooks C6 (EventoWebhookC6): reconsulta o C6 e dá a baixa. '
+        'Fica em laço consultando a fila; rode um processo por worker (systemd). '
+        'Use --uma-vez para drenar a fila e sair (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true', help='Drena a fila uma vez e sai.')
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=1.0,
+            help='Segundos de espera entre consultas quando a fila está vazia (default: 1).',
+        )
+
+    def handle(self, *args, **options):
+        worker = identificar_worker()
+        if options['uma_vez']:
+            total = processar_eventos_webhook_c6(worker)
+            self.stdout.write(self.style.SUCCESS(f'{total} evento(s) processado(s).'))
+            return
+
+        parar = []
+        signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+        self.stdout.write(f'Worker {worker} aguardando webhooks C6...')
+        try:
+            while not parar:
+                if not processar_eventos_webhook_c6(worker):
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Worker {worker} encerrado.')
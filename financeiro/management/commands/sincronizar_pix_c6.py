@@ -4,71 +4,46 @@ e alinha TransacaoC6Bank + Mensalidade (mesma lógica do webhook e das APIs de s
 
 Agendar no cron (ex.: a cada 10 min), como fallback quando o webhook falhar:
 
-    python manage.py sincronizar_pix_c6
-"""
-import logging
-
-from django.core.management.base import BaseCommand
+    python manage.py sincronizar_pix_c6 --janela-horas 24
 
-from financeiro.c6_pix_sync import sincronizar_transacao_pix_c6
-from financeiro.models import TransacaoC6Bank
+Com --janela-horas, pagina as listas GET /cob e /cobv do período (poucas chamadas) e
+liquida tudo numa transação. Sem a opção, consulta cobrança a cobrança (GET /cob/{txid}),
+em paralelo e com limite de taxa; ver financeiro.c6_reconciliacao. Rodar esse modo com
+menos frequência (ex.: de hora em hora) cobre as transações anteriores à janela:
 
-logger = logging.getLogger(__name__)
+    python manage.py sincronizar_pix_c6 [--limit 200] [--workers 4] [--taxa 5]
+"""
+from financeiro.c6_pix_sync import conciliar_pix_c6_por_janela
 
-_STATUS = ('pendente', 'expirado', 'processando')
+from ._reconciliacao_c6 import ComandoReconciliacaoC6
 
 
-class Command(BaseCommand):
+class Command(ComandoReconciliacaoC6):
     help = (
         'Consulta C6 para transações PIX ainda não finalizadas e atualiza mensalidades '
         '(reconciliação em lote; fallback ao webhook).'
     )
+    tipo = 'pix'
+    rotulo = 'PIX C6'
 
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
-            '--limit',
+            '--janela-horas',
             type=int,
-            default=200,
-            help='Número máximo de transações a processar por execução (default: 200).',
+            default=None,
+            help='Concilia pelas listas de cobranças criadas nas últimas N horas, em vez de consultar por txid.',
         )
 
     def handle(self, *args, **options):
-        limit = max(1, options['limit'])
-        qs = (
-            TransacaoC6Bank.objects.filter(
-                tipo='pix',
-                status__in=_STATUS,
-            )
-            .exclude(txid__isnull=True)
-            .exclude(txid='')
-            .order_by('-id')[:limit]
-        )
-
-        processadas = 0
-        novas_aprovadas = 0
-        novas_canceladas = 0
-        erros_api = 0
-
-        for transacao in qs:
-            old_status = transacao.status
-            cobranca = sincronizar_transacao_pix_c6(transacao)
-            transacao.refresh_from_db()
-            processadas += 1
-
-            if cobranca is None:
-                erros_api += 1
-                continue
-
-            if transacao.status == 'aprovado' and old_status != 'aprovado':
-                novas_aprovadas += 1
-            elif transacao.status == 'cancelado' and old_status != 'cancelado':
-                novas_canceladas += 1
-
+        if not options['janela_horas']:
+            return super().handle(*args, **options)
+        resumo = conciliar_pix_c6_por_janela(horas=max(1, options['janela_horas']))
         self.stdout.write(
             self.style.SUCCESS(
-                f'PIX C6: {processadas} consultada(s); '
-                f'{novas_aprovadas} nova(s) aprovada(s); '
-                f'{novas_canceladas} nova(s) cancelada(s); '
-                f'{erros_api} falha(s) de API ou consulta.'
+                f"PIX C6 (listas, {options['janela_horas']}h): {resumo['chamadas']} chamada(s); "
+                f"{resumo['cobrancas']} cobrança(s) no C6; {resumo['conciliadas']} transação(ões) local(is); "
+                f"{resumo['aprovadas']} aprovada(s); {resumo['canceladas']} cancelada(s); "
+                f"{resumo['expiradas']} expirada(s)."
             )
         )
@@ -1,6 +1,7 @@
 """
 Middleware que detecta a virada de mês e emite o signal mes_virado.
-Na primeira requisição de cada novo mês, dispara a geração de mensalidades.
+Na primeira requisição de cada novo mês, enfileira a geração de mensalidades
+(o custo na requisição é um cache.add e, uma vez por mês, um INSERT na fila).
 """
 from django.core.cache import cache
 from django.utils import timezone
@@ -14,7 +15,7 @@ CACHE_TIMEOUT = 60 * 24 * 60 * 60  # 60 dias em segundos
 class MensalidadeMesViradoMiddleware:
     """
     Detecta quando entramos em um novo mês e emite o signal mes_virado
-    para que as mensalidades sejam geradas automaticamente.
+    para que a geração das mensalidades seja enfileirada.
     """
 
     def __init__(self, get_response):
@@ -26,7 +27,7 @@ class MensalidadeMesViradoMiddleware:
 
     def _verificar_virada_mes(self):
         """
-        Dispara a geração de mensalidades uma vez por mês (ano-mês).
+        Enfileira a geração de mensalidades uma vez por mês (ano-mês).
         Usa cache.add em chave única por mês para evitar corrida entre requisições
         simultâneas (get+set não é atômico).
         """
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0014_salario_competencia_and_pagamento_efetivo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaFinanceira',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('gerar_mensalidades', 'Gerar mensalidades do mês')], max_length=40)),
+                ('chave', models.CharField(max_length=120, unique=True)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=12)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('max_tentativas', models.PositiveSmallIntegerField(default=5)),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now)),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, default='', max_length=120)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True, default='')),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('atualizada_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tarefa financeira',
+                'verbose_name_plural': 'Tarefas financeiras',
+                'ordering': ['-criada_em'],
+                'indexes': [models.Index(fields=['status', 'executar_apos'], name='fin_tarefa_status_exec_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0015_tarefafinanceira'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transacaoc6bank',
+            name='reconciliada_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ExecucaoReconciliacaoC6',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('pix', 'PIX'), ('boleto', 'Boleto'), ('cartao', 'Cartão de Crédito/Débito'), ('transferencia', 'Transferência Bancária')], max_length=20)),
+                ('status', models.CharField(choices=[('executando', 'Executando'), ('concluida', 'Concluída')], default='executando', max_length=12)),
+                ('worker', models.CharField(blank=True, default='', max_length=120)),
+                ('workers', models.PositiveSmallIntegerField(default=1)),
+                ('taxa_por_segundo', models.FloatField(default=0)),
+                ('candidatas', models.PositiveIntegerField(default=0)),
+                ('processadas', models.PositiveIntegerField(default=0)),
+                ('erros', models.PositiveIntegerField(default=0)),
+                ('erros_por_tipo', models.JSONField(blank=True, default=dict)),
+                ('transicoes', models.JSONField(blank=True, default=dict)),
+                ('retomadas', models.PositiveSmallIntegerField(default=0)),
+                ('duracao_segundos', models.FloatField(default=0)),
+                ('iniciada_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('atualizada_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Execução de reconciliação C6',
+                'verbose_name_plural': 'Execuções de reconciliação C6',
+                'ordering': ['-iniciada_em'],
+                'indexes': [models.Index(fields=['tipo', 'status'], name='fin_recon_tipo_status_idx')],
+            },
+        ),
+    ]
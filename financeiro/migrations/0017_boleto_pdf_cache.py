@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0016_reconciliacao_c6'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transacaoc6bank',
+            name='boleto_pdf_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='tarefafinanceira',
+            name='tipo',
+            field=models.CharField(choices=[('gerar_mensalidades', 'Gerar mensalidades do mês'), ('baixar_pdf_boleto', 'Baixar PDF do boleto para o cache')], max_length=40),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0017_boleto_pdf_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoWebhookC6',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('servico', models.CharField(choices=[('pix', 'PIX'), ('boleto', 'Boleto'), ('cartao', 'Cartão de Crédito/Débito'), ('transferencia', 'Transferência Bancária')], max_length=20)),
+                ('chave', models.CharField(max_length=200, unique=True)),
+                ('txid', models.CharField(blank=True, db_index=True, default='', max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluido', 'Concluído'), ('falhou', 'Falhou')], default='pendente', max_length=12)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('max_tentativas', models.PositiveSmallIntegerField(default=5)),
+                ('recebimentos', models.PositiveIntegerField(default=1)),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, default='', max_length=120)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True, default='')),
+                ('recebido_em', models.DateTimeField(auto_now_add=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('mensalidade', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='eventos_webhook_c6', to='financeiro.mensalidade')),
+            ],
+            options={
+                'verbose_name': 'Evento webhook C6',
+                'verbose_name_plural': 'Eventos webhook C6',
+                'ordering': ['-recebido_em'],
+                'indexes': [models.Index(fields=['status', 'executar_apos'], name='fin_evento_c6_status_exec_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0018_eventos_webhook_c6'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mensalidade',
+            index=models.Index(condition=models.Q(('status', 'pago'), _negated=True), fields=['data_vencimento'], name='mensalidade_em_aberto_idx'),
+        ),
+    ]
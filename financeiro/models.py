@@ -128,6 +128,14 @@ class Mensalidade(models.Model):
                 name='uniq_mensalidade_aluno_ano_mes',
             ),
         ]
+        indexes = [
+            # Só as em aberto: inadimplência (painel do aluno, segmentos de push) sem varrer as pagas
+            models.Index(
+                fields=['data_vencimento'],
+                condition=~models.Q(status='pago'),
+                name='mensalidade_em_aberto_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.aluno.get_full_name()} - R${self.valor} ({self.get_status_display()})"
@@ -274,6 +282,10 @@ class TransacaoC6Bank(models.Model):
     # Dados de resposta da API
     resposta_api = models.JSONField(blank=True, null=True)  # Resposta completa da API
     erro_api = models.TextField(blank=True, null=True)  # Mensagem de erro da API
+    # Checkpoint da reconciliação em lote (c6_reconciliacao): última consulta ao C6 por uma execução
+    reconciliada_em = models.DateTimeField(null=True, blank=True)
+    # PDF do boleto no cache em disco (financeiro.boleto_pdf_cache), endereçado pelo sha256 do conteúdo
+    boleto_pdf_sha256 = models.CharField(max_length=64, blank=True, default='')
 
     def __str__(self):
         return f"C6 Bank {self.tipo.upper()} - {self.mensalidade.aluno.get_full_name()} - R$ {self.valor}"
@@ -281,4 +293,158 @@ class TransacaoC6Bank(models.Model):
     class Meta:
         verbose_name = "Transação C6 Bank"
         verbose_name_plural = "Transações C6 Bank"
-        ordering = ['-data_criacao']
\ No newline at end of file
+        ordering = ['-data_criacao']
+
+class TarefaFinanceira(models.Model):
+    """
+    Fila local de tarefas do financeiro, persistida no banco e drenada pelo comando
+    processar_tarefas_financeiras. A `chave` é a chave de idempotência (ex.:
+    gerar_mensalidades:2026-03): enfileirar de novo a mesma chave não cria outra tarefa.
+    """
+    TIPO_GERAR_MENSALIDADES = 'gerar_mensalidades'
+    TIPO_BAIXAR_PDF_BOLETO = 'baixar_pdf_boleto'
+    TIPO_CHOICES = [
+        (TIPO_GERAR_MENSALIDADES, 'Gerar mensalidades do mês'),
+        (TIPO_BAIXAR_PDF_BOLETO, 'Baixar PDF do boleto para o cache'),
+    ]
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_EXECUTANDO = 'executando'
+    STATUS_CONCLUIDA = 'concluida'
+    STATUS_FALHOU = 'falhou'
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Pendente'),
+        (STATUS_EXECUTANDO, 'Executando'),
+        (STATUS_CONCLUIDA, 'Concluída'),
+        (STATUS_FALHOU, 'Falhou'),
+    ]
+
+    tipo = models.CharField(max_length=40, choices=TIPO_CHOICES)
+    chave = models.CharField(max_length=120, unique=True)
+    parametros = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_PENDENTE)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    max_tentativas = models.PositiveSmallIntegerField(default=5)
+    executar_apos = models.DateTimeField(default=timezone.now)
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=120, blank=True, default='')
+    resultado = models.JSONField(null=True, blank=True)
+    erro = models.TextField(blank=True, default='')
+    criada_em = models.DateTimeField(auto_now_add=True)
+    atualizada_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Tarefa financeira"
+        verbose_name_plural = "Tarefas financeiras"
+        ordering = ['-criada_em']
+        indexes = [
+            models.Index(fields=['status', 'executar_apos'], name='fin_tarefa_status_exec_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.chave} ({self.get_status_display()}, {self.tentativas}/{self.max_tentativas})"
+
+
+class ExecucaoReconciliacaoC6(models.Model):
+    """
+    Execução da reconciliação em lote com o C6 (comandos sincronizar_*_c6), com o resumo
+    da rodada. Cada transação consultada grava um checkpoint (TransacaoC6Bank.reconciliada_em)
+    e atualiza os contadores aqui; uma execução que ficou em "executando" sem atualização
+    (processo morto) é retomada pela próxima rodada do mesmo tipo, pulando o que já foi feito.
+    """
+    STATUS_EXECUTANDO = 'executando'
+    STATUS_CONCLUIDA = 'concluida'
+    STATUS_CHOICES = [
+        (STATUS_EXECUTANDO, 'Executando'),
+        (STATUS_CONCLUIDA, 'Concluída'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TransacaoC6Bank.TIPO_CHOICES)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_EXECUTANDO)
+    worker = models.CharField(max_length=120, blank=True, default='')
+    workers = models.PositiveSmallIntegerField(default=1)
+    taxa_por_segundo = models.FloatField(default=0)
+    candidatas = models.PositiveIntegerField(default=0)
+    processadas = models.PositiveIntegerField(default=0)
+    erros = models.PositiveIntegerField(default=0)
+    erros_por_tipo = models.JSONField(default=dict, blank=True)
+    transicoes = models.JSONField(default=dict, blank=True)  # ex.: {"pendente->aprovado": 3}
+    retomadas = models.PositiveSmallIntegerField(default=0)
+    duracao_segundos = models.FloatField(default=0)
+    iniciada_em = models.DateTimeField(default=timezone.now)
+    atualizada_em = models.DateTimeField(default=timezone.now)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Execução de reconciliação C6"
+        verbose_name_plural = "Execuções de reconciliação C6"
+        ordering = ['-iniciada_em']
+        indexes = [
+            models.Index(fields=['tipo', 'status'], name='fin_recon_tipo_status_idx'),
+        ]
+
+    @property
+    def por_segundo(self) -> float:
+        return self.processadas / self.duracao_segundos if self.duracao_segundos else 0.0
+
+    def __str__(self):
+        return f"Reconciliação {self.tipo} {self.iniciada_em:%Y-%m-%d %H:%M} ({self.get_status_display()})"
+
+
+class EventoWebhookC6(models.Model):
+    """
+    Caixa de entrada dos webhooks do C6 (PIX, BANK_SLIP e CHECKOUT). O webhook só grava o
+    evento e responde; o worker processar_webhooks_c6 reconsulta o C6 e dá a baixa.
+
+    A `chave` deduplica as notificações: ``pix:<endToEndId>``, ``boleto:<id>:<status>`` ou
+    ``cartao:<id>:<status>``; reenvios do banco só incrementam `recebimentos`. Eventos da
+    mesma mensalidade são aplicados em ordem de chegada, um de cada vez.
+    """
+    SERVICO_CHOICES = TransacaoC6Bank.TIPO_CHOICES
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_EXECUTANDO = 'executando'
+    STATUS_CONCLUIDO = 'concluido'
+    STATUS_FALHOU = 'falhou'
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Pendente'),
+        (STATUS_EXECUTANDO, 'Executando'),
+        (STATUS_CONCLUIDO, 'Concluído'),
+        (STATUS_FALHOU, 'Falhou'),
+    ]
+
+    servico = models.CharField(max_length=20, choices=SERVICO_CHOICES)
+    chave = models.CharField(max_length=200, unique=True)
+    txid = models.CharField(max_length=100, blank=True, default='', db_index=True)
+    mensalidade = models.ForeignKey(
+        Mensalidade,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='eventos_webhook_c6',
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_PENDENTE)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    max_tentativas = models.PositiveSmallIntegerField(default=5)
+    recebimentos = models.PositiveIntegerField(default=1)
+    executar_apos = models.DateTimeField(default=timezone.now)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=120, blank=True, default='')
+    resultado = models.JSONField(null=True, blank=True)
+    erro = models.TextField(blank=True, default='')
+    recebido_em = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Evento webhook C6"
+        verbose_name_plural = "Eventos webhook C6"
+        ordering = ['-recebido_em']
+        indexes = [
+            models.Index(fields=['status', 'executar_apos'], name='fin_evento_c6_status_exec_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.chave} ({self.get_status_display()}, {self.recebimentos}x)"
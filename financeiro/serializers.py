@@ -1,6 +1,6 @@
 from django.utils import timezone
 from rest_framework import serializers
-from .models import Salario, Despesa, Mensalidade, TransacaoC6Bank
+from .models import Salario, Despesa, Mensalidade, TarefaFinanceira, TransacaoC6Bank
 from usuarios.serializers import UsuarioSerializer
 from app.date_api import DATA_API_FMT, DATE_INPUT_FORMATS, format_data_api, format_datetime_api
 
@@ -133,4 +133,20 @@ class TransacaoC6BankSerializer(serializers.ModelSerializer):
             'valor': obj.mensalidade.valor,
             'data_vencimento': format_data_api(dv) if dv else None,
             'status': obj.mensalidade.status_efetivo
-        }
\ No newline at end of file
+        }
+
+class TarefaFinanceiraSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TarefaFinanceira
+        fields = [
+            'id', 'tipo', 'chave', 'parametros', 'status', 'tentativas', 'max_tentativas',
+            'executar_apos', 'iniciada_em', 'concluida_em', 'worker', 'resultado', 'erro',
+            'criada_em', 'atualizada_em',
+        ]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        ret = super().to_representation(instance)
+        for campo in ('executar_apos', 'iniciada_em', 'concluida_em', 'criada_em', 'atualizada_em'):
+            ret[campo] = format_datetime_api(getattr(instance, campo))
+        return ret
@@ -8,9 +8,9 @@ from calendar import monthrange
 from decimal import Decimal, ROUND_HALF_UP
 
 from datetime import date, timedelta
-from django.db import IntegrityError
 from django.utils import timezone
 
+from app.calendario_br import proximos_dias_uteis
 from financeiro.dias_uteis import proximo_dia_util_br
 from financeiro.models import Mensalidade, TransacaoC6Bank
 from usuarios.models import Usuario
@@ -73,65 +73,118 @@ def criar_mensalidade_ao_vincular_turma(aluno, turma, valor_primeira_mensalidade
     return None
 
 
-def gerar_mensalidades_para_mes(ano: int, mes: int) -> int:
-    """
-    Gera mensalidades do mês especificado para todos os alunos ativos
-    que ainda não possuem mensalidade naquele período.
+def _mes_seguinte(ano: int, mes: int) -> tuple[int, int]:
+    return (ano + 1, 1) if mes == 12 else (ano, mes + 1)
 
-    Não considera status de pagamento - gera inclusive para alunos com
-    mensalidades pendentes/atrasadas do mês anterior.
 
-    Retorna o número de mensalidades criadas.
-    Exclui alunos que só estão em CTs com sem_financeiro.
+def planejar_mensalidades_do_mes(ano: int, mes: int) -> list[Mensalidade]:
+    """
+    Monta (sem gravar) as mensalidades que faltam no mês para os alunos ativos.
+
+    Trabalha em conjunto, com número fixo de consultas independente do total de
+    alunos: elegibilidade (ativo, não suspenso, em CT com financeiro) numa única
+    consulta, chaves (aluno, ano, mês) já existentes numa segunda, e vencimentos
+    calculados uma vez por dia de vencimento distinto (no máximo 31).
 
     Critério de "aluno ativo" alinhado ao painel do gerente e à gestão de
     usuários: ativo no CT (ativo=True) e conta liberada para login (is_active=True).
     """
-    total_geradas = 0
+    from django.db.models import Exists, OuterRef, Q
+    from turmas.models import Turma
+
     hoje = timezone.localdate()
     ultimo_dia = monthrange(ano, mes)[1]
 
-    alunos = Usuario.objects.filter(tipo='aluno', ativo=True, is_active=True)
+    em_ct_com_financeiro = Turma.objects.filter(
+        alunos=OuterRef("pk"),
+        ct__sem_financeiro=False,
+    )
+    # Mesma regra de Usuario.esta_suspenso(): suspenso sem data final, ou até hoje inclusive.
+    suspenso = Q(contrato_suspenso=True) & (Q(suspenso_ate__isnull=True) | Q(suspenso_ate__gte=hoje))
+    alunos = list(
+        Usuario.objects.filter(tipo="aluno", ativo=True, is_active=True)
+        .exclude(suspenso)
+        .filter(Exists(em_ct_com_financeiro))
+        .only("id", "first_name", "last_name", "valor_mensalidade", "dia_vencimento")
+        .order_by("id")
+    )
+    if not alunos:
+        return []
+
+    # O próximo dia útil pode cair no mês seguinte (ex.: dia 31 num domingo):
+    # a checagem de duplicidade usa o ano/mês do vencimento efetivo, como a constraint.
+    ano_seg, mes_seg = _mes_seguinte(ano, mes)
+    existentes = set(
+        Mensalidade.objects.filter(
+            data_vencimento__gte=date(ano, mes, 1),
+            data_vencimento__lte=date(ano_seg, mes_seg, monthrange(ano_seg, mes_seg)[1]),
+        ).values_list("aluno_id", "data_vencimento__year", "data_vencimento__month")
+    )
 
+    dias = range(1, ultimo_dia + 1)
+    vencimento_por_dia = dict(zip(dias, proximos_dias_uteis(date(ano, mes, d) for d in dias)))
+    plano = []
     for aluno in alunos:
-        # Cinto e suspensório: ex-aluno nunca recebe parcela na virada de mês.
-        if not aluno.ativo:
-            continue
-        if getattr(aluno, "contrato_suspenso", False) and aluno.esta_suspenso():
-            continue
-        if not _aluno_tem_ct_com_financeiro(aluno):
-            continue
-
-        valor = aluno.valor_mensalidade or Decimal("150.00")
-        dia_venc = aluno.dia_vencimento or 10
         try:
-            dia_venc = int(dia_venc)
+            dia_venc = int(aluno.dia_vencimento or 10)
         except (TypeError, ValueError):
             dia_venc = 10
+        data_vencimento = vencimento_por_dia[min(max(1, dia_venc), ultimo_dia)]
 
-        dia = min(dia_venc, ultimo_dia)
-        data_vencimento = proximo_dia_util_br(date(ano, mes, dia))
+        if (aluno.id, data_vencimento.year, data_vencimento.month) in existentes:
+            continue
+        plano.append(
+            Mensalidade(
+                aluno=aluno,
+                valor=aluno.valor_mensalidade or Decimal("150.00"),
+                data_inicio=hoje,
+                data_vencimento=data_vencimento,
+                # bulk_create não chama Mensalidade.save(): replica o status por data aqui.
+                status="atrasado" if hoje > data_vencimento else "pendente",
+            )
+        )
+    return plano
 
-        existe = Mensalidade.objects.filter(
-            aluno=aluno,
-            data_vencimento__year=data_vencimento.year,
-            data_vencimento__month=data_vencimento.month,
-        ).exists()
 
-        if not existe:
-            try:
-                Mensalidade.objects.create(
-                    aluno=aluno,
-                    valor=valor,
-                    data_inicio=hoje,
-                    data_vencimento=data_vencimento,
-                )
-                total_geradas += 1
-            except IntegrityError:
-                # Outra requisição/thread criou no mesmo instante
-                pass
+def gerar_mensalidades_para_mes(ano: int, mes: int, *, dry_run: bool = False) -> int:
+    """
+    Gera mensalidades do mês especificado para todos os alunos ativos
+    que ainda não possuem mensalidade naquele período.
+
+    Não considera status de pagamento - gera inclusive para alunos com
+    mensalidades pendentes/atrasadas do mês anterior.
+
+    Retorna o número de mensalidades criadas (ou que seriam criadas, com dry_run).
+    Exclui ex-alunos, contratos suspensos e alunos que só estão em CTs com sem_financeiro.
+
+    A inserção é um bulk_create(ignore_conflicts=True): se outra requisição/worker
+    criar a mesma parcela no meio do caminho, uniq_mensalidade_aluno_ano_mes descarta
+    a duplicata sem abortar o lote.
+    """
+    plano = planejar_mensalidades_do_mes(ano, mes)
+    if dry_run or not plano:
+        return len(plano)
+
+    ano_seg, mes_seg = _mes_seguinte(ano, mes)
+    janela = Mensalidade.objects.filter(
+        data_vencimento__gte=date(ano, mes, 1),
+        data_vencimento__lte=date(ano_seg, mes_seg, monthrange(ano_seg, mes_seg)[1]),
+    )
+    antes = janela.count()
+    Mensalidade.objects.bulk_create(plano, batch_size=500, ignore_conflicts=True)
+    total_geradas = janela.count() - antes
 
     if total_geradas > 0:
+        # bulk_create não dispara post_save: avisa os painéis do gerente e dos alunos explicitamente.
+        from alunos.painel import invalidar_painel_aluno
+        from funcionarios.painel_gerente import (
+            SECAO_ATIVIDADES,
+            SECAO_MENSALIDADES,
+            marcar_secoes_desatualizadas,
+        )
+
+        marcar_secoes_desatualizadas(SECAO_MENSALIDADES, SECAO_ATIVIDADES)
+        invalidar_painel_aluno(*(m.aluno_id for m in plano))
         logger.info(f'Mensalidades: {total_geradas} criada(s) para {ano}/{mes:02d}')
 
     return total_geradas
@@ -244,10 +297,12 @@ def gerar_pix_para_mensalidade(mensalidade):
 
 def gerar_boleto_para_mensalidade(mensalidade):
     """
-    Gera boleto para uma mensalidade. Retorna dict com digitable_line, valor, data_vencimento, pdf_content.
+    Gera boleto para uma mensalidade. Retorna dict com digitable_line, valor, data_vencimento, pdf_content
+    (bytes do PDF se já estiver no cache; senão None e o download é agendado na fila).
     Levanta exceção em caso de erro.
     """
     from django.conf import settings
+    from financeiro.boleto_pdf_cache import enfileirar_prefetch_pdf_boleto, ler_pdf_boleto_em_cache
     from financeiro.c6_client import c6_client
 
     transacao_existente = TransacaoC6Bank.objects.filter(
@@ -258,11 +313,9 @@ def gerar_boleto_para_mensalidade(mensalidade):
     ).first()
 
     if transacao_existente:
-        pdf_content = None
-        try:
-            pdf_content = c6_client.get_bank_slip_pdf(transacao_existente.txid)
-        except Exception:
-            pass
+        pdf_content = ler_pdf_boleto_em_cache(transacao_existente)
+        if pdf_content is None:
+            enfileirar_prefetch_pdf_boleto(transacao_existente)
         return {
             'digitable_line': transacao_existente.boleto_codigo,
             'valor': float(transacao_existente.valor),
@@ -356,18 +409,15 @@ def gerar_boleto_para_mensalidade(mensalidade):
         resposta_api=boleto_response
     )
 
-    pdf_content = None
-    try:
-        pdf_content = c6_client.get_bank_slip_pdf(boleto_id)
-    except Exception as e:
-        logger.warning(f"Erro ao obter PDF do boleto: {str(e)}")
+    # O PDF costuma levar alguns segundos para ficar disponível no C6: baixa em segundo plano
+    enfileirar_prefetch_pdf_boleto(transacao)
 
     return {
         'digitable_line': digitable_line,
         'valor': valor_mensalidade,
         'data_vencimento': mensalidade.data_vencimento,
         'transacao': transacao,
-        'pdf_content': pdf_content,
+        'pdf_content': None,
     }
 
 
@@ -4,7 +4,7 @@ Signals do módulo financeiro.
 import logging
 from django.dispatch import Signal
 
-from financeiro.services import gerar_mensalidades_para_mes
+from financeiro.tarefas import enfileirar_geracao_mensalidades
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +15,12 @@ mes_virado = Signal()
 def on_mes_virado(sender, ano: int, mes: int, **kwargs):
     """
     Receiver do signal mes_virado.
-    Gera as mensalidades do novo mês para todos os alunos ativos.
+    Enfileira a geração das mensalidades do novo mês; quem executa é o worker
+    (manage.py processar_tarefas_financeiras), fora do ciclo da requisição.
     """
     try:
-        total = gerar_mensalidades_para_mes(ano=ano, mes=mes)
-        logger.info(f'Signal mes_virado: {total} mensalidade(s) gerada(s) para {ano}/{mes:02d}')
+        chave = enfileirar_geracao_mensalidades(ano=ano, mes=mes)
+        logger.info(f'Signal mes_virado: tarefa {chave} enfileirada')
     except Exception as e:
-        logger.exception(f'Erro ao gerar mensalidades no signal mes_virado: {e}')
+        logger.exception(f'Erro ao enfileirar mensalidades no signal mes_virado: {e}')
         raise
@@ -0,0 +1,183 @@
+"""
+Fila local de tarefas do financeiro (tabela TarefaFinanceira).
+
+O caminho da requisição só enfileira (um INSERT com ON CONFLICT DO NOTHING pela chave
+de idempotência); o trabalho pesado roda no worker iniciado por
+`manage.py processar_tarefas_financeiras`. A reserva de uma tarefa é um UPDATE
+condicional (status=pendente → executando), portanto vários workers podem drenar a
+mesma fila sem executar a mesma tarefa duas vezes.
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from financeiro.models import TarefaFinanceira
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SEGUNDOS = 30
+BACKOFF_MAX_SEGUNDOS = 60 * 60
+# Tarefa "executando" há mais que isso é considerada órfã (worker morto) e volta à fila
+TIMEOUT_EXECUCAO = timedelta(minutes=30)
+
+
+def _executar_geracao_mensalidades(ano, mes):
+    from financeiro.services import gerar_mensalidades_para_mes
+
+    return {'geradas': gerar_mensalidades_para_mes(ano=int(ano), mes=int(mes))}
+
+
+def _executar_prefetch_pdf_boleto(transacao_id):
+    from financeiro.boleto_pdf_cache import obter_pdf_boleto, pdf_boleto_em_cache
+    from financeiro.models import TransacaoC6Bank
+
+    transacao = TransacaoC6Bank.objects.filter(pk=transacao_id, tipo='boleto').first()
+    if transacao is None or transacao.status == 'cancelado' or not transacao.txid:
+        return {'ignorada': True}
+    if pdf_boleto_em_cache(transacao):
+        return {'sha256': transacao.boleto_pdf_sha256, 'em_cache': True}
+    obter_pdf_boleto(transacao)
+    return {'sha256': transacao.boleto_pdf_sha256}
+
+
+EXECUTORES = {
+    TarefaFinanceira.TIPO_GERAR_MENSALIDADES: _executar_geracao_mensalidades,
+    TarefaFinanceira.TIPO_BAIXAR_PDF_BOLETO: _executar_prefetch_pdf_boleto,
+}
+
+
+def chave_geracao_mensalidades(ano: int, mes: int) -> str:
+    return f'{TarefaFinanceira.TIPO_GERAR_MENSALIDADES}:{ano}-{mes:02d}'
+
+
+def enfileirar_tarefa(tipo: str, chave: str, parametros: dict | None = None, *, reabrir: bool = False) -> None:
+    """
+    Enfileira a tarefa `chave`, se ainda não existir.
+    Com reabrir=True, uma tarefa já concluída ou que falhou volta para pendente
+    (com as tentativas zeradas); pendente/executando nunca é duplicada.
+    """
+    TarefaFinanceira.objects.bulk_create(
+        [TarefaFinanceira(tipo=tipo, chave=chave, parametros=parametros or {})],
+        ignore_conflicts=True,
+    )
+    if reabrir:
+        TarefaFinanceira.objects.filter(
+            chave=chave,
+            status__in=[TarefaFinanceira.STATUS_CONCLUIDA, TarefaFinanceira.STATUS_FALHOU],
+        ).update(
+            status=TarefaFinanceira.STATUS_PENDENTE,
+            parametros=parametros or {},
+            tentativas=0,
+            executar_apos=timezone.now(),
+            iniciada_em=None,
+            concluida_em=None,
+            erro='',
+            atualizada_em=timezone.now(),
+        )
+
+
+def enfileirar_geracao_mensalidades(ano: int, mes: int, *, reabrir: bool = False) -> str:
+    """Enfileira a geração das mensalidades de ano/mes. Retorna a chave da tarefa."""
+    chave = chave_geracao_mensalidades(ano, mes)
+    enfileirar_tarefa(
+        TarefaFinanceira.TIPO_GERAR_MENSALIDADES,
+        chave,
+        {'ano': ano, 'mes': mes},
+        reabrir=reabrir,
+    )
+    return chave
+
+
+def identificar_worker() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _backoff(tentativas: int) -> timedelta:
+    segundos = BACKOFF_BASE_SEGUNDOS * (2 ** max(tentativas - 1, 0))
+    return timedelta(seconds=min(segundos, BACKOFF_MAX_SEGUNDOS))
+
+
+def recuperar_tarefas_orfas() -> int:
+    """Devolve à fila tarefas presas em 'executando' por um worker que morreu."""
+    return TarefaFinanceira.objects.filter(
+        status=TarefaFinanceira.STATUS_EXECUTANDO,
+        iniciada_em__lt=timezone.now() - TIMEOUT_EXECUCAO,
+    ).update(
+        status=TarefaFinanceira.STATUS_PENDENTE,
+        executar_apos=timezone.now(),
+        atualizada_em=timezone.now(),
+    )
+
+
+def reservar_proxima_tarefa(worker: str) -> TarefaFinanceira | None:
+    """Reserva a próxima tarefa vencida da fila para `worker` (ou None se a fila está vazia)."""
+    agora = timezone.now()
+    candidatas = list(
+        TarefaFinanceira.objects.filter(
+            status=TarefaFinanceira.STATUS_PENDENTE,
+            executar_apos__lte=agora,
+        )
+        .order_by('executar_apos', 'id')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidatas:
+        reservada = TarefaFinanceira.objects.filter(
+            pk=pk, status=TarefaFinanceira.STATUS_PENDENTE
+        ).update(
+            status=TarefaFinanceira.STATUS_EXECUTANDO,
+            tentativas=F('tentativas') + 1,
+            iniciada_em=agora,
+            worker=worker,
+            atualizada_em=agora,
+        )
+        if reservada:
+            return TarefaFinanceira.objects.get(pk=pk)
+    return None
+
+
+def executar_tarefa(tarefa: TarefaFinanceira) -> None:
+    """Executa uma tarefa já reservada e registra o resultado, o reagendamento ou a falha."""
+    try:
+        executor = EXECUTORES[tarefa.tipo]
+        resultado = executor(**tarefa.parametros)
+    except Exception as e:
+        definitiva = tarefa.tentativas >= tarefa.max_tentativas
+        logger.exception(
+            'Tarefa %s falhou (tentativa %s/%s): %s',
+            tarefa.chave, tarefa.tentativas, tarefa.max_tentativas, e,
+        )
+        tarefa.erro = traceback.format_exc()[-4000:]
+        if definitiva:
+            tarefa.status = TarefaFinanceira.STATUS_FALHOU
+            tarefa.concluida_em = timezone.now()
+        else:
+            tarefa.status = TarefaFinanceira.STATUS_PENDENTE
+            tarefa.executar_apos = timezone.now() + _backoff(tarefa.tentativas)
+        tarefa.save(update_fields=['erro', 'status', 'concluida_em', 'executar_apos', 'atualizada_em'])
+        return
+
+    tarefa.status = TarefaFinanceira.STATUS_CONCLUIDA
+    tarefa.resultado = resultado
+    tarefa.erro = ''
+    tarefa.concluida_em = timezone.now()
+    tarefa.save(update_fields=['status', 'resultado', 'erro', 'concluida_em', 'atualizada_em'])
+    logger.info('Tarefa %s concluída: %s', tarefa.chave, resultado)
+
+
+def processar_tarefas(worker: str | None = None, limite: int | None = None) -> int:
+    """Drena a fila até esvaziar (ou até `limite` tarefas). Retorna quantas foram executadas."""
+    worker = worker or identificar_worker()
+    recuperar_tarefas_orfas()
+    executadas = 0
+    while limite is None or executadas < limite:
+        tarefa = reservar_proxima_tarefa(worker)
+        if tarefa is None:
+            break
+        executar_tarefa(tarefa)
+        executadas += 1
+    return executadas
@@ -0,0 +1,94 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from financeiro.boleto_pdf_cache import caminho_pdf_boleto, enfileirar_prefetch_pdf_boleto
+from financeiro.c6_client import c6_client
+from financeiro.models import Mensalidade, TransacaoC6Bank
+from financeiro.tarefas import processar_tarefas
+from usuarios.models import Usuario
+
+PDF = b"%PDF-1.4 boleto de teste"
+
+
+class BoletoPdfCacheTests(TestCase):
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        configuracao = override_settings(BOLETO_PDF_CACHE_DIR=diretorio.name, BOLETO_PDF_X_ACCEL_PREFIX="")
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.aluno = Usuario.objects.create_user(
+            username="21501658727",
+            password="x",
+            tipo="aluno",
+            first_name="Bella",
+            last_name="Teste",
+            email="bella@test.com",
+            cpf="21501658727",
+            ativo=True,
+        )
+        self.gerente = Usuario.objects.create_user(
+            username="00000000000",
+            password="x",
+            tipo="gerente",
+            first_name="Gerente",
+            last_name="Teste",
+            email="gerente@test.com",
+            cpf="00000000000",
+        )
+        mensalidade = Mensalidade.objects.create(
+            aluno=self.aluno, valor=Decimal("160.00"), data_vencimento=date(2031, 3, 10)
+        )
+        self.transacao = TransacaoC6Bank.objects.create(
+            mensalidade=mensalidade,
+            tipo="boleto",
+            valor=Decimal("160.00"),
+            txid="slip-123",
+            data_expiracao=timezone.now() + timedelta(days=30),
+        )
+        self.url = f"/api/financeiro/boletos/{self.transacao.id}/pdf/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.aluno)
+
+    def test_download_repetido_consulta_o_c6_uma_vez(self):
+        with mock.patch.object(c6_client, "get_bank_slip_pdf", return_value=PDF) as baixar:
+            primeira = self.client.get(self.url)
+            segunda = self.client.get(self.url)
+
+        self.assertEqual(baixar.call_count, 1)
+        self.assertEqual(b"".join(primeira.streaming_content), PDF)
+        self.assertEqual(b"".join(segunda.streaming_content), PDF)
+        self.assertIn('filename="boleto_slip-123.pdf"', segunda["Content-Disposition"])
+
+        nao_modificado = self.client.get(self.url, HTTP_IF_NONE_MATCH=segunda["ETag"])
+        self.assertEqual(nao_modificado.status_code, 304)
+
+    def test_x_accel_redirect_delega_o_arquivo_ao_nginx(self):
+        with mock.patch.object(c6_client, "get_bank_slip_pdf", return_value=PDF):
+            with override_settings(BOLETO_PDF_X_ACCEL_PREFIX="/_boletos_pdf/"):
+                resp = self.client.get(self.url)
+        sha256 = TransacaoC6Bank.objects.get(pk=self.transacao.pk).boleto_pdf_sha256
+        self.assertEqual(resp["X-Accel-Redirect"], f"/_boletos_pdf/{sha256[:2]}/{sha256}.pdf")
+        self.assertEqual(resp.content, b"")
+
+    def test_prefetch_em_segundo_plano_e_invalidacao_no_cancelamento(self):
+        enfileirar_prefetch_pdf_boleto(self.transacao)
+        with mock.patch.object(c6_client, "get_bank_slip_pdf", return_value=PDF):
+            self.assertEqual(processar_tarefas("teste"), 1)
+        sha256 = TransacaoC6Bank.objects.get(pk=self.transacao.pk).boleto_pdf_sha256
+        self.assertTrue(os.path.exists(caminho_pdf_boleto(sha256)))
+
+        self.client.force_authenticate(self.gerente)
+        with mock.patch.object(c6_client, "cancel_bank_slip"):
+            resp = self.client.put(f"/api/financeiro/boletos/{self.transacao.id}/cancelar/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(TransacaoC6Bank.objects.get(pk=self.transacao.pk).boleto_pdf_sha256, "")
+        self.assertFalse(os.path.exists(caminho_pdf_boleto(sha256)))
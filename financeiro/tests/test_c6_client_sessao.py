@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from financeiro.c6_client import (
+    TOKEN_CACHE_KEY,
+    TOKEN_LOCK_CACHE_KEY,
+    C6BankClient,
+    C6BankGatewayTimeoutError,
+    C6BankTooManyRequestsError,
+)
+
+
+def _resposta(status, corpo=None, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = json.dumps(corpo or {}).encode()
+    resp.headers["Content-Type"] = "application/json"
+    resp.headers.update(headers or {})
+    return resp
+
+
+@override_settings(C6_BANK_RETRY_BACKOFF=0)
+@mock.patch.object(C6BankClient, "_setup_certificates", return_value={})
+class C6ClientSessaoTests(SimpleTestCase):
+    def setUp(self):
+        cache.delete(TOKEN_CACHE_KEY)
+        cache.delete(TOKEN_LOCK_CACHE_KEY)
+        self.addCleanup(cache.delete, TOKEN_CACHE_KEY)
+
+    def _cliente_com_sessao(self, *respostas):
+        client = C6BankClient()
+        sessao = mock.Mock()
+        sessao.request.side_effect = list(respostas)
+        client._session, client._session_pid = sessao, os.getpid()
+        cache.set(TOKEN_CACHE_KEY, "token", 60)
+        return client, sessao
+
+    def test_sessao_reaproveitada_e_recriada_apos_fork(self, _certs):
+        client = C6BankClient()
+        sessao = client._http()
+        self.assertIs(client._http(), sessao)
+        with mock.patch("financeiro.c6_client.os.getpid", return_value=-1):
+            self.assertIsNot(client._http(), sessao)
+
+    def test_429_respeita_retry_after_e_repete(self, _certs):
+        client, sessao = self._cliente_com_sessao(
+            _resposta(429, headers={"Retry-After": "0"}),
+            _resposta(200, {"txid": "abc"}),
+        )
+        with mock.patch("financeiro.c6_client.time.sleep") as dormir:
+            resp = client._make_request("GET", "/v2/pix/cob/abc")
+        self.assertEqual(resp.json(), {"txid": "abc"})
+        self.assertEqual(sessao.request.call_count, 2)
+        dormir.assert_called_once_with(0.0)
+
+    def test_retry_after_acima_do_orcamento_nao_espera(self, _certs):
+        client, sessao = self._cliente_com_sessao(_resposta(429, headers={"Retry-After": "60"}))
+        with mock.patch("financeiro.c6_client.time.sleep") as dormir:
+            with self.assertRaises(C6BankTooManyRequestsError):
+                client._make_request("GET", "/v2/pix/cob/abc")
+        self.assertEqual(sessao.request.call_count, 1)
+        dormir.assert_not_called()
+
+    @override_settings(C6_BANK_RETRY_ORCAMENTO=5)
+    def test_orcamento_limita_a_soma_das_esperas(self, _certs):
+        client, sessao = self._cliente_com_sessao(*[_resposta(429, headers={"Retry-After": "2"})] * 4)
+        # início da chamada e o relógio a cada 429
+        with mock.patch("financeiro.c6_client.time.monotonic", side_effect=[0, 0, 2, 4]), \
+                mock.patch("financeiro.c6_client.time.sleep") as dormir:
+            with self.assertRaises(C6BankTooManyRequestsError):
+                client._make_request("GET", "/v2/pix/cob/abc")
+        # 0s → espera 2 (restam 5); 2s → espera 2 (restam 3); 4s → restam 1 < 2: desiste
+        self.assertEqual(dormir.call_count, 2)
+        self.assertEqual(sessao.request.call_count, 3)
+
+    def test_504_em_post_nao_repete(self, _certs):
+        client, sessao = self._cliente_com_sessao(_resposta(504))
+        with self.assertRaises(C6BankGatewayTimeoutError):
+            client._make_request("POST", "/v2/pix/cob", data={"valor": 1})
+        self.assertEqual(sessao.request.call_count, 1)
+
+    def test_504_em_get_repete_ate_o_limite(self, _certs):
+        client, sessao = self._cliente_com_sessao(*[_resposta(504)] * 4)
+        with mock.patch("financeiro.c6_client.time.sleep"):
+            with self.assertRaises(C6BankGatewayTimeoutError):
+                client._make_request("GET", "/v2/pix/cob/abc")
+        self.assertEqual(sessao.request.call_count, client.max_retries + 1)
+
+    def test_renovacao_do_token_single_flight(self, _certs):
+        client = C6BankClient()
+        sessao = mock.Mock()
+        barreira = threading.Barrier(5)
+
+        def autenticar(*args, **kwargs):
+            return _resposta(200, {"access_token": "novo", "expires_in": 3600})
+
+        sessao.post.side_effect = autenticar
+        client._session, client._session_pid = sessao, os.getpid()
+        tokens = []
+
+        def obter():
+            barreira.wait()
+            tokens.append(client._get_access_token())
+
+        threads = [threading.Thread(target=obter) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(tokens, ["novo"] * 5)
+        self.assertEqual(sessao.post.call_count, 1)
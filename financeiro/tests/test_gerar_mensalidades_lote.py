@@ -0,0 +1,102 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ct.models import CentroDeTreinamento
+from financeiro.models import Mensalidade
+from financeiro.services import gerar_mensalidades_para_mes, planejar_mensalidades_do_mes
+from turmas.models import Turma
+from usuarios.models import Usuario
+
+
+class GerarMensalidadesEmLoteTests(TestCase):
+    def setUp(self):
+        self.ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        self.ct_sem_fin = CentroDeTreinamento.objects.create(nome="Projeto Social", sem_financeiro=True)
+        self.turma = Turma.objects.create(ct=self.ct, horario=time(7, 0), capacidade_maxima=20)
+        self.turma_sem_fin = Turma.objects.create(ct=self.ct_sem_fin, horario=time(8, 0), capacidade_maxima=20)
+        self._seq = 0
+
+    def _aluno(self, turma=None, **extra):
+        self._seq += 1
+        cpf = f"{self._seq:011d}"
+        dados = {
+            "username": cpf,
+            "password": "x",
+            "tipo": "aluno",
+            "first_name": f"Aluno{self._seq}",
+            "last_name": "Teste",
+            "email": f"a{self._seq}@test.com",
+            "cpf": cpf,
+            "ativo": True,
+            "valor_mensalidade": Decimal("160.00"),
+            "dia_vencimento": 10,
+        }
+        dados.update(extra)
+        aluno = Usuario.objects.create_user(**dados)
+        (turma or self.turma).alunos.add(aluno)
+        return aluno
+
+    def test_gera_para_elegiveis_e_ignora_demais(self):
+        ok = self._aluno()
+        self._aluno(turma=self.turma_sem_fin)
+        self._aluno(ativo=False)
+        self._aluno(is_active=False)
+        self._aluno(contrato_suspenso=True, suspenso_ate=timezone.localdate() + timedelta(days=10))
+        suspensao_vencida = self._aluno(
+            contrato_suspenso=True, suspenso_ate=timezone.localdate() - timedelta(days=1)
+        )
+
+        criadas = gerar_mensalidades_para_mes(2031, 3)
+
+        self.assertEqual(criadas, 2)
+        self.assertEqual(
+            set(Mensalidade.objects.values_list("aluno_id", flat=True)),
+            {ok.id, suspensao_vencida.id},
+        )
+        m = Mensalidade.objects.get(aluno=ok)
+        self.assertEqual(m.data_vencimento, date(2031, 3, 10))
+        self.assertEqual(m.valor, Decimal("160.00"))
+        self.assertEqual(m.status, "pendente")
+
+    def test_consultas_nao_crescem_com_alunos(self):
+        for _ in range(3):
+            self._aluno()
+        with self.assertNumQueries(6):
+            gerar_mensalidades_para_mes(2031, 3)
+        for _ in range(10):
+            self._aluno(dia_vencimento=15)
+        with self.assertNumQueries(6):
+            self.assertEqual(gerar_mensalidades_para_mes(2031, 3), 10)
+
+    def test_idempotente_e_respeita_vencimento_no_mes_seguinte(self):
+        # 31/05/2031 é sábado: vencimento efetivo 02/06/2031 (mês seguinte)
+        aluno = self._aluno(dia_vencimento=31)
+        self.assertEqual(gerar_mensalidades_para_mes(2031, 5), 1)
+        self.assertEqual(
+            Mensalidade.objects.get(aluno=aluno).data_vencimento, date(2031, 6, 2)
+        )
+        self.assertEqual(gerar_mensalidades_para_mes(2031, 5), 0)
+        self.assertEqual(Mensalidade.objects.count(), 1)
+
+    def test_vencimento_passado_ja_nasce_atrasado(self):
+        self._aluno(dia_vencimento=1)
+        ontem = timezone.localdate() - timedelta(days=40)
+        gerar_mensalidades_para_mes(ontem.year, ontem.month)
+        self.assertEqual(Mensalidade.objects.get().status, "atrasado")
+
+    def test_dry_run_nao_grava(self):
+        self._aluno()
+        self._aluno()
+        self.assertEqual(gerar_mensalidades_para_mes(2031, 3, dry_run=True), 2)
+        self.assertEqual(len(planejar_mensalidades_do_mes(2031, 3)), 2)
+        self.assertFalse(Mensalidade.objects.exists())
+
+        out = StringIO()
+        call_command("gerar_mensalidades", "--dry-run", "--ano", "2031", "--mes", "3", stdout=out)
+        self.assertIn("2 mensalidade(s) seriam geradas para 2031/03", out.getvalue())
+        self.assertFalse(Mensalidade.objects.exists())
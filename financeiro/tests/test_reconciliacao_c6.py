@@ -0,0 +1,199 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from financeiro.c6_client import C6BankServiceUnavailableError
+from financeiro.c6_pix_sync import conciliar_pix_c6_por_janela
+from financeiro.c6_reconciliacao import (
+    LimitadorTaxa,
+    ReconciliacaoEmAndamento,
+    reconciliar_transacoes_c6,
+)
+from financeiro.models import ExecucaoReconciliacaoC6, Mensalidade, TransacaoC6Bank
+from funcionarios.models import PainelGerenteSecao
+from funcionarios.painel_gerente import reconstruir_painel_gerente
+from usuarios.models import Usuario
+
+
+class ReconciliacaoC6Tests(TestCase):
+    def setUp(self):
+        aluno = Usuario.objects.create_user(
+            username="21501658727",
+            password="x",
+            tipo="aluno",
+            first_name="Bella",
+            last_name="Teste",
+            email="bella@test.com",
+            cpf="21501658727",
+            ativo=True,
+            valor_mensalidade=Decimal("160.00"),
+            dia_vencimento=10,
+        )
+        agora = timezone.now()
+        self.transacoes = {}
+        # Criadas fora da ordem de prioridade (expiração mais próxima primeiro)
+        for txid, horas, mes in (("tx-c", 3, 3), ("tx-a", 1, 6), ("tx-b", 2, 9)):
+            mensalidade = Mensalidade.objects.create(
+                aluno=aluno, valor=Decimal("160.00"), data_vencimento=date(2031, mes, 10), status="pendente"
+            )
+            self.transacoes[txid] = TransacaoC6Bank.objects.create(
+                mensalidade=mensalidade,
+                tipo="pix",
+                valor=Decimal("160.00"),
+                txid=txid,
+                data_expiracao=agora + timedelta(hours=horas),
+            )
+
+    def _c6(self, **respostas):
+        def consultar(txid):
+            resposta = respostas.get(txid, {"status": "ATIVA"})
+            if isinstance(resposta, Exception):
+                raise resposta
+            return resposta
+
+        c6 = mock.patch("financeiro.c6_pix_sync.c6_client")
+        cliente = c6.start()
+        self.addCleanup(c6.stop)
+        cliente.get_pix_payment_status.side_effect = consultar
+        return cliente
+
+    def test_paralelo_aplica_resultados_e_grava_resumo(self):
+        self._c6(**{
+            "tx-a": {"status": "CONCLUIDA"},
+            "tx-b": C6BankServiceUnavailableError("service_unavailable", "fora do ar", 503),
+        })
+        execucao = reconciliar_transacoes_c6("pix", workers=3, taxa=0)
+
+        self.assertEqual(execucao.status, ExecucaoReconciliacaoC6.STATUS_CONCLUIDA)
+        self.assertEqual((execucao.candidatas, execucao.processadas, execucao.erros), (3, 3, 1))
+        self.assertEqual(execucao.erros_por_tipo, {"C6BankServiceUnavailableError": 1})
+        self.assertEqual(execucao.transicoes, {"pendente->aprovado": 1})
+        self.assertEqual(Mensalidade.objects.get(pk=self.transacoes["tx-a"].mensalidade_id).status, "pago")
+        self.assertFalse(TransacaoC6Bank.objects.filter(reconciliada_em__isnull=True).exists())
+
+    def test_prioriza_expiracao_mais_proxima(self):
+        cliente = self._c6()
+        reconciliar_transacoes_c6("pix", workers=1, taxa=0, limite=2)
+        ordem = [c.args[0] for c in cliente.get_pix_payment_status.call_args_list]
+        self.assertEqual(ordem, ["tx-a", "tx-b"])
+
+    def test_expirados_parados_nao_barram_cobrancas_novas(self):
+        # Três PIX expirados já consultados em rodadas anteriores ocupariam todo o limite
+        antiga = timezone.now() - timedelta(days=2)
+        for n, txid in enumerate(("tx-a", "tx-b", "tx-c")):
+            TransacaoC6Bank.objects.filter(txid=txid).update(
+                status="expirado", data_expiracao=antiga, reconciliada_em=antiga + timedelta(minutes=n)
+            )
+        nova = TransacaoC6Bank.objects.create(
+            mensalidade=self.transacoes["tx-a"].mensalidade, tipo="pix", valor=Decimal("160.00"),
+            txid="tx-nova", data_expiracao=timezone.now() + timedelta(hours=1),
+        )
+        cliente = self._c6()
+
+        reconciliar_transacoes_c6("pix", workers=1, taxa=0, limite=3)
+        ordem = [c.args[0] for c in cliente.get_pix_payment_status.call_args_list]
+        self.assertEqual(ordem, [nova.txid, "tx-a", "tx-b"])
+
+        # Rodada seguinte: o backlog gira e o expirado que ficou de fora é consultado
+        cliente.get_pix_payment_status.reset_mock()
+        reconciliar_transacoes_c6("pix", workers=1, taxa=0, limite=1)
+        self.assertEqual([c.args[0] for c in cliente.get_pix_payment_status.call_args_list], ["tx-c"])
+
+    def test_retoma_execucao_abandonada_sem_repetir_transacoes(self):
+        antiga = timezone.now() - timedelta(hours=1)
+        abandonada = ExecucaoReconciliacaoC6.objects.create(
+            tipo="pix", processadas=1, candidatas=3, iniciada_em=antiga, atualizada_em=antiga
+        )
+        TransacaoC6Bank.objects.filter(txid="tx-a").update(reconciliada_em=antiga + timedelta(minutes=1))
+        cliente = self._c6()
+
+        execucao = reconciliar_transacoes_c6("pix", workers=2, taxa=0)
+
+        self.assertEqual(execucao.pk, abandonada.pk)
+        self.assertEqual(execucao.retomadas, 1)
+        self.assertEqual(execucao.processadas, 3)
+        consultadas = {c.args[0] for c in cliente.get_pix_payment_status.call_args_list}
+        self.assertEqual(consultadas, {"tx-b", "tx-c"})
+
+    def test_execucao_ativa_nao_e_duplicada(self):
+        ExecucaoReconciliacaoC6.objects.create(tipo="pix")
+        with self.assertRaises(ReconciliacaoEmAndamento):
+            reconciliar_transacoes_c6("pix", taxa=0)
+        out = StringIO()
+        call_command("sincronizar_pix_c6", stdout=out)
+        self.assertIn("em andamento", out.getvalue())
+
+    def test_comando_escreve_resumo(self):
+        self._c6(**{"tx-c": {"status": "REMOVIDA_PELO_USUARIO_RECEBEDOR"}})
+        out = StringIO()
+        call_command("sincronizar_pix_c6", "--workers", "2", "--taxa", "0", stdout=out)
+        self.assertIn("3/3 consultada(s); 0 erro(s)", out.getvalue())
+        self.assertIn("pendente->cancelado=1", out.getvalue())
+
+    def test_conciliacao_por_janela_pagina_listas_e_liquida_em_lote(self):
+        cliente = self._c6()
+        paginas = [
+            {
+                "parametros": {"paginacao": {"paginaAtual": 0, "quantidadeDePaginas": 2}},
+                "cobs": [{"txid": "tx-a", "status": "CONCLUIDA"}, {"txid": "de-outro-sistema", "status": "ATIVA"}],
+            },
+            {
+                "parametros": {"paginacao": {"paginaAtual": 1, "quantidadeDePaginas": 2}},
+                "cobs": [{"txid": "tx-c", "status": "REMOVIDA_PELO_USUARIO_RECEBEDOR"}],
+            },
+        ]
+        cliente.list_pix_immediate_charges.side_effect = paginas
+        cliente.list_pix_charges_with_due_date.return_value = {
+            "parametros": {"paginacao": {"paginaAtual": 0, "quantidadeDePaginas": 1}},
+            "cobs": [],
+        }
+
+        resumo = conciliar_pix_c6_por_janela(horas=24)
+
+        self.assertEqual(resumo, {
+            "chamadas": 3, "cobrancas": 3, "conciliadas": 2, "aprovadas": 1, "canceladas": 1, "expiradas": 0,
+        })
+        self.assertEqual(
+            [c.kwargs["pagina"] for c in cliente.list_pix_immediate_charges.call_args_list], [0, 1]
+        )
+        cliente.get_pix_payment_status.assert_not_called()
+        status = dict(TransacaoC6Bank.objects.values_list("txid", "status"))
+        self.assertEqual(status, {"tx-a": "aprovado", "tx-b": "pendente", "tx-c": "cancelado"})
+        paga = Mensalidade.objects.get(pk=self.transacoes["tx-a"].mensalidade_id)
+        self.assertEqual((paga.status, paga.valor_pago), ("pago", Decimal("160.00")))
+        self.assertIsNotNone(paga.data_pagamento)
+        self.assertTrue(Mensalidade.objects.filter(data_vencimento__month=7).exists())
+
+    def test_conciliacao_por_janela_marca_painel_do_gerente_desatualizado(self):
+        cliente = self._c6()
+        cliente.list_pix_immediate_charges.return_value = {
+            "parametros": {"paginacao": {"paginaAtual": 0, "quantidadeDePaginas": 1}},
+            "cobs": [{"txid": "tx-a", "status": "CONCLUIDA"}],
+        }
+        cliente.list_pix_charges_with_due_date.return_value = {
+            "parametros": {"paginacao": {"paginaAtual": 0, "quantidadeDePaginas": 1}},
+            "cobs": [],
+        }
+        reconstruir_painel_gerente()
+        # Sem criar a próxima mensalidade (cujo post_save também marcaria o painel)
+        with mock.patch.object(Mensalidade, "criar_proxima_mensalidade", return_value=None):
+            conciliar_pix_c6_por_janela(horas=24)
+
+        self.assertEqual(
+            set(PainelGerenteSecao.objects.filter(desatualizada=True).values_list("secao", flat=True)),
+            {"mensalidades", "atividades"},
+        )
+
+    def test_limitador_respeita_taxa_apos_rajada(self):
+        limitador = LimitadorTaxa(taxa=100, rajada=2)
+        inicio = time.monotonic()
+        for _ in range(6):
+            limitador.adquirir()
+        # 2 fichas da rajada + 4 a 100/s: ao menos ~40 ms
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.035)
@@ -0,0 +1,122 @@
+from datetime import time, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ct.models import CentroDeTreinamento
+from financeiro.models import Mensalidade, TarefaFinanceira
+from financeiro.signals import mes_virado
+from financeiro.tarefas import EXECUTORES, processar_tarefas, recuperar_tarefas_orfas
+from turmas.models import Turma
+from usuarios.models import Usuario
+
+
+class TarefasFinanceirasTests(TestCase):
+    def setUp(self):
+        ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        turma = Turma.objects.create(ct=ct, horario=time(7, 0), capacidade_maxima=20)
+        self.aluno = Usuario.objects.create_user(
+            username="21501658727",
+            password="x",
+            tipo="aluno",
+            first_name="Bella",
+            last_name="Teste",
+            email="bella@test.com",
+            cpf="21501658727",
+            ativo=True,
+            valor_mensalidade=Decimal("160.00"),
+            dia_vencimento=10,
+        )
+        turma.alunos.add(self.aluno)
+        self.gerente = Usuario.objects.create_user(
+            username="00000000000",
+            password="x",
+            tipo="gerente",
+            first_name="Gerente",
+            last_name="Teste",
+            email="gerente@test.com",
+            cpf="00000000000",
+        )
+
+    def test_virada_de_mes_so_enfileira_uma_vez(self):
+        mes_virado.send(sender=self.__class__, ano=2031, mes=3)
+        mes_virado.send(sender=self.__class__, ano=2031, mes=3)
+
+        tarefa = TarefaFinanceira.objects.get()
+        self.assertEqual(tarefa.chave, "gerar_mensalidades:2031-03")
+        self.assertEqual(tarefa.status, TarefaFinanceira.STATUS_PENDENTE)
+        self.assertFalse(Mensalidade.objects.exists())
+
+        self.assertEqual(processar_tarefas("teste"), 1)
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.status, TarefaFinanceira.STATUS_CONCLUIDA)
+        self.assertEqual(tarefa.resultado, {"geradas": 1})
+        self.assertEqual(tarefa.worker, "teste")
+        self.assertEqual(Mensalidade.objects.get().aluno, self.aluno)
+        self.assertEqual(processar_tarefas("teste"), 0)
+
+    def test_falha_reagenda_com_backoff_e_desiste_no_limite(self):
+        mes_virado.send(sender=self.__class__, ano=2031, mes=3)
+        TarefaFinanceira.objects.update(max_tentativas=2)
+        falha = mock.Mock(side_effect=RuntimeError("banco fora"))
+        with mock.patch.dict(EXECUTORES, {TarefaFinanceira.TIPO_GERAR_MENSALIDADES: falha}):
+            processar_tarefas("teste")
+            tarefa = TarefaFinanceira.objects.get()
+            self.assertEqual(tarefa.status, TarefaFinanceira.STATUS_PENDENTE)
+            self.assertEqual(tarefa.tentativas, 1)
+            self.assertGreater(tarefa.executar_apos, timezone.now())
+            self.assertIn("banco fora", tarefa.erro)
+
+            # Ainda no backoff: não é reservada
+            self.assertEqual(processar_tarefas("teste"), 0)
+            TarefaFinanceira.objects.update(executar_apos=timezone.now())
+            processar_tarefas("teste")
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.status, TarefaFinanceira.STATUS_FALHOU)
+        self.assertEqual(tarefa.tentativas, 2)
+
+    def test_tarefa_orfa_volta_para_fila(self):
+        mes_virado.send(sender=self.__class__, ano=2031, mes=3)
+        TarefaFinanceira.objects.update(
+            status=TarefaFinanceira.STATUS_EXECUTANDO,
+            iniciada_em=timezone.now() - timedelta(hours=2),
+        )
+        self.assertEqual(recuperar_tarefas_orfas(), 1)
+        self.assertEqual(TarefaFinanceira.objects.get().status, TarefaFinanceira.STATUS_PENDENTE)
+
+    def test_comando_enfileira_e_reabre_mes_concluido(self):
+        out = StringIO()
+        call_command("gerar_mensalidades", "--ano", "2031", "--mes", "3", stdout=out)
+        self.assertIn("gerar_mensalidades:2031-03 enfileirada", out.getvalue())
+        call_command("processar_tarefas_financeiras", "--uma-vez", stdout=out)
+
+        call_command("gerar_mensalidades", "--ano", "2031", "--mes", "3", stdout=out)
+        tarefa = TarefaFinanceira.objects.get()
+        self.assertEqual(tarefa.status, TarefaFinanceira.STATUS_PENDENTE)
+        self.assertEqual(tarefa.tentativas, 0)
+
+        call_command("gerar_mensalidades", "--sync", "--ano", "2031", "--mes", "4", stdout=out)
+        self.assertTrue(Mensalidade.objects.filter(data_vencimento__month=4).exists())
+
+    def test_api_enfileira_e_consulta_status(self):
+        client = APIClient()
+        client.force_authenticate(self.gerente)
+        resp = client.post(
+            "/api/financeiro/tarefas/gerar-mensalidades/", {"ano": 2031, "mes": 3}, format="json"
+        )
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.json()["status"], "pendente")
+
+        processar_tarefas("teste")
+        resp = client.get(f"/api/financeiro/tarefas/{resp.json()['id']}/")
+        self.assertEqual(resp.json()["status"], "concluida")
+        self.assertEqual(resp.json()["resultado"], {"geradas": 1})
+        self.assertEqual(len(client.get("/api/financeiro/tarefas/?status=concluida").json()), 1)
+
+        client.force_authenticate(self.aluno)
+        self.assertEqual(client.get("/api/financeiro/tarefas/").status_code, 403)
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from financeiro.c6_client import C6BankServiceUnavailableError
+from financeiro.c6_webhooks import processar_eventos_webhook_c6, reservar_proximo_evento
+from financeiro.models import EventoWebhookC6, Mensalidade, TransacaoC6Bank
+from usuarios.models import Usuario
+
+
+class WebhooksC6Tests(TestCase):
+    def setUp(self):
+        aluno = Usuario.objects.create_user(
+            username="21501658727",
+            password="x",
+            tipo="aluno",
+            first_name="Bella",
+            last_name="Teste",
+            email="bella@test.com",
+            cpf="21501658727",
+            ativo=True,
+            valor_mensalidade=Decimal("160.00"),
+            dia_vencimento=10,
+        )
+        self.mensalidade = Mensalidade.objects.create(
+            aluno=aluno, valor=Decimal("160.00"), data_vencimento=date(2031, 3, 10), status="pendente"
+        )
+        expiracao = timezone.now() + timedelta(days=1)
+        self.pix = TransacaoC6Bank.objects.create(
+            mensalidade=self.mensalidade, tipo="pix", valor=Decimal("160.00"), txid="tx-pix", data_expiracao=expiracao
+        )
+        self.boleto = TransacaoC6Bank.objects.create(
+            mensalidade=self.mensalidade, tipo="boleto", valor=Decimal("160.00"), txid="slip-1", data_expiracao=expiracao
+        )
+        self.client = APIClient()
+
+    def _pix(self, end_to_end_id="E2E-1"):
+        return self.client.post(
+            "/api/financeiro/c6/webhook/",
+            {"pix": [{"txid": "tx-pix", "endToEndId": end_to_end_id, "valor": "160.00"}, {"endToEndId": "sem-txid"}]},
+            format="json",
+        )
+
+    def test_webhook_pix_so_enfileira_e_reenvio_nao_duplica(self):
+        with mock.patch("financeiro.c6_pix_sync.c6_client") as c6:
+            resp = self._pix()
+            self._pix()
+            c6.get_pix_payment_status.assert_not_called()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.json()["pix_enfileirados"], resp.json()["pix_ignorados"]), (1, 1))
+        evento = EventoWebhookC6.objects.get()
+        self.assertEqual((evento.chave, evento.recebimentos), ("pix:E2E-1", 2))
+        self.assertEqual(evento.mensalidade_id, self.mensalidade.id)
+
+        with mock.patch("financeiro.c6_pix_sync.c6_client") as c6:
+            c6.get_pix_payment_status.return_value = {"status": "CONCLUIDA"}
+            self.assertEqual(processar_eventos_webhook_c6("teste"), 1)
+            c6.get_pix_payment_status.assert_called_once_with("tx-pix")
+
+        self.mensalidade.refresh_from_db()
+        self.assertEqual(self.mensalidade.status, "pago")
+        self.pix.refresh_from_db()
+        self.assertEqual(self.pix.resposta_api["pix_recebidos"][0]["endToEndId"], "E2E-1")
+        self.assertEqual(EventoWebhookC6.objects.get().resultado["status"], "aprovado")
+
+    def test_eventos_da_mesma_mensalidade_sao_aplicados_em_ordem(self):
+        self._pix()
+        self.client.post(
+            "/api/financeiro/c6/webhook-bank-slip/",
+            {"service": "BANK_SLIP", "external_id": "slip-1", "status": "PAID"},
+            format="json",
+        )
+        primeiro = reservar_proximo_evento("w1")
+        self.assertEqual(primeiro.servico, "pix")
+        # O boleto da mesma mensalidade espera o PIX terminar
+        self.assertIsNone(reservar_proximo_evento("w2"))
+
+    def test_falha_na_consulta_reagenda_com_backoff(self):
+        self._pix()
+        with mock.patch("financeiro.c6_pix_sync.c6_client") as c6:
+            c6.get_pix_payment_status.side_effect = C6BankServiceUnavailableError("service_unavailable", "fora", 503)
+            self.assertEqual(processar_eventos_webhook_c6("teste"), 1)
+            # Ainda no backoff: não consulta de novo
+            self.assertEqual(processar_eventos_webhook_c6("teste"), 0)
+
+        evento = EventoWebhookC6.objects.get()
+        self.assertEqual((evento.status, evento.tentativas), (EventoWebhookC6.STATUS_PENDENTE, 1))
+        self.assertGreater(evento.executar_apos, timezone.now())
+        self.assertEqual(Mensalidade.objects.get(pk=self.mensalidade.pk).status, "pendente")
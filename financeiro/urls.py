@@ -6,6 +6,7 @@ from .views import (
     SalarioListCreateView, SalarioRetrieveUpdateDestroyView,
     PagarSalarioAPIView, DashboardFinanceiroAPIView, RelatorioFinanceiroAPIView,
     RelatorioExAlunosPendenciasAPIView,
+    TarefaFinanceiraListAPIView, TarefaFinanceiraDetailAPIView, EnfileirarGeracaoMensalidadesAPIView,
     GerarPixAPIView, ConsultarStatusPixAPIView, ConsultarStatusPixPorTransacaoAPIView,
     # Integração C6 Bank
     C6BankTestConnectionAPIView, C6BankCreatePixPaymentAPIView, C6BankCheckPaymentStatusAPIView,
@@ -48,6 +49,15 @@ urlpatterns = [
         name='relatorio_ex_alunos_pendencias',
     ),
 
+    # Fila de tarefas (geração de mensalidades fora do ciclo da requisição)
+    path('tarefas/', TarefaFinanceiraListAPIView.as_view(), name='tarefa_list'),
+    path('tarefas/<int:pk>/', TarefaFinanceiraDetailAPIView.as_view(), name='tarefa_detail'),
+    path(
+        'tarefas/gerar-mensalidades/',
+        EnfileirarGeracaoMensalidadesAPIView.as_view(),
+        name='tarefa_gerar_mensalidades',
+    ),
+
     # Pagamentos PIX - Rotas alternativas para compatibilidade com frontend
     # Frontend chama: financeiro/pix/gerar/${mensalidadeId}/
     # Frontend chama: financeiro/pix/status/${transacaoId}/
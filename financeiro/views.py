@@ -8,15 +8,32 @@ from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.db.models.functions import Coalesce
 from django.utils import timezone
-from .models import Mensalidade, Despesa, Salario, TransacaoC6Bank
+from .models import Mensalidade, Despesa, Salario, TarefaFinanceira, TransacaoC6Bank
 from .services import serializar_exalunos_com_mensalidade_aberta
 from .salarios import ensure_salarios_competencia
-from .serializers import MensalidadeSerializer, DespesaSerializer, SalarioSerializer, TransacaoC6BankSerializer
+from .serializers import (
+    MensalidadeSerializer, DespesaSerializer, SalarioSerializer, TarefaFinanceiraSerializer,
+    TransacaoC6BankSerializer,
+)
+from .tarefas import enfileirar_geracao_mensalidades
 from .pagination import MensalidadePagination
+from usuarios.serializers import UsuarioSerializer
 from .c6_client import c6_client, C6BankError, C6BankMethodNotAllowedError, C6BankInvalidRequestError
 from .c6_checkout_sync import sincronizar_transacao_checkout_c6
 from .c6_boleto_sync import sincronizar_transacao_boleto_c6
+from .boleto_pdf_cache import (
+    enfileirar_prefetch_pdf_boleto,
+    invalidar_pdf_boleto,
+    obter_pdf_boleto,
+    resposta_pdf_boleto,
+)
 from .c6_pix_sync import extrair_lista_pix_webhook, sincronizar_transacao_pix_c6
+from .c6_webhooks import (
+    chave_evento_notificacao,
+    chave_evento_pix,
+    enfileirar_eventos_webhook_c6,
+    extrair_id_notificacao_c6,
+)
 from django.shortcuts import get_object_or_404
 from django.conf import settings
 from datetime import timedelta
@@ -24,7 +41,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.http import JsonResponse
 from decimal import Decimal, InvalidOperation
-from app.date_api import format_data_api, format_datetime_api
+from app.date_api import format_data_api
 import json
 import logging
 import re
@@ -187,12 +204,8 @@ class MensalidadeListCreateView(ListCreateAPIView):
         elif status_param == 'atrasado':
             queryset = queryset.filter(~Q(status='pago'), data_vencimento__lt=hoje)
         return (
-            queryset.select_related('aluno')
-            .prefetch_related(
-                'aluno__turmas_aluno__ct',
-                'aluno__turmas_aluno__dias_semana',
-                'transacoes_c6',
-            )
+            UsuarioSerializer.preparar_queryset(queryset.select_related('aluno'), prefixo='aluno__')
+            .prefetch_related('transacoes_c6')
             .order_by('-data_vencimento', '-id')
         )
 
@@ -456,7 +469,9 @@ class RelatorioFinanceiroAPIView(APIView):
         if request.user.tipo != "gerente":
             return Response({"error": "Permissão negada."}, status=403)
 
-        mensalidades = Mensalidade.objects.all().order_by('-data_vencimento')
+        mensalidades = UsuarioSerializer.preparar_queryset(
+            Mensalidade.objects.select_related('aluno').prefetch_related('transacoes_c6'), prefixo='aluno__'
+        ).order_by('-data_vencimento')
         despesas = Despesa.objects.all().order_by('-data')
 
         mes = request.query_params.get('mes')
@@ -519,6 +534,60 @@ class RelatorioExAlunosPendenciasAPIView(APIView):
         return Response(serializar_exalunos_com_mensalidade_aberta())
 
 
+class TarefaFinanceiraListAPIView(APIView):
+    """Status da fila de tarefas do financeiro (últimas 50; filtros ?tipo= e ?status=). Apenas gerentes."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.tipo != "gerente":
+            return Response({"error": "Permissão negada."}, status=403)
+        qs = TarefaFinanceira.objects.all()
+        for campo in ("tipo", "status"):
+            valor = request.query_params.get(campo)
+            if valor:
+                qs = qs.filter(**{campo: valor})
+        return Response(TarefaFinanceiraSerializer(qs[:50], many=True).data)
+
+
+class TarefaFinanceiraDetailAPIView(APIView):
+    """Status de uma tarefa da fila do financeiro. Apenas gerentes."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        if request.user.tipo != "gerente":
+            return Response({"error": "Permissão negada."}, status=403)
+        tarefa = get_object_or_404(TarefaFinanceira, pk=pk)
+        return Response(TarefaFinanceiraSerializer(tarefa).data)
+
+
+class EnfileirarGeracaoMensalidadesAPIView(APIView):
+    """
+    Enfileira a geração das mensalidades de um mês (body: ano, mes; default: mês atual).
+    A tarefa já concluída/falha para o mês é reaberta; se estiver pendente ou em execução,
+    nada é duplicado. Responde 202 com a tarefa. Apenas gerentes.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.tipo != "gerente":
+            return Response({"error": "Permissão negada."}, status=403)
+        hoje = timezone.localdate()
+        try:
+            ano = int(request.data.get("ano") or hoje.year)
+            mes = int(request.data.get("mes") or hoje.month)
+        except (TypeError, ValueError):
+            return Response({"error": "ano e mes devem ser números."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= mes <= 12:
+            return Response({"error": "mes deve estar entre 1 e 12."}, status=status.HTTP_400_BAD_REQUEST)
+
+        chave = enfileirar_geracao_mensalidades(ano=ano, mes=mes, reabrir=True)
+        tarefa = TarefaFinanceira.objects.get(chave=chave)
+        return Response(TarefaFinanceiraSerializer(tarefa).data, status=status.HTTP_202_ACCEPTED)
+
+
 class GerarPixAPIView(APIView):
     """
     Gera cobrança Pix para uma mensalidade usando C6 Bank
@@ -1158,6 +1227,9 @@ class C6BankWebhookCheckoutAPIView(APIView):
         {"url": "https://SEU_DOMINIO/api/financeiro/c6/webhook-checkout/", "service": "CHECKOUT"}
 
     O webhook de PIX (array BACEN) permanece em ``/api/financeiro/c6/webhook/``.
+
+    A notificação só é gravada (EventoWebhookC6); o worker processar_webhooks_c6 consulta
+    o checkout no C6 e dá a baixa.
     """
     permission_classes = []
     authentication_classes = []
@@ -1173,50 +1245,22 @@ class C6BankWebhookCheckoutAPIView(APIView):
                 logger.info('Webhook C6 checkout: ignorado (service=%s)', service)
                 return JsonResponse({'status': 'ignored', 'reason': 'not_checkout'}, status=200)
 
-            external_id = data.get('external_id') or data.get('id')
-            if not external_id and data.get('information'):
-                try:
-                    info_raw = data['information']
-                    if isinstance(info_raw, str):
-                        info_parsed = json.loads(info_raw)
-                    else:
-                        info_parsed = info_raw
-                    if isinstance(info_parsed, dict):
-                        external_id = info_parsed.get('id') or info_parsed.get('external_id')
-                except (json.JSONDecodeError, TypeError, ValueError):
-                    pass
+            external_id = extrair_id_notificacao_c6(data)
             if not external_id:
                 logger.warning('Webhook C6 checkout sem external_id: %s', data)
                 return JsonResponse({'status': 'ignored', 'reason': 'no_external_id'}, status=200)
 
-            external_id = str(external_id).strip()
-            transacao = TransacaoC6Bank.objects.filter(
-                tipo='cartao',
-                txid=external_id,
-            ).first()
-
-            if not transacao:
-                logger.warning(
-                    'Webhook C6 checkout: transação local não encontrada (txid=%s)',
-                    external_id,
-                )
-                return JsonResponse({'status': 'ok', 'message': 'transacao_nao_encontrada'}, status=200)
-
             wh_status = str(data.get('status', '') or '').upper().strip()
-            logger.info(
-                'Webhook C6 checkout: txid=%s transacao_id=%s notify_status=%s',
-                external_id,
-                transacao.id,
-                wh_status,
-            )
-
-            resultado = sincronizar_transacao_checkout_c6(transacao)
-            transacao = resultado['transacao']
+            logger.info('Webhook C6 checkout: txid=%s notify_status=%s', external_id, wh_status)
 
+            # Só enfileira: a consulta ao C6 e a baixa rodam no worker processar_webhooks_c6
+            eventos = enfileirar_eventos_webhook_c6(
+                'cartao',
+                [(chave_evento_notificacao('cartao', external_id, wh_status), external_id, data)],
+            )
             return JsonResponse({
-                'status': 'processed',
-                'transacao_id': transacao.id,
-                'transacao_status': transacao.status,
+                'status': 'duplicate' if eventos['duplicados'] else 'accepted',
+                'txid': external_id,
             })
         except Exception as e:
             logger.exception('Erro no webhook C6 checkout: %s', e)
@@ -1236,6 +1280,9 @@ class C6BankWebhookBankSlipAPIView(APIView):
     Cadastro no C6 (API ``POST /v1/webhooks/``, escopo ``webhook.write``), exemplo::
 
         {"url": "https://SEU_DOMINIO/api/financeiro/c6/webhook-bank-slip/", "service": "BANK_SLIP"}
+
+    A notificação só é gravada (EventoWebhookC6); o worker processar_webhooks_c6 consulta
+    o boleto no C6 e dá a baixa.
     """
     permission_classes = []
     authentication_classes = []
@@ -1251,50 +1298,22 @@ class C6BankWebhookBankSlipAPIView(APIView):
                 logger.info('Webhook C6 bank slip: ignorado (service=%s)', service)
                 return JsonResponse({'status': 'ignored', 'reason': 'not_bank_slip'}, status=200)
 
-            external_id = data.get('external_id') or data.get('id')
-            if not external_id and data.get('information'):
-                try:
-                    info_raw = data['information']
-                    if isinstance(info_raw, str):
-                        info_parsed = json.loads(info_raw)
-                    else:
-                        info_parsed = info_raw
-                    if isinstance(info_parsed, dict):
-                        external_id = info_parsed.get('id') or info_parsed.get('external_id')
-                except (json.JSONDecodeError, TypeError, ValueError):
-                    pass
+            external_id = extrair_id_notificacao_c6(data)
             if not external_id:
                 logger.warning('Webhook C6 bank slip sem external_id: %s', data)
                 return JsonResponse({'status': 'ignored', 'reason': 'no_external_id'}, status=200)
 
-            external_id = str(external_id).strip()
-            transacao = TransacaoC6Bank.objects.filter(
-                tipo='boleto',
-                txid=external_id,
-            ).first()
-
-            if not transacao:
-                logger.warning(
-                    'Webhook C6 bank slip: transação local não encontrada (txid=%s)',
-                    external_id,
-                )
-                return JsonResponse({'status': 'ok', 'message': 'transacao_nao_encontrada'}, status=200)
-
             wh_status = str(data.get('status', '') or '').upper().strip()
-            logger.info(
-                'Webhook C6 bank slip: txid=%s transacao_id=%s notify_status=%s',
-                external_id,
-                transacao.id,
-                wh_status,
-            )
-
-            resultado = sincronizar_transacao_boleto_c6(transacao)
-            transacao = resultado['transacao']
+            logger.info('Webhook C6 bank slip: txid=%s notify_status=%s', external_id, wh_status)
 
+            # Só enfileira: a consulta ao C6 e a baixa rodam no worker processar_webhooks_c6
+            eventos = enfileirar_eventos_webhook_c6(
+                'boleto',
+                [(chave_evento_notificacao('boleto', external_id, wh_status), external_id, data)],
+            )
             return JsonResponse({
-                'status': 'processed',
-                'transacao_id': transacao.id,
-                'transacao_status': transacao.status,
+                'status': 'duplicate' if eventos['duplicados'] else 'accepted',
+                'txid': external_id,
             })
         except Exception as e:
             logger.exception('Erro no webhook C6 bank slip: %s', e)
@@ -1309,6 +1328,9 @@ class C6BankWebhookAPIView(APIView):
     
     Body conforme pix-api.yaml (WebhookPixBody): objeto com propriedade ``pix`` (array)
     ou array na raiz / objeto único Pix — ver ``extrair_lista_pix_webhook``.
+
+    Cada Pix é gravado na caixa de entrada (EventoWebhookC6, chave = endToEndId) e
+    conciliado pelo worker processar_webhooks_c6 (ver financeiro/c6_webhooks.py).
     """
     permission_classes = []  # Público para receber webhooks
     authentication_classes = []
@@ -1334,41 +1356,38 @@ class C6BankWebhookAPIView(APIView):
                 return JsonResponse({
                     'status': 'received',
                     'message': 'Nenhum item Pix no payload',
-                    'pix_processados': 0,
+                    'pix_enfileirados': 0,
+                    'pix_duplicados': 0,
                     'pix_ignorados': 0,
-                    'pix_erros': 0
                 })
             
-            # Processa cada PIX recebido no array
-            pix_processados = 0
-            pix_erros = 0
+            # Só enfileira: a reconsulta ao C6 e a baixa rodam no worker processar_webhooks_c6
+            eventos = []
             pix_ignorados = 0
-            
             for pix_data in pix_array:
-                try:
-                    if self._process_pix_received(pix_data):
-                        pix_processados += 1
-                    else:
-                        pix_ignorados += 1
-                except Exception as e:
-                    logger.error(f"Erro ao processar PIX no webhook: {str(e)}")
-                    pix_erros += 1
-            
+                chave = chave_evento_pix(pix_data) if isinstance(pix_data, dict) else None
+                if not chave or not pix_data.get('txid'):
+                    # PIX espontâneo (sem cobrança) ou item inválido: nada a conciliar
+                    pix_ignorados += 1
+                    continue
+                eventos.append((chave, str(pix_data['txid']), pix_data))
+            resultado = enfileirar_eventos_webhook_c6('pix', eventos)
+
             logger.info(
-                "Webhook PIX: %s associados, %s ignorados, %s erros",
-                pix_processados,
+                "Webhook PIX: %s novos, %s reenvios, %s ignorados",
+                resultado['novos'],
+                resultado['duplicados'],
                 pix_ignorados,
-                pix_erros,
             )
-            
+
             return JsonResponse({
                 'status': 'received',
-                'message': 'Webhook processado com sucesso',
-                'pix_processados': pix_processados,
+                'message': 'Webhook recebido',
+                'pix_enfileirados': resultado['novos'],
+                'pix_duplicados': resultado['duplicados'],
                 'pix_ignorados': pix_ignorados,
-                'pix_erros': pix_erros
             })
-            
+
         except Exception as e:
             logger.error(f"Erro no webhook C6 Bank: {str(e)}")
             import traceback
@@ -1377,104 +1396,6 @@ class C6BankWebhookAPIView(APIView):
                 'status': 'error',
                 'message': f'Erro ao processar webhook: {str(e)}'
             }, status=400)
-    
-    def _process_pix_received(self, pix_data):
-        """
-        Processa um objeto PIX recebido no webhook.
-
-        SEGURANÇA: o corpo do webhook NÃO é confiável para dar baixa. Um atacante
-        poderia POSTar um txid válido com um valor forjado. Por isso reconsultamos
-        a cobrança no C6 (``sincronizar_transacao_pix_c6``), que só marca a
-        mensalidade como paga se o banco confirmar o status ``CONCLUIDA``. O corpo
-        é usado apenas para localizar a transação (txid) e para auditoria.
-
-        Returns:
-            True se, após reconsulta ao C6, a transação está aprovada; False caso
-            contrário (PIX espontâneo, txid desconhecido ou ainda não confirmado).
-        """
-        if not isinstance(pix_data, dict):
-            logger.warning("Webhook PIX: item ignorado (não é objeto JSON): %s", type(pix_data))
-            return False
-
-        # O txid identifica a cobrança que foi paga
-        txid = pix_data.get('txid')
-        end_to_end_id = pix_data.get('endToEndId')
-        valor = pix_data.get('valor')
-        horario = pix_data.get('horario')
-
-        logger.info("Processando PIX webhook: txid=%s endToEndId=%s valor=%s", txid, end_to_end_id, valor)
-
-        if not txid:
-            logger.warning(
-                "PIX sem txid (endToEndId: %s). Pode ser PIX espontâneo (não associado a cobrança).",
-                end_to_end_id,
-            )
-            return False
-
-        # Busca a transação pela cobrança (txid)
-        transacao = TransacaoC6Bank.objects.filter(txid=txid).first()
-        if not transacao:
-            logger.warning(
-                "Transação não encontrada para TXID: %s. PIX pode ter sido pago para cobrança não gerenciada por este sistema.",
-                txid,
-            )
-            return False
-
-        # Fonte da verdade: reconsulta a cobrança no C6. Só marca como paga se o
-        # banco confirmar. Nunca confia no status/valor vindos do corpo do webhook.
-        status_anterior = transacao.status
-        try:
-            sincronizar_transacao_pix_c6(transacao)
-        except Exception as e:
-            logger.error("Erro ao reconsultar cobrança PIX no C6 (txid=%s): %s", txid, e)
-            return False
-        transacao.refresh_from_db()
-
-        # Registra os dados informativos do PIX recebido (auditoria), sem alterar status.
-        self._registrar_pix_recebido_info(
-            transacao,
-            {
-                'endToEndId': end_to_end_id,
-                'txid': txid,
-                'valor': valor,
-                'horario': horario,
-                'infoPagador': pix_data.get('infoPagador'),
-                'data_recebimento': format_datetime_api(timezone.now()),
-            },
-        )
-
-        if transacao.status == 'aprovado':
-            if status_anterior != 'aprovado':
-                logger.info("PIX confirmado com o C6 e mensalidade baixada (txid=%s).", txid)
-            else:
-                logger.info("PIX já estava aprovado (webhook duplicado) (txid=%s).", txid)
-            return True
-
-        logger.info(
-            "Webhook PIX recebido, mas o C6 ainda não confirmou o pagamento (txid=%s, status=%s).",
-            txid,
-            transacao.status,
-        )
-        return False
-
-    def _registrar_pix_recebido_info(self, transacao, pix_info):
-        """Anexa metadados do PIX recebido em ``resposta_api`` para auditoria (não altera status)."""
-        if not transacao.resposta_api:
-            transacao.resposta_api = {}
-        if 'pix_recebidos' not in transacao.resposta_api:
-            transacao.resposta_api['pix_recebidos'] = []
-
-        for pix_exist in transacao.resposta_api['pix_recebidos']:
-            if pix_exist.get('endToEndId') == pix_info.get('endToEndId'):
-                pix_exist.update(pix_info)
-                break
-        else:
-            transacao.resposta_api['pix_recebidos'].append(pix_info)
-
-        transacao.save(update_fields=['resposta_api'])
-
-        logger.info(f"✅ PIX processado com sucesso: Transação {transacao.id}, EndToEndId: {end_to_end_id}, Valor: R$ {valor}")
-        return True
 
 
 # ========================================
@@ -1763,6 +1684,7 @@ class GerarBoletoAPIView(APIView):
             )
             
             logger.info(f"Boleto criado para mensalidade {mensalidade.id}: {boleto_id}")
+            enfileirar_prefetch_pdf_boleto(transacao)
             
             return Response({
                 'message': 'Boleto gerado com sucesso!',
@@ -2065,6 +1987,10 @@ class AlterarBoletoAPIView(APIView):
                 transacao.valor = Decimal(str(amount))
             transacao.save()
             
+            # PDF antigo não vale mais: descarta e baixa o novo em segundo plano
+            invalidar_pdf_boleto(transacao)
+            enfileirar_prefetch_pdf_boleto(transacao)
+            
             logger.info(f"Boleto {transacao.txid} alterado com sucesso")
             
             return Response({
@@ -2126,6 +2052,7 @@ class CancelarBoletoAPIView(APIView):
             transacao.status = 'cancelado'
             transacao.data_cancelamento = timezone.now()
             transacao.save()
+            invalidar_pdf_boleto(transacao)
             
             logger.info(f"Boleto {transacao.txid} cancelado com sucesso")
             
@@ -2164,22 +2091,12 @@ class DownloadBoletoPDFAPIView(APIView):
                     'error': 'Boleto não possui ID válido.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Obtém o PDF do boleto via C6 Bank
-            pdf_content = c6_client.get_bank_slip_pdf(
-                transacao.txid,
-                partner_software_name="CT Supera",
-                partner_software_version="1.0.0"
-            )
-            
-            # Retorna o PDF como resposta HTTP
-            from django.http import HttpResponse
-            
-            response = HttpResponse(pdf_content, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="boleto_{transacao.txid}.pdf"'
+            # PDF do cache em disco; só consulta o C6 (lento) se ainda não foi baixado
+            caminho = obter_pdf_boleto(transacao)
             
             logger.info(f"PDF do boleto {transacao.txid} enviado")
             
-            return response
+            return resposta_pdf_boleto(request, transacao, caminho)
             
         except Exception as e:
             logger.error(f"Erro ao obter PDF do boleto: {str(e)}")
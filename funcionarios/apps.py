@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FuncionariosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'funcionarios'
+
+    def ready(self):
+        from funcionarios.signals import conectar_signals_painel_gerente
+        conectar_signals_painel_gerente()
@@ -0,0 +1,233 @@
+"""
+Lista de presença de uma turma num dia (tela de check-in do professor).
+
+A lista inteira sai de um número fixo de consultas, independente do tamanho da turma:
+turma (+ dias da semana), alunos, presenças do dia indexadas por usuario_id,
+pré-cadastros de aula experimental e reservas Wellhub. Os helpers de consulta também
+são usados pelo registro de presença (gravação em lote) e pelo relatório.
+"""
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from alunos.painel import invalidar_painel_aluno
+from turmas.models import Turma
+from usuarios.models import PreCadastro, Usuario
+from wellhub.models import WellhubBooking
+from wellhub.services.presenca_professor import (
+    nome_exibicao_wellhub,
+    wellhub_bookings_presenca_turma,
+)
+
+from .models import Presenca
+
+
+def obter_turma_lista_presenca(turma_id) -> Turma:
+    """Turma com CT e dias da semana carregados (str(turma) sem consultas extras)."""
+    return Turma.objects.select_related("ct").prefetch_related("dias_semana").get(id=turma_id)
+
+
+def alunos_da_turma(turma: Turma, *, aluno_id=None, aluno_nome=None):
+    """Alunos esperados na aula: ativos, matriculados na turma e sem contrato suspenso."""
+    qs = Usuario.objects.filter(
+        tipo="aluno", ativo=True, turmas_aluno=turma, contrato_suspenso=False
+    )
+    if aluno_id:
+        qs = qs.filter(id=int(aluno_id))
+    if aluno_nome:
+        qs = qs.filter(
+            Q(first_name__icontains=aluno_nome)
+            | Q(last_name__icontains=aluno_nome)
+            | Q(username__icontains=aluno_nome)
+        )
+    return qs.distinct().order_by("first_name", "last_name", "id")
+
+
+def presencas_por_aluno(turma: Turma, data: date) -> dict[int, Presenca]:
+    """Presenças da turma na data, indexadas por usuario_id (uma consulta)."""
+    return {p.usuario_id: p for p in Presenca.objects.filter(turma=turma, data=data)}
+
+
+def precadastros_aula_experimental(turma: Turma, data: date):
+    """Pré-cadastros pendentes com aula experimental nesta turma e data."""
+    return PreCadastro.objects.filter(
+        turma=turma,
+        data_aula_experimental=data,
+        origem="aula_experimental",
+        status="pendente",
+    ).order_by("first_name", "last_name", "id")
+
+
+def _so_digitos(valor) -> str:
+    return "".join(c for c in str(valor or "") if c.isdigit())
+
+
+def montar_lista_presenca(turma: Turma, data: date) -> list[dict]:
+    """
+    Alunos regulares, pré-cadastros (aula experimental) e clientes Wellhub da turma na data.
+
+    ``ausencia_registrada``: falta registrada pelo professor (desmarcação de presença).
+    ``pode_confirmar_presenca``: sempre True para o professor alternar presente/falta no dia.
+    """
+    presencas = presencas_por_aluno(turma, data)
+
+    status_alunos = []
+    emails_alunos = set()
+    cpfs_alunos = set()
+    for aluno in alunos_da_turma(turma):
+        presenca = presencas.get(aluno.id)
+        email_norm = (aluno.email or "").strip().lower()
+        cpf_norm = _so_digitos(aluno.cpf)
+        if email_norm:
+            emails_alunos.add(email_norm)
+        if cpf_norm:
+            cpfs_alunos.add(cpf_norm)
+        status_alunos.append({
+            "id": str(aluno.id),
+            "nome": f"{aluno.first_name} {aluno.last_name}",
+            "username": aluno.username,
+            "tipo": "aluno",
+            "checkin_realizado": presenca.checkin_realizado if presenca else False,
+            "presenca_confirmada": presenca.presenca_confirmada if presenca else False,
+            "ausencia_registrada": bool(presenca.ausencia_registrada) if presenca else False,
+            # Professor pode alternar presente / falta no mesmo dia
+            "pode_confirmar_presenca": True,
+        })
+
+    precadastros_adicionados = set()
+    for pc in precadastros_aula_experimental(turma, data):
+        email_pc = (pc.email or "").strip().lower()
+        cpf_pc = _so_digitos(pc.cpf)
+
+        # Evita duplicação visual da mesma pessoa (já está como aluno regular da turma)
+        if (email_pc and email_pc in emails_alunos) or (cpf_pc and cpf_pc in cpfs_alunos):
+            continue
+
+        # Defesa extra contra duplicidade do próprio pré-cadastro no retorno
+        key_pc = (email_pc, cpf_pc, (pc.first_name or "").strip().lower(), (pc.last_name or "").strip().lower())
+        if key_pc in precadastros_adicionados:
+            continue
+        precadastros_adicionados.add(key_pc)
+        if email_pc:
+            emails_alunos.add(email_pc)
+
+        status_alunos.append({
+            "id": f"precadastro_{pc.id}",
+            "nome": f"{pc.first_name} {pc.last_name or ''}".strip(),
+            "username": pc.email,
+            "tipo": "aula_experimental",
+            "checkin_realizado": False,
+            "presenca_confirmada": bool(pc.compareceu_aula_experimental),
+            "ausencia_registrada": False,
+            "pode_confirmar_presenca": True,
+        })
+
+    wellhub_adicionados = set()
+    for booking in wellhub_bookings_presenca_turma(turma, data):
+        cadastro = booking.cadastro
+        if not cadastro:
+            continue
+        email_wh = (cadastro.email or "").strip().lower()
+        # Rótulo identificável: usa nome real quando existir; senão, e-mail +
+        # sufixo do booking para o professor distinguir cada cliente Wellhub.
+        nome_wh = nome_exibicao_wellhub(booking)
+        key_wh = (email_wh, nome_wh.lower(), booking.id)
+        if key_wh in wellhub_adicionados:
+            continue
+        wellhub_adicionados.add(key_wh)
+        # Sempre inclui a reserva Wellhub na lista (mesmo se o e-mail coincidir
+        # com aluno CT — o professor precisa ver o cliente Wellhub do dia).
+        status_alunos.append({
+            "id": f"wellhub_{booking.id}",
+            "nome": nome_wh or "Cliente Wellhub",
+            "username": cadastro.email or "Wellhub",
+            "tipo": "wellhub",
+            "checkin_realizado": bool(booking.checkin_validado),
+            "presenca_confirmada": bool(booking.presenca_confirmada),
+            "ausencia_registrada": bool(booking.ausencia_registrada),
+            "pode_confirmar_presenca": True,
+        })
+
+    return status_alunos
+
+
+def registrar_presencas_em_lote(
+    turma: Turma,
+    data: date,
+    *,
+    alunos_presentes=(),
+    alunos_falta=(),
+    precadastros_presentes=(),
+    precadastros_falta=(),
+    wellhub_presentes=(),
+    wellhub_falta=(),
+) -> int:
+    """
+    Grava presença/falta de toda a turma numa transação, com número fixo de comandos SQL.
+
+    Alunos (ids em str) fora do elenco da turma são ignorados. Presenças novas entram num
+    único INSERT (upsert pela unicidade usuario/turma/data, seguro contra dois envios
+    simultâneos); as existentes num único bulk_update. Pré-cadastros e reservas Wellhub
+    viram um UPDATE ... WHERE id IN (...) por estado. Retorna quantos registros foram gravados.
+    """
+    alunos_presentes = {str(x) for x in alunos_presentes}
+    alunos_falta = {str(x) for x in alunos_falta}
+    campos = ["presenca_confirmada", "ausencia_registrada"]
+
+    with transaction.atomic():
+        existentes = presencas_por_aluno(turma, data)
+        novas, alteradas = [], []
+        for aluno_id in alunos_da_turma(turma).values_list("id", flat=True):
+            if str(aluno_id) in alunos_presentes:
+                confirmada = True
+            elif str(aluno_id) in alunos_falta:
+                confirmada = False
+            else:
+                continue
+            presenca = existentes.get(aluno_id)
+            if presenca is None:
+                novas.append(Presenca(
+                    usuario_id=aluno_id,
+                    turma=turma,
+                    data=data,
+                    checkin_realizado=False,
+                    presenca_confirmada=confirmada,
+                    ausencia_registrada=not confirmada,
+                ))
+            else:
+                presenca.presenca_confirmada = confirmada
+                presenca.ausencia_registrada = not confirmada
+                alteradas.append(presenca)
+        if novas:
+            Presenca.objects.bulk_create(
+                novas,
+                update_conflicts=True,
+                unique_fields=["usuario", "turma", "data"],
+                update_fields=campos,
+            )
+        if alteradas:
+            Presenca.objects.bulk_update(alteradas, campos)
+        registradas = len(novas) + len(alteradas)
+        # bulk_* não dispara post_save: descarta o histórico em cache desses alunos
+        invalidar_painel_aluno(*(p.usuario_id for p in novas + alteradas))
+
+        precadastros = precadastros_aula_experimental(turma, data)
+        for ids, compareceu in ((precadastros_presentes, True), (precadastros_falta, False)):
+            if ids:
+                registradas += precadastros.filter(id__in=set(ids)).update(
+                    compareceu_aula_experimental=compareceu
+                )
+
+        for ids, confirmada in ((wellhub_presentes, True), (wellhub_falta, False)):
+            if ids:
+                registradas += WellhubBooking.objects.filter(
+                    id__in=wellhub_bookings_presenca_turma(turma, data).filter(id__in=set(ids)).values("id")
+                ).update(
+                    presenca_confirmada=confirmada,
+                    ausencia_registrada=not confirmada,
+                    atualizado_em=timezone.now(),
+                )
+
+    return registradas
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from funcionarios.painel_gerente import reconstruir_painel_gerente
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula todas as seções do snapshot do painel do gerente. "
+        "Agendar logo após a meia-noite (virada do dia); a leitura também refaz o snapshot se estiver velho."
+    )
+
+    def handle(self, *args, **options):
+        secoes = reconstruir_painel_gerente()
+        self.stdout.write(self.style.SUCCESS(f"Painel do gerente recalculado ({len(secoes)} seção(ões))."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funcionarios', '0014_alter_presenca_ausencia_registrada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PainelGerenteSecao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('secao', models.CharField(max_length=32, unique=True)),
+                ('data_referencia', models.DateField(blank=True, null=True)),
+                ('dados', models.JSONField(blank=True, default=dict)),
+                ('desatualizada', models.BooleanField(default=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Seção do painel do gerente',
+                'verbose_name_plural': 'Seções do painel do gerente',
+            },
+        ),
+    ]
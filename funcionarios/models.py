@@ -46,4 +46,26 @@ class Presenca(models.Model):
         unique_together = ("usuario", "turma", "data")  # Um registro por aluno por turma por dia
 
     def __str__(self):
-        return f"{self.usuario.get_full_name()} - {self.data} ({self.turma})"
\ No newline at end of file
+        return f"{self.usuario.get_full_name()} - {self.data} ({self.turma})"
+
+class PainelGerenteSecao(models.Model):
+    """
+    Seção pré-calculada do painel do gerente (contadores + listas de nomes).
+
+    Uma linha por seção. Escritas em Usuario/Mensalidade/PreCadastro/Turma marcam a
+    seção como desatualizada (ver funcionarios.signals); a próxima leitura recalcula
+    só o que mudou. Na virada do dia (data_referencia != hoje) tudo é refeito.
+    """
+
+    secao = models.CharField(max_length=32, unique=True)
+    data_referencia = models.DateField(null=True, blank=True)
+    dados = models.JSONField(default=dict, blank=True)
+    desatualizada = models.BooleanField(default=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Seção do painel do gerente"
+        verbose_name_plural = "Seções do painel do gerente"
+
+    def __str__(self):
+        return f"Painel gerente: {self.secao} ({self.data_referencia})"
@@ -0,0 +1,310 @@
+"""
+Snapshot do painel do gerente (PainelGerenteAPIView).
+
+Os contadores e listas de nomes ficam materializados em PainelGerenteSecao, uma
+linha por seção. Escritas nos modelos de origem só marcam a seção como
+desatualizada (um UPDATE); a leitura recalcula apenas as seções marcadas e
+refaz tudo quando muda o dia (buckets de vencimento dependem de "hoje").
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from app.date_api import format_data_api, format_datetime_api
+from financeiro.models import Mensalidade
+from turmas.models import Turma
+from usuarios.models import PreCadastro, Usuario
+
+from .models import PainelGerenteSecao
+
+logger = logging.getLogger(__name__)
+
+SECAO_ALUNOS = "alunos"
+SECAO_MENSALIDADES = "mensalidades"
+SECAO_PRECADASTROS = "precadastros"
+SECAO_TURMAS = "turmas"
+SECAO_ATIVIDADES = "atividades"
+
+
+def _nome_completo(first_name, last_name):
+    n = f"{(first_name or '').strip()} {(last_name or '').strip()}".strip()
+    return n or "—"
+
+
+def _calcular_alunos(hoje):
+    # Alunos: partição coerente com a Gestão de Usuários (badge Ativo/Inativo = is_active)
+    # e com o campo de negócio `ativo`. Conta como "ativo" só quem está ativo no CT
+    # e com conta liberada (login); pendente de ativação de e-mail (ativo=True, is_active=False)
+    # entra como inativo, alinhado à listagem.
+    qs_alunos = Usuario.objects.filter(tipo="aluno")
+    alunos_ativos = qs_alunos.filter(ativo=True, is_active=True).count()
+    alunos_inativos = qs_alunos.exclude(ativo=True, is_active=True).count()
+    professores = Usuario.objects.filter(tipo="professor", ativo=True).count()
+
+    # Uma única leitura dos alunos ativos; as três listas PAR-Q saem do mesmo resultado.
+    respondidos, nao_respondidos, com_sim = [], [], []
+    linhas = (
+        Usuario.objects.filter(tipo="aluno", ativo=True, is_active=True)
+        .order_by("first_name", "last_name", "id")
+        .values_list("first_name", "last_name", "parq_completed", *[f"parq_question_{i}" for i in range(1, 11)])
+    )
+    for first_name, last_name, completo, *respostas in linhas:
+        nome = _nome_completo(first_name, last_name)
+        if completo:
+            respondidos.append(nome)
+            if any(respostas):
+                com_sim.append(nome)
+        else:
+            nao_respondidos.append(nome)
+
+    return {
+        "alunos_ativos": alunos_ativos,
+        "alunos_inativos": alunos_inativos,
+        "professores": professores,
+        "parq_respondidos": len(respondidos),
+        "parq_respondidos_nomes": respondidos,
+        "parq_nao_respondidos": len(nao_respondidos),
+        "parq_nao_respondidos_nomes": nao_respondidos,
+        "parq_com_resposta_sim": len(com_sim),
+        "parq_com_resposta_sim_nomes": com_sim,
+    }
+
+
+def _calcular_mensalidades(hoje):
+    ano, mes = hoje.year, hoje.month
+    limite_30_dias = hoje - timedelta(days=30)
+
+    # Pendentes: não pagas, vencem no mês atual e ainda não passou o vencimento
+    mensalidades_pendentes = Mensalidade.objects.filter(
+        ~Q(status="pago"),
+        data_vencimento__year=ano,
+        data_vencimento__month=mes,
+        data_vencimento__gte=hoje,
+    ).count()
+
+    # Atrasadas: não pagas; (1) vencimento no mês corrente e já passou o dia do vencimento
+    # (2) vencimento há mais de 30 dias (acúmulo de atraso)
+    atraso_mes_nomes = [
+        _nome_completo(first, last)
+        for first, last in Mensalidade.objects.filter(
+            ~Q(status="pago"),
+            data_vencimento__year=ano,
+            data_vencimento__month=mes,
+            data_vencimento__lt=hoje,
+        )
+        .order_by("data_vencimento", "aluno__first_name", "aluno__last_name", "id")
+        .values_list("aluno__first_name", "aluno__last_name")
+    ]
+    atraso_30_nomes = [
+        _nome_completo(first, last)
+        for first, last in Mensalidade.objects.filter(
+            ~Q(status="pago"),
+            data_vencimento__lt=limite_30_dias,
+        )
+        .order_by("data_vencimento", "aluno__first_name", "aluno__last_name", "id")
+        .values_list("aluno__first_name", "aluno__last_name")
+    ]
+
+    # Mensalidades pagas no mês corrente (data do pagamento);
+    # fallback: se data_pagamento for null, considerar data_vencimento no mês
+    mensalidades_pagas = Mensalidade.objects.filter(status="pago").filter(
+        Q(data_pagamento__year=ano, data_pagamento__month=mes)
+        | Q(data_pagamento__isnull=True, data_vencimento__year=ano, data_vencimento__month=mes)
+    ).count()
+
+    return {
+        "mensalidades_pendentes": mensalidades_pendentes,
+        "mensalidades_atrasadas_mes_corrente": len(atraso_mes_nomes),
+        "mensalidades_atrasadas_mais_30_dias": len(atraso_30_nomes),
+        "mensalidades_pagas": mensalidades_pagas,
+        "mensalidades_atrasadas_mes_corrente_nomes": atraso_mes_nomes,
+        "mensalidades_atrasadas_mais_30_dias_nomes": atraso_30_nomes,
+    }
+
+
+def _calcular_precadastros(hoje):
+    # Pré-cadastros pendentes (ex-alunos têm aba própria)
+    precadastros = PreCadastro.objects.filter(status="pendente").exclude(origem="ex_aluno").count()
+
+    # Aulas experimentais (só status pendente, alinhado à listagem de pré-cadastros)
+    futuras = [
+        _nome_completo(first, last)
+        for first, last in PreCadastro.objects.filter(
+            origem="aula_experimental",
+            status="pendente",
+            data_aula_experimental__gt=hoje,
+        )
+        .order_by("data_aula_experimental", "first_name", "last_name", "id")
+        .values_list("first_name", "last_name")
+    ]
+    ocorridas = [
+        _nome_completo(first, last)
+        for first, last in PreCadastro.objects.filter(
+            origem="aula_experimental",
+            status="pendente",
+            data_aula_experimental__isnull=False,
+            data_aula_experimental__lte=hoje,
+        )
+        .order_by("-data_aula_experimental", "first_name", "last_name", "id")
+        .values_list("first_name", "last_name")
+    ]
+    return {
+        "precadastros": precadastros,
+        "aulas_experimentais_futuras": len(futuras),
+        "aulas_experimentais_ocorridas": len(ocorridas),
+        "aulas_experimentais_futuras_nomes": futuras,
+        "aulas_experimentais_ocorridas_nomes": ocorridas,
+    }
+
+
+def _calcular_turmas(hoje):
+    # Só id/ativo: os apps usam apenas len(turmas) no cartão "Total de turmas".
+    # Evita TurmaSerializer(depth=1) com todos os alunos aninhados por turma.
+    return {"turmas": list(Turma.objects.order_by("id").values("id", "ativo"))}
+
+
+def _calcular_atividades(hoje):
+    agora = timezone.now()
+    atividades = []
+
+    # Últimos alunos cadastrados
+    for aluno in Usuario.objects.filter(
+        tipo="aluno",
+        date_joined__gte=agora - timedelta(days=7),
+    ).order_by("-date_joined")[:5]:
+        atividades.append({
+            "id": f"aluno_{aluno.id}",
+            "type": "aluno",
+            "description": f"Novo aluno cadastrado - {aluno.first_name}",
+            "data": format_datetime_api(timezone.localtime(aluno.date_joined)),
+            "_ts": timezone.localtime(aluno.date_joined).timestamp(),
+        })
+
+    # Pré-cadastros criados nos últimos 7 dias (feed alinhado ao painel; ex-alunos têm aba própria)
+    for pc in PreCadastro.objects.filter(
+        criado_em__gte=agora - timedelta(days=7)
+    ).exclude(origem="ex_aluno").order_by("-criado_em")[:5]:
+        nome_pc = (pc.first_name or "").strip() or "—"
+        atividades.append({
+            "id": f"precadastro_{pc.id}",
+            "type": "precadastro",
+            "description": f"Pré-cadastro recebido - {nome_pc}",
+            "data": format_datetime_api(timezone.localtime(pc.criado_em)),
+            "_ts": timezone.localtime(pc.criado_em).timestamp(),
+        })
+
+    # Mensalidades pagas recentes: usar data_pagamento (quando o pagamento ocorreu),
+    # não data_vencimento — senão pagamentos de títulos antigos não apareciam no feed.
+    cand_mens = list(
+        Mensalidade.objects.filter(status="pago")
+        .filter(
+            Q(data_pagamento__gte=agora - timedelta(days=14))
+            | Q(data_pagamento__isnull=True, data_vencimento__gte=hoje - timedelta(days=14))
+        )
+        .select_related("aluno")[:80]
+    )
+
+    def _ts_mensalidade(m):
+        if m.data_pagamento:
+            return m.data_pagamento.timestamp()
+        return timezone.make_aware(datetime.combine(m.data_vencimento, datetime.min.time())).timestamp()
+
+    cand_mens.sort(key=_ts_mensalidade, reverse=True)
+    for mensalidade in cand_mens[:5]:
+        nome_aluno = getattr(mensalidade.aluno, "first_name", None) or "Aluno"
+        if mensalidade.data_pagamento:
+            data_evt = format_datetime_api(mensalidade.data_pagamento)
+        else:
+            data_evt = format_data_api(mensalidade.data_vencimento)
+        atividades.append({
+            "id": f"mensalidade_{mensalidade.id}",
+            "type": "mensalidade",
+            "description": f"Mensalidade paga - {nome_aluno}",
+            "data": data_evt,
+            "_ts": _ts_mensalidade(mensalidade),
+        })
+
+    # Ordena todas as atividades por data
+    atividades.sort(key=lambda x: x.get("_ts") or 0, reverse=True)
+    for ev in atividades:
+        ev.pop("_ts", None)
+    return {"atividades_recentes": atividades[:5]}
+
+
+_CALCULOS = {
+    SECAO_ALUNOS: _calcular_alunos,
+    SECAO_MENSALIDADES: _calcular_mensalidades,
+    SECAO_PRECADASTROS: _calcular_precadastros,
+    SECAO_TURMAS: _calcular_turmas,
+    SECAO_ATIVIDADES: _calcular_atividades,
+}
+
+SECOES = tuple(_CALCULOS)
+
+
+def marcar_secoes_desatualizadas(*secoes):
+    """
+    Marca seções para recálculo na próxima leitura do painel.
+
+    Chamado pelos signals de funcionarios.signals e por serviços que escrevem em
+    lote sem disparar post_save (ex.: bulk_create de mensalidades).
+    """
+    secoes = [s for s in secoes if s in _CALCULOS]
+    if secoes:
+        PainelGerenteSecao.objects.filter(secao__in=secoes).update(desatualizada=True)
+
+
+def _recalcular(secao, hoje):
+    # Desmarca ANTES de calcular: uma escrita concorrente durante o cálculo volta
+    # a marcar a seção e o próximo acesso recalcula de novo (nada se perde).
+    PainelGerenteSecao.objects.filter(secao=secao).update(desatualizada=False)
+    dados = _CALCULOS[secao](hoje)
+    PainelGerenteSecao.objects.update_or_create(
+        secao=secao,
+        defaults={"dados": dados, "data_referencia": hoje},
+        create_defaults={"dados": dados, "data_referencia": hoje, "desatualizada": False},
+    )
+    return dados
+
+
+def reconstruir_painel_gerente(hoje=None):
+    """Recalcula todas as seções (virada do dia, ?fresh=1, comando de manutenção)."""
+    hoje = hoje or timezone.localdate()
+    return {secao: _recalcular(secao, hoje) for secao in SECOES}
+
+
+def obter_painel_gerente(*, fresh=False, hoje=None):
+    """
+    Dados agregados do painel do gerente a partir do snapshot materializado.
+
+    Lê todas as seções numa única consulta; recalcula somente as ausentes,
+    marcadas como desatualizadas ou de outro dia. Com ``fresh=True`` refaz tudo.
+    Retorna (dados, atualizado_em) — atualizado_em é o recálculo mais antigo servido.
+    """
+    hoje = hoje or timezone.localdate()
+    if fresh:
+        dados_secoes = reconstruir_painel_gerente(hoje)
+        return _mesclar(dados_secoes), timezone.now()
+
+    existentes = {s.secao: s for s in PainelGerenteSecao.objects.filter(secao__in=SECOES)}
+    dados_secoes = {}
+    atualizado_em = timezone.now()
+    for secao in SECOES:
+        registro = existentes.get(secao)
+        if registro is None or registro.desatualizada or registro.data_referencia != hoje:
+            dados_secoes[secao] = _recalcular(secao, hoje)
+        else:
+            dados_secoes[secao] = registro.dados
+            atualizado_em = min(atualizado_em, registro.atualizado_em)
+    return _mesclar(dados_secoes), atualizado_em
+
+
+def _mesclar(dados_secoes):
+    out = {}
+    for secao in SECOES:
+        out.update(dados_secoes.get(secao) or {})
+    return out
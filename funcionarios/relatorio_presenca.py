@@ -0,0 +1,287 @@
+"""
+Relatório de presença do gerente, gerado em fluxo.
+
+Os registros de Presenca são lidos sem instanciar modelos (`values()`), em ordem de data
+decrescente e em blocos (`iterator`). A grade esperada (aluno × dia de aula) da turma
+é cruzada com esse fluxo dia a dia (merge-join): os alunos esperados saem de uma única
+consulta e cada dia só mantém em memória as suas próprias linhas. Os totais são
+acumulados na mesma passada que produz as linhas, o que permite paginar e exportar
+(CSV / NDJSON) períodos longos sem montar a lista inteira.
+"""
+import csv
+import json
+from datetime import date, timedelta
+from itertools import groupby
+
+from django.db.models import Max, Q
+from django.http import StreamingHttpResponse
+
+from app.date_api import format_data_api
+from turmas.models import Turma
+
+from .lista_presenca import alunos_da_turma
+from .models import Presenca
+
+# Alinhado ao painel do aluno / turmas (dia da semana da data vs nomes em DiaSemana)
+WEEKDAY_NOME_PT = (
+    "Segunda-feira",
+    "Terça-feira",
+    "Quarta-feira",
+    "Quinta-feira",
+    "Sexta-feira",
+    "Sábado",
+    "Domingo",
+)
+
+COLUNAS = [
+    "id",
+    "aluno_id",
+    "aluno_nome",
+    "turma_id",
+    "turma_nome",
+    "data",
+    "checkin_realizado",
+    "presenca_confirmada",
+    "ausencia_registrada",
+    "sem_registro",
+]
+
+_CAMPOS_REGISTRO = (
+    "id",
+    "usuario_id",
+    "usuario__first_name",
+    "usuario__last_name",
+    "usuario__username",
+    "turma_id",
+    "data",
+    "checkin_realizado",
+    "presenca_confirmada",
+    "ausencia_registrada",
+)
+
+
+def _nome_aluno(first_name, last_name, username) -> str:
+    # Mesmo resultado de Usuario.get_full_name() or username
+    return f"{first_name} {last_name}".strip() or username
+
+
+class RelatorioPresenca:
+    """
+    Linhas do relatório para os filtros dados (todos opcionais), ordenadas por
+    data desc e nome do aluno asc. Com turma e período definidos e
+    ``incluir_faltantes``, inclui linhas sintéticas (``sem_registro``) para os alunos
+    esperados num dia de aula da turma que não têm registro.
+    """
+
+    def __init__(
+        self,
+        *,
+        data_inicio: date | None = None,
+        data_fim: date | None = None,
+        turma_id: int | None = None,
+        aluno_id: int | None = None,
+        aluno_nome: str | None = None,
+        incluir_faltantes: bool = True,
+    ):
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+        self.turma_id = turma_id
+        self.aluno_id = aluno_id
+        self.aluno_nome = aluno_nome
+        self.incluir_faltantes = incluir_faltantes
+        self.totais = self._totais_zerados()
+
+    @staticmethod
+    def _totais_zerados() -> dict:
+        return {
+            "total_registros": 0,
+            "total_checkins": 0,
+            "total_confirmadas": 0,
+            "total_faltas": 0,
+            "total_sem_registro": 0,
+        }
+
+    def _registros(self):
+        qs = Presenca.objects.all()
+        if self.data_inicio:
+            qs = qs.filter(data__gte=self.data_inicio)
+        if self.data_fim:
+            qs = qs.filter(data__lte=self.data_fim)
+        if self.turma_id:
+            qs = qs.filter(turma_id=self.turma_id)
+        if self.aluno_id:
+            qs = qs.filter(usuario_id=self.aluno_id)
+        if self.aluno_nome:
+            qs = qs.filter(
+                Q(usuario__first_name__icontains=self.aluno_nome)
+                | Q(usuario__last_name__icontains=self.aluno_nome)
+                | Q(usuario__username__icontains=self.aluno_nome)
+            )
+        # Uma linha por (aluno, turma, data): remove duplicatas legadas mantendo o registro de maior id
+        max_ids = (
+            qs.values("usuario_id", "turma_id", "data")
+            .annotate(max_id=Max("id"))
+            .values_list("max_id", flat=True)
+        )
+        return Presenca.objects.filter(id__in=max_ids)
+
+    def _turma_da_grade(self) -> Turma | None:
+        if not (
+            self.incluir_faltantes
+            and self.turma_id
+            and self.data_inicio
+            and self.data_fim
+            and self.data_inicio <= self.data_fim
+        ):
+            return None
+        return (
+            Turma.objects.select_related("ct")
+            .prefetch_related("dias_semana")
+            .filter(pk=self.turma_id)
+            .first()
+        )
+
+    def _nomes_turmas(self, registros, turma_grade) -> dict[int, str]:
+        if turma_grade is not None:
+            return {turma_grade.id: str(turma_grade)}
+        turmas = (
+            Turma.objects.filter(id__in=registros.values("turma_id"))
+            .select_related("ct")
+            .prefetch_related("dias_semana")
+        )
+        return {t.id: str(t) for t in turmas}
+
+    def _dias_de_aula(self, turma: Turma) -> list[date]:
+        """Dias de aula da turma no período, do mais recente para o mais antigo."""
+        dia_nomes = {d.nome for d in turma.dias_semana.all()}
+        dias = []
+        cur = self.data_fim
+        while cur >= self.data_inicio:
+            if WEEKDAY_NOME_PT[cur.weekday()] in dia_nomes:
+                dias.append(cur)
+            cur -= timedelta(days=1)
+        return dias
+
+    @staticmethod
+    def _datas_com_registros(registros, dias_de_aula):
+        """Une (merge) o fluxo de registros por data com os dias de aula, ambos em ordem decrescente."""
+        dias = iter(dias_de_aula)
+        proximo_dia = next(dias, None)
+        for data, grupo in groupby(registros, key=lambda r: r["data"]):
+            while proximo_dia is not None and proximo_dia > data:
+                yield proximo_dia, []
+                proximo_dia = next(dias, None)
+            if proximo_dia == data:
+                proximo_dia = next(dias, None)
+            yield data, list(grupo)
+        while proximo_dia is not None:
+            yield proximo_dia, []
+            proximo_dia = next(dias, None)
+
+    def linhas(self):
+        """Gera as linhas do relatório na ordem final, atualizando ``self.totais`` a cada linha."""
+        self.totais = totais = self._totais_zerados()
+        registros = self._registros()
+        turma_grade = self._turma_da_grade()
+        nomes_turmas = self._nomes_turmas(registros, turma_grade)
+
+        dias_de_aula, alunos_esperados = [], []
+        if turma_grade is not None:
+            dias_de_aula = self._dias_de_aula(turma_grade)
+            alunos_esperados = [
+                (a["id"], _nome_aluno(a["first_name"], a["last_name"], a["username"]))
+                for a in alunos_da_turma(
+                    turma_grade, aluno_id=self.aluno_id, aluno_nome=self.aluno_nome
+                ).values("id", "first_name", "last_name", "username")
+            ]
+        dias_set = set(dias_de_aula)
+
+        fluxo = registros.order_by("-data").values(*_CAMPOS_REGISTRO).iterator(chunk_size=2000)
+        for data, grupo in self._datas_com_registros(fluxo, dias_de_aula):
+            data_fmt = format_data_api(data)
+            linhas_dia = [
+                {
+                    "id": r["id"],
+                    "aluno_id": r["usuario_id"],
+                    "aluno_nome": _nome_aluno(
+                        r["usuario__first_name"], r["usuario__last_name"], r["usuario__username"]
+                    ),
+                    "turma_id": r["turma_id"],
+                    "turma_nome": nomes_turmas.get(r["turma_id"], ""),
+                    "data": data_fmt,
+                    "checkin_realizado": r["checkin_realizado"],
+                    "presenca_confirmada": r["presenca_confirmada"],
+                    "ausencia_registrada": r["ausencia_registrada"],
+                    "sem_registro": False,
+                }
+                for r in grupo
+            ]
+            if data in dias_set:
+                com_registro = {r["usuario_id"] for r in grupo}
+                linhas_dia.extend(
+                    {
+                        "id": None,
+                        "aluno_id": aluno_id,
+                        "aluno_nome": nome,
+                        "turma_id": turma_grade.id,
+                        "turma_nome": nomes_turmas[turma_grade.id],
+                        "data": data_fmt,
+                        "checkin_realizado": False,
+                        "presenca_confirmada": False,
+                        "ausencia_registrada": False,
+                        "sem_registro": True,
+                    }
+                    for aluno_id, nome in alunos_esperados
+                    if aluno_id not in com_registro
+                )
+            linhas_dia.sort(key=lambda p: (p["aluno_nome"] or "").lower())
+            for linha in linhas_dia:
+                totais["total_registros"] += 1
+                totais["total_checkins"] += linha["checkin_realizado"]
+                totais["total_confirmadas"] += linha["presenca_confirmada"]
+                totais["total_faltas"] += linha["ausencia_registrada"]
+                totais["total_sem_registro"] += linha["sem_registro"]
+                yield linha
+
+    def pagina(self, numero: int | None = None, tamanho: int | None = None) -> list[dict]:
+        """
+        Consome o relatório inteiro (totais completos) guardando só as linhas da página
+        pedida (1-based). Sem ``numero``/``tamanho``, devolve todas as linhas.
+        """
+        if not numero or not tamanho:
+            return list(self.linhas())
+        inicio = (numero - 1) * tamanho
+        fim = inicio + tamanho
+        return [linha for i, linha in enumerate(self.linhas()) if inicio <= i < fim]
+
+
+class _Eco:
+    """Pseudo-arquivo para csv.writer devolver a linha em vez de gravá-la."""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_relatorio_presenca(relatorio: RelatorioPresenca, formato: str, data_inicio=None, data_fim=None):
+    """StreamingHttpResponse em CSV (com cabeçalho) ou NDJSON (uma linha JSON por registro + totais)."""
+    if formato == "csv":
+        escritor = csv.writer(_Eco())
+
+        def conteudo():
+            yield escritor.writerow(COLUNAS)
+            for linha in relatorio.linhas():
+                yield escritor.writerow([linha[c] for c in COLUNAS])
+
+        content_type = "text/csv; charset=utf-8"
+    else:
+        def conteudo():
+            for linha in relatorio.linhas():
+                yield json.dumps(linha, ensure_ascii=False) + "\n"
+            yield json.dumps({"totais": relatorio.totais}, ensure_ascii=False) + "\n"
+
+        content_type = "application/x-ndjson; charset=utf-8"
+
+    periodo = "_".join(format_data_api(d) for d in (data_inicio, data_fim) if d) or "completo"
+    resposta = StreamingHttpResponse(conteudo(), content_type=content_type)
+    resposta["Content-Disposition"] = f'attachment; filename="relatorio_presenca_{periodo}.{formato}"'
+    return resposta
@@ -0,0 +1,40 @@
+"""
+Signals do módulo funcionarios: invalidação incremental do painel do gerente.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from financeiro.models import Mensalidade
+from turmas.models import Turma
+from usuarios.models import PreCadastro, Usuario
+
+from .painel_gerente import (
+    SECAO_ALUNOS,
+    SECAO_ATIVIDADES,
+    SECAO_MENSALIDADES,
+    SECAO_PRECADASTROS,
+    SECAO_TURMAS,
+    marcar_secoes_desatualizadas,
+)
+
+# Campos gravados a cada login / ajustes que não aparecem no painel
+_CAMPOS_USUARIO_IRRELEVANTES = frozenset({"last_login", "password"})
+
+_SECOES_POR_MODELO = {
+    Usuario: (SECAO_ALUNOS, SECAO_MENSALIDADES, SECAO_ATIVIDADES),
+    Mensalidade: (SECAO_MENSALIDADES, SECAO_ATIVIDADES),
+    PreCadastro: (SECAO_PRECADASTROS, SECAO_ATIVIDADES),
+    Turma: (SECAO_TURMAS,),
+}
+
+
+def invalidar_painel_gerente(sender, instance=None, update_fields=None, **kwargs):
+    if sender is Usuario and update_fields and set(update_fields) <= _CAMPOS_USUARIO_IRRELEVANTES:
+        return
+    marcar_secoes_desatualizadas(*_SECOES_POR_MODELO[sender])
+
+
+def conectar_signals_painel_gerente():
+    for model in _SECOES_POR_MODELO:
+        uid = f"painel_gerente_{model._meta.label_lower}"
+        post_save.connect(invalidar_painel_gerente, sender=model, dispatch_uid=f"{uid}_save")
+        post_delete.connect(invalidar_painel_gerente, sender=model, dispatch_uid=f"{uid}_delete")
@@ -1,3 +1,330 @@
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ct.models import CentroDeTreinamento
+from financeiro.models import Mensalidade
+from funcionarios.models import PainelGerenteSecao, Presenca
+from turmas.models import DiaSemana, Turma
+from usuarios.models import PreCadastro, Usuario
+from wellhub.models import CadastroWellhub, WellhubBooking, WellhubSlot
+
+
+class PainelGerenteSnapshotTests(TestCase):
+    def setUp(self):
+        self.gerente = Usuario.objects.create_user(
+            username="00000000000",
+            password="gerente123",
+            tipo="gerente",
+            first_name="Gerente",
+            last_name="Teste",
+            email="gerente@test.com",
+            cpf="00000000000",
+        )
+        self.aluno = Usuario.objects.create_user(
+            username="21501658727",
+            password="x",
+            tipo="aluno",
+            first_name="Bella",
+            last_name="Teste",
+            email="bella@test.com",
+            cpf="21501658727",
+            ativo=True,
+            valor_mensalidade=Decimal("160.00"),
+            dia_vencimento=10,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.gerente)
+
+    def _painel(self, **params):
+        resp = self.client.get("/api/funcionarios/painel-gerente/", params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_segunda_leitura_nao_recalcula(self):
+        self._painel()
+        with self.assertNumQueries(2):  # seções do snapshot + dados do gerente
+            dados = self._painel()
+        self.assertEqual(dados["alunos_ativos"], 1)
+
+    def test_escrita_em_mensalidade_invalida_so_secoes_afetadas(self):
+        self._painel()
+        Mensalidade.objects.create(
+            aluno=self.aluno,
+            valor=Decimal("160.00"),
+            data_vencimento=timezone.localdate() - timedelta(days=40),
+        )
+        pendentes = set(
+            PainelGerenteSecao.objects.filter(desatualizada=True).values_list("secao", flat=True)
+        )
+        self.assertEqual(pendentes, {"mensalidades", "atividades"})
+        dados = self._painel()
+        self.assertEqual(dados["mensalidades_atrasadas_mais_30_dias"], 1)
+        self.assertEqual(dados["mensalidades_atrasadas_mais_30_dias_nomes"], ["Bella Teste"])
+
+    def test_precadastro_e_usuario_atualizam_contadores(self):
+        self._painel()
+        PreCadastro.objects.create(
+            first_name="Lia",
+            last_name="Nova",
+            telefone="21988887777",
+            email="lia@test.com",
+            origem="aula_experimental",
+            data_aula_experimental=timezone.localdate() + timedelta(days=2),
+        )
+        self.aluno.ativo = False
+        self.aluno.save(update_fields=["ativo"])
+        dados = self._painel()
+        self.assertEqual(dados["aulas_experimentais_futuras_nomes"], ["Lia Nova"])
+        self.assertEqual(dados["alunos_ativos"], 0)
+        self.assertEqual(dados["alunos_inativos"], 1)
+
+    def test_login_nao_invalida_painel(self):
+        self._painel()
+        self.aluno.last_login = timezone.now()
+        self.aluno.save(update_fields=["last_login"])
+        self.assertFalse(PainelGerenteSecao.objects.filter(desatualizada=True).exists())
+
+    def test_virada_do_dia_reconstroi(self):
+        self._painel()
+        PainelGerenteSecao.objects.update(data_referencia=date(2000, 1, 1))
+        # Escrita sem signal: só a reconstrução do dia enxerga
+        Usuario.objects.filter(pk=self.aluno.pk).update(parq_completed=True)
+        dados = self._painel()
+        self.assertEqual(dados["parq_respondidos_nomes"], ["Bella Teste"])
+        self.assertFalse(
+            PainelGerenteSecao.objects.exclude(data_referencia=timezone.localdate()).exists()
+        )
+
+    def test_fresh_recalcula(self):
+        self._painel()
+        Usuario.objects.filter(pk=self.aluno.pk).update(parq_completed=True)
+        self.assertEqual(self._painel()["parq_respondidos"], 0)
+        self.assertEqual(self._painel(fresh="1")["parq_respondidos"], 1)
+
+    def test_aluno_nao_acessa(self):
+        self.client.force_authenticate(self.aluno)
+        resp = self.client.get("/api/funcionarios/painel-gerente/")
+        self.assertEqual(resp.status_code, 403)
+
+
+class ListaPresencaTests(TestCase):
+    def setUp(self):
+        ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        seg, _ = DiaSemana.objects.get_or_create(nome="Segunda-feira")
+        self.turma = Turma.objects.create(ct=ct, horario=time(7, 0), capacidade_maxima=30)
+        self.turma.dias_semana.set([seg])
+        self.professor = Usuario.objects.create_user(
+            username="11111111111",
+            password="x",
+            tipo="professor",
+            first_name="Prof",
+            email="prof@test.com",
+            cpf="11111111111",
+        )
+        self.turma.professores.add(self.professor)
+        self.hoje = timezone.localdate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.professor)
+        self.url = f"/api/funcionarios/verificar-checkin/{self.turma.id}/"
+        self._seq = 0
+
+    def _aluno(self):
+        self._seq += 1
+        cpf = f"3{self._seq:010d}"
+        aluno = Usuario.objects.create_user(
+            username=cpf,
+            password="x",
+            tipo="aluno",
+            first_name=f"Aluno{self._seq:02d}",
+            last_name="Teste",
+            email=f"a{self._seq}@test.com",
+            cpf=cpf,
+            ativo=True,
+        )
+        self.turma.alunos.add(aluno)
+        return aluno
+
+    def test_consultas_fixas_independente_do_tamanho_da_turma(self):
+        for _ in range(2):
+            aluno = self._aluno()
+        Presenca.objects.create(usuario=aluno, turma=self.turma, data=self.hoje, checkin_realizado=True)
+        self.client.get(self.url)
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+        for _ in range(10):
+            Presenca.objects.create(usuario=self._aluno(), turma=self.turma, data=self.hoje)
+        with self.assertNumQueries(6):
+            resp = self.client.get(self.url)
+        self.assertEqual(len(resp.data["alunos"]), 12)
+        checkins = [a["nome"] for a in resp.data["alunos"] if a["checkin_realizado"]]
+        self.assertEqual(checkins, ["Aluno02 Teste"])
+
+    def test_etag_devolve_304_ate_a_lista_mudar(self):
+        aluno = self._aluno()
+        resp = self.client.get(self.url)
+        etag = resp["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+
+        resp = self.client.post(
+            f"/api/funcionarios/registrar-presenca/{self.turma.id}/",
+            {"presenca": [str(aluno.id)]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertTrue(resp.data["alunos"][0]["presenca_confirmada"])
+
+    def test_registro_em_lote_com_numero_fixo_de_comandos(self):
+        presente, faltou, ja_registrado, fora = (self._aluno() for _ in range(4))
+        Presenca.objects.create(usuario=ja_registrado, turma=self.turma, data=self.hoje, checkin_realizado=True)
+        pc = PreCadastro.objects.create(
+            first_name="Lia",
+            last_name="Nova",
+            telefone="21988887777",
+            email="lia@test.com",
+            origem="aula_experimental",
+            turma=self.turma,
+            data_aula_experimental=self.hoje,
+        )
+        occur = timezone.make_aware(datetime.combine(self.hoje, self.turma.horario))
+        slot = WellhubSlot.objects.create(
+            turma=self.turma,
+            data_aula=self.hoje,
+            occur_date=occur,
+            wellhub_slot_id="slot-lote",
+            total_capacity=5,
+            opens_at=occur - timedelta(days=2),
+            closes_at=occur - timedelta(minutes=10),
+        )
+        booking = WellhubBooking.objects.create(
+            wellhub_booking_id="bk-lote",
+            slot=slot,
+            cadastro=CadastroWellhub.objects.create(wellhub_user_id="wh-lote", first_name="Ana", email="ana@wh.test"),
+            status="confirmed",
+        )
+        self.client.get(self.url)
+
+        corpo = {
+            "presenca": [str(presente.id), str(ja_registrado.id), f"precadastro_{pc.id}", f"wellhub_{booking.id}"],
+            "faltas": [str(faltou.id)],
+        }
+        # elenco + presenças + upsert + bulk_update + pré-cadastros + Wellhub + savepoint
+        # e a lista de presença devolvida (6)
+        with self.assertNumQueries(14):
+            resp = self.client.post(
+                f"/api/funcionarios/registrar-presenca/{self.turma.id}/", corpo, format="json"
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("(5 registro(s))", resp.data["message"])
+
+        estado = {a["id"]: (a["presenca_confirmada"], a["ausencia_registrada"]) for a in resp.data["alunos"]}
+        self.assertEqual(estado[str(presente.id)], (True, False))
+        self.assertEqual(estado[str(faltou.id)], (False, True))
+        self.assertEqual(estado[str(ja_registrado.id)], (True, False))
+        self.assertEqual(estado[str(fora.id)], (False, False))
+        self.assertEqual(estado[f"precadastro_{pc.id}"], (True, False))
+        self.assertEqual(estado[f"wellhub_{booking.id}"], (True, False))
+        self.assertTrue(Presenca.objects.get(usuario=ja_registrado).checkin_realizado)
+        self.assertEqual(Presenca.objects.count(), 3)
+        self.assertEqual(resp["ETag"], self.client.get(self.url)["ETag"])
+
+
+class RelatorioPresencaTests(TestCase):
+    def setUp(self):
+        ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        seg, _ = DiaSemana.objects.get_or_create(nome="Segunda-feira")
+        qua, _ = DiaSemana.objects.get_or_create(nome="Quarta-feira")
+        self.turma = Turma.objects.create(ct=ct, horario=time(7, 0), capacidade_maxima=30)
+        self.turma.dias_semana.set([seg, qua])
+        self.gerente = Usuario.objects.create_user(
+            username="00000000000",
+            password="x",
+            tipo="gerente",
+            first_name="Gerente",
+            email="gerente@test.com",
+            cpf="00000000000",
+        )
+        self.alunos = []
+        for i, nome in enumerate(["Carla", "ana", "Bruno"]):
+            cpf = f"4{i:010d}"
+            aluno = Usuario.objects.create_user(
+                username=cpf, password="x", tipo="aluno", first_name=nome, last_name="Teste",
+                email=f"r{i}@test.com", cpf=cpf, ativo=True,
+            )
+            self.turma.alunos.add(aluno)
+            self.alunos.append(aluno)
+        self.carla, self.ana, self.bruno = self.alunos
+        # 02/03/2026 é segunda: aulas em 02, 04, 09 e 11/03
+        Presenca.objects.create(usuario=self.carla, turma=self.turma, data=date(2026, 3, 4), checkin_realizado=True,
+                                presenca_confirmada=True)
+        Presenca.objects.create(usuario=self.ana, turma=self.turma, data=date(2026, 3, 9), ausencia_registrada=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.gerente)
+        self.url = "/api/funcionarios/relatorio-presenca/"
+        self.params = {"data_inicio": "02-03-2026", "data_fim": "11-03-2026", "turma_id": self.turma.id}
+
+    def test_grade_com_faltantes_ordem_e_totais(self):
+        dados = self.client.get(self.url, self.params).json()
+        self.assertEqual(dados["total_registros"], 12)  # 4 aulas x 3 alunos
+        self.assertEqual(dados["total_sem_registro"], 10)
+        self.assertEqual(dados["total_checkins"], 1)
+        self.assertEqual(dados["total_confirmadas"], 1)
+        self.assertEqual(dados["total_faltas"], 1)
+        ordem = [(p["data"], p["aluno_nome"]) for p in dados["presencas"][:4]]
+        self.assertEqual(
+            ordem,
+            [("11-03-2026", "ana Teste"), ("11-03-2026", "Bruno Teste"), ("11-03-2026", "Carla Teste"),
+             ("09-03-2026", "ana Teste")],
+        )
+        self.assertFalse(dados["presencas"][3]["sem_registro"])
+
+        dados = self.client.get(self.url, {**self.params, "incluir_faltantes": "false"}).json()
+        self.assertEqual(dados["total_registros"], 2)
+
+    def test_consultas_nao_crescem_com_o_periodo(self):
+        self.client.get(self.url, self.params)
+        # turma + dias da semana, alunos esperados, registros (em fluxo)
+        with self.assertNumQueries(4):
+            self.client.get(self.url, self.params)
+        with self.assertNumQueries(4):
+            dados = self.client.get(self.url, {**self.params, "data_inicio": "01-01-2026"}).json()
+        self.assertGreater(dados["total_registros"], 40)
+
+    def test_paginacao_mantem_totais_do_relatorio(self):
+        completo = self.client.get(self.url, self.params).json()["presencas"]
+        dados = self.client.get(self.url, {**self.params, "page": 2, "page_size": 5}).json()
+        self.assertEqual(dados["count"], 12)
+        self.assertEqual(dados["num_pages"], 3)
+        self.assertEqual(dados["total_sem_registro"], 10)
+        self.assertEqual(dados["presencas"], completo[5:10])
+        self.assertIn("page=3", dados["next"])
+        self.assertIn("page=1", dados["previous"])
+
+    def test_exportacao_csv_e_ndjson(self):
+        resp = self.client.get(self.url, {**self.params, "formato": "csv"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("attachment", resp["Content-Disposition"])
+        linhas = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(linhas[0].split(",")[:3], ["id", "aluno_id", "aluno_nome"])
+        self.assertEqual(len(linhas), 13)
+
+        resp = self.client.get(self.url, {**self.params, "formato": "ndjson"})
+        linhas = [json.loads(l) for l in b"".join(resp.streaming_content).decode().splitlines()]
+        self.assertEqual(len(linhas), 13)
+        self.assertEqual(linhas[-1]["totais"]["total_faltas"], 1)
 
-# Create your tests here.
+    def test_professor_nao_acessa(self):
+        self.client.force_authenticate(self.carla)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -1,64 +1,30 @@
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from turmas.models import Turma
-from datetime import date
 from usuarios.models import Usuario, PreCadastro
-from financeiro.models import Mensalidade
 from .models import Presenca, ObservacaoAula, MAX_OBSERVACAO_AULA_CHARS
+from .lista_presenca import (
+    montar_lista_presenca,
+    obter_turma_lista_presenca,
+    registrar_presencas_em_lote,
+)
+from .painel_gerente import obter_painel_gerente
+from .relatorio_presenca import RelatorioPresenca, exportar_relatorio_presenca
 from .serializers import UsuarioSerializer, PreCadastroSerializer, PresencaSerializer, TurmaSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
+from rest_framework.utils.urls import replace_query_param
 from django.core.mail import send_mail
-from django.db.models import Count, Sum, Q, Max
+from django.db.models import Count, Sum
 from django.utils import timezone
-from datetime import datetime, timedelta
 import logging
 from app.date_api import format_data_api, format_datetime_api, parse_data_api
-from wellhub.services.presenca_professor import (
-    nome_exibicao_wellhub,
-    wellhub_bookings_presenca_turma,
-)
+from app.etag import etag_fraco, resposta_condicional
 
 logger = logging.getLogger(__name__)
 
-# Alinhado ao painel do aluno / turmas (dia da semana da data vs nomes em DiaSemana)
-_WEEKDAY_NOME_PT = (
-    "Segunda-feira",
-    "Terça-feira",
-    "Quarta-feira",
-    "Quinta-feira",
-    "Sexta-feira",
-    "Sábado",
-    "Domingo",
-)
-
-
-def _serialize_presenca_sintetica(aluno: Usuario, turma: Turma, d: date) -> dict:
-    """Linha sem registro em Presenca (aluno esperado na aula e sem linha no banco)."""
-    return {
-        "id": None,
-        "aluno_id": aluno.id,
-        "aluno_nome": aluno.get_full_name() or aluno.username,
-        "turma_id": turma.id,
-        "turma_nome": str(turma),
-        "data": format_data_api(d),
-        "checkin_realizado": False,
-        "presenca_confirmada": False,
-        "ausencia_registrada": False,
-        "sem_registro": True,
-    }
-
-
-def _nome_completo_precadastro(pc):
-    n = f"{(pc.first_name or '').strip()} {(pc.last_name or '').strip()}".strip()
-    return n or "—"
-
-
-def _nome_completo_usuario(u):
-    n = f"{(u.first_name or '').strip()} {(u.last_name or '').strip()}".strip()
-    return n or "—"
-
 
 class VerificarCheckinAlunosAPIView(APIView):
     """API para verificar quais alunos fizeram check-in em uma turma. Inclui pré-cadastros com aula experimental no dia.
@@ -67,124 +33,39 @@ class VerificarCheckinAlunosAPIView(APIView):
 
     ``pode_confirmar_presenca``: sempre True para o professor alternar presente/falta no dia (check-in
     continua sendo feito pelo aluno no app quando aplicável).
+
+    A resposta leva ``ETag``; com ``If-None-Match`` igual, devolve 304 sem corpo (polling do app durante a aula).
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, turma_id):
-        turma = get_object_or_404(Turma, id=turma_id)
+        try:
+            turma = obter_turma_lista_presenca(turma_id)
+        except Turma.DoesNotExist:
+            raise Http404
         hoje = timezone.localdate()
 
-        # Busca todos os alunos da turma (distinct evita duplicidades por JOIN/M2M)
-        alunos = (
-            Usuario.objects.filter(tipo="aluno", ativo=True, turmas_aluno=turma, contrato_suspenso=False)
-            .distinct()
-            .order_by("first_name", "last_name", "id")
-        )
-
-        status_alunos = []
-        emails_alunos = set()
-        cpfs_alunos = set()
-        for aluno in alunos:
-            presenca = Presenca.objects.filter(
-                usuario=aluno,
-                data=hoje,
-                turma=turma
-            ).first()
-            ja_confirmada = presenca.presenca_confirmada if presenca else False
-            ausencia = bool(presenca.ausencia_registrada) if presenca else False
-            email_norm = (aluno.email or "").strip().lower()
-            cpf_norm = ''.join(c for c in str(aluno.cpf or '') if c.isdigit())
-            if email_norm:
-                emails_alunos.add(email_norm)
-            if cpf_norm:
-                cpfs_alunos.add(cpf_norm)
-            status_alunos.append({
-                "id": str(aluno.id),
-                "nome": f"{aluno.first_name} {aluno.last_name}",
-                "username": aluno.username,
-                "tipo": "aluno",
-                "checkin_realizado": presenca.checkin_realizado if presenca else False,
-                "presenca_confirmada": ja_confirmada,
-                "ausencia_registrada": ausencia,
-                # Professor pode alternar presente / falta no mesmo dia
-                "pode_confirmar_presenca": True,
-            })
-
-        # Pré-cadastros com aula experimental nesta turma e data
-        precadastros = PreCadastro.objects.filter(
-            turma=turma,
-            data_aula_experimental=hoje,
-            origem='aula_experimental',
-            status='pendente'
-        ).order_by("first_name", "last_name", "id")
-        precadastros_adicionados = set()
-        for pc in precadastros:
-            email_pc = (pc.email or "").strip().lower()
-            cpf_pc = ''.join(c for c in str(pc.cpf or '') if c.isdigit())
-
-            # Evita duplicação visual da mesma pessoa (já está como aluno regular da turma)
-            if (email_pc and email_pc in emails_alunos) or (cpf_pc and cpf_pc in cpfs_alunos):
-                continue
-
-            # Defesa extra contra duplicidade do próprio pré-cadastro no retorno
-            key_pc = (email_pc, cpf_pc, (pc.first_name or "").strip().lower(), (pc.last_name or "").strip().lower())
-            if key_pc in precadastros_adicionados:
-                continue
-            precadastros_adicionados.add(key_pc)
-            if email_pc:
-                emails_alunos.add(email_pc)
-
-            ja_exp = bool(pc.compareceu_aula_experimental)
-            status_alunos.append({
-                "id": f"precadastro_{pc.id}",
-                "nome": f"{pc.first_name} {pc.last_name or ''}".strip(),
-                "username": pc.email,
-                "tipo": "aula_experimental",
-                "checkin_realizado": False,
-                "presenca_confirmada": ja_exp,
-                "ausencia_registrada": False,
-                "pode_confirmar_presenca": True,
-            })
-
-        wellhub_adicionados = set()
-        for booking in wellhub_bookings_presenca_turma(turma, hoje):
-            cadastro = booking.cadastro
-            if not cadastro:
-                continue
-            email_wh = (cadastro.email or "").strip().lower()
-            # Rótulo identificável: usa nome real quando existir; senão, e-mail +
-            # sufixo do booking para o professor distinguir cada cliente Wellhub.
-            nome_wh = nome_exibicao_wellhub(booking)
-            key_wh = (email_wh, nome_wh.lower(), booking.id)
-            if key_wh in wellhub_adicionados:
-                continue
-            wellhub_adicionados.add(key_wh)
-            # Sempre inclui a reserva Wellhub na lista (mesmo se o e-mail coincidir
-            # com aluno CT — o professor precisa ver o cliente Wellhub do dia).
-            status_alunos.append({
-                "id": f"wellhub_{booking.id}",
-                "nome": nome_wh or "Cliente Wellhub",
-                "username": cadastro.email or "Wellhub",
-                "tipo": "wellhub",
-                "checkin_realizado": bool(booking.checkin_validado),
-                "presenca_confirmada": bool(booking.presenca_confirmada),
-                "ausencia_registrada": bool(booking.ausencia_registrada),
-                "pode_confirmar_presenca": True,
-            })
-
-        return Response({
-            "turma": turma.__str__(),
+        payload = {
+            "turma": str(turma),
             "data": format_data_api(hoje),
-            "alunos": status_alunos
-        }, status=status.HTTP_200_OK)
+            "alunos": montar_lista_presenca(turma, hoje),
+        }
+        return resposta_condicional(request, payload)
 
 
 class RegistrarPresencaAPIView(APIView):
-    """API para registrar presença dos alunos e comparecimento de pré-cadastros (aula experimental) em uma turma."""
+    """API para registrar presença dos alunos e comparecimento de pré-cadastros (aula experimental) em uma turma.
+
+    Grava tudo em lote numa transação e devolve a lista de presença resultante (mesmo formato de
+    verificar-checkin, com ETag).
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request, turma_id):
-        turma = get_object_or_404(Turma, id=turma_id)
+        try:
+            turma = obter_turma_lista_presenca(turma_id)
+        except Turma.DoesNotExist:
+            raise Http404
         hoje = timezone.localdate()
 
         alunos_presentes = request.data.get('presenca', [])
@@ -259,102 +140,31 @@ class RegistrarPresencaAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        presencas_registradas = 0
-        alunos = Usuario.objects.filter(
-            tipo="aluno", ativo=True, turmas_aluno=turma, contrato_suspenso=False
+        presencas_registradas = registrar_presencas_em_lote(
+            turma,
+            hoje,
+            alunos_presentes=alunos_ids,
+            alunos_falta=falta_ids if usar_faltas else (),
+            precadastros_presentes=precadastro_ids,
+            precadastros_falta=precadastro_falta_ids if usar_faltas else (),
+            wellhub_presentes=wellhub_presentes_ids,
+            wellhub_falta=wellhub_falta_ids if usar_faltas else (),
         )
 
-        for aluno in alunos:
-            sid = str(aluno.id)
-            if sid in alunos_ids:
-                presenca = Presenca.objects.filter(
-                    usuario=aluno,
-                    data=hoje,
-                    turma=turma
-                ).first()
-                if presenca:
-                    presenca.presenca_confirmada = True
-                    presenca.ausencia_registrada = False
-                    presenca.save()
-                else:
-                    Presenca.objects.create(
-                        usuario=aluno,
-                        turma=turma,
-                        data=hoje,
-                        checkin_realizado=False,
-                        presenca_confirmada=True,
-                        ausencia_registrada=False,
-                    )
-                presencas_registradas += 1
-            elif usar_faltas and sid in falta_ids:
-                presenca = Presenca.objects.filter(
-                    usuario=aluno,
-                    data=hoje,
-                    turma=turma
-                ).first()
-                if presenca:
-                    presenca.presenca_confirmada = False
-                    presenca.ausencia_registrada = True
-                    presenca.save()
-                else:
-                    Presenca.objects.create(
-                        usuario=aluno,
-                        turma=turma,
-                        data=hoje,
-                        checkin_realizado=False,
-                        presenca_confirmada=False,
-                        ausencia_registrada=True,
-                    )
-                presencas_registradas += 1
-
-        # Marcar comparecimento de pré-cadastros (aula experimental)
-        for pc_id in set(precadastro_ids):
-            pc = PreCadastro.objects.filter(
-                id=pc_id,
-                turma=turma,
-                data_aula_experimental=hoje,
-                origem='aula_experimental',
-                status='pendente'
-            ).first()
-            if pc:
-                pc.compareceu_aula_experimental = True
-                pc.save()
-                presencas_registradas += 1
-
-        if usar_faltas:
-            for pc_id in set(precadastro_falta_ids):
-                pc = PreCadastro.objects.filter(
-                    id=pc_id,
-                    turma=turma,
-                    data_aula_experimental=hoje,
-                    origem='aula_experimental',
-                    status='pendente'
-                ).first()
-                if pc:
-                    pc.compareceu_aula_experimental = False
-                    pc.save()
-                    presencas_registradas += 1
-
-        for booking_id in set(wellhub_presentes_ids):
-            booking = wellhub_bookings_presenca_turma(turma, hoje).filter(id=booking_id).first()
-            if booking:
-                booking.presenca_confirmada = True
-                booking.ausencia_registrada = False
-                booking.save(update_fields=["presenca_confirmada", "ausencia_registrada", "atualizado_em"])
-                presencas_registradas += 1
-
-        if usar_faltas:
-            for booking_id in set(wellhub_falta_ids):
-                booking = wellhub_bookings_presenca_turma(turma, hoje).filter(id=booking_id).first()
-                if booking:
-                    booking.presenca_confirmada = False
-                    booking.ausencia_registrada = True
-                    booking.save(update_fields=["presenca_confirmada", "ausencia_registrada", "atualizado_em"])
-                    presencas_registradas += 1
-
-        return Response({
-            "message": f"Presenças registradas com sucesso! ({presencas_registradas} registro(s))"
-        }, status=status.HTTP_200_OK)
+        # Estado resultante de cada pessoa: o app atualiza a tela sem buscar a lista de novo
+        lista = {
+            "turma": str(turma),
+            "data": format_data_api(hoje),
+            "alunos": montar_lista_presenca(turma, hoje),
+        }
+        return Response(
+            {
+                "message": f"Presenças registradas com sucesso! ({presencas_registradas} registro(s))",
+                **lista,
+            },
+            status=status.HTTP_200_OK,
+            headers={"ETag": etag_fraco(lista)},
+        )
 
 
 def _serialize_presenca(presenca: Presenca):
@@ -373,123 +183,74 @@ def _serialize_presenca(presenca: Presenca):
 
 
 class RelatorioPresencaAPIView(APIView):
-    """API para relatório de presença (gerente)."""
+    """API para relatório de presença (gerente).
+
+    Sem ``page``/``page_size`` devolve todas as linhas (compatível com os apps). Com eles, devolve só
+    a página pedida (``page_size`` até 1000) com ``count``/``num_pages``/``next``/``previous``; os
+    totais sempre cobrem o relatório inteiro. ``formato=csv`` ou ``formato=ndjson`` exporta em fluxo
+    (NDJSON termina com uma linha ``{"totais": {...}}``).
+    """
     permission_classes = [IsAuthenticated]
+    MAX_PAGE_SIZE = 1000
 
     def get(self, request):
         if request.user.tipo != "gerente":
             return Response({"error": "Permissão negada."}, status=status.HTTP_403_FORBIDDEN)
 
-        data_inicio = request.query_params.get("data_inicio")
-        data_fim = request.query_params.get("data_fim")
-        turma_id = request.query_params.get("turma_id")
-        aluno_id = request.query_params.get("aluno_id")
-        aluno_nome = request.query_params.get("aluno_nome")
-
+        params = request.query_params
         parsed_inicio = None
         parsed_fim = None
-
-        qs = Presenca.objects.select_related("usuario", "turma").order_by("-data", "usuario__first_name")
-
-        if data_inicio:
-            parsed_inicio = parse_data_api(data_inicio)
+        if params.get("data_inicio"):
+            parsed_inicio = parse_data_api(params["data_inicio"])
             if not parsed_inicio:
                 return Response({"error": "Data inicial inválida."}, status=status.HTTP_400_BAD_REQUEST)
-            qs = qs.filter(data__gte=parsed_inicio)
-        if data_fim:
-            parsed_fim = parse_data_api(data_fim)
+        if params.get("data_fim"):
+            parsed_fim = parse_data_api(params["data_fim"])
             if not parsed_fim:
                 return Response({"error": "Data final inválida."}, status=status.HTTP_400_BAD_REQUEST)
-            qs = qs.filter(data__lte=parsed_fim)
-        if turma_id:
-            qs = qs.filter(turma_id=turma_id)
-        if aluno_id:
-            qs = qs.filter(usuario_id=aluno_id)
-        if aluno_nome:
-            qs = qs.filter(
-                Q(usuario__first_name__icontains=aluno_nome) |
-                Q(usuario__last_name__icontains=aluno_nome) |
-                Q(usuario__username__icontains=aluno_nome)
+        try:
+            turma_id = int(params["turma_id"]) if params.get("turma_id") else None
+            aluno_id = int(params["aluno_id"]) if params.get("aluno_id") else None
+            page = int(params["page"]) if params.get("page") else None
+            page_size = int(params["page_size"]) if params.get("page_size") else None
+        except ValueError:
+            return Response(
+                {"error": "turma_id, aluno_id, page e page_size devem ser números."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Uma linha por (aluno, turma, data): remove duplicatas legadas mantendo o registro de maior id
-        max_ids = (
-            qs.values("usuario_id", "turma_id", "data")
-            .annotate(max_id=Max("id"))
-            .values_list("max_id", flat=True)
-        )
-        qs = (
-            Presenca.objects.filter(id__in=max_ids)
-            .select_related("usuario", "turma")
-            .order_by("-data", "usuario__first_name")
+        relatorio = RelatorioPresenca(
+            data_inicio=parsed_inicio,
+            data_fim=parsed_fim,
+            turma_id=turma_id,
+            aluno_id=aluno_id,
+            aluno_nome=params.get("aluno_nome"),
+            incluir_faltantes=params.get("incluir_faltantes", "true").lower() in ("1", "true", "yes", ""),
         )
 
-        total_checkins = qs.filter(checkin_realizado=True).count()
-        total_confirmadas = qs.filter(presenca_confirmada=True).count()
-        total_faltas = qs.filter(ausencia_registrada=True).count()
+        formato = (params.get("formato") or "").lower()
+        if formato in ("csv", "ndjson"):
+            return exportar_relatorio_presenca(relatorio, formato, parsed_inicio, parsed_fim)
 
-        presencas_list = [_serialize_presenca(item) for item in qs]
-
-        incluir_faltantes = request.query_params.get("incluir_faltantes", "true").lower() in (
-            "1",
-            "true",
-            "yes",
-            "",
-        )
-
-        if (
-            incluir_faltantes
-            and turma_id
-            and parsed_inicio
-            and parsed_fim
-            and parsed_inicio <= parsed_fim
-        ):
-            try:
-                turma = Turma.objects.prefetch_related("dias_semana", "alunos").get(pk=int(turma_id))
-            except (ValueError, Turma.DoesNotExist):
-                turma = None
-            if turma:
-                existentes = {
-                    (p["aluno_id"], p["turma_id"], (p["data"] or ""))
-                    for p in presencas_list
-                }
-                dia_nomes = {d.nome for d in turma.dias_semana.all()}
-                cur = parsed_inicio
-                while cur <= parsed_fim:
-                    nome_dia = _WEEKDAY_NOME_PT[cur.weekday()]
-                    if nome_dia in dia_nomes:
-                        alunos_qs = turma.alunos.filter(
-                            tipo="aluno", ativo=True, contrato_suspenso=False
-                        )
-                        if aluno_id:
-                            alunos_qs = alunos_qs.filter(id=int(aluno_id))
-                        if aluno_nome:
-                            alunos_qs = alunos_qs.filter(
-                                Q(first_name__icontains=aluno_nome)
-                                | Q(last_name__icontains=aluno_nome)
-                                | Q(username__icontains=aluno_nome)
-                            )
-                        for aluno in alunos_qs.distinct():
-                            k = (aluno.id, turma.id, format_data_api(cur))
-                            if k not in existentes:
-                                presencas_list.append(_serialize_presenca_sintetica(aluno, turma, cur))
-                                existentes.add(k)
-                    cur += timedelta(days=1)
-
-        # Mesma ordem do queryset: data desc, nome asc (sort estável)
-        presencas_list.sort(key=lambda p: (p.get("aluno_nome") or "").lower())
-        presencas_list.sort(key=lambda p: parse_data_api(p.get("data")) or date.min, reverse=True)
-
-        total_sem_registro = sum(1 for p in presencas_list if p.get("sem_registro"))
-        total_registros = len(presencas_list)
+        if page is None and page_size is None:
+            presencas = relatorio.pagina()
+            return Response({**relatorio.totais, "presencas": presencas}, status=status.HTTP_200_OK)
 
+        page = max(page or 1, 1)
+        page_size = min(max(page_size or 100, 1), self.MAX_PAGE_SIZE)
+        presencas = relatorio.pagina(page, page_size)
+        count = relatorio.totais["total_registros"]
+        num_pages = max((count + page_size - 1) // page_size, 1)
+        url = request.build_absolute_uri()
         return Response({
-            "total_registros": total_registros,
-            "total_checkins": total_checkins,
-            "total_confirmadas": total_confirmadas,
-            "total_faltas": total_faltas,
-            "total_sem_registro": total_sem_registro,
-            "presencas": presencas_list,
+            **relatorio.totais,
+            "count": count,
+            "page": page,
+            "page_size": page_size,
+            "num_pages": num_pages,
+            "next": replace_query_param(url, "page", page + 1) if page < num_pages else None,
+            "previous": replace_query_param(url, "page", page - 1) if page > 1 else None,
+            "presencas": presencas,
         }, status=status.HTTP_200_OK)
 
 
@@ -588,244 +349,18 @@ class PainelGerenteAPIView(APIView):
                 logger.warning(f"Tentativa de acesso não autorizado por: {request.user.username}")
                 return Response({"error": "Permissão negada."}, status=status.HTTP_403_FORBIDDEN)
 
-            # Estatísticas básicas (data civil em TIME_ZONE — alinha com mensalidades / vencimento)
-            hoje = timezone.localdate()
-            ano = hoje.year
-            mes = hoje.month
-            limite_30_dias = hoje - timedelta(days=30)
-
-            # Alunos: partição coerente com a Gestão de Usuários (badge Ativo/Inativo = is_active)
-            # e com o campo de negócio `ativo`. Conta como "ativo" só quem está ativo no CT
-            # e com conta liberada (login); pendente de ativação de e-mail (ativo=True, is_active=False)
-            # entra como inativo, alinhado à listagem.
-            qs_alunos = Usuario.objects.filter(tipo="aluno")
-            alunos_ativos = qs_alunos.filter(ativo=True, is_active=True).count()
-            alunos_inativos = qs_alunos.exclude(ativo=True, is_active=True).count()
-
-            professores = Usuario.objects.filter(tipo="professor", ativo=True).count()
-
-            # Pendentes: não pagas, vencem no mês atual e ainda não passou o vencimento
-            mensalidades_pendentes = Mensalidade.objects.filter(
-                ~Q(status="pago"),
-                data_vencimento__year=ano,
-                data_vencimento__month=mes,
-                data_vencimento__gte=hoje,
-            ).count()
-
-            # Atrasadas: não pagas; (1) vencimento no mês corrente e já passou o dia do vencimento
-            # (2) vencimento há mais de 30 dias (acúmulo de atraso)
-            mensalidades_atrasadas_mes_corrente = Mensalidade.objects.filter(
-                ~Q(status="pago"),
-                data_vencimento__year=ano,
-                data_vencimento__month=mes,
-                data_vencimento__lt=hoje,
-            ).count()
-            mensalidades_atrasadas_mais_30_dias = Mensalidade.objects.filter(
-                ~Q(status="pago"),
-                data_vencimento__lt=limite_30_dias,
-            ).count()
-
-            # Mensalidades pagas no mês corrente (data do pagamento)
-            qs_pagas_mes = Mensalidade.objects.filter(status="pago")
-            mensalidades_pagas = qs_pagas_mes.filter(
-                data_pagamento__year=ano,
-                data_pagamento__month=mes
-            ).count()
-            # Fallback: se data_pagamento for null, considerar data_vencimento no mês
-            mensalidades_pagas += qs_pagas_mes.filter(
-                data_pagamento__isnull=True,
-                data_vencimento__year=ano,
-                data_vencimento__month=mes
-            ).count()
-
-            # Pré-cadastros pendentes (ex-alunos têm aba própria)
-            precadastros = PreCadastro.objects.filter(status='pendente').exclude(origem='ex_aluno').count()
-
-            # Aulas experimentais (só status pendente, alinhado à listagem de pré-cadastros)
-            aulas_experimentais_futuras = PreCadastro.objects.filter(
-                origem='aula_experimental',
-                status='pendente',
-                data_aula_experimental__gt=hoje
-            ).count()
-            aulas_experimentais_ocorridas = PreCadastro.objects.filter(
-                origem='aula_experimental',
-                status='pendente',
-                data_aula_experimental__isnull=False,
-                data_aula_experimental__lte=hoje
-            ).count()
-
-            qs_aulas_futuras = PreCadastro.objects.filter(
-                origem="aula_experimental",
-                status="pendente",
-                data_aula_experimental__gt=hoje,
-            ).order_by("data_aula_experimental", "first_name", "last_name", "id")
-            aulas_experimentais_futuras_nomes = [
-                _nome_completo_precadastro(pc) for pc in qs_aulas_futuras
-            ]
-
-            qs_aulas_ocorridas = PreCadastro.objects.filter(
-                origem="aula_experimental",
-                status="pendente",
-                data_aula_experimental__isnull=False,
-                data_aula_experimental__lte=hoje,
-            ).order_by("-data_aula_experimental", "first_name", "last_name", "id")
-            aulas_experimentais_ocorridas_nomes = [
-                _nome_completo_precadastro(pc) for pc in qs_aulas_ocorridas
-            ]
-
-            qs_atraso_mes = (
-                Mensalidade.objects.filter(
-                    ~Q(status="pago"),
-                    data_vencimento__year=ano,
-                    data_vencimento__month=mes,
-                    data_vencimento__lt=hoje,
-                )
-                .select_related("aluno")
-                .order_by("data_vencimento", "aluno__first_name", "aluno__last_name", "id")
-            )
-            mensalidades_atrasadas_mes_corrente_nomes = [
-                _nome_completo_usuario(m.aluno) for m in qs_atraso_mes
-            ]
-
-            qs_atraso_30 = (
-                Mensalidade.objects.filter(
-                    ~Q(status="pago"),
-                    data_vencimento__lt=limite_30_dias,
-                )
-                .select_related("aluno")
-                .order_by("data_vencimento", "aluno__first_name", "aluno__last_name", "id")
-            )
-            mensalidades_atrasadas_mais_30_dias_nomes = [
-                _nome_completo_usuario(m.aluno) for m in qs_atraso_30
-            ]
-
-            qs_parq_alunos = Usuario.objects.filter(
-                tipo="aluno", ativo=True, is_active=True
-            ).order_by("first_name", "last_name", "id")
-
-            parq_sim_q = Q()
-            for i in range(1, 11):
-                parq_sim_q |= Q(**{f"parq_question_{i}": True})
-
-            qs_parq_respondidos = qs_parq_alunos.filter(parq_completed=True)
-            qs_parq_nao_respondidos = qs_parq_alunos.filter(parq_completed=False)
-            qs_parq_com_sim = qs_parq_alunos.filter(parq_completed=True).filter(parq_sim_q)
-
-            parq_respondidos = qs_parq_respondidos.count()
-            parq_respondidos_nomes = [_nome_completo_usuario(a) for a in qs_parq_respondidos]
-            parq_nao_respondidos = qs_parq_nao_respondidos.count()
-            parq_nao_respondidos_nomes = [_nome_completo_usuario(a) for a in qs_parq_nao_respondidos]
-            parq_com_resposta_sim = qs_parq_com_sim.count()
-            parq_com_resposta_sim_nomes = [_nome_completo_usuario(a) for a in qs_parq_com_sim]
-
-            # Só id/ativo: os apps usam apenas len(turmas) no cartão "Total de turmas".
-            # Evita TurmaSerializer(depth=1) com todos os alunos aninhados por turma.
-            turmas_resumo = list(Turma.objects.order_by('id').values('id', 'ativo'))
-
-            # Atividades recentes
-            atividades = []
-
-            # Últimos alunos cadastrados
-            ultimos_alunos = Usuario.objects.filter(
-                tipo="aluno",
-                date_joined__gte=timezone.now() - timedelta(days=7)
-            ).order_by('-date_joined')[:5]
-
-            for aluno in ultimos_alunos:
-                atividades.append({
-                    'id': f'aluno_{aluno.id}',
-                    'type': 'aluno',
-                    'description': f'Novo aluno cadastrado - {aluno.first_name}',
-                    'data': format_datetime_api(timezone.localtime(aluno.date_joined)),
-                    '_ts': timezone.localtime(aluno.date_joined).timestamp(),
-                })
-
-            # Pré-cadastros criados nos últimos 7 dias (feed alinhado ao painel; ex-alunos têm aba própria)
-            for pc in PreCadastro.objects.filter(
-                criado_em__gte=timezone.now() - timedelta(days=7)
-            ).exclude(origem='ex_aluno').order_by('-criado_em')[:5]:
-                nome_pc = (pc.first_name or '').strip() or '—'
-                atividades.append({
-                    'id': f'precadastro_{pc.id}',
-                    'type': 'precadastro',
-                    'description': f'Pré-cadastro recebido - {nome_pc}',
-                    'data': format_datetime_api(timezone.localtime(pc.criado_em)),
-                    '_ts': timezone.localtime(pc.criado_em).timestamp(),
-                })
-
-            # Mensalidades pagas recentes: usar data_pagamento (quando o pagamento ocorreu),
-            # não data_vencimento — senão pagamentos de títulos antigos não apareciam no feed.
-            limite_pag = timezone.now() - timedelta(days=14)
-            limite_venc = timezone.localdate() - timedelta(days=14)
-            cand_mens = list(
-                Mensalidade.objects.filter(status="pago")
-                .filter(
-                    Q(data_pagamento__gte=limite_pag)
-                    | Q(data_pagamento__isnull=True, data_vencimento__gte=limite_venc)
-                )
-                .select_related("aluno")[:80]
-            )
-
-            def _ts_mensalidade_atividade(m):
-                if m.data_pagamento:
-                    return m.data_pagamento
-                return timezone.make_aware(
-                    datetime.combine(m.data_vencimento, datetime.min.time())
-                )
-
-            cand_mens.sort(key=_ts_mensalidade_atividade, reverse=True)
-            ultimas_mensalidades = cand_mens[:5]
-
-            for mensalidade in ultimas_mensalidades:
-                nome_aluno = getattr(mensalidade.aluno, "first_name", None) or "Aluno"
-                if mensalidade.data_pagamento:
-                    data_evt = format_datetime_api(mensalidade.data_pagamento)
-                    ts_evt = mensalidade.data_pagamento.timestamp()
-                else:
-                    data_evt = format_data_api(mensalidade.data_vencimento)
-                    ts_evt = timezone.make_aware(
-                        datetime.combine(mensalidade.data_vencimento, datetime.min.time())
-                    ).timestamp()
-                atividades.append({
-                    'id': f'mensalidade_{mensalidade.id}',
-                    'type': 'mensalidade',
-                    'description': f'Mensalidade paga - {nome_aluno}',
-                    'data': data_evt,
-                    '_ts': ts_evt,
-                })
-
-            # Ordena todas as atividades por data
-            atividades.sort(key=lambda x: x.get('_ts') or 0, reverse=True)
-            for ev in atividades:
-                ev.pop('_ts', None)
+            # Contadores e listas vêm do snapshot materializado (funcionarios.painel_gerente);
+            # ?fresh=1 força o recálculo completo.
+            fresh = request.query_params.get("fresh", "").lower() in ("1", "true", "yes")
+            painel, painel_atualizado_em = obter_painel_gerente(fresh=fresh)
 
             # Dados do gerente
             gerente = get_object_or_404(Usuario, id=request.user.id, tipo="gerente")
             gerente_data = UsuarioSerializer(gerente).data
-            
+
             response_data = {
-                'alunos_ativos': alunos_ativos,
-                'alunos_inativos': alunos_inativos,
-                'professores': professores,
-                'mensalidades_pendentes': mensalidades_pendentes,
-                'mensalidades_atrasadas_mes_corrente': mensalidades_atrasadas_mes_corrente,
-                'mensalidades_atrasadas_mais_30_dias': mensalidades_atrasadas_mais_30_dias,
-                'mensalidades_pagas': mensalidades_pagas,
-                'precadastros': precadastros,
-                'aulas_experimentais_futuras': aulas_experimentais_futuras,
-                'aulas_experimentais_ocorridas': aulas_experimentais_ocorridas,
-                'aulas_experimentais_futuras_nomes': aulas_experimentais_futuras_nomes,
-                'aulas_experimentais_ocorridas_nomes': aulas_experimentais_ocorridas_nomes,
-                'mensalidades_atrasadas_mes_corrente_nomes': mensalidades_atrasadas_mes_corrente_nomes,
-                'mensalidades_atrasadas_mais_30_dias_nomes': mensalidades_atrasadas_mais_30_dias_nomes,
-                'parq_respondidos': parq_respondidos,
-                'parq_respondidos_nomes': parq_respondidos_nomes,
-                'parq_nao_respondidos': parq_nao_respondidos,
-                'parq_nao_respondidos_nomes': parq_nao_respondidos_nomes,
-                'parq_com_resposta_sim': parq_com_resposta_sim,
-                'parq_com_resposta_sim_nomes': parq_com_resposta_sim_nomes,
-                'turmas': turmas_resumo,
-                'atividades_recentes': atividades[:5],
+                **painel,
+                'painel_atualizado_em': format_datetime_api(timezone.localtime(painel_atualizado_em)),
                 # Dados do gerente
                 'first_name': gerente_data.get('first_name'),
                 'last_name': gerente_data.get('last_name'),
@@ -837,7 +372,7 @@ class PainelGerenteAPIView(APIView):
                 'ativo': gerente_data.get('ativo'),
                 'id': gerente_data.get('id')
             }
-            
+
             logger.info("Dashboard do gerente gerado com sucesso")
             return Response(response_data)
 
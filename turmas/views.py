@@ -35,6 +35,17 @@ def _validar_aluno_turma(aluno, turma):
     return True, None
 
 
+# TurmaSerializer (depth=1) serializa professores/alunos com os M2M do usuário
+PREFETCH_TURMA_SERIALIZER = (
+    'dias_semana',
+    *(
+        f'{relacao}{m2m}'
+        for relacao in ('professores', 'alunos')
+        for m2m in ('', '__groups', '__user_permissions', '__dias_habilitados')
+    ),
+)
+
+
 class ListaCriarTurmasAPIView(ListCreateAPIView):
     """API para listar e criar turmas."""
     queryset = Turma.objects.all()
@@ -80,11 +91,7 @@ class ListaCriarTurmasAPIView(ListCreateAPIView):
             )
         )
 
-        queryset = queryset.select_related('ct').prefetch_related(
-            'dias_semana',
-            'professores',
-            'alunos',
-        )
+        queryset = queryset.select_related('ct').prefetch_related(*PREFETCH_TURMA_SERIALIZER)
 
         return queryset
 
@@ -145,7 +152,9 @@ class ListaAlunosTurmaAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, turma_id):
-        turma = get_object_or_404(Turma, id=turma_id)
+        turma = get_object_or_404(
+            Turma.objects.select_related('ct').prefetch_related(*PREFETCH_TURMA_SERIALIZER), id=turma_id
+        )
 
         user = request.user
         is_gerente = user.is_authenticated and getattr(user, 'tipo', None) == 'gerente'
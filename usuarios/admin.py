@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django import forms
-from .models import Usuario, PushTokenExpo
+from .models import Usuario, PushTokenExpo, CampanhaPush, EmailSaida
 
 
 class UsuarioCreationForm(forms.ModelForm):
@@ -129,7 +129,8 @@ class UsuarioAdmin(admin.ModelAdmin):
 
 @admin.register(PushTokenExpo)
 class PushTokenExpoAdmin(admin.ModelAdmin):
-    list_display = ("usuario", "token_preview", "atualizado_em")
+    list_display = ("usuario", "token_preview", "valido", "atualizado_em")
+    list_filter = ("valido",)
     search_fields = ("token", "usuario__cpf", "usuario__first_name")
     raw_id_fields = ("usuario",)
     readonly_fields = ("criado_em", "atualizado_em")
@@ -138,3 +139,25 @@ class PushTokenExpoAdmin(admin.ModelAdmin):
     def token_preview(self, obj):
         t = obj.token or ""
         return (t[:36] + "…") if len(t) > 36 else t
+
+
+@admin.register(CampanhaPush)
+class CampanhaPushAdmin(admin.ModelAdmin):
+    list_display = ("titulo", "status", "total_tokens", "tickets_ok", "tickets_erro", "recibos_erro", "tokens_removidos", "criada_em")
+    list_filter = ["status"]
+    search_fields = ("titulo",)
+    ordering = ["-criada_em"]
+    raw_id_fields = ("criada_por",)
+    readonly_fields = (
+        "worker", "iniciada_em", "enviada_em", "recibos_apos", "concluida_em", "erros", "criada_em", "atualizada_em",
+    )
+
+
+@admin.register(EmailSaida)
+class EmailSaidaAdmin(admin.ModelAdmin):
+    list_display = ("assunto", "tipo", "status", "tentativas", "criado_em", "enviado_em")
+    list_filter = ["status", "tipo"]
+    search_fields = ("assunto", "destinatarios")
+    ordering = ["-criado_em"]
+    exclude = ("anexos",)
+    readonly_fields = ("worker", "iniciado_em", "enviado_em", "erro", "criado_em", "atualizado_em")
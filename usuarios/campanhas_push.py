@@ -0,0 +1,275 @@
+"""
+Campanhas de push Expo (avisos do gerente aos alunos pelo app).
+
+A requisição do gerente só grava a campanha (CampanhaPush) e um EnvioPushExpo por token
+e responde na hora com o id. O worker `manage.py processar_campanhas_push` reserva a
+campanha com um UPDATE condicional (pendente → enviando; vários workers não enviam a
+mesma), manda os lotes de 100 em paralelo e grava os tickets. Numa passada posterior
+(EXPO_PUSH_RECIBOS_ATRASO segundos depois) consulta os recibos; tokens que voltam
+DeviceNotRegistered, no ticket ou no recibo, são apagados de PushTokenExpo.
+"""
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from app.date_api import format_datetime_api
+from usuarios.models import CampanhaPush, EnvioPushExpo, PushTokenExpo
+from usuarios.push_expo import (
+    ERRO_DISPOSITIVO_NAO_REGISTRADO,
+    MAX_MESSAGES_PER_REQUEST,
+    MAX_RECEIPT_IDS_PER_REQUEST,
+    ExpoPushError,
+    consultar_recibos,
+    enviar_lotes_em_paralelo,
+    erro_expo,
+    montar_mensagem,
+)
+
+logger = logging.getLogger(__name__)
+
+# Campanha "enviando" há mais que isso é considerada órfã (worker morto) e volta à fila;
+# só os envios ainda sem ticket são refeitos.
+TIMEOUT_ENVIO = timedelta(minutes=15)
+# A Expo guarda os recibos por 24h: depois disso a campanha é encerrada sem os que faltam
+PRAZO_RECIBOS = timedelta(hours=24)
+# Intervalo mínimo entre duas consultas de recibos da mesma campanha
+INTERVALO_MIN_RECIBOS = timedelta(minutes=1)
+# Quantos erros da Expo ficam registrados na campanha (amostra para o painel)
+MAX_ERROS_REGISTRADOS = 20
+
+
+def identificar_worker() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _atraso_recibos() -> timedelta:
+    return timedelta(seconds=float(getattr(settings, 'EXPO_PUSH_RECIBOS_ATRASO', 900) or 0))
+
+
+def criar_campanha(
+    titulo: str,
+    mensagem: str,
+    tokens: list[str],
+    criada_por=None,
+    *,
+    segmento: dict | None = None,
+    chave: str | None = None,
+) -> CampanhaPush | None:
+    """
+    Grava a campanha e seus envios; o worker faz o resto. Com `chave` (disparos
+    automáticos), não cria outra se já existir uma com a mesma chave e retorna None.
+    """
+    if chave and CampanhaPush.objects.filter(chave=chave).exists():
+        return None
+    try:
+        with transaction.atomic():
+            campanha = CampanhaPush.objects.create(
+                titulo=titulo[:200],
+                mensagem=mensagem,
+                criada_por=criada_por,
+                segmento=segmento or {'tipo': 'todos'},
+                chave=chave,
+                total_tokens=len(tokens),
+            )
+            EnvioPushExpo.objects.bulk_create(
+                [EnvioPushExpo(campanha=campanha, token=t) for t in tokens], batch_size=1000
+            )
+    except IntegrityError:
+        # Outro processo criou a mesma chave entre a checagem e o INSERT
+        if chave:
+            return None
+        raise
+    return campanha
+
+
+def _registrar_erros(campanha: CampanhaPush, erros: list[str]) -> None:
+    faltam = MAX_ERROS_REGISTRADOS - len(campanha.erros)
+    if erros and faltam > 0:
+        campanha.erros = campanha.erros + erros[:faltam]
+
+
+def _remover_tokens(tokens: set[str]) -> int:
+    if not tokens:
+        return 0
+    removidos, _ = PushTokenExpo.objects.filter(token__in=tokens).delete()
+    logger.info('Push: %s token(s) removido(s) (DeviceNotRegistered).', removidos)
+    return removidos
+
+
+def recuperar_campanhas_orfas() -> int:
+    """Devolve à fila campanhas presas em 'enviando' por um worker que morreu."""
+    return CampanhaPush.objects.filter(
+        status=CampanhaPush.STATUS_ENVIANDO,
+        iniciada_em__lt=timezone.now() - TIMEOUT_ENVIO,
+    ).update(status=CampanhaPush.STATUS_PENDENTE, atualizada_em=timezone.now())
+
+
+def reservar_proxima_campanha(worker: str) -> CampanhaPush | None:
+    """Reserva a campanha pendente mais antiga para `worker` (ou None)."""
+    for pk in CampanhaPush.objects.filter(status=CampanhaPush.STATUS_PENDENTE).order_by('id').values_list('pk', flat=True)[:10]:
+        agora = timezone.now()
+        reservada = CampanhaPush.objects.filter(pk=pk, status=CampanhaPush.STATUS_PENDENTE).update(
+            status=CampanhaPush.STATUS_ENVIANDO, worker=worker, iniciada_em=agora, atualizada_em=agora
+        )
+        if reservada:
+            return CampanhaPush.objects.get(pk=pk)
+    return None
+
+
+def enviar_campanha(campanha: CampanhaPush) -> None:
+    """Envia os envios ainda sem ticket, em lotes paralelos, e grava tickets e contadores."""
+    envios = list(campanha.envios.filter(ticket='').order_by('id'))
+    lotes = [envios[i:i + MAX_MESSAGES_PER_REQUEST] for i in range(0, len(envios), MAX_MESSAGES_PER_REQUEST)]
+    resultados = enviar_lotes_em_paralelo(
+        [[montar_mensagem(e.token, campanha.titulo, campanha.mensagem) for e in lote] for lote in lotes]
+    )
+
+    erros, nao_registrados = [], set()
+    for lote, resultado in zip(lotes, resultados):
+        if isinstance(resultado, ExpoPushError):
+            erros.append(str(resultado)[:500])
+            resultado = [{'status': 'error', 'message': str(resultado)}] * len(lote)
+        for envio, ticket in zip(lote, resultado):
+            ticket = ticket if isinstance(ticket, dict) else {'status': 'error', 'message': str(ticket)}
+            if ticket.get('status') == 'ok':
+                envio.ticket = EnvioPushExpo.SITUACAO_OK
+                envio.ticket_id = str(ticket.get('id') or '')[:100]
+                campanha.tickets_ok += 1
+            else:
+                envio.ticket = EnvioPushExpo.SITUACAO_ERRO
+                envio.erro = erro_expo(ticket)
+                campanha.tickets_erro += 1
+                erros.append(f'Ticket: {ticket.get("message", ticket)}')
+                if envio.erro == ERRO_DISPOSITIVO_NAO_REGISTRADO:
+                    nao_registrados.add(envio.token)
+    EnvioPushExpo.objects.bulk_update(envios, ['ticket', 'ticket_id', 'erro'], batch_size=500)
+
+    agora = timezone.now()
+    campanha.tokens_removidos += _remover_tokens(nao_registrados)
+    _registrar_erros(campanha, erros)
+    campanha.enviada_em = agora
+    if campanha.tickets_ok:
+        campanha.status = CampanhaPush.STATUS_AGUARDANDO_RECIBOS
+        campanha.recibos_apos = agora + _atraso_recibos()
+    else:
+        campanha.status = CampanhaPush.STATUS_FALHOU
+        campanha.concluida_em = agora
+    campanha.save()
+    logger.info(
+        'Campanha push %s: %s ticket(s) ok, %s com erro, %s token(s) removido(s).',
+        campanha.pk, campanha.tickets_ok, campanha.tickets_erro, campanha.tokens_removidos,
+    )
+
+
+def reservar_consulta_recibos() -> CampanhaPush | None:
+    """
+    Reserva a próxima campanha com recibos a consultar: empurrar recibos_apos para frente
+    com UPDATE condicional impede que dois workers consultem a mesma.
+    """
+    agora = timezone.now()
+    vencidas = CampanhaPush.objects.filter(
+        status=CampanhaPush.STATUS_AGUARDANDO_RECIBOS, recibos_apos__lte=agora
+    ).order_by('recibos_apos').values_list('pk', 'recibos_apos')[:10]
+    for pk, recibos_apos in vencidas:
+        if CampanhaPush.objects.filter(pk=pk, recibos_apos=recibos_apos).update(
+            recibos_apos=agora + max(_atraso_recibos(), INTERVALO_MIN_RECIBOS), atualizada_em=agora
+        ):
+            return CampanhaPush.objects.get(pk=pk)
+    return None
+
+
+def processar_recibos(campanha: CampanhaPush) -> None:
+    """Consulta os recibos dos tickets ok ainda sem recibo; conclui quando não faltar nenhum."""
+    pendentes = list(
+        campanha.envios.filter(ticket=EnvioPushExpo.SITUACAO_OK, recibo='').exclude(ticket_id='').order_by('id')
+    )
+    erros, nao_registrados, atualizados = [], set(), []
+    for i in range(0, len(pendentes), MAX_RECEIPT_IDS_PER_REQUEST):
+        lote = pendentes[i:i + MAX_RECEIPT_IDS_PER_REQUEST]
+        try:
+            recibos = consultar_recibos([e.ticket_id for e in lote])
+        except ExpoPushError as e:
+            logger.warning('Campanha push %s: falha ao consultar recibos: %s', campanha.pk, e)
+            continue
+        for envio in lote:
+            recibo = recibos.get(envio.ticket_id)
+            if not isinstance(recibo, dict):
+                continue  # ainda não disponível
+            if recibo.get('status') == 'ok':
+                envio.recibo = EnvioPushExpo.SITUACAO_OK
+                campanha.recibos_ok += 1
+            else:
+                envio.recibo = EnvioPushExpo.SITUACAO_ERRO
+                envio.erro = erro_expo(recibo)
+                campanha.recibos_erro += 1
+                erros.append(f'Recibo: {recibo.get("message", recibo)}')
+                if envio.erro == ERRO_DISPOSITIVO_NAO_REGISTRADO:
+                    nao_registrados.add(envio.token)
+            atualizados.append(envio)
+    EnvioPushExpo.objects.bulk_update(atualizados, ['recibo', 'erro'], batch_size=500)
+
+    campanha.tokens_removidos += _remover_tokens(nao_registrados)
+    _registrar_erros(campanha, erros)
+    faltam = len(pendentes) - len(atualizados)
+    agora = timezone.now()
+    if not faltam or (campanha.enviada_em and agora - campanha.enviada_em > PRAZO_RECIBOS):
+        campanha.status = CampanhaPush.STATUS_CONCLUIDA
+        campanha.recibos_apos = None
+        campanha.concluida_em = agora
+    update_fields = [
+        'recibos_ok', 'recibos_erro', 'tokens_removidos', 'erros', 'status', 'recibos_apos',
+        'concluida_em', 'atualizada_em',
+    ]
+    if campanha.status != CampanhaPush.STATUS_CONCLUIDA:
+        # recibos_apos já foi empurrado na reserva; não sobrescrever
+        update_fields.remove('recibos_apos')
+    campanha.save(update_fields=update_fields)
+
+
+def processar_campanhas(worker: str | None = None, limite: int | None = None) -> int:
+    """
+    Envia as campanhas pendentes e consulta os recibos vencidos até não haver mais nada
+    (ou até `limite` passos). Retorna quantos passos (envios + consultas) foram feitos.
+    """
+    worker = worker or identificar_worker()
+    recuperar_campanhas_orfas()
+    feitos = 0
+    while limite is None or feitos < limite:
+        campanha = reservar_proxima_campanha(worker)
+        if campanha is not None:
+            enviar_campanha(campanha)
+        else:
+            campanha = reservar_consulta_recibos()
+            if campanha is None:
+                break
+            processar_recibos(campanha)
+        feitos += 1
+    return feitos
+
+
+def progresso_campanha(campanha: CampanhaPush) -> dict:
+    """Resumo exibido ao gerente enquanto a campanha anda."""
+    enviados = campanha.tickets_ok + campanha.tickets_erro
+    return {
+        'id': campanha.pk,
+        'titulo': campanha.titulo,
+        'segmento': campanha.segmento,
+        'status': campanha.status,
+        'destinatarios_tokens': campanha.total_tokens,
+        'enviados': enviados,
+        'percentual': round(100 * enviados / campanha.total_tokens) if campanha.total_tokens else 100,
+        'tickets_ok': campanha.tickets_ok,
+        'tickets_erro': campanha.tickets_erro,
+        'recibos_ok': campanha.recibos_ok,
+        'recibos_erro': campanha.recibos_erro,
+        'tokens_removidos': campanha.tokens_removidos,
+        'erros': campanha.erros[:5],
+        'criada_em': format_datetime_api(campanha.criada_em),
+        'enviada_em': format_datetime_api(campanha.enviada_em) if campanha.enviada_em else None,
+        'concluida_em': format_datetime_api(campanha.concluida_em) if campanha.concluida_em else None,
+    }
@@ -0,0 +1,116 @@
+"""
+Renderização dos e-mails transacionais a partir de templates Django (usuarios/templates/emails/).
+
+Cada e-mail tem um corpo HTML (<nome>.html) e a alternativa em texto (<nome>.txt),
+renderizados com o mesmo contexto. Os templates são compilados uma vez por processo e a
+moldura (header com logo, CSS e footer, que não depende do destinatário) é renderizada
+uma vez por título e guardada como prefixo/sufixo: cada envio só renderiza o miolo.
+Assim lotes (lembretes, reenvio de convites) renderizam centenas de mensagens com pouca CPU.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+# Cores e branding do CT Supera (conforme o site)
+EMAIL_COR_PRIMARIA = "#1F6C86"      # Azul principal (navbar, títulos)
+EMAIL_COR_DESTAQUE = "#E0CC98"     # Dourado (botões)
+EMAIL_COR_FUNDO = "#f5f5f5"
+EMAIL_COR_FOOTER = "#666"
+CORES = {
+    "primaria": EMAIL_COR_PRIMARIA,
+    "destaque": EMAIL_COR_DESTAQUE,
+    "fundo": EMAIL_COR_FUNDO,
+    "footer": EMAIL_COR_FOOTER,
+}
+
+# nome do template → assunto e textos do header
+MODELOS = {
+    "convite": {
+        "assunto": "Ativação da sua conta - Sistema CT Supera",
+        "titulo_header": "Bem-vindo ao Sistema!",
+        "subtitulo": "Sua conta foi criada com sucesso",
+    },
+    "recuperacao_senha": {
+        "assunto": "Recuperação de Senha - Sistema CT Supera",
+        "titulo_header": "Recuperação de Senha",
+        "subtitulo": "Redefina sua senha com segurança",
+    },
+    "primeira_mensalidade_pix": {
+        "assunto": "Sua primeira mensalidade - Pagamento via PIX - CT Supera",
+        "titulo_header": "Primeira mensalidade - PIX",
+        "subtitulo": "Pagamento via PIX",
+    },
+    "primeira_mensalidade_boleto": {
+        "assunto": "Sua primeira mensalidade - Boleto - CT Supera",
+        "titulo_header": "Primeira mensalidade - Boleto",
+        "subtitulo": "Pagamento via Boleto",
+    },
+    "confirmacao_aula_experimental": {
+        "assunto": "Aula experimental agendada - CT Supera",
+        "titulo_header": "Aula experimental agendada",
+        "subtitulo": "Confirmação de agendamento",
+    },
+    "lembrete_aula_experimental": {
+        "assunto": "Lembrete: sua aula experimental amanhã - CT Supera",
+        "titulo_header": "Lembrete: aula experimental amanhã",
+        "subtitulo": "Não esqueça da sua aula!",
+    },
+}
+
+# Ponto da moldura onde entra o corpo de cada e-mail
+_MARCADOR_CONTEUDO = "<!--conteudo-do-email-->"
+
+
+@lru_cache(maxsize=None)
+def _get_logo_url():
+    """Retorna a URL absoluta do logo CT Supera para uso em e-mails."""
+    logo_url = getattr(settings, 'EMAIL_LOGO_URL', None)
+    if logo_url:
+        return logo_url
+    frontend_url = getattr(settings, 'FRONTEND_URL', 'https://ctsupera.com.br')
+    return f"{frontend_url.rstrip('/')}/logo-supera-principal.png"
+
+
+@lru_cache(maxsize=None)
+def _template(nome: str):
+    return get_template(f"emails/{nome}")
+
+
+@lru_cache(maxsize=64)
+def _moldura(titulo_header: str, subtitulo: str) -> tuple[str, str]:
+    """(prefixo, sufixo) do HTML da moldura, renderizados uma vez por título."""
+    html = _template("base.html").render({
+        "titulo_header": titulo_header,
+        "subtitulo": subtitulo,
+        "logo_url": _get_logo_url(),
+        "cores": CORES,
+        "conteudo": mark_safe(_MARCADOR_CONTEUDO),
+    })
+    prefixo, sufixo = html.split(_MARCADOR_CONTEUDO)
+    return prefixo, sufixo
+
+
+@receiver(setting_changed)
+def _limpar_caches(*, setting, **kwargs):
+    # override_settings nos testes (e recarga de settings) invalidam logo, templates e moldura
+    if setting in ("EMAIL_LOGO_URL", "FRONTEND_URL", "TEMPLATES"):
+        _get_logo_url.cache_clear()
+        _template.cache_clear()
+        _moldura.cache_clear()
+
+
+def renderizar_email(nome: str, contexto: dict) -> tuple[str, str, str]:
+    """
+    (assunto, texto, html) do e-mail `nome` (chave de MODELOS). Valores do contexto são
+    escapados no HTML; o texto sai sem escape.
+    """
+    modelo = MODELOS[nome]
+    contexto = {**contexto, "cores": CORES}
+    texto = _template(f"{nome}.txt").render(contexto).strip()
+    prefixo, sufixo = _moldura(modelo["titulo_header"], modelo["subtitulo"])
+    html = prefixo + _template(f"{nome}.html").render(contexto) + sufixo
+    return modelo["assunto"], texto, html
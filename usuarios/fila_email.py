@@ -0,0 +1,194 @@
+"""
+Fila de saída dos e-mails transacionais (tabela EmailSaida).
+
+A requisição só enfileira (um INSERT); o envio roda no worker
+`manage.py processar_emails`, que reserva lotes com um UPDATE condicional
+(status=pendente → enviando) e manda o lote inteiro por UMA conexão SMTP+TLS, em vez de
+abrir uma conexão por e-mail dentro da requisição. Falhas voltam para a fila com backoff
+exponencial até `max_tentativas`; destinatário recusado pelo servidor falha de vez.
+"""
+import base64
+import logging
+import os
+import smtplib
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from usuarios.models import EmailSaida
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SEGUNDOS = 60
+BACKOFF_MAX_SEGUNDOS = 60 * 60
+# E-mail "enviando" há mais que isso é considerado órfão (worker morto) e volta à fila
+TIMEOUT_ENVIO = timedelta(minutes=10)
+# Campos gravados ao fim do lote (bulk_update)
+_CAMPOS_RESULTADO = ['status', 'enviado_em', 'executar_apos', 'erro', 'atualizado_em']
+
+
+def identificar_worker() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _tamanho_lote() -> int:
+    return max(int(getattr(settings, 'EMAIL_FILA_LOTE', 50) or 1), 1)
+
+
+def enfileirar_email(
+    tipo: str,
+    assunto: str,
+    corpo_texto: str,
+    destinatarios: list[str],
+    *,
+    corpo_html: str = '',
+    anexos=(),
+) -> EmailSaida:
+    """
+    Grava o e-mail na fila. `anexos` são tuplas (nome, bytes, mimetype), guardadas em
+    base64 no JSON.
+    """
+    return EmailSaida.objects.create(
+        tipo=tipo,
+        assunto=assunto[:255],
+        remetente=settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+        corpo_texto=corpo_texto,
+        corpo_html=corpo_html or '',
+        anexos=[
+            {'nome': nome, 'conteudo_b64': base64.b64encode(conteudo).decode('ascii'), 'mimetype': mimetype}
+            for nome, conteudo, mimetype in anexos
+        ],
+    )
+
+
+def _backoff(tentativas: int) -> timedelta:
+    segundos = BACKOFF_BASE_SEGUNDOS * (2 ** max(tentativas - 1, 0))
+    return timedelta(seconds=min(segundos, BACKOFF_MAX_SEGUNDOS))
+
+
+def recuperar_emails_orfaos() -> int:
+    """Devolve à fila e-mails presos em 'enviando' por um worker que morreu."""
+    return EmailSaida.objects.filter(
+        status=EmailSaida.STATUS_ENVIANDO,
+        iniciado_em__lt=timezone.now() - TIMEOUT_ENVIO,
+    ).update(
+        status=EmailSaida.STATUS_PENDENTE,
+        executar_apos=timezone.now(),
+        atualizado_em=timezone.now(),
+    )
+
+
+def reservar_lote(worker: str, tamanho: int) -> list[EmailSaida]:
+    """Reserva até `tamanho` e-mails vencidos da fila para um lote de `worker`."""
+    agora = timezone.now()
+    candidatos = list(
+        EmailSaida.objects.filter(status=EmailSaida.STATUS_PENDENTE, executar_apos__lte=agora)
+        .order_by('executar_apos', 'id')
+        .values_list('pk', flat=True)[:tamanho]
+    )
+    if not candidatos:
+        return []
+    lote = f'{worker}:{uuid.uuid4().hex[:12]}'
+    # Outro worker pode ter levado parte dos candidatos: fica só o que este UPDATE marcou
+    EmailSaida.objects.filter(pk__in=candidatos, status=EmailSaida.STATUS_PENDENTE).update(
+        status=EmailSaida.STATUS_ENVIANDO,
+        tentativas=F('tentativas') + 1,
+        iniciado_em=agora,
+        worker=lote,
+        atualizado_em=agora,
+    )
+    return list(EmailSaida.objects.filter(worker=lote, status=EmailSaida.STATUS_ENVIANDO).order_by('id'))
+
+
+def _montar_mensagem(email: EmailSaida, conexao) -> EmailMultiAlternatives:
+    mensagem = EmailMultiAlternatives(
+        email.assunto,
+        email.corpo_texto,
+        email.remetente,
+        email.destinatarios,
+        connection=conexao,
+    )
+    if email.corpo_html:
+        mensagem.attach_alternative(email.corpo_html, 'text/html')
+    for anexo in email.anexos:
+        mensagem.attach(anexo['nome'], base64.b64decode(anexo['conteudo_b64']), anexo['mimetype'])
+    return mensagem
+
+
+def _registrar_falha(email: EmailSaida, erro: Exception) -> None:
+    definitiva = isinstance(erro, smtplib.SMTPRecipientsRefused) or email.tentativas >= email.max_tentativas
+    email.erro = f'{type(erro).__name__}: {erro}'[:2000]
+    email.atualizado_em = timezone.now()
+    if definitiva:
+        email.status = EmailSaida.STATUS_FALHOU
+    else:
+        email.status = EmailSaida.STATUS_PENDENTE
+        email.executar_apos = timezone.now() + _backoff(email.tentativas)
+    logger.warning(
+        'E-mail %s (%s) para %s falhou (tentativa %s/%s): %s',
+        email.pk, email.tipo, email.destinatarios, email.tentativas, email.max_tentativas, email.erro,
+    )
+
+
+def enviar_lote(emails: list[EmailSaida]) -> int:
+    """Envia um lote já reservado por uma única conexão SMTP. Retorna quantos foram enviados."""
+    conexao = get_connection(fail_silently=False)
+    enviados = 0
+    try:
+        conexao.open()
+    except Exception as e:
+        # Sem conexão (rede, autenticação): o lote inteiro volta para a fila
+        for email in emails:
+            _registrar_falha(email, e)
+        EmailSaida.objects.bulk_update(emails, _CAMPOS_RESULTADO)
+        return 0
+    try:
+        for email in emails:
+            try:
+                _montar_mensagem(email, conexao).send()
+            except Exception as e:
+                _registrar_falha(email, e)
+                if isinstance(e, smtplib.SMTPServerDisconnected):
+                    # O servidor derrubou a conexão no meio do lote: reabre para os próximos
+                    conexao.close()
+                    try:
+                        conexao.open()
+                    except Exception:
+                        logger.exception('Não foi possível reabrir a conexão SMTP; o restante do lote fica para depois.')
+                        break
+                continue
+            email.status = EmailSaida.STATUS_ENVIADO
+            email.enviado_em = email.atualizado_em = timezone.now()
+            email.erro = ''
+            enviados += 1
+    finally:
+        conexao.close()
+    # E-mails não tentados (conexão perdida) voltam para a fila sem backoff
+    for email in emails:
+        if email.status == EmailSaida.STATUS_ENVIANDO:
+            email.status = EmailSaida.STATUS_PENDENTE
+            email.atualizado_em = timezone.now()
+    EmailSaida.objects.bulk_update(emails, _CAMPOS_RESULTADO)
+    logger.info('Lote de e-mails: %s de %s enviado(s).', enviados, len(emails))
+    return enviados
+
+
+def processar_emails(worker: str | None = None, limite: int | None = None) -> int:
+    """Drena a fila em lotes (até esvaziar ou até `limite` e-mails). Retorna quantos foram tentados."""
+    worker = worker or identificar_worker()
+    recuperar_emails_orfaos()
+    processados = 0
+    while limite is None or processados < limite:
+        tamanho = _tamanho_lote() if limite is None else min(_tamanho_lote(), limite - processados)
+        lote = reservar_lote(worker, tamanho)
+        if not lote:
+            break
+        enviar_lote(lote)
+        processados += len(lote)
+    return processados
@@ -1,11 +1,15 @@
 """
 Comando para enviar e-mails de lembrete de aula experimental (24h antes).
 Executar diariamente via cron: python manage.py enviar_lembretes_aula_experimental
+
+Os lembretes entram na fila de saída (EmailSaida) e a fila é drenada em seguida, de modo
+que o lote inteiro sai por uma conexão SMTP (o que falhar fica com o worker processar_emails).
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 
+from usuarios.fila_email import processar_emails
 from usuarios.models import PreCadastro
 from usuarios.utils import enviar_lembrete_aula_experimental
 
@@ -19,15 +23,17 @@ class Command(BaseCommand):
             origem='aula_experimental',
             status='pendente',
             data_aula_experimental=amanha,
-        ).exclude(email='').exclude(email__isnull=True).exclude(email='pendente')
+        ).exclude(email='').exclude(email__isnull=True).exclude(email='pendente').select_related('turma__ct').prefetch_related('turma__dias_semana')
 
-        enviados = 0
+        enfileirados = 0
         for p in precadastros:
             if enviar_lembrete_aula_experimental(p):
-                enviados += 1
+                enfileirados += 1
+        processados = processar_emails() if enfileirados else 0
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'{enviados} lembrete(s) enviado(s) para aula experimental em {amanha.strftime("%d/%m/%Y")}.'
+                f'{enfileirados} lembrete(s) de aula experimental em {amanha.strftime("%d/%m/%Y")} enfileirado(s); '
+                f'{processados} e-mail(s) processado(s) da fila.'
             )
         )
@@ -0,0 +1,38 @@
+"""
+Comando para criar as campanhas push "sua aula começa em breve".
+Executar via cron a cada --janela minutos: python manage.py enviar_lembretes_aula_push
+(o envio em si é do worker processar_campanhas_push).
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from usuarios.segmentos_push import lembrar_aulas_em_breve
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria uma campanha push por turma que começa daqui a --antecedencia minutos, para os '
+        'alunos que ainda não fizeram check-in. Idempotente por turma/dia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--antecedencia', type=int, default=120, help='Minutos antes do início da aula (default: 120).'
+        )
+        parser.add_argument(
+            '--janela',
+            type=int,
+            default=15,
+            help='Minutos cobertos por execução; use o mesmo intervalo do cron (default: 15).',
+        )
+
+    def handle(self, *args, **options):
+        campanhas = lembrar_aulas_em_breve(
+            antecedencia=timedelta(minutes=options['antecedencia']),
+            janela=timedelta(minutes=options['janela']),
+        )
+        destinatarios = sum(c.total_tokens for c in campanhas)
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(campanhas)} lembrete(s) de aula criado(s) para {destinatarios} dispositivo(s).')
+        )
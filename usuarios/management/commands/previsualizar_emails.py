@@ -0,0 +1,84 @@
+"""
+Pré-visualização e benchmark dos e-mails transacionais (templates em usuarios/templates/emails/).
+
+    python manage.py previsualizar_emails --saida /tmp/emails          # grava <nome>.html/.txt
+    python manage.py previsualizar_emails --modelo convite --benchmark 1000
+"""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from usuarios.emails import MODELOS, renderizar_email
+
+_TURMA = {"ct": "CT Praia", "horario": "07:00", "dias": "Segunda-feira, Quarta-feira"}
+_LINK = "https://ctsupera.com.br/ativar-conta/MTIz/abc123-def456/"
+_REAGENDAR = "https://ctsupera.com.br/agendamento/reagendar?token=1%3Aabc"
+
+# Contextos de exemplo (mesmas chaves que usuarios.utils monta para cada e-mail)
+EXEMPLOS = {
+    "convite": {"nome": "Maria", "link": _LINK},
+    "recuperacao_senha": {"nome": "Maria", "link": _LINK},
+    "primeira_mensalidade_pix": {
+        "nome": "Maria Souza", "valor": "R$ 160,00", "vencimento": "10/03/2030",
+        "codigo_pix": "00020101021226880014br.gov.bcb.pix2566qrcodes.exemplo/v2/cobv/abc5204000053039865802BR6304ABCD",
+        "qr_base64": "",
+    },
+    "primeira_mensalidade_boleto": {
+        "nome": "Maria Souza", "valor": "R$ 160,00", "vencimento": "10/03/2030",
+        "linha_digitavel": "33690.00009 00000.000000 00000.000000 1 00000000016000", "tem_pdf": True,
+    },
+    "confirmacao_aula_experimental": {
+        "nome": "João", "data": "10/03/2030", "turma": _TURMA, "link_reagendar": _REAGENDAR,
+    },
+    "lembrete_aula_experimental": {
+        "nome": "João", "data": "10/03/2030", "turma": _TURMA, "link_reagendar": _REAGENDAR,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Renderiza os e-mails transacionais com dados de exemplo: grava o HTML e o texto '
+        '(--saida) e/ou mede o tempo de renderização (--benchmark N).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelo', action='append', choices=sorted(MODELOS),
+            help='E-mail a renderizar (pode repetir; padrão: todos).',
+        )
+        parser.add_argument('--saida', help='Diretório onde gravar <nome>.html e <nome>.txt.')
+        parser.add_argument('--benchmark', type=int, default=0, help='Renderizações por e-mail para medir o tempo.')
+
+    def handle(self, *args, **options):
+        modelos = options['modelo'] or list(MODELOS)
+        if options['benchmark'] < 0:
+            raise CommandError('--benchmark deve ser >= 0.')
+
+        saida = Path(options['saida']) if options['saida'] else None
+        if saida:
+            saida.mkdir(parents=True, exist_ok=True)
+        for nome in modelos:
+            assunto, texto, html = renderizar_email(nome, EXEMPLOS[nome])
+            if saida:
+                (saida / f'{nome}.html').write_text(html, encoding='utf-8')
+                (saida / f'{nome}.txt').write_text(f'Assunto: {assunto}\n\n{texto}\n', encoding='utf-8')
+            self.stdout.write(f'{nome}: "{assunto}" ({len(html)} bytes HTML, {len(texto)} bytes texto)')
+
+        if saida:
+            self.stdout.write(self.style.SUCCESS(f'Pré-visualizações gravadas em {saida}.'))
+
+        vezes = options['benchmark']
+        if not vezes:
+            return
+        # A primeira renderização (acima) já compilou os templates e a moldura
+        for nome in modelos:
+            inicio = time.perf_counter()
+            for _ in range(vezes):
+                renderizar_email(nome, EXEMPLOS[nome])
+            decorrido = time.perf_counter() - inicio
+            self.stdout.write(
+                f'{nome}: {vezes} renderizações em {decorrido * 1000:.1f} ms '
+                f'({decorrido / vezes * 1_000_000:.0f} µs/e-mail)'
+            )
@@ -0,0 +1,41 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from usuarios.campanhas_push import identificar_worker, processar_campanhas
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker das campanhas de push Expo (CampanhaPush): envia as campanhas pendentes e, '
+        'depois de EXPO_PUSH_RECIBOS_ATRASO, consulta os recibos e remove tokens mortos. '
+        'Fica em laço consultando a fila; use --uma-vez para drenar e sair (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true', help='Drena a fila uma vez e sai.')
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre consultas quando a fila está vazia (default: 5).',
+        )
+
+    def handle(self, *args, **options):
+        worker = identificar_worker()
+        if options['uma_vez']:
+            total = processar_campanhas(worker)
+            self.stdout.write(self.style.SUCCESS(f'{total} passo(s) de campanha executado(s).'))
+            return
+
+        parar = []
+        signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+        self.stdout.write(f'Worker {worker} aguardando campanhas de push...')
+        try:
+            while not parar:
+                if not processar_campanhas(worker, limite=10):
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Worker {worker} encerrado.')
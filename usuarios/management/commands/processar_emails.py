@@ -0,0 +1,41 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from usuarios.fila_email import identificar_worker, processar_emails
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker da fila de e-mails transacionais (EmailSaida): envia em lotes de EMAIL_FILA_LOTE '
+        'por uma conexão SMTP cada, com novas tentativas em backoff. '
+        'Fica em laço consultando a fila; use --uma-vez para drenar e sair (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true', help='Drena a fila uma vez e sai.')
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre consultas quando a fila está vazia (default: 5).',
+        )
+
+    def handle(self, *args, **options):
+        worker = identificar_worker()
+        if options['uma_vez']:
+            total = processar_emails(worker)
+            self.stdout.write(self.style.SUCCESS(f'{total} e-mail(s) processado(s).'))
+            return
+
+        parar = []
+        signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+        self.stdout.write(f'Worker {worker} aguardando e-mails...')
+        try:
+            while not parar:
+                if not processar_emails(worker, limite=200):
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Worker {worker} encerrado.')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from usuarios.models import PushTokenExpo
+from usuarios.push_expo import token_expo_formato_valido
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula PushTokenExpo.valido (formato aceito pela Expo) dos tokens já gravados. "
+        "A migração 0035 já preenche a coluna e novos tokens são marcados ao registrar; use para "
+        "rechecar após mudar o formato ou gravar tokens em lote (bulk_create)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Tokens por UPDATE em lote (padrão 1000).")
+
+    def handle(self, *args, **options):
+        lote = max(options["lote"], 1)
+        alterados, pendentes, total = 0, [], 0
+        for push_token in PushTokenExpo.objects.only("id", "token", "valido").order_by("id").iterator(chunk_size=lote):
+            total += 1
+            valido = token_expo_formato_valido(push_token.token)
+            if push_token.valido != valido:
+                push_token.valido = valido
+                pendentes.append(push_token)
+            if len(pendentes) >= lote:
+                alterados += PushTokenExpo.objects.bulk_update(pendentes, ["valido"])
+                pendentes = []
+        if pendentes:
+            alterados += PushTokenExpo.objects.bulk_update(pendentes, ["valido"])
+        self.stdout.write(self.style.SUCCESS(f"{total} token(s) verificado(s), {alterados} atualizado(s)."))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:38
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizar_texto_busca(valor):
+    """Cópia de usuarios.utils.normalizar_texto_busca na data da migração."""
+    if not valor:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(valor))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def preencher_busca(apps, schema_editor):
+    """Mesmo valor de Usuario.texto_busca() para os usuários existentes."""
+    Usuario = apps.get_model("usuarios", "Usuario")
+    lote = []
+    for usuario in Usuario.objects.only("id", "first_name", "last_name", "cpf", "email").iterator():
+        usuario.busca = normalizar_texto_busca(
+            " ".join(str(v or "") for v in (usuario.first_name, usuario.last_name, usuario.cpf, usuario.email))
+        )[:400]
+        lote.append(usuario)
+        if len(lote) >= 500:
+            Usuario.objects.bulk_update(lote, ["busca"])
+            lote = []
+    Usuario.objects.bulk_update(lote, ["busca"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0031_usuario_suspensao_contrato'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuario',
+            name='busca',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, help_text='Nome, CPF e e-mail normalizados (minúsculas, sem acento) para a busca do diretório.', max_length=400),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0032_usuario_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampanhaPush',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(max_length=200)),
+                ('mensagem', models.TextField()),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviando', 'Enviando'), ('aguardando_recibos', 'Aguardando recibos'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('total_tokens', models.PositiveIntegerField(default=0)),
+                ('tickets_ok', models.PositiveIntegerField(default=0)),
+                ('tickets_erro', models.PositiveIntegerField(default=0)),
+                ('recibos_ok', models.PositiveIntegerField(default=0)),
+                ('recibos_erro', models.PositiveIntegerField(default=0)),
+                ('tokens_removidos', models.PositiveIntegerField(default=0)),
+                ('erros', models.JSONField(blank=True, default=list)),
+                ('worker', models.CharField(blank=True, default='', max_length=120)),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('enviada_em', models.DateTimeField(blank=True, null=True)),
+                ('recibos_apos', models.DateTimeField(blank=True, null=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('atualizada_em', models.DateTimeField(auto_now=True)),
+                ('criada_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='campanhas_push', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Campanha push',
+                'verbose_name_plural': 'Campanhas push',
+            },
+        ),
+        migrations.CreateModel(
+            name='EnvioPushExpo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=512)),
+                ('ticket_id', models.CharField(blank=True, default='', max_length=100)),
+                ('ticket', models.CharField(blank=True, choices=[('ok', 'Ok'), ('erro', 'Erro')], default='', max_length=4)),
+                ('recibo', models.CharField(blank=True, choices=[('ok', 'Ok'), ('erro', 'Erro')], default='', max_length=4)),
+                ('erro', models.CharField(blank=True, default='', max_length=200)),
+                ('campanha', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='envios', to='usuarios.campanhapush')),
+            ],
+            options={
+                'verbose_name': 'Envio push Expo',
+                'verbose_name_plural': 'Envios push Expo',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='campanhapush',
+            index=models.Index(fields=['status', 'recibos_apos'], name='campanha_push_fila_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enviopushexpo',
+            index=models.Index(fields=['campanha', 'ticket', 'recibo'], name='envio_push_situacao_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='enviopushexpo',
+            constraint=models.UniqueConstraint(fields=('campanha', 'token'), name='uniq_envio_push_campanha_token'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0033_campanhas_push'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campanhapush',
+            name='chave',
+            field=models.CharField(blank=True, max_length=120, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='campanhapush',
+            name='segmento',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:05
+
+import re
+
+from django.db import migrations, models
+
+# Cópia do formato de usuarios.push_expo na data da migração
+_EXPO_PUSH_TOKEN_RE = re.compile(r"^(?:ExponentPushToken|ExpoPushToken)\[([A-Za-z0-9_-]{20,})\]\s*$")
+
+
+def marcar_validos(apps, schema_editor):
+    """Preenche `valido` dos tokens existentes; o comando validar_tokens_push refaz a checagem."""
+    PushTokenExpo = apps.get_model("usuarios", "PushTokenExpo")
+    validos = [
+        pk for pk, token in PushTokenExpo.objects.values_list("id", "token").iterator()
+        if _EXPO_PUSH_TOKEN_RE.match((token or "").strip())
+    ]
+    for i in range(0, len(validos), 500):
+        PushTokenExpo.objects.filter(pk__in=validos[i:i + 500]).update(valido=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0034_campanha_push_segmento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pushtokenexpo',
+            name='valido',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='pushtokenexpo',
+            index=models.Index(fields=['valido', 'usuario'], name='push_token_valido_idx'),
+        ),
+        migrations.RunPython(marcar_validos, migrations.RunPython.noop),
+    ]
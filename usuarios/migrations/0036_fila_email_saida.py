@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0035_push_token_valido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailSaida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('convite', 'Convite de ativação'), ('recuperacao_senha', 'Recuperação de senha'), ('primeira_mensalidade', 'Primeira mensalidade'), ('confirmacao_aula_experimental', 'Confirmação de aula experimental'), ('lembrete_aula_experimental', 'Lembrete de aula experimental')], max_length=40)),
+                ('assunto', models.CharField(max_length=255)),
+                ('remetente', models.CharField(max_length=255)),
+                ('destinatarios', models.JSONField(default=list)),
+                ('corpo_texto', models.TextField()),
+                ('corpo_html', models.TextField(blank=True, default='')),
+                ('anexos', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('falhou', 'Falhou')], default='pendente', max_length=10)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('max_tentativas', models.PositiveSmallIntegerField(default=5)),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now)),
+                ('worker', models.CharField(blank=True, default='', max_length=120)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('enviado_em', models.DateTimeField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True, default='')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'E-mail de saída',
+                'verbose_name_plural': 'E-mails de saída',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['status', 'executar_apos'], name='email_saida_fila_idx')],
+            },
+        ),
+    ]
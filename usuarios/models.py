@@ -7,7 +7,8 @@ from django.core.mail import send_mail
 from django.core.validators import RegexValidator
 from ct.models import CentroDeTreinamento
 import logging
-from usuarios.utils import enviar_convite_aluno
+from usuarios.utils import enviar_convite_aluno, normalizar_texto_busca
+from usuarios.push_expo import token_expo_formato_valido
 from financeiro.dias_uteis import proximo_dia_util_br
 
 logger = logging.getLogger(__name__)
@@ -224,6 +225,14 @@ class Usuario(AbstractUser):
     telefone = models.CharField(max_length=20, blank=True, null=True)
     cpf = models.CharField(max_length=11, unique=True, blank=False, null=False)
     endereco = models.CharField(max_length=255, blank=True, null=True)
+    busca = models.CharField(
+        max_length=400,
+        blank=True,
+        default='',
+        db_index=True,
+        editable=False,
+        help_text='Nome, CPF e e-mail normalizados (minúsculas, sem acento) para a busca do diretório.',
+    )
     ativo = models.BooleanField(default=True)  # 🔹 Para ativação/inativação rápida
     data_inativacao = models.DateField(
         null=True,
@@ -458,12 +467,24 @@ class Usuario(AbstractUser):
             raise ValidationError({"telefone_emergencia": "Alunos maiores de idade devem ter um telefone de emergência."})
 
 
+    CAMPOS_BUSCA = ("first_name", "last_name", "cpf", "email")
+
+    def texto_busca(self) -> str:
+        """Valor de ``busca``: começa pelo nome, então ordenar por ele é ordem alfabética."""
+        return normalizar_texto_busca(
+            " ".join(str(getattr(self, campo) or "") for campo in self.CAMPOS_BUSCA)
+        )[:400]
+
     def save(self, *args, **kwargs):
-        """Remove pontos do CPF e define `username` baseado nele."""
+        """Remove pontos do CPF, define `username` baseado nele e atualiza `busca`."""
         self.cpf = self.cpf.replace(".", "").replace("-", "")  # 🔹 Remove pontos e traços ao salvar
         if not self.username:
             self.username = self.cpf  # 🔹 Usa CPF sem pontos como `username`
-        
+        self.busca = self.texto_busca()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(update_fields) & set(self.CAMPOS_BUSCA):
+            kwargs["update_fields"] = {*update_fields, "busca"}
+
         super().save(*args, **kwargs)
 
     def reativar_para_reingresso(
@@ -547,14 +568,171 @@ class PushTokenExpo(models.Model):
     )
     # Tokens Expo podem passar de 255 caracteres; truncar quebrava o registro silenciosamente no BD.
     token = models.CharField(max_length=512, unique=True)
+    # Formato aceito pela Expo, calculado ao salvar: as estatísticas contam pelo índice, sem regex
+    valido = models.BooleanField(default=False, editable=False)
     atualizado_em = models.DateTimeField(auto_now=True)
     criado_em = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = "Token push Expo"
         verbose_name_plural = "Tokens push Expo"
+        indexes = [
+            models.Index(fields=["valido", "usuario"], name="push_token_valido_idx"),
+        ]
 
     def __str__(self):
         return f"{self.usuario_id} — {self.token[:24]}…"
 
+    def save(self, *args, **kwargs):
+        """Atualiza `valido` a partir do token (bulk_create/update não passam por aqui)."""
+        self.valido = token_expo_formato_valido(self.token)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "token" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "valido"}
+        super().save(*args, **kwargs)
+
+
+class CampanhaPush(models.Model):
+    """
+    Aviso do gerente aos alunos pelo app (push Expo), enviado em segundo plano.
+
+    A requisição do gerente só grava a campanha e um EnvioPushExpo por token; o worker
+    `manage.py processar_campanhas_push` envia os lotes em paralelo e, depois de
+    EXPO_PUSH_RECIBOS_ATRASO segundos, consulta os recibos da Expo. Tokens que voltam
+    DeviceNotRegistered são apagados de PushTokenExpo.
+    """
+    STATUS_PENDENTE = 'pendente'
+    STATUS_ENVIANDO = 'enviando'
+    STATUS_AGUARDANDO_RECIBOS = 'aguardando_recibos'
+    STATUS_CONCLUIDA = 'concluida'
+    STATUS_FALHOU = 'falhou'
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Pendente'),
+        (STATUS_ENVIANDO, 'Enviando'),
+        (STATUS_AGUARDANDO_RECIBOS, 'Aguardando recibos'),
+        (STATUS_CONCLUIDA, 'Concluída'),
+        (STATUS_FALHOU, 'Falhou'),
+    ]
+
+    titulo = models.CharField(max_length=200)
+    mensagem = models.TextField()
+    criada_por = models.ForeignKey(
+        Usuario, on_delete=models.SET_NULL, null=True, blank=True, related_name='campanhas_push'
+    )
+    # Público: {'tipo': 'turma', 'valor': 3}, {'tipo': 'lembrete_aula', ...} (usuarios.segmentos_push)
+    segmento = models.JSONField(default=dict, blank=True)
+    # Idempotência dos disparos automáticos (ex.: lembrete_aula:<turma>:<data>); nulo nos avisos manuais
+    chave = models.CharField(max_length=120, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDENTE)
+    total_tokens = models.PositiveIntegerField(default=0)
+    tickets_ok = models.PositiveIntegerField(default=0)
+    tickets_erro = models.PositiveIntegerField(default=0)
+    recibos_ok = models.PositiveIntegerField(default=0)
+    recibos_erro = models.PositiveIntegerField(default=0)
+    tokens_removidos = models.PositiveIntegerField(default=0)
+    # Primeiros erros da Expo (amostra para o painel/admin)
+    erros = models.JSONField(default=list, blank=True)
+    worker = models.CharField(max_length=120, blank=True, default='')
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    enviada_em = models.DateTimeField(null=True, blank=True)
+    # Próxima consulta de recibos (a Expo só os disponibiliza alguns minutos após o envio)
+    recibos_apos = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+    criada_em = models.DateTimeField(auto_now_add=True)
+    atualizada_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Campanha push"
+        verbose_name_plural = "Campanhas push"
+        indexes = [models.Index(fields=['status', 'recibos_apos'], name='campanha_push_fila_idx')]
+
+    def __str__(self):
+        return f"{self.titulo} ({self.get_status_display()})"
 
+
+class EnvioPushExpo(models.Model):
+    """Um token de uma campanha: ticket devolvido no envio e, depois, o recibo da Expo."""
+    SITUACAO_OK = 'ok'
+    SITUACAO_ERRO = 'erro'
+    SITUACAO_CHOICES = [(SITUACAO_OK, 'Ok'), (SITUACAO_ERRO, 'Erro')]
+
+    campanha = models.ForeignKey(CampanhaPush, on_delete=models.CASCADE, related_name='envios')
+    # Texto, não FK: o PushTokenExpo pode ser apagado (DeviceNotRegistered) com o histórico mantido
+    token = models.CharField(max_length=512)
+    ticket_id = models.CharField(max_length=100, blank=True, default='')
+    ticket = models.CharField(max_length=4, choices=SITUACAO_CHOICES, blank=True, default='')
+    recibo = models.CharField(max_length=4, choices=SITUACAO_CHOICES, blank=True, default='')
+    erro = models.CharField(max_length=200, blank=True, default='')
+
+    class Meta:
+        verbose_name = "Envio push Expo"
+        verbose_name_plural = "Envios push Expo"
+        constraints = [
+            models.UniqueConstraint(fields=['campanha', 'token'], name='uniq_envio_push_campanha_token'),
+        ]
+        indexes = [models.Index(fields=['campanha', 'ticket', 'recibo'], name='envio_push_situacao_idx')]
+
+    def __str__(self):
+        return f"{self.campanha_id} — {self.token[:24]}…"
+
+
+class EmailSaida(models.Model):
+    """
+    E-mail transacional na fila de saída (convite, recuperação de senha, aula experimental...).
+
+    A requisição só grava a linha (usuarios.fila_email.enfileirar_email); o worker
+    `manage.py processar_emails` reserva lotes e envia cada lote por UMA conexão SMTP,
+    com novas tentativas em backoff exponencial e o status de entrega registrado aqui.
+    """
+    TIPO_CONVITE = 'convite'
+    TIPO_RECUPERACAO_SENHA = 'recuperacao_senha'
+    TIPO_PRIMEIRA_MENSALIDADE = 'primeira_mensalidade'
+    TIPO_CONFIRMACAO_AULA_EXPERIMENTAL = 'confirmacao_aula_experimental'
+    TIPO_LEMBRETE_AULA_EXPERIMENTAL = 'lembrete_aula_experimental'
+    TIPO_CHOICES = [
+        (TIPO_CONVITE, 'Convite de ativação'),
+        (TIPO_RECUPERACAO_SENHA, 'Recuperação de senha'),
+        (TIPO_PRIMEIRA_MENSALIDADE, 'Primeira mensalidade'),
+        (TIPO_CONFIRMACAO_AULA_EXPERIMENTAL, 'Confirmação de aula experimental'),
+        (TIPO_LEMBRETE_AULA_EXPERIMENTAL, 'Lembrete de aula experimental'),
+    ]
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_ENVIANDO = 'enviando'
+    STATUS_ENVIADO = 'enviado'
+    STATUS_FALHOU = 'falhou'
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Pendente'),
+        (STATUS_ENVIANDO, 'Enviando'),
+        (STATUS_ENVIADO, 'Enviado'),
+        (STATUS_FALHOU, 'Falhou'),
+    ]
+
+    tipo = models.CharField(max_length=40, choices=TIPO_CHOICES)
+    assunto = models.CharField(max_length=255)
+    remetente = models.CharField(max_length=255)
+    destinatarios = models.JSONField(default=list)
+    corpo_texto = models.TextField()
+    corpo_html = models.TextField(blank=True, default='')
+    # [{'nome': ..., 'conteudo_b64': ..., 'mimetype': ...}] (QR Code PIX, PDF do boleto)
+    anexos = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDENTE)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    max_tentativas = models.PositiveSmallIntegerField(default=5)
+    executar_apos = models.DateTimeField(default=django_timezone.now)
+    # Identifica o lote que reservou o e-mail (worker + id do lote)
+    worker = models.CharField(max_length=120, blank=True, default='')
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+    erro = models.TextField(blank=True, default='')
+    criado_em = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "E-mail de saída"
+        verbose_name_plural = "E-mails de saída"
+        ordering = ['-criado_em']
+        indexes = [models.Index(fields=['status', 'executar_apos'], name='email_saida_fila_idx')]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} → {', '.join(self.destinatarios)} ({self.get_status_display()})"
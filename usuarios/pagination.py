@@ -0,0 +1,16 @@
+"""
+Paginação do diretório de usuários: cursor (keyset) sobre ``Usuario.busca``.
+
+Cada página é um ``WHERE busca > <cursor>`` pelo índice, sem OFFSET/COUNT; o custo não
+cresce com a página. ``next``/``previous`` na resposta já trazem o cursor.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class DiretorioUsuariosPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    # busca começa pelo nome normalizado: ordem alfabética; id desempata homônimos
+    ordering = ("busca", "id")
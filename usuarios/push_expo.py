@@ -1,18 +1,37 @@
 """
 Envio de notificações push via Expo Push Service (app React Native / Expo).
 Documentação: https://docs.expo.dev/push-notifications/sending-notifications/
+
+Só o transporte: lotes de até 100 mensagens enviados em paralelo (limite de threads em
+EXPO_PUSH_WORKERS) por uma sessão keep-alive do processo, corpo em gzip, e consulta de
+recibos. A campanha (persistência, progresso, limpeza de tokens) fica em
+usuarios.campanhas_push.
 """
+import gzip
+import json
 import logging
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
 # Lote máximo recomendado pela Expo por requisição
 MAX_MESSAGES_PER_REQUEST = 100
+MAX_RECEIPT_IDS_PER_REQUEST = 1000
+# Corpos maiores que isso vão comprimidos (mesmo limiar do SDK oficial da Expo)
+GZIP_MIN_BYTES = 1024
+HTTP_TIMEOUT = 30
+# Aparelho desinstalou o app / token expirou: o token deve ser descartado
+ERRO_DISPOSITIVO_NAO_REGISTRADO = "DeviceNotRegistered"
 
 # O ID entre colchetes em tokens reais é longo (opaque); placeholders tipo
 # ExponentPushToken[teste-curl] passam no prefixo mas a Expo rejeita no envio.
@@ -20,98 +39,111 @@ _EXPO_PUSH_TOKEN_RE = re.compile(
     r"^(?:ExponentPushToken|ExpoPushToken)\[([A-Za-z0-9_-]{20,})\]\s*$"
 )
 
+_sessao = None
+_sessao_pid = None
+_sessao_lock = threading.Lock()
+
+
+class ExpoPushError(Exception):
+    """Falha da requisição inteira (rede, HTTP, resposta não-JSON ou "errors" da API)."""
+
 
 def token_expo_formato_valido(s: str) -> bool:
     """True se o token segue o formato Expo (evita strings de teste/curl salvas no BD)."""
     return bool(_EXPO_PUSH_TOKEN_RE.match((s or "").strip()))
 
 
-def enviar_lote_expo_push(tokens: list[str], titulo: str, corpo: str) -> dict[str, Any]:
+def _workers() -> int:
+    return max(int(getattr(settings, "EXPO_PUSH_WORKERS", 4) or 1), 1)
+
+
+def _sessao_http() -> requests.Session:
+    """Sessão keep-alive do processo (recriada num processo filho após fork)."""
+    global _sessao, _sessao_pid
+    if _sessao is None or _sessao_pid != os.getpid():
+        with _sessao_lock:
+            if _sessao is None or _sessao_pid != os.getpid():
+                sessao = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_workers(), max_retries=0)
+                sessao.mount("https://", adapter)
+                _sessao, _sessao_pid = sessao, os.getpid()
+    return _sessao
+
+
+def montar_mensagem(token: str, titulo: str, corpo: str) -> dict:
+    # Payload mínimo: "priority" inválido já gerou 400 na Expo em alguns ambientes.
+    # channelId alinha com setNotificationChannelAsync('default') no app Android; sound ajuda iOS.
+    return {
+        "to": token,
+        "title": (titulo or "")[:200],
+        "body": (corpo or "")[:2000],
+        "sound": "default",
+        "channelId": "default",
+    }
+
+
+def _post_expo(url: str, payload: Any) -> Any:
+    corpo = json.dumps(payload).encode("utf-8")
+    headers = {
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Content-Type": "application/json",
+    }
+    if len(corpo) > GZIP_MIN_BYTES:
+        corpo = gzip.compress(corpo)
+        headers["Content-Encoding"] = "gzip"
+    try:
+        r = _sessao_http().post(url, data=corpo, headers=headers, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        raise ExpoPushError(str(e)) from e
+    try:
+        data = r.json()
+    except ValueError:
+        raise ExpoPushError(f"Resposta não-JSON da Expo (HTTP {r.status_code}): {(r.text or '')[:500]}")
+    # Falha global da requisição (campo "errors" no JSON)
+    if isinstance(data, dict) and data.get("errors"):
+        raise ExpoPushError(f"Expo API: {data.get('errors')}")
+    if r.status_code != 200:
+        raise ExpoPushError(f"HTTP {r.status_code}: {data}")
+    return data
+
+
+def enviar_mensagens(mensagens: list[dict]) -> list:
+    """Envia um lote (até 100) e devolve os push tickets, na ordem das mensagens."""
+    data = _post_expo(EXPO_PUSH_URL, mensagens)
+    # Resposta: { "data": [ push tickets ] }
+    if isinstance(data, dict) and "data" in data:
+        return data["data"]
+    return data if isinstance(data, list) else [data]
+
+
+def enviar_lotes_em_paralelo(lotes: list[list[dict]]) -> list:
     """
-    Envia a mesma notificação para vários tokens Expo.
-    Retorna dict com: resultados, erros, tickets_ok (int), tickets_erro (int).
+    Envia vários lotes com até EXPO_PUSH_WORKERS requisições simultâneas. Devolve, na
+    ordem dos lotes, a lista de tickets ou a ExpoPushError daquele lote.
     """
-    tokens = [t.strip() for t in tokens if t and token_expo_formato_valido(str(t))]
-    if not tokens:
-        return {
-            "erros": ["Nenhum token Expo válido no banco (formato esperado: ExponentPushToken[...])."],
-            "resultados": [],
-            "tickets_ok": 0,
-            "tickets_erro": 0,
-        }
-
-    titulo = (titulo or "")[:200]
-    corpo = (corpo or "")[:2000]
-
-    resultados: list = []
-    erros: list[str] = []
-    tickets_ok = 0
-    tickets_erro = 0
-
-    for i in range(0, len(tokens), MAX_MESSAGES_PER_REQUEST):
-        chunk = tokens[i : i + MAX_MESSAGES_PER_REQUEST]
-        # Payload mínimo: "priority" inválido já gerou 400 na Expo em alguns ambientes.
-        # channelId alinha com setNotificationChannelAsync('default') no app Android; sound ajuda iOS.
-        messages = [
-            {
-                "to": t,
-                "title": titulo,
-                "body": corpo,
-                "sound": "default",
-                "channelId": "default",
-            }
-            for t in chunk
-        ]
+
+    def enviar(mensagens):
         try:
-            r = requests.post(
-                EXPO_PUSH_URL,
-                json=messages,
-                headers={"Accept": "application/json", "Content-Type": "application/json"},
-                timeout=90,
-            )
-            try:
-                data = r.json()
-            except ValueError:
-                snippet = (r.text or "")[:500]
-                erros.append(f"Resposta não-JSON da Expo (HTTP {r.status_code}): {snippet}")
-                continue
-
-            # Falha global da requisição (campo "errors" no JSON)
-            if isinstance(data, dict) and data.get("errors"):
-                erros.append(f"Expo API: {data.get('errors')}")
-                continue
-
-            if r.status_code != 200:
-                erros.append(f"HTTP {r.status_code}: {data}")
-                continue
-
-            # Resposta: { "data": [ push tickets ] }
-            chunk_results: list
-            if isinstance(data, dict) and "data" in data:
-                chunk_results = data["data"]
-            elif isinstance(data, list):
-                chunk_results = data
-            else:
-                chunk_results = [data]
-
-            resultados.extend(chunk_results)
-            for ticket in chunk_results:
-                if isinstance(ticket, dict):
-                    if ticket.get("status") == "ok":
-                        tickets_ok += 1
-                    else:
-                        tickets_erro += 1
-                        msg = ticket.get("message", ticket)
-                        erros.append(f"Ticket: {msg}")
-                else:
-                    tickets_erro += 1
-        except requests.RequestException as e:
-            logger.exception("Falha ao chamar Expo Push API")
-            erros.append(str(e))
+            return enviar_mensagens(mensagens)
+        except ExpoPushError as e:
+            logger.warning("Falha ao enviar lote de %s push(es) à Expo: %s", len(mensagens), e)
+            return e
 
-    return {
-        "resultados": resultados,
-        "erros": erros,
-        "tickets_ok": tickets_ok,
-        "tickets_erro": tickets_erro,
-    }
+    if len(lotes) <= 1:
+        return [enviar(lote) for lote in lotes]
+    with ThreadPoolExecutor(max_workers=min(_workers(), len(lotes))) as executor:
+        return list(executor.map(enviar, lotes))
+
+
+def consultar_recibos(ids: list[str]) -> dict[str, dict]:
+    """Recibos dos tickets `ids` (até 1000); ids ainda sem recibo não aparecem."""
+    data = _post_expo(EXPO_RECEIPTS_URL, {"ids": ids})
+    recibos = data.get("data") if isinstance(data, dict) else None
+    return recibos if isinstance(recibos, dict) else {}
+
+
+def erro_expo(item: dict) -> str:
+    """Código de erro de um ticket/recibo (ex.: DeviceNotRegistered), ou a mensagem."""
+    detalhes = item.get("details") if isinstance(item.get("details"), dict) else {}
+    return str(detalhes.get("error") or item.get("message") or item)[:200]
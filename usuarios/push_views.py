@@ -3,13 +3,18 @@ APIs para registro de token push (Expo) e envio de avisos a alunos pelo app.
 """
 import logging
 
+from django.db.models import Count, Q
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from usuarios.models import PushTokenExpo
-from usuarios.push_expo import enviar_lote_expo_push, token_expo_formato_valido
+from usuarios.campanhas_push import criar_campanha, progresso_campanha
+from usuarios.segmentos_push import SEGMENTO_TODOS, SegmentoInvalido, tokens_do_segmento
+from usuarios.models import CampanhaPush, PushTokenExpo
+from usuarios.push_expo import token_expo_formato_valido
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +50,8 @@ class RegistrarPushTokenExpoAPIView(APIView):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        # Um token pertence a um aparelho; reatribui se já existir (troca de usuário no mesmo aparelho é raro)
+        # Um token pertence a um aparelho; reatribui se já existir (troca de usuário no mesmo aparelho é raro).
+        # O save() marca `valido`, usado pelas estatísticas do painel.
         try:
             PushTokenExpo.objects.update_or_create(
                 token=token,
@@ -85,35 +91,32 @@ class NotificacaoAppEstatisticasAPIView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
         # Todos os alunos com token (inclui conta Django inativa e aluno “inativo” no CT),
-        # para o painel refletir o mesmo público do envio em massa.
-        base = {"usuario__tipo": "aluno"}
-        # Conta só tokens com formato aceito pela Expo (evita placeholders de teste no painel).
-        aluno_ids_com_token_valido = set()
-        n_tokens_alunos = 0
-        for uid, tok in PushTokenExpo.objects.filter(**base).values_list(
-            "usuario_id", "token"
-        ):
-            if token_expo_formato_valido(tok):
-                aluno_ids_com_token_valido.add(uid)
-                n_tokens_alunos += 1
-        alunos_com_app = len(aluno_ids_com_token_valido)
-        tokens_total = n_tokens_alunos
-        dispositivos_no_servidor = sum(
-            1
-            for tok in PushTokenExpo.objects.values_list("token", flat=True)
-            if token_expo_formato_valido(tok)
+        # para o painel refletir o mesmo público do envio em massa. Conta só tokens com
+        # formato aceito pela Expo (coluna `valido`), numa consulta pelo índice.
+        do_aluno = Q(usuario__tipo="aluno")
+        totais = PushTokenExpo.objects.filter(valido=True).aggregate(
+            alunos_com_app=Count("usuario", filter=do_aluno, distinct=True),
+            tokens_registrados=Count("id", filter=do_aluno),
+            dispositivos_no_servidor=Count("id"),
         )
         return Response(
             {
-                "alunos_com_app": alunos_com_app,
-                "tokens_registrados": tokens_total,
-                "dispositivos_no_servidor": dispositivos_no_servidor,
+                "alunos_com_app": totais["alunos_com_app"],
+                "tokens_registrados": totais["tokens_registrados"],
+                "dispositivos_no_servidor": totais["dispositivos_no_servidor"],
             }
         )
 
 
 class EnviarNotificacaoAlunosAppAPIView(APIView):
-    """Gerente envia título e mensagem a todos os alunos com token Expo registrado."""
+    """Gerente envia título e mensagem aos alunos com token Expo registrado.
+
+    ``segmento`` (padrão "todos") e ``valor`` escolhem o público: turma, ct, dia_semana,
+    inadimplentes, wellhub, somente_ct ou checkin_amanha (ver usuarios.segmentos_push).
+
+    Só grava a campanha (CampanhaPush) e responde 202 com o id; o envio roda no worker
+    `processar_campanhas_push`. O progresso sai em CampanhaPushProgressoAPIView.
+    """
 
     permission_classes = [IsAuthenticated]
 
@@ -146,54 +149,65 @@ class EnviarNotificacaoAlunosAppAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        qs = PushTokenExpo.objects.filter(usuario__tipo="aluno").values_list(
-            "token", flat=True
-        )
-        tokens = list(dict.fromkeys(qs))  # únicos, preserva ordem
+        # JSON pode trazer número/lista/objeto: vira texto e cai no 400 de segmento desconhecido
+        segmento = str(request.data.get("segmento") or SEGMENTO_TODOS).strip()
+        valor = request.data.get("valor")
+        try:
+            tokens = tokens_do_segmento(segmento, valor)
+        except SegmentoInvalido as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         if not tokens:
             return Response(
                 {
-                    "error": "Nenhum aluno com app registrado para receber notificações.",
+                    "error": (
+                        "Nenhum aluno com app registrado para receber notificações."
+                        if segmento == SEGMENTO_TODOS
+                        else "Nenhum aluno deste público tem o app registrado."
+                    ),
                     "enviados": 0,
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        resultado = enviar_lote_expo_push(tokens, titulo, mensagem)
-        tickets_ok = int(resultado.get("tickets_ok") or 0)
-        erros_expo = resultado.get("erros") or []
-
+        campanha = criar_campanha(
+            titulo,
+            mensagem,
+            tokens,
+            criada_por=request.user,
+            segmento={"tipo": segmento, "valor": valor},
+        )
         logger.info(
-            "Push gerente user_id=%s titulo=%r tokens=%s tickets_ok=%s erros=%s",
+            "Push gerente user_id=%s titulo=%r segmento=%s tokens=%s campanha=%s",
             request.user.id,
             titulo,
+            segmento,
             len(tokens),
-            tickets_ok,
-            erros_expo[:5],
+            campanha.pk,
         )
-
-        if tickets_ok == 0:
-            partes = [str(e) for e in erros_expo[:5]]
-            mensagem_erro = (
-                " ".join(partes)
-                if partes
-                else "A Expo não aceitou o envio. Verifique credenciais do app (EAS) e tokens dos dispositivos."
-            )
-            return Response(
-                {
-                    "error": mensagem_erro[:2000],
-                    "destinatarios_tokens": len(tokens),
-                    "detalhes": resultado,
-                },
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
-
         return Response(
             {
                 "ok": True,
+                "campanha_id": campanha.pk,
+                "segmento": segmento,
                 "destinatarios_tokens": len(tokens),
-                "tickets_enviados_ok": tickets_ok,
-                "detalhes": resultado,
+                "progresso": request.build_absolute_uri(
+                    reverse("campanha_push_progresso_api", args=[campanha.pk])
+                ),
             },
-            status=status.HTTP_200_OK,
+            status=status.HTTP_202_ACCEPTED,
         )
+
+
+class CampanhaPushProgressoAPIView(APIView):
+    """Progresso de uma campanha de push (envio, recibos, tokens removidos)."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, campanha_id):
+        if request.user.tipo != "gerente":
+            return Response(
+                {"error": "Apenas gerentes podem consultar campanhas de notificação."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        campanha = get_object_or_404(CampanhaPush, pk=campanha_id)
+        return Response(progresso_campanha(campanha))
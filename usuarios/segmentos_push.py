@@ -0,0 +1,195 @@
+"""
+Públicos (segmentos) das campanhas de push e lembretes automáticos.
+
+Cada segmento vira UMA consulta: PushTokenExpo com ``valido`` (formato Expo, marcado ao
+gravar; índice (valido, usuario)) e ``usuario_id IN (subconsulta de alunos)``, sem duplicatas mesmo quando o aluno casa por várias turmas. Os filtros
+andam por FKs/M2Ms indexadas; "inadimplentes" usa o índice parcial de mensalidades em
+aberto e "wellhub" o índice de e-mail normalizado de CadastroWellhub.
+
+Os lembretes ("sua aula começa em 2h") rodam em lote pelo comando
+`enviar_lembretes_aula_push`: uma consulta traz os pares (turma, token) de todas as
+turmas da janela, e cada turma vira uma campanha com chave de idempotência.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from alunos.checkin_utils import _DIAS_SEMANA_NOMES
+from financeiro.models import Mensalidade
+from funcionarios.models import Presenca
+from turmas.models import Turma
+from usuarios.campanhas_push import criar_campanha
+from usuarios.models import PushTokenExpo, Usuario
+from wellhub.models import CadastroWellhub
+
+logger = logging.getLogger(__name__)
+
+SEGMENTO_TODOS = 'todos'
+SEGMENTO_TURMA = 'turma'
+SEGMENTO_CT = 'ct'
+SEGMENTO_DIA_SEMANA = 'dia_semana'
+SEGMENTO_INADIMPLENTES = 'inadimplentes'
+SEGMENTO_WELLHUB = 'wellhub'
+SEGMENTO_SOMENTE_CT = 'somente_ct'
+SEGMENTO_CHECKIN_AMANHA = 'checkin_amanha'
+
+
+class SegmentoInvalido(ValueError):
+    """Segmento desconhecido ou valor ausente/inválido (vira 400 na API)."""
+
+
+def _alunos():
+    return Usuario.objects.filter(tipo='aluno')
+
+
+def _id(valor) -> int:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise SegmentoInvalido('Informe o id (número) do segmento.')
+
+
+def _nome_dia(valor) -> str:
+    if str(valor).strip().isdigit() and int(valor) < len(_DIAS_SEMANA_NOMES):
+        return _DIAS_SEMANA_NOMES[int(valor)]
+    if valor in _DIAS_SEMANA_NOMES:
+        return valor
+    raise SegmentoInvalido('Dia da semana inválido (0=segunda ... 6=domingo, ou o nome).')
+
+
+def mensalidade_em_atraso(hoje):
+    """Exists de mensalidade não paga vencida antes de `hoje` (índice parcial em aberto)."""
+    return Exists(
+        Mensalidade.objects.filter(aluno=OuterRef('pk'), data_vencimento__lt=hoje).exclude(status='pago')
+    )
+
+
+def _cliente_wellhub():
+    return Exists(
+        CadastroWellhub.objects.annotate(email_normalizado=Lower('email'))
+        .filter(email_normalizado=Lower(OuterRef('email')))
+        .exclude(email='')
+    )
+
+
+def _com_aula_no_dia(alunos, nome_dia):
+    # Mesmo filter(): turma ativa E com aula naquele dia (a mesma linha da junção)
+    return alunos.filter(
+        turmas_aluno__ativo=True,
+        turmas_aluno__dias_semana__nome=nome_dia,
+        dias_habilitados__nome=nome_dia,
+    )
+
+
+def podem_fazer_checkin(alunos, data, hoje):
+    """Alunos ativos, sem suspensão em `data` e sem mensalidade atrasada (regras do painel)."""
+    return alunos.filter(ativo=True).filter(
+        Q(contrato_suspenso=False) | Q(suspenso_ate__lt=data)
+    ).exclude(mensalidade_em_atraso(hoje))
+
+
+def alunos_do_segmento(segmento: str, valor=None, *, hoje=None):
+    """Queryset de alunos do segmento (usado como subconsulta, nunca iterado)."""
+    hoje = hoje or timezone.localdate()
+    alunos = _alunos()
+    if segmento == SEGMENTO_TODOS:
+        # Todos os alunos com token (inclui inativos), como no envio em massa original
+        return alunos
+    if segmento == SEGMENTO_TURMA:
+        return alunos.filter(turmas_aluno=_id(valor))
+    if segmento == SEGMENTO_CT:
+        return alunos.filter(turmas_aluno__ativo=True, turmas_aluno__ct=_id(valor))
+    if segmento == SEGMENTO_DIA_SEMANA:
+        return _com_aula_no_dia(alunos.filter(ativo=True), _nome_dia(valor))
+    if segmento == SEGMENTO_INADIMPLENTES:
+        return alunos.filter(mensalidade_em_atraso(hoje))
+    if segmento == SEGMENTO_WELLHUB:
+        return alunos.filter(_cliente_wellhub())
+    if segmento == SEGMENTO_SOMENTE_CT:
+        return alunos.exclude(_cliente_wellhub())
+    if segmento == SEGMENTO_CHECKIN_AMANHA:
+        amanha = hoje + timedelta(days=1)
+        return podem_fazer_checkin(
+            _com_aula_no_dia(alunos, _DIAS_SEMANA_NOMES[amanha.weekday()]), amanha, hoje
+        )
+    raise SegmentoInvalido(f'Segmento desconhecido: {segmento!r}.')
+
+
+SEGMENTOS = (
+    SEGMENTO_TODOS, SEGMENTO_TURMA, SEGMENTO_CT, SEGMENTO_DIA_SEMANA, SEGMENTO_INADIMPLENTES,
+    SEGMENTO_WELLHUB, SEGMENTO_SOMENTE_CT, SEGMENTO_CHECKIN_AMANHA,
+)
+
+
+def tokens_do_segmento(segmento: str, valor=None, *, hoje=None) -> list[str]:
+    """Tokens válidos e únicos do segmento, numa única consulta."""
+    qs = (
+        PushTokenExpo.objects.filter(
+            valido=True, usuario_id__in=alunos_do_segmento(segmento, valor, hoje=hoje).values('pk')
+        )
+        .order_by('id')
+        .values_list('token', flat=True)
+    )
+    return list(dict.fromkeys(t.strip() for t in qs))
+
+
+# --- Lembretes automáticos ---------------------------------------------------------
+
+
+def lembrar_aulas_em_breve(*, antecedencia=timedelta(hours=2), janela=timedelta(minutes=15), agora=None):
+    """
+    Uma campanha por turma cuja aula começa entre agora+antecedencia e
+    agora+antecedencia+janela, para os alunos com a janela de check-in aberta (dia
+    habilitado, aptos ao check-in) que ainda não fizeram check-in. Rodar de `janela` em
+    `janela` (cron); a chave lembrete_aula:<turma>:<data> impede aviso repetido.
+    Retorna as campanhas criadas.
+    """
+    agora = agora or timezone.localtime()
+    inicio = agora + antecedencia
+    fim = min(inicio + janela, datetime.combine(inicio.date(), datetime.max.time(), tzinfo=inicio.tzinfo))
+    dia = inicio.date()
+    nome_dia = _DIAS_SEMANA_NOMES[dia.weekday()]
+
+    turmas = {
+        t.pk: t
+        for t in Turma.objects.filter(
+            ativo=True, dias_semana__nome=nome_dia, horario__gte=inicio.time(), horario__lt=fim.time()
+        ).select_related('ct')
+    }
+    if not turmas:
+        return []
+
+    # Uma consulta: pares (turma, token válido) pela tabela de matrículas
+    Matricula = Turma.alunos.through
+    aptos = podem_fazer_checkin(_alunos().filter(dias_habilitados__nome=nome_dia), dia, agora.date())
+    pares = (
+        Matricula.objects.filter(
+            turma_id__in=turmas, usuario_id__in=aptos.values('pk'), usuario__push_tokens_expo__valido=True
+        )
+        .exclude(Exists(Presenca.objects.filter(
+            usuario=OuterRef('usuario_id'), turma=OuterRef('turma_id'), data=dia, checkin_realizado=True
+        )))
+        .order_by('turma_id', 'usuario_id')
+        .values_list('turma_id', 'usuario__push_tokens_expo__token')
+    )
+    tokens_por_turma = {}
+    for turma_id, token in pares:
+        tokens_por_turma.setdefault(turma_id, {})[token.strip()] = None
+
+    campanhas = []
+    for turma_id, tokens in tokens_por_turma.items():
+        turma = turmas[turma_id]
+        campanha = criar_campanha(
+            'Sua aula começa em breve',
+            f'Aula às {turma.horario.strftime("%H:%M")} no {turma.ct.nome}. Não esqueça o check-in!',
+            list(tokens),
+            segmento={'tipo': 'lembrete_aula', 'turma': turma_id, 'data': dia.isoformat()},
+            chave=f'lembrete_aula:{turma_id}:{dia.isoformat()}',
+        )
+        if campanha is not None:
+            campanhas.append(campanha)
+    logger.info('Lembretes de aula (%s): %s campanha(s) criada(s).', dia, len(campanhas))
+    return campanhas
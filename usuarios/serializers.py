@@ -1,6 +1,10 @@
+import logging
+
 from rest_framework import serializers
 from rest_framework.fields import empty
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from usuarios.models import Usuario, PreCadastro
 from turmas.models import DiaSemana, Turma
@@ -15,6 +19,28 @@ from app.date_api import (
     format_datetime_api,
 )
 
+logger = logging.getLogger(__name__)
+
+
+class PrefetchAusenteError(AssertionError):
+    """Relação lida por linha numa lista sem o prefetch declarado pelo serializer."""
+
+
+def _centros_das_turmas(turmas):
+    """CTs distintos (ordem das turmas) a partir de turmas com ``ct`` já carregado."""
+    cts = {t.ct_id: t.ct.nome for t in turmas if t.ct_id}
+    return [{'id': ct_id, 'nome': nome} for ct_id, nome in cts.items()]
+
+
+def _em_lista(serializer) -> bool:
+    node = serializer
+    while node is not None:
+        if isinstance(node, serializers.ListSerializer):
+            return True
+        node = node.parent
+    return False
+
+
 def validar_senha_serializer(senha):
     """Valida a força da senha no serializer"""
     if not senha:
@@ -87,6 +113,52 @@ def validar_email_aluno_cadastro(email, data_nascimento, instance_usuario=None,
         return
 
 
+class UsuarioDiretorioSerializer(serializers.ModelSerializer):
+    """
+    Projeção enxuta para listas (diretório de usuários); o perfil completo continua em
+    ``UsuarioSerializer``. ``campos`` restringe a saída (``?fields=`` na view).
+    """
+    nome_completo = serializers.SerializerMethodField()
+    centros_treinamento = serializers.SerializerMethodField()
+
+    # Colunas de Usuario que cada campo lê (a view usa em .only())
+    COLUNAS = {
+        'nome_completo': ('first_name', 'last_name'),
+        'centros_treinamento': ('tipo',),
+    }
+
+    class Meta:
+        model = Usuario
+        fields = [
+            'id', 'nome_completo', 'tipo', 'cpf', 'email', 'telefone',
+            'ativo', 'contrato_suspenso', 'foto_perfil', 'centros_treinamento',
+        ]
+
+    def __init__(self, *args, campos=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos:
+            for nome in set(self.fields) - set(campos):
+                self.fields.pop(nome)
+
+    @classmethod
+    def colunas(cls, campos) -> set:
+        colunas = {'id'}
+        for campo in campos:
+            colunas.update(cls.COLUNAS.get(campo, (campo,)))
+        return colunas
+
+    def get_nome_completo(self, obj):
+        return f"{obj.first_name or ''} {obj.last_name or ''}".strip()
+
+    def get_centros_treinamento(self, obj):
+        """CTs das turmas (aluno: matriculadas; professor: que leciona), do prefetch da view."""
+        if obj.tipo == 'aluno':
+            return _centros_das_turmas(obj.turmas_aluno.all())
+        if obj.tipo == 'professor':
+            return _centros_das_turmas(obj.turmas.all())
+        return []
+
+
 class UsuarioSerializer(serializers.ModelSerializer):
     data_nascimento = serializers.DateField(
         format=DATA_API_FMT,
@@ -182,16 +254,44 @@ class UsuarioSerializer(serializers.ModelSerializer):
         }
         return tipos.get(obj.tipo, obj.tipo)
     
+    @classmethod
+    def prefetches(cls, prefixo: str = '') -> list:
+        """
+        Prefetches que os campos calculados leem; ``prefixo`` para serializar via relação
+        (ex.: ``'aluno__'`` em mensalidades). Listas devem usar preparar_queryset.
+        """
+        return [
+            Prefetch(
+                f'{prefixo}turmas_aluno',
+                queryset=Turma.objects.select_related('ct').prefetch_related('dias_semana'),
+            ),
+            Prefetch(f'{prefixo}turmas', queryset=Turma.objects.select_related('ct')),
+            f'{prefixo}dias_habilitados',
+        ]
+
+    @classmethod
+    def preparar_queryset(cls, queryset, prefixo: str = ''):
+        return queryset.prefetch_related(*cls.prefetches(prefixo))
+
+    def _relacao(self, obj, nome):
+        """
+        ``obj.<nome>.all()``. Numa lista sem o prefetch isso é uma consulta por linha:
+        com USUARIO_SERIALIZER_PREFETCH_ESTRITO (testes) levanta PrefetchAusenteError,
+        senão registra aviso.
+        """
+        if nome not in getattr(obj, '_prefetched_objects_cache', {}) and _em_lista(self):
+            mensagem = f'UsuarioSerializer em lista sem prefetch de {nome!r} (use preparar_queryset).'
+            if getattr(settings, 'USUARIO_SERIALIZER_PREFETCH_ESTRITO', False):
+                raise PrefetchAusenteError(mensagem)
+            logger.warning(mensagem)
+        return getattr(obj, nome).all()
+
     def get_centros_treinamento(self, obj):
-        """Retorna os Centros de Treinamento vinculados ao usuário (alunos através de turmas, professores através de turmas que lecionam)"""
+        """CTs vinculados ao usuário (aluno: turmas matriculadas; professor: turmas que leciona)."""
         if obj.tipo == 'aluno':
-            # Busca CTs através das turmas do aluno
-            cts = obj.turmas_aluno.select_related('ct').values('ct__id', 'ct__nome').distinct()
-            return [{'id': ct['ct__id'], 'nome': ct['ct__nome']} for ct in cts]
-        elif obj.tipo == 'professor':
-            # Busca CTs através das turmas que o professor leciona
-            cts = obj.turmas.select_related('ct').values('ct__id', 'ct__nome').distinct()
-            return [{'id': ct['ct__id'], 'nome': ct['ct__nome']} for ct in cts]
+            return _centros_das_turmas(self._relacao(obj, 'turmas_aluno'))
+        if obj.tipo == 'professor':
+            return _centros_das_turmas(self._relacao(obj, 'turmas'))
         return []
 
     def get_turmas_vinculadas(self, obj):
@@ -199,7 +299,8 @@ class UsuarioSerializer(serializers.ModelSerializer):
         if obj.tipo != 'aluno':
             return []
         out = []
-        for t in obj.turmas_aluno.all().order_by('horario', 'id'):
+        # Ordena em Python: order_by() no related manager ignoraria o prefetch
+        for t in sorted(self._relacao(obj, 'turmas_aluno'), key=lambda t: (t.horario, t.id)):
             horario_str = t.horario.strftime('%H:%M') if getattr(t, 'horario', None) else ''
             dias = [dia.nome for dia in t.dias_semana.all()]
             out.append({
@@ -212,7 +313,7 @@ class UsuarioSerializer(serializers.ModelSerializer):
         return out
 
     def get_dias_habilitados_nomes(self, obj):
-        return [dia.nome for dia in obj.dias_habilitados.all()]
+        return [dia.nome for dia in self._relacao(obj, 'dias_habilitados')]
 
     def validate_cpf(self, value):
         if value is None or (isinstance(value, str) and not str(value).strip()):
@@ -262,9 +363,8 @@ class UsuarioSerializer(serializers.ModelSerializer):
             representation['contrato_aceito_em'] = format_datetime_api(instance.contrato_aceito_em)
         representation['tipo'] = instance.tipo
         if instance.tipo == 'aluno':
-            representation['turmas'] = list(
-                instance.turmas_aluno.order_by('horario', 'id').values_list('id', flat=True)[:2]
-            )
+            turmas = sorted(self._relacao(instance, 'turmas_aluno'), key=lambda t: (t.horario, t.id))
+            representation['turmas'] = [t.id for t in turmas[:2]]
         else:
             representation['turmas'] = []
 
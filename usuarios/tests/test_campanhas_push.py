@@ -0,0 +1,131 @@
+import gzip
+import json
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from usuarios.campanhas_push import processar_campanhas
+from usuarios.models import CampanhaPush, EnvioPushExpo, PushTokenExpo, Usuario
+from usuarios.push_expo import EXPO_PUSH_URL
+
+
+def _token(n):
+    return f"ExponentPushToken[{n:022d}]"
+
+
+class ExpoFalsa:
+    """Responde como a Expo: ticket/recibo ok, exceto para os tokens marcados como mortos."""
+
+    def __init__(self, mortos_no_ticket=(), mortos_no_recibo=()):
+        self.mortos_no_ticket = set(mortos_no_ticket)
+        self.mortos_no_recibo = set(mortos_no_recibo)
+        self.envios = []
+
+    def post(self, url, data, headers, timeout):
+        if headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        payload = json.loads(data)
+        resposta = MagicMock(status_code=200)
+        if url == EXPO_PUSH_URL:
+            self.envios.append((len(payload), headers.get("Content-Encoding")))
+            tickets = [
+                {"status": "error", "message": "not registered", "details": {"error": "DeviceNotRegistered"}}
+                if m["to"] in self.mortos_no_ticket else {"status": "ok", "id": f"tk-{m['to']}"}
+                for m in payload
+            ]
+            resposta.json.return_value = {"data": tickets}
+        else:
+            resposta.json.return_value = {"data": {
+                i: {"status": "error", "message": "gone", "details": {"error": "DeviceNotRegistered"}}
+                if i[3:] in self.mortos_no_recibo else {"status": "ok"}
+                for i in payload["ids"]
+            }}
+        return resposta
+
+
+@override_settings(EXPO_PUSH_RECIBOS_ATRASO=0)
+class CampanhasPushTests(TestCase):
+    def setUp(self):
+        self.gerente = Usuario.objects.create_user(
+            username="00000000000", password="x", tipo="gerente", first_name="Gerente", email="g@test.com",
+            cpf="00000000000",
+        )
+        aluno = Usuario.objects.create_user(
+            username="11111111101", password="x", tipo="aluno", first_name="Ana", email="a@test.com",
+            cpf="11111111101", telefone_emergencia="21999990000",
+        )
+        # bulk_create não passa pelo save(): marca `valido` como a migração 0035 faria
+        PushTokenExpo.objects.bulk_create(
+            [PushTokenExpo(usuario=aluno, token=_token(n), valido=True) for n in range(150)]
+        )
+        PushTokenExpo.objects.create(usuario=aluno, token="ExponentPushToken[teste-curl]")
+        self.client = APIClient()
+        self.client.force_authenticate(self.gerente)
+
+    def _enviar(self):
+        resp = self.client.post("/api/usuarios/notificacoes-app/enviar/", {"titulo": "Aviso", "mensagem": "Sem aula"})
+        self.assertEqual(resp.status_code, 202)
+        return resp
+
+    def test_requisicao_so_grava_campanha(self):
+        with patch("usuarios.push_expo._sessao_http") as sessao:
+            resp = self._enviar()
+        sessao.assert_not_called()
+        self.assertEqual(resp.data["destinatarios_tokens"], 150)
+        self.assertEqual(EnvioPushExpo.objects.filter(campanha_id=resp.data["campanha_id"]).count(), 150)
+
+        progresso = self.client.get(resp.data["progresso"]).data
+        self.assertEqual((progresso["status"], progresso["enviados"]), (CampanhaPush.STATUS_PENDENTE, 0))
+
+    def test_worker_envia_em_lotes_consulta_recibos_e_remove_tokens_mortos(self):
+        campanha_id = self._enviar().data["campanha_id"]
+        expo = ExpoFalsa(mortos_no_ticket=[_token(3)], mortos_no_recibo=[_token(120)])
+        with patch("usuarios.push_expo._sessao_http", return_value=expo):
+            processar_campanhas()
+
+        self.assertEqual(sorted(expo.envios), [(50, "gzip"), (100, "gzip")])
+        progresso = self.client.get(f"/api/usuarios/notificacoes-app/campanhas/{campanha_id}/").data
+        self.assertEqual(progresso["status"], CampanhaPush.STATUS_CONCLUIDA)
+        self.assertEqual((progresso["enviados"], progresso["percentual"]), (150, 100))
+        self.assertEqual((progresso["tickets_ok"], progresso["tickets_erro"]), (149, 1))
+        self.assertEqual((progresso["recibos_ok"], progresso["recibos_erro"]), (148, 1))
+        self.assertEqual(progresso["tokens_removidos"], 2)
+        self.assertFalse(PushTokenExpo.objects.filter(token__in=[_token(3), _token(120)]).exists())
+        self.assertEqual(PushTokenExpo.objects.count(), 149)
+
+    def test_falha_de_todos_os_lotes_encerra_campanha(self):
+        campanha_id = self._enviar().data["campanha_id"]
+        sessao = MagicMock()
+        sessao.post.return_value = MagicMock(status_code=503, text="indisponível", **{"json.side_effect": ValueError})
+        with patch("usuarios.push_expo._sessao_http", return_value=sessao):
+            processar_campanhas()
+
+        campanha = CampanhaPush.objects.get(pk=campanha_id)
+        self.assertEqual(campanha.status, CampanhaPush.STATUS_FALHOU)
+        self.assertEqual(campanha.tickets_erro, 150)
+        self.assertIn("HTTP 503", campanha.erros[0])
+        self.assertEqual(PushTokenExpo.objects.count(), 151)
+
+        self.client.force_authenticate(Usuario.objects.get(tipo="aluno"))
+        self.assertEqual(self.client.get(f"/api/usuarios/notificacoes-app/campanhas/{campanha_id}/").status_code, 403)
+
+    def test_estatisticas_pela_coluna_valido_numa_consulta(self):
+        url = "/api/usuarios/notificacoes-app/estatisticas/"
+        # Tokens gravados sem passar pelo save() ficam sem a marcação até o comando rechecar
+        PushTokenExpo.objects.update(valido=False)
+        self.assertEqual(self.client.get(url).data["dispositivos_no_servidor"], 0)
+
+        call_command("validar_tokens_push", lote=40, stdout=StringIO())
+        PushTokenExpo.objects.create(usuario=self.gerente, token=_token(999))
+        aluno = Usuario.objects.get(tipo="aluno")
+        self.client.force_authenticate(aluno)
+        self.assertEqual(self.client.post("/api/usuarios/push-token/", {"token": _token(151)}).status_code, 200)
+
+        self.client.force_authenticate(self.gerente)
+        with self.assertNumQueries(1):
+            dados = self.client.get(url).data
+        self.assertEqual(dados, {"alunos_com_app": 1, "tokens_registrados": 151, "dispositivos_no_servidor": 152})
+        self.assertFalse(PushTokenExpo.objects.get(token="ExponentPushToken[teste-curl]").valido)
@@ -0,0 +1,113 @@
+"""
+Regressão de consultas por linha (N+1): cada endpoint de lista faz o mesmo número de
+consultas com 1 ou com vários registros. Com USUARIO_SERIALIZER_PREFETCH_ESTRITO, o
+UsuarioSerializer também falha na hora se uma lista chega sem o prefetch declarado.
+"""
+from datetime import date, time
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ct.models import CentroDeTreinamento
+from financeiro.models import Mensalidade
+from funcionarios.models import PainelGerenteSecao
+from turmas.models import DiaSemana, Turma
+from usuarios.models import Usuario
+from usuarios.serializers import PrefetchAusenteError, UsuarioSerializer
+
+
+@override_settings(USUARIO_SERIALIZER_PREFETCH_ESTRITO=True)
+class ConsultasPorLinhaTests(TestCase):
+    def setUp(self):
+        self.gerente = Usuario.objects.create_user(
+            username="00000000000", password="x", tipo="gerente", first_name="Gerente", email="g@test.com",
+            cpf="00000000000",
+        )
+        self.ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        self.segunda, _ = DiaSemana.objects.get_or_create(nome="Segunda-feira")
+        self.turma = Turma.objects.create(ct=self.ct, horario=time(7, 0), capacidade_maxima=20, ativo=True)
+        self.turma.dias_semana.set([self.segunda])
+        self.n = 0
+        self._novo_aluno()
+        self._novo_professor()
+        self.client = APIClient()
+        self.client.force_authenticate(self.gerente)
+
+    def _novo_aluno(self):
+        self.n += 1
+        aluno = Usuario.objects.create_user(
+            username=f"1111111110{self.n}", password="x", tipo="aluno", first_name=f"Aluno{self.n}",
+            email=f"a{self.n}@test.com", cpf=f"1111111110{self.n}", telefone_emergencia="21999990000",
+            valor_mensalidade=Decimal("160.00"), dia_vencimento=10,
+        )
+        aluno.dias_habilitados.set([self.segunda])
+        self.turma.alunos.add(aluno)
+        Mensalidade.objects.create(aluno=aluno, valor=Decimal("160.00"), data_vencimento=date(2031, 3, 10))
+        return aluno
+
+    def _novo_professor(self):
+        self.n += 1
+        professor = Usuario.objects.create_user(
+            username=f"2222222220{self.n}", password="x", tipo="professor", first_name=f"Prof{self.n}",
+            email=f"p{self.n}@test.com", cpf=f"2222222220{self.n}",
+        )
+        self.turma.professores.add(professor)
+
+    def _consultas(self, url, params=None, antes_de_medir=None):
+        # Primeira chamada aquece caches (sessão, tarefas do middleware, etc.); mede a segunda.
+        # `antes_de_medir` desfaz o cache que esconderia o caminho a medir (ex.: snapshot do painel).
+        self.client.get(url, params or {})
+        if antes_de_medir:
+            antes_de_medir()
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url, params or {})
+        self.assertEqual(resp.status_code, 200, resp.content[:300])
+        return len(ctx)
+
+    def _assert_constante(self, url, params=None, mais_linhas=None, antes_de_medir=None):
+        antes = self._consultas(url, params, antes_de_medir)
+        for _ in range(3):
+            (mais_linhas or self._novo_aluno)()
+        self.assertEqual(self._consultas(url, params, antes_de_medir), antes, f"{url} faz consultas por linha")
+
+    def test_listagem_de_usuarios(self):
+        self._assert_constante("/api/usuarios/", {"tipo": "aluno"})
+        self._assert_constante("/api/usuarios/", {"tipo": "professor"}, mais_linhas=self._novo_professor)
+
+    def test_diretorio_de_usuarios(self):
+        self._assert_constante("/api/usuarios/diretorio/", {"tipo": "aluno"})
+
+    def test_turmas(self):
+        self._assert_constante("/api/turmas/")
+        self._assert_constante("/api/turmas/", mais_linhas=self._novo_professor)
+        self._assert_constante(f"/api/turmas/{self.turma.id}/alunos/")
+
+    def test_mensalidades_e_relatorio(self):
+        self._assert_constante("/api/financeiro/mensalidades/")
+        self._assert_constante("/api/financeiro/relatorio/")
+
+    def test_painel_gerente(self):
+        # Sem o snapshot o painel recalcula todas as seções: mede o recálculo a frio, não a leitura
+        def sem_snapshot():
+            PainelGerenteSecao.objects.all().delete()
+
+        self._assert_constante("/api/funcionarios/painel-gerente/", antes_de_medir=sem_snapshot)
+
+    def test_painel_aluno(self):
+        aluno = Usuario.objects.filter(tipo="aluno").first()
+        self.client.force_authenticate(aluno)
+        meses = iter(range(1, 13))
+
+        def mais_mensalidades():
+            Mensalidade.objects.create(aluno=aluno, valor=Decimal("160.00"), data_vencimento=date(2030, next(meses), 10))
+
+        self._assert_constante("/api/alunos/painel-aluno/", mais_linhas=mais_mensalidades)
+
+    def test_lista_sem_prefetch_falha(self):
+        with self.assertRaises(PrefetchAusenteError):
+            UsuarioSerializer(Usuario.objects.filter(tipo="aluno"), many=True).data
+        # Objeto único não exige prefetch
+        UsuarioSerializer(Usuario.objects.filter(tipo="aluno").first()).data
@@ -0,0 +1,71 @@
+from datetime import time
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ct.models import CentroDeTreinamento
+from turmas.models import Turma
+from usuarios.models import Usuario
+
+
+class DiretorioUsuariosTests(TestCase):
+    def setUp(self):
+        self.gerente = Usuario.objects.create_user(
+            username="00000000000",
+            password="x",
+            tipo="gerente",
+            first_name="Gerente",
+            last_name="Teste",
+            email="gerente@test.com",
+            cpf="00000000000",
+        )
+        ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        turma = Turma.objects.create(ct=ct, horario=time(7, 0), capacidade_maxima=20, ativo=True)
+        nomes = [("João", "Árvore"), ("Ana", "Souza"), ("Bruno", "Lima"), ("Álvaro", "Costa"), ("Carla", "Dias")]
+        for i, (first, last) in enumerate(nomes, start=1):
+            aluno = Usuario.objects.create_user(
+                username=f"1234567890{i}",
+                password="x",
+                tipo="aluno",
+                first_name=first,
+                last_name=last,
+                email=f"{first.lower()}@test.com",
+                cpf=f"1234567890{i}",
+                telefone_emergencia="21999990000",
+            )
+            turma.alunos.add(aluno)
+        self.client = APIClient()
+        self.client.force_authenticate(self.gerente)
+
+    def test_pagina_por_cursor_em_ordem_alfabetica(self):
+        resp = self.client.get("/api/usuarios/diretorio/", {"tipo": "aluno", "page_size": 2})
+        self.assertEqual(resp.status_code, 200)
+        nomes = [u["nome_completo"] for u in resp.data["results"]]
+        while resp.data["next"]:
+            resp = self.client.get(resp.data["next"])
+            nomes += [u["nome_completo"] for u in resp.data["results"]]
+        self.assertEqual(nomes, ["Álvaro Costa", "Ana Souza", "Bruno Lima", "Carla Dias", "João Árvore"])
+        self.assertEqual(
+            resp.data["results"][-1]["centros_treinamento"], [{"id": Turma.objects.get().ct_id, "nome": "Praia de Itaipuaçu"}]
+        )
+
+    def test_busca_sem_acento_cpf_com_mascara_e_campos(self):
+        resp = self.client.get("/api/usuarios/diretorio/", {"q": "joao arv"})
+        self.assertEqual([u["cpf"] for u in resp.data["results"]], ["12345678901"])
+
+        resp = self.client.get("/api/usuarios/diretorio/", {"q": "123.456.789-03", "fields": "id,nome_completo"})
+        self.assertEqual(resp.data["results"], [{"id": Usuario.objects.get(cpf="12345678903").id, "nome_completo": "Bruno Lima"}])
+
+        # Renomear atualiza a coluna de busca
+        usuario = Usuario.objects.get(cpf="12345678903")
+        usuario.first_name = "Breno"
+        usuario.save(update_fields=["first_name"])
+        self.assertEqual(len(self.client.get("/api/usuarios/diretorio/", {"q": "breno"}).data["results"]), 1)
+
+    def test_etag_devolve_304_e_aluno_nao_acessa(self):
+        resp = self.client.get("/api/usuarios/diretorio/", {"tipo": "aluno"})
+        resp_304 = self.client.get("/api/usuarios/diretorio/", {"tipo": "aluno"}, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp_304.status_code, 304)
+
+        self.client.force_authenticate(Usuario.objects.get(cpf="12345678901"))
+        self.assertEqual(self.client.get("/api/usuarios/diretorio/").status_code, 403)
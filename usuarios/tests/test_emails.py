@@ -0,0 +1,34 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from usuarios.emails import MODELOS, _moldura, renderizar_email
+
+
+class RenderizacaoEmailsTests(SimpleTestCase):
+    def test_moldura_renderizada_uma_vez_e_texto_sem_escape(self):
+        _moldura.cache_clear()
+        contexto = {"nome": "Ana & <Bia>", "link": "https://ctsupera.com.br/x/?a=1&b=2"}
+        for _ in range(5):
+            assunto, texto, html = renderizar_email("convite", contexto)
+
+        self.assertEqual((_moldura.cache_info().misses, _moldura.cache_info().hits), (1, 4))
+        self.assertEqual(assunto, MODELOS["convite"]["assunto"])
+        self.assertIn("Olá Ana & <Bia>, seja bem-vindo", texto)
+        self.assertIn("https://ctsupera.com.br/x/?a=1&b=2", texto)
+        self.assertIn("<strong>Ana &amp; &lt;Bia&gt;</strong>", html)
+        self.assertIn('href="https://ctsupera.com.br/x/?a=1&amp;b=2"', html)
+        self.assertTrue(html.lstrip().startswith("<!DOCTYPE html>") and html.rstrip().endswith("</html>"))
+
+        with override_settings(EMAIL_LOGO_URL="https://cdn.test/logo.png"):
+            self.assertIn('src="https://cdn.test/logo.png"', renderizar_email("convite", contexto)[2])
+        self.assertNotIn("cdn.test", renderizar_email("convite", contexto)[2])
+
+    def test_comando_de_previsualizacao(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            call_command("previsualizar_emails", saida=pasta, benchmark=3, stdout=StringIO())
+            gravados = sorted(p.name for p in Path(pasta).iterdir())
+        self.assertEqual(gravados, sorted(f"{nome}.{ext}" for nome in MODELOS for ext in ("html", "txt")))
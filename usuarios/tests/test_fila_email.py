@@ -0,0 +1,105 @@
+import smtplib
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from usuarios.fila_email import enfileirar_email, processar_emails
+from usuarios.models import EmailSaida, PreCadastro, Usuario
+from usuarios.utils import enviar_primeira_mensalidade_email
+
+
+class BackendContador(EmailBackend):
+    """locmem que conta as conexões abertas e recusa os destinatários em `recusados`."""
+
+    aberturas = 0
+    recusados = set()
+    fora_do_ar = False
+
+    def open(self):
+        if BackendContador.fora_do_ar:
+            raise smtplib.SMTPConnectError(421, "indisponível")
+        BackendContador.aberturas += 1
+        return True
+
+    def send_messages(self, messages):
+        for m in messages:
+            if set(m.to) & BackendContador.recusados:
+                raise smtplib.SMTPRecipientsRefused({m.to[0]: (550, b"no such user")})
+            if "falha@" in m.to[0]:
+                raise smtplib.SMTPDataError(451, "tente mais tarde")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="usuarios.tests.test_fila_email.BackendContador", EMAIL_FILA_LOTE=50)
+class FilaEmailTests(TestCase):
+    def setUp(self):
+        BackendContador.aberturas = 0
+        BackendContador.recusados = set()
+        BackendContador.fora_do_ar = False
+        self.aluno = Usuario.objects.create_user(
+            username="11111111101", password="x", tipo="aluno", first_name="Ana", email="ana@test.com",
+            cpf="11111111101", telefone_emergencia="21999990000",
+        )
+
+    def test_requisicao_so_enfileira_e_worker_usa_uma_conexao(self):
+        resp = APIClient().post("/api/usuarios/esqueci-senha/", {"cpf": "111.111.111-01"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mail.outbox, [])
+        email = EmailSaida.objects.get()
+        self.assertEqual((email.tipo, email.destinatarios), (EmailSaida.TIPO_RECUPERACAO_SENHA, ["ana@test.com"]))
+
+        enviar_primeira_mensalidade_email(
+            self.aluno, "boleto", 160, timezone.localdate(), digitable_line="123", pdf_content=b"%PDF-1.4",
+        )
+        self.assertEqual(processar_emails(), 2)
+
+        self.assertEqual(BackendContador.aberturas, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].attachments[0][:2], ("boleto_mensalidade.pdf", b"%PDF-1.4"))
+        self.assertEqual(mail.outbox[0].alternatives[0].mimetype, "text/html")
+        self.assertFalse(EmailSaida.objects.exclude(status=EmailSaida.STATUS_ENVIADO).exists())
+
+    def test_falhas_voltam_com_backoff_e_recusa_e_definitiva(self):
+        for destino in ("ok@test.com", "falha@test.com", "nao.existe@test.com"):
+            enfileirar_email(EmailSaida.TIPO_CONVITE, "Oi", "corpo", [destino])
+        BackendContador.recusados = {"nao.existe@test.com"}
+
+        processar_emails()
+        situacao = {e.destinatarios[0]: e for e in EmailSaida.objects.all()}
+        self.assertEqual(situacao["ok@test.com"].status, EmailSaida.STATUS_ENVIADO)
+        self.assertEqual(situacao["nao.existe@test.com"].status, EmailSaida.STATUS_FALHOU)
+        adiado = situacao["falha@test.com"]
+        self.assertEqual((adiado.status, adiado.tentativas), (EmailSaida.STATUS_PENDENTE, 1))
+        self.assertGreater(adiado.executar_apos, timezone.now() + timedelta(seconds=30))
+        self.assertIn("SMTPDataError", adiado.erro)
+
+        # Ainda no backoff: nada a fazer; vencido, tenta de novo e esgota as tentativas
+        self.assertEqual(processar_emails(), 0)
+        EmailSaida.objects.filter(pk=adiado.pk).update(executar_apos=timezone.now(), tentativas=4)
+        processar_emails()
+        self.assertEqual(EmailSaida.objects.get(pk=adiado.pk).status, EmailSaida.STATUS_FALHOU)
+
+    def test_servidor_fora_do_ar_devolve_o_lote(self):
+        enfileirar_email(EmailSaida.TIPO_CONVITE, "Oi", "corpo", ["ok@test.com"])
+        BackendContador.fora_do_ar = True
+        processar_emails()
+        email = EmailSaida.objects.get()
+        self.assertEqual((email.status, email.tentativas), (EmailSaida.STATUS_PENDENTE, 1))
+        self.assertEqual(mail.outbox, [])
+
+    def test_lembretes_de_aula_experimental_saem_numa_conexao(self):
+        amanha = timezone.localdate() + timedelta(days=1)
+        for n in range(3):
+            PreCadastro.objects.create(
+                first_name=f"Visitante{n}", email=f"v{n}@test.com", telefone="21999990000",
+                origem="aula_experimental", data_aula_experimental=amanha,
+            )
+        call_command("enviar_lembretes_aula_experimental", stdout=StringIO())
+        self.assertEqual(BackendContador.aberturas, 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["v0@test.com", "v1@test.com", "v2@test.com"])
@@ -0,0 +1,107 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ct.models import CentroDeTreinamento
+from financeiro.models import Mensalidade
+from funcionarios.models import Presenca
+from turmas.models import DiaSemana, Turma
+from usuarios.models import CampanhaPush, PushTokenExpo, Usuario
+from usuarios.segmentos_push import SegmentoInvalido, lembrar_aulas_em_breve, tokens_do_segmento
+from wellhub.models import CadastroWellhub
+
+# Segunda-feira, 15h: a turma das 17h entra na janela do lembrete de 2h
+AGORA = timezone.make_aware(datetime(2030, 3, 4, 15, 0))
+HOJE = AGORA.date()
+
+
+class SegmentosPushTests(TestCase):
+    def setUp(self):
+        seg, _ = DiaSemana.objects.get_or_create(nome="Segunda-feira")
+        ter, _ = DiaSemana.objects.get_or_create(nome="Terça-feira")
+        self.praia = CentroDeTreinamento.objects.create(nome="Praia")
+        self.quadra = CentroDeTreinamento.objects.create(nome="Quadra")
+        self.turma_seg = Turma.objects.create(ct=self.praia, horario=time(17, 0), capacidade_maxima=20, ativo=True)
+        self.turma_seg.dias_semana.set([seg])
+        self.turma_ter = Turma.objects.create(ct=self.quadra, horario=time(7, 0), capacidade_maxima=20, ativo=True)
+        self.turma_ter.dias_semana.set([ter])
+
+        self.ana = self._aluno(1, self.turma_seg, [seg])
+        self.bia = self._aluno(2, self.turma_seg, [seg])
+        self.caio = self._aluno(3, self.turma_ter, [ter], email="CAIO@Test.com")
+        # Dois turmas e dois aparelhos: continua um token por aparelho, sem repetir
+        self.turma_ter.alunos.add(self.ana)
+        PushTokenExpo.objects.create(usuario=self.ana, token=self._token(11))
+
+        Mensalidade.objects.create(aluno=self.bia, valor=Decimal("160.00"), data_vencimento=date(2030, 2, 10))
+        CadastroWellhub.objects.create(first_name="Caio", email="caio@test.com")
+
+    @staticmethod
+    def _token(n):
+        return f"ExponentPushToken[{n:022d}]"
+
+    def _aluno(self, n, turma, dias, email=None):
+        aluno = Usuario.objects.create_user(
+            username=f"1111111110{n}", password="x", tipo="aluno", first_name=f"Aluno{n}",
+            email=email or f"a{n}@test.com", cpf=f"1111111110{n}", telefone_emergencia="21999990000",
+        )
+        aluno.dias_habilitados.set(dias)
+        turma.alunos.add(aluno)
+        PushTokenExpo.objects.create(usuario=aluno, token=self._token(n))
+        return aluno
+
+    def _segmento(self, segmento, valor=None):
+        with self.assertNumQueries(1):
+            return sorted(tokens_do_segmento(segmento, valor, hoje=HOJE))
+
+    def test_cada_segmento_resolve_numa_consulta(self):
+        t = self._token
+        self.assertEqual(self._segmento("todos"), [t(1), t(2), t(3), t(11)])
+        self.assertEqual(self._segmento("turma", self.turma_ter.id), [t(1), t(3), t(11)])
+        self.assertEqual(self._segmento("ct", self.praia.id), [t(1), t(2), t(11)])
+        self.assertEqual(self._segmento("dia_semana", 1), [t(3)])
+        self.assertEqual(self._segmento("inadimplentes"), [t(2)])
+        self.assertEqual(self._segmento("wellhub"), [t(3)])
+        self.assertEqual(self._segmento("somente_ct"), [t(1), t(2), t(11)])
+        # Amanhã é terça: Ana está na turma de terça mas só tem segunda habilitada
+        self.assertEqual(self._segmento("checkin_amanha"), [t(3)])
+        with self.assertRaises(SegmentoInvalido):
+            tokens_do_segmento("turma", "abc")
+
+    def test_lembrete_de_aula_em_lote_e_idempotente(self):
+        Presenca.objects.create(usuario=self.ana, turma=self.turma_seg, data=HOJE, checkin_realizado=True)
+        self.caio.dias_habilitados.add(DiaSemana.objects.get(nome="Segunda-feira"))
+
+        campanhas = lembrar_aulas_em_breve(agora=AGORA)
+        # Ana já fez check-in, Bia está inadimplente e Caio não é da turma das 17h
+        self.assertEqual(campanhas, [])
+
+        Mensalidade.objects.filter(aluno=self.bia).update(status="pago")
+        # 2 leituras (turmas da janela + pares turma/token) e a gravação da campanha
+        with self.assertNumQueries(7):
+            campanhas = lembrar_aulas_em_breve(agora=AGORA)
+        self.assertEqual([c.total_tokens for c in campanhas], [1])
+        self.assertEqual(list(campanhas[0].envios.values_list("token", flat=True)), [self._token(2)])
+        self.assertEqual(lembrar_aulas_em_breve(agora=AGORA), [])
+
+    def test_envio_segmentado_pela_api(self):
+        gerente = Usuario.objects.create_user(
+            username="00000000000", password="x", tipo="gerente", first_name="G", email="g@test.com", cpf="00000000000",
+        )
+        client = APIClient()
+        client.force_authenticate(gerente)
+        url = "/api/usuarios/notificacoes-app/enviar/"
+        dados = {"titulo": "Aviso", "mensagem": "Aula cancelada", "segmento": "turma", "valor": self.turma_seg.id}
+
+        resp = client.post(url, dados, format="json")
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.data["destinatarios_tokens"], 3)
+        self.assertEqual(
+            CampanhaPush.objects.get(pk=resp.data["campanha_id"]).segmento,
+            {"tipo": "turma", "valor": self.turma_seg.id},
+        )
+        for segmento in ("vip", 123, ["turma"], {"tipo": "turma"}):
+            self.assertEqual(client.post(url, {**dados, "segmento": segmento}, format="json").status_code, 400)
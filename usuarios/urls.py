@@ -3,7 +3,7 @@ from .views import (
     ListarPrecadastrosAPIView, EditarExcluirPrecadastroAPIView,
     ReagendarAulaExperimentalAPIView,
     FinalizarAgendamentoAPIView, LoginAPIView, LogoutAPIView, AtivarContaAPIView,
-    ListarCriarUsuariosAPIView, EditarExcluirUsuarioAPIView, ReenviarConviteAPIView, AceitarContratoAPIView,
+    ListarCriarUsuariosAPIView, DiretorioUsuariosAPIView, EditarExcluirUsuarioAPIView, ReenviarConviteAPIView, AceitarContratoAPIView,
     ReverterAlunoParaPreCadastroAPIView,
     SuspenderContratoAPIView,
     SolicitarPrimeiroAcessoAPIView,
@@ -13,6 +13,7 @@ from .push_views import (
     RegistrarPushTokenExpoAPIView,
     NotificacaoAppEstatisticasAPIView,
     EnviarNotificacaoAlunosAppAPIView,
+    CampanhaPushProgressoAPIView,
 )
 
 urlpatterns = [
@@ -34,6 +35,8 @@ urlpatterns = [
     path('push-token/', RegistrarPushTokenExpoAPIView.as_view(), name='registrar_push_token_expo_api'),
     path('notificacoes-app/estatisticas/', NotificacaoAppEstatisticasAPIView.as_view(), name='notificacao_app_estatisticas_api'),
     path('notificacoes-app/enviar/', EnviarNotificacaoAlunosAppAPIView.as_view(), name='enviar_notificacao_alunos_app_api'),
+    path('notificacoes-app/campanhas/<int:campanha_id>/', CampanhaPushProgressoAPIView.as_view(), name='campanha_push_progresso_api'),
+    path('diretorio/', DiretorioUsuariosAPIView.as_view(), name='diretorio_usuarios_api'),
     path('', ListarCriarUsuariosAPIView.as_view(), name='listar_criar_usuarios_api'),
     path('<int:pk>/', EditarExcluirUsuarioAPIView.as_view(), name='editar_excluir_usuario_api'),
 ]
\ No newline at end of file
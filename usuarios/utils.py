@@ -1,6 +1,5 @@
 from django.contrib.auth import authenticate, login
 from django.contrib import messages
-from django.core.mail import send_mail, EmailMultiAlternatives
 from django.core.signing import Signer
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
@@ -11,7 +10,9 @@ from typing import Optional, List
 from urllib.parse import quote
 import re
 import base64
-import html as html_module
+import unicodedata
+
+from usuarios.emails import renderizar_email
 
 logger = logging.getLogger(__name__)
 
@@ -34,153 +35,27 @@ def normalizar_telefone_br_para_precadastro(valor) -> str:
         d = d[-11:]
     return d
 
-SALT_REAGENDAR = "reagendar_aula_experimental"
-
-# Cores e branding do CT Supera (conforme o site)
-EMAIL_COR_PRIMARIA = "#1F6C86"      # Azul principal (navbar, títulos)
-EMAIL_COR_DESTAQUE = "#E0CC98"     # Dourado (botões)
-EMAIL_COR_FUNDO = "#f5f5f5"
-EMAIL_COR_FOOTER = "#666"
+def normalizar_texto_busca(valor) -> str:
+    """Minúsculas, sem acentos e com espaços simples (coluna ``Usuario.busca`` e termos da busca)."""
+    if not valor:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(valor))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
 
 
-def _get_logo_url():
-    """Retorna a URL absoluta do logo CT Supera para uso em e-mails."""
-    logo_url = getattr(settings, 'EMAIL_LOGO_URL', None)
-    if logo_url:
-        return logo_url
-    frontend_url = getattr(settings, 'FRONTEND_URL', 'https://ctsupera.com.br')
-    return f"{frontend_url.rstrip('/')}/logo-supera-principal.png"
+def termos_busca_usuario(q) -> list:
+    """Termos de ``?q=``; um termo só com dígitos, pontos e traços vira CPF sem máscara."""
+    termos = []
+    for termo in normalizar_texto_busca(q).split(' '):
+        if re.fullmatch(r'[\d.\-/]+', termo):
+            termo = re.sub(r'\D', '', termo)
+        if termo:
+            termos.append(termo)
+    return termos
 
 
-def _email_wrapper_html(content_html: str, titulo_header: str = "CT Supera", subtitulo: str = "") -> str:
-    """
-    Retorna o HTML completo de um e-mail com header (logo + cores), conteúdo e footer.
-    content_html: HTML do corpo da mensagem
-    titulo_header: título exibido no header (abaixo do logo)
-    subtitulo: subtítulo opcional no header
-    """
-    logo_url = _get_logo_url()
-    return f"""
-<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{titulo_header} - CT Supera</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            margin: 0;
-            padding: 0;
-            background-color: {EMAIL_COR_FUNDO};
-        }}
-        .email-container {{
-            max-width: 600px;
-            margin: 0 auto;
-            background-color: #ffffff;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }}
-        .email-header {{
-            background-color: {EMAIL_COR_PRIMARIA};
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        .email-header img {{
-            max-width: 200px;
-            height: auto;
-            max-height: 80px;
-            display: block;
-            margin: 0 auto 15px auto;
-        }}
-        .email-header h1 {{
-            margin: 0;
-            font-size: 24px;
-            font-weight: 600;
-        }}
-        .email-header .subtitle {{
-            margin-top: 8px;
-            opacity: 0.95;
-            font-size: 15px;
-        }}
-        .email-content {{
-            padding: 35px 30px;
-        }}
-        .cta-button {{
-            display: inline-block;
-            background-color: {EMAIL_COR_DESTAQUE};
-            color: {EMAIL_COR_PRIMARIA};
-            text-decoration: none;
-            padding: 14px 28px;
-            border-radius: 6px;
-            font-weight: bold;
-            font-size: 16px;
-            margin: 15px 0;
-        }}
-        .info-box {{
-            background-color: #f8f9fa;
-            border-left: 4px solid {EMAIL_COR_PRIMARIA};
-            padding: 18px;
-            margin: 20px 0;
-            border-radius: 0 8px 8px 0;
-        }}
-        .info-box h3 {{
-            margin: 0 0 12px 0;
-            color: #2c3e50;
-            font-size: 16px;
-        }}
-        .info-list {{
-            margin: 0;
-            padding-left: 20px;
-        }}
-        .info-list li {{
-            margin-bottom: 6px;
-            color: #555;
-        }}
-        .email-footer {{
-            background-color: #f8f9fa;
-            padding: 25px 30px;
-            text-align: center;
-            color: {EMAIL_COR_FOOTER};
-            font-size: 14px;
-        }}
-        .link-fallback {{
-            word-break: break-all;
-            color: {EMAIL_COR_PRIMARIA};
-            text-decoration: none;
-        }}
-        @media only screen and (max-width: 600px) {{
-            .email-container {{
-                margin: 10px;
-            }}
-            .email-header, .email-content, .email-footer {{
-                padding: 20px;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="email-container">
-        <div class="email-header">
-            <img src="{logo_url}" alt="CT Supera - Centro de Treinamento" />
-            <h1>{titulo_header}</h1>
-            {f'<div class="subtitle">{subtitulo}</div>' if subtitulo else ''}
-        </div>
-        <div class="email-content">
-            {content_html}
-        </div>
-        <div class="email-footer">
-            <strong>CT Supera - Centro de Treinamento</strong><br>
-            Sistema de Gestão Completo
-        </div>
-    </div>
-</body>
-</html>
-"""
+SALT_REAGENDAR = "reagendar_aula_experimental"
 
 
 def gerar_token_reagendamento(precadastro_id: int) -> str:
@@ -256,15 +131,23 @@ def is_gerente_ou_professor(user) -> bool:
 
 
 
+def _enfileirar_email(tipo, assunto, corpo_texto, destinatarios, **kwargs):
+    """Grava na fila de saída (EmailSaida); o envio SMTP é do worker `processar_emails`."""
+    # Import local: usuarios.models importa este módulo
+    from usuarios.fila_email import enfileirar_email
+
+    return enfileirar_email(tipo, assunto, corpo_texto, destinatarios, **kwargs)
+
+
 def enviar_convite_aluno(aluno) -> None:
     """
-    Envia e-mail de ativação para um aluno com link seguro.
+    Enfileira o e-mail de ativação para um aluno com link seguro.
     
     Args:
         aluno: Instância do modelo Usuario (aluno)
     
     Raises:
-        Exception: Se houver erro no envio do e-mail
+        Exception: Se houver erro ao enfileirar o e-mail
         ValueError: Se o aluno não tem e-mail válido
     """
     # Validações
@@ -282,75 +165,12 @@ def enviar_convite_aluno(aluno) -> None:
         frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')
         link_ativacao = f"{frontend_url}/ativar-conta/{uidb64}/{token}/"
 
-        # Versão em texto simples (fallback para clientes que não suportam HTML)
-        mensagem_texto = f"""
-        Olá {aluno.first_name}, seja bem-vindo ao sistema! 🚀
-
-        Sua conta foi criada com sucesso e está aguardando ativação.
-
-        🔗 Clique no link abaixo para ativar sua conta e definir sua senha:
-        {link_ativacao}
-
-        ⚠️ IMPORTANTE:
-        - Este link é válido por 24 horas
-        - Use seu CPF como usuário para fazer login
-        - Defina uma senha segura (mínimo 8 caracteres)
-        - Se o link expirar, solicite um novo ao administrador
-
-        Qualquer dúvida, estamos à disposição. 🤝
-        """
-
-        # Versão HTML com logo e cores CT Supera
-        content_html = f"""
-                    <div style="font-size: 18px; color: #2c3e50; margin-bottom: 20px;">
-                        Olá <strong>{aluno.first_name}</strong>, seja bem-vindo ao CT Supera! 🚀
-                    </div>
-                    
-                    <div style="color: #555; margin-bottom: 25px; font-size: 16px;">
-                        Sua conta foi criada com sucesso e está aguardando ativação. 
-                        Para começar a usar o sistema, você precisa ativar sua conta e definir sua senha.
-                    </div>
-                    
-                    <div style="text-align: center;">
-                        <a href="{link_ativacao}" class="cta-button">
-                            🎯 ATIVAR MINHA CONTA
-                        </a>
-                    </div>
-                    
-                    <div class="info-box">
-                        <h3>⚠️ Informações Importantes</h3>
-                        <ul class="info-list">
-                            <li><strong>Validade:</strong> Este link é válido por 24 horas</li>
-                            <li><strong>Usuário:</strong> Use seu CPF como nome de usuário para fazer login</li>
-                            <li><strong>Senha:</strong> Defina uma senha segura (mínimo 8 caracteres)</li>
-                            <li><strong>Segurança:</strong> Inclua letras maiúsculas, minúsculas, números e caracteres especiais</li>
-                        </ul>
-                    </div>
-                    
-                    <div style="margin-top: 25px; padding: 15px; background-color: #e8f4fd; border-radius: 8px; border-left: 4px solid {EMAIL_COR_PRIMARIA};">
-                        <strong>🔗 Link de Ativação:</strong><br>
-                        <a href="{link_ativacao}" class="link-fallback">{link_ativacao}</a>
-                    </div>
-                    <div style="color: #999; font-size: 12px; margin-top: 15px;">
-                        Se o link não funcionar, copie e cole o endereço acima no seu navegador.
-                    </div>
-        """
-        mensagem_html = _email_wrapper_html(
-            content_html,
-            titulo_header="Bem-vindo ao Sistema!",
-            subtitulo="Sua conta foi criada com sucesso"
-        )
-
-        # Envia e-mail com versão HTML e texto simples
-        send_mail(
-            "Ativação da sua conta - Sistema CT Supera",
-            mensagem_texto,
-            settings.DEFAULT_FROM_EMAIL,
-            [aluno.email],
-            fail_silently=False,
-            html_message=mensagem_html
+        # Templates emails/convite.(html|txt): versão HTML com logo e cores CT Supera e texto simples
+        assunto, mensagem_texto, mensagem_html = renderizar_email(
+            "convite", {"nome": aluno.first_name, "link": link_ativacao}
         )
-        logger.info(f"Convite de ativação enviado para {aluno.email}")
+        _enfileirar_email("convite", assunto, mensagem_texto, [aluno.email], corpo_html=mensagem_html)
+        logger.info(f"Convite de ativação enfileirado para {aluno.email}")
         return True
     except Exception as e:
         logger.error(f"Erro ao enviar convite para {aluno.email}: {str(e)}")
@@ -368,7 +188,7 @@ def enviar_primeira_mensalidade_email(
     qr_png_bytes=None,
 ) -> bool:
     """
-    Envia e-mail ao aluno com os dados da primeira mensalidade para pagamento.
+    Enfileira e-mail ao aluno com os dados da primeira mensalidade para pagamento.
     forma_pagamento: 'pix' ou 'boleto'
     codigo_pix: código PIX Copia e Cola (quando forma_pagamento='pix')
     digitable_line: linha digitável do boleto (quando forma_pagamento='boleto')
@@ -379,9 +199,11 @@ def enviar_primeira_mensalidade_email(
         logger.warning("Aluno sem e-mail válido, não enviando cobrança.")
         return False
 
-    nome = f"{aluno.first_name} {aluno.last_name or ''}".strip() or "Aluno"
-    valor_str = f"R$ {float(valor):.2f}".replace(".", ",")
-    data_str = data_vencimento.strftime("%d/%m/%Y") if hasattr(data_vencimento, 'strftime') else str(data_vencimento)
+    contexto = {
+        "nome": f"{aluno.first_name} {aluno.last_name or ''}".strip() or "Aluno",
+        "valor": f"R$ {float(valor):.2f}".replace(".", ","),
+        "vencimento": data_vencimento.strftime("%d/%m/%Y") if hasattr(data_vencimento, 'strftime') else str(data_vencimento),
+    }
 
     if forma_pagamento == 'pix' and codigo_pix:
         from financeiro.pix_utils import (
@@ -402,109 +224,37 @@ def enviar_primeira_mensalidade_email(
         if qr_png_bytes is None:
             qr_png_bytes = gerar_qr_pix_png_bytes(codigo_pix)
 
-        codigo_esc = html_module.escape(codigo_pix)
-        assunto = "Sua primeira mensalidade - Pagamento via PIX - CT Supera"
-        corpo_texto = f"""
-Olá {nome}!
-
-Sua matrícula foi confirmada. Segue o pagamento da primeira mensalidade:
-
-Valor: {valor_str}
-Vencimento: {data_str}
-
-PAGAMENTO VIA PIX
-Copie o código abaixo INTEIRO (uma única linha, sem espaços no meio) e cole em "PIX copia e cola"
-no app do banco (PagBank, Nubank, etc.):
-
-{codigo_pix}
-
-Dica: também enviamos o QR Code em anexo (pix_qrcode.png) — abra o app do banco em PIX por QR Code e use a imagem.
-
-Qualquer dúvida, entre em contato conosco.
-"""
-        bloco_qr_html = ""
-        if qr_png_bytes:
-            b64_qr = base64.b64encode(qr_png_bytes).decode("ascii")
-            bloco_qr_html = f"""
-                    <p style="margin-top: 18px;"><strong>QR Code PIX</strong> (mesmo pagamento que o código abaixo):</p>
-                    <div style="text-align:center;margin:16px 0;">
-                        <img src="data:image/png;base64,{b64_qr}" alt="QR Code PIX" width="220" height="220" style="max-width:100%;height:auto;border:1px solid #e0e0e0;border-radius:8px;padding:8px;background:#fff;" />
-                    </div>
-                    <p style="color:#666;font-size:14px;">Se a imagem não aparecer, use o anexo <strong>pix_qrcode.png</strong> ou o código copia e cola.</p>
-            """
-
-        content_html = f"""
-                    <div style="font-size: 18px; color: #2c3e50; margin-bottom: 15px;">
-                        Olá <strong>{html_module.escape(nome)}</strong>,
-                    </div>
-                    <p style="color: #555; margin-bottom: 20px;">Sua matrícula foi confirmada. Segue o pagamento da primeira mensalidade:</p>
-                    <p><strong>Valor:</strong> {valor_str}<br><strong>Vencimento:</strong> {data_str}</p>
-                    {bloco_qr_html}
-                    <p style="margin-top: 20px;"><strong>PIX copia e cola</strong> (copie tudo de uma vez):</p>
-                    <pre style="background:#f5f5f5;padding:12px;border-radius:4px;overflow-x:auto;border-left:4px solid {EMAIL_COR_PRIMARIA};white-space:pre-wrap;word-break:break-all;font-size:12px;">{codigo_esc}</pre>
-                    <p style="margin-top: 15px; color:#555;">Cole no app do banco em <strong>PIX → Copia e cola</strong>. O código é uma linha só; não apague nem quebre no meio.</p>
-        """
-        corpo_html = _email_wrapper_html(
-            content_html,
-            titulo_header="Primeira mensalidade - PIX",
-            subtitulo="Pagamento via PIX"
-        )
-        email = EmailMultiAlternatives(
+        assunto, corpo_texto, corpo_html = renderizar_email("primeira_mensalidade_pix", {
+            **contexto,
+            "codigo_pix": codigo_pix,
+            "qr_base64": base64.b64encode(qr_png_bytes).decode("ascii") if qr_png_bytes else "",
+        })
+        _enfileirar_email(
+            "primeira_mensalidade",
             assunto,
-            corpo_texto.strip(),
-            settings.DEFAULT_FROM_EMAIL,
+            corpo_texto,
             [aluno.email],
+            corpo_html=corpo_html,
+            anexos=[("pix_qrcode.png", qr_png_bytes, "image/png")] if qr_png_bytes else [],
         )
-        email.attach_alternative(corpo_html, "text/html")
-        if qr_png_bytes:
-            email.attach("pix_qrcode.png", qr_png_bytes, "image/png")
-        email.send(fail_silently=False)
-        logger.info(f"Cobrança PIX enviada por e-mail para {aluno.email}")
+        logger.info(f"Cobrança PIX enfileirada por e-mail para {aluno.email}")
         return True
 
     elif forma_pagamento == 'boleto' and digitable_line:
-        assunto = "Sua primeira mensalidade - Boleto - CT Supera"
-        corpo_texto = f"""
-Olá {nome}!
-
-Sua matrícula foi confirmada. Segue o pagamento da primeira mensalidade:
-
- Valor: {valor_str}
- Vencimento: {data_str}
-
-PAGAMENTO VIA BOLETO
-Linha digitável (copie e cole no app do banco ou internet banking):
-
-{digitable_line}
-
-O boleto em PDF está anexado a este e-mail.
-"""
-        content_html = f"""
-                    <div style="font-size: 18px; color: #2c3e50; margin-bottom: 15px;">
-                        Olá <strong>{nome}</strong>,
-                    </div>
-                    <p style="color: #555; margin-bottom: 20px;">Sua matrícula foi confirmada. Segue o pagamento da primeira mensalidade:</p>
-                    <p><strong>Valor:</strong> {valor_str}<br><strong>Vencimento:</strong> {data_str}</p>
-                    <p style="margin-top: 20px;"><strong>Linha digitável:</strong></p>
-                    <pre style="background:#f5f5f5;padding:12px;border-radius:4px;border-left:4px solid {EMAIL_COR_PRIMARIA};">{digitable_line}</pre>
-                    <p style="margin-top: 15px;">O boleto em PDF está anexado a este e-mail.</p>
-        """
-        corpo_html = _email_wrapper_html(
-            content_html,
-            titulo_header="Primeira mensalidade - Boleto",
-            subtitulo="Pagamento via Boleto"
-        )
-        email = EmailMultiAlternatives(
+        assunto, corpo_texto, corpo_html = renderizar_email("primeira_mensalidade_boleto", {
+            **contexto,
+            "linha_digitavel": digitable_line,
+            "tem_pdf": bool(pdf_content),
+        })
+        _enfileirar_email(
+            "primeira_mensalidade",
             assunto,
-            corpo_texto.strip(),
-            settings.DEFAULT_FROM_EMAIL,
+            corpo_texto,
             [aluno.email],
+            corpo_html=corpo_html,
+            anexos=[("boleto_mensalidade.pdf", pdf_content, "application/pdf")] if pdf_content else [],
         )
-        email.attach_alternative(corpo_html, "text/html")
-        if pdf_content:
-            email.attach("boleto_mensalidade.pdf", pdf_content, "application/pdf")
-        email.send(fail_silently=False)
-        logger.info(f"Boleto enviado por e-mail para {aluno.email}")
+        logger.info(f"Boleto enfileirado por e-mail para {aluno.email}")
         return True
 
     logger.warning("enviar_primeira_mensalidade_email: forma_pagamento ou dados inválidos")
@@ -528,9 +278,30 @@ def reenviar_convite_aluno(aluno) -> bool:
         return False
 
 
+def _contexto_aula_experimental(precadastro) -> dict:
+    """Contexto comum da confirmação e do lembrete de aula experimental."""
+    turma = None
+    if precadastro.turma:
+        ct = precadastro.turma.ct
+        turma = {
+            "ct": ct.nome if ct else "CT",
+            "horario": precadastro.turma.horario.strftime("%H:%M") if precadastro.turma.horario else "",
+            # .all() (e não .exists() + .all()): uma consulta, ou nenhuma com prefetch_related
+            "dias": ", ".join(d.nome for d in precadastro.turma.dias_semana.all()),
+        }
+    frontend_url = getattr(settings, 'FRONTEND_URL', 'https://ctsupera.com.br')
+    token = gerar_token_reagendamento(precadastro.id)
+    return {
+        "nome": f"{precadastro.first_name} {precadastro.last_name or ''}".strip() or "Visitante",
+        "data": precadastro.data_aula_experimental.strftime("%d/%m/%Y"),
+        "turma": turma,
+        "link_reagendar": f"{frontend_url}/agendamento/reagendar?token={quote(token)}",
+    }
+
+
 def enviar_confirmacao_aula_experimental(precadastro) -> bool:
     """
-    Envia e-mail de confirmação de agendamento de aula experimental.
+    Enfileira e-mail de confirmação de agendamento de aula experimental.
     """
     if not precadastro.email or precadastro.email == 'pendente':
         logger.warning("Pré-cadastro sem e-mail válido, não enviando confirmação.")
@@ -538,59 +309,17 @@ def enviar_confirmacao_aula_experimental(precadastro) -> bool:
     if precadastro.origem != 'aula_experimental' or not precadastro.data_aula_experimental:
         return False
     try:
-        nome = f"{precadastro.first_name} {precadastro.last_name or ''}".strip() or "Visitante"
-        data_str = precadastro.data_aula_experimental.strftime("%d/%m/%Y")
-        turma_info = ""
-        if precadastro.turma:
-            ct = precadastro.turma.ct
-            ct_nome = ct.nome if ct else "CT"
-            horario = precadastro.turma.horario.strftime("%H:%M") if precadastro.turma.horario else ""
-            dias = ", ".join(d.nome for d in precadastro.turma.dias_semana.all()) if precadastro.turma.dias_semana.exists() else ""
-            turma_info = f"\n\n📍 Centro: {ct_nome}\n⏰ Horário: {horario}\n📅 Dias: {dias}"
-        frontend_url = getattr(settings, 'FRONTEND_URL', 'https://ctsupera.com.br')
-        token = gerar_token_reagendamento(precadastro.id)
-        link_reagendar = f"{frontend_url}/agendamento/reagendar?token={quote(token)}"
-
-        assunto = "Aula experimental agendada - CT Supera"
-        mensagem = f"""
-Olá {nome}!
-
-Sua aula experimental foi agendada com sucesso! 🎉
-
-📅 Data: {data_str}{turma_info}
-
-Para reagendar (até 24h antes), acesse: {link_reagendar}
-
-Qualquer dúvida, entre em contato conosco.
-"""
-        content_html = f"""
-                    <div style="font-size: 18px; color: #2c3e50; margin-bottom: 20px;">
-                        Olá <strong>{nome}</strong>,
-                    </div>
-                    <p style="color: #555; margin-bottom: 20px;">Sua aula experimental foi agendada com sucesso! 🎉</p>
-                    <div class="info-box">
-                        <h3>📅 Informações do agendamento</h3>
-                        <p style="margin: 0;"><strong>Data:</strong> {data_str}</p>
-                        {f'<p style="margin: 10px 0 0 0;">{turma_info.replace(chr(10), "<br>")}</p>' if turma_info else ''}
-                    </div>
-                    <p style="margin-top: 20px;">Para reagendar (até 24h antes), acesse:</p>
-                    <p><a href="{link_reagendar}" class="link-fallback">{link_reagendar}</a></p>
-                    <p style="margin-top: 20px; color: #666;">Qualquer dúvida, entre em contato conosco.</p>
-        """
-        mensagem_html = _email_wrapper_html(
-            content_html,
-            titulo_header="Aula experimental agendada",
-            subtitulo="Confirmação de agendamento"
+        assunto, mensagem, mensagem_html = renderizar_email(
+            "confirmacao_aula_experimental", _contexto_aula_experimental(precadastro)
         )
-        send_mail(
+        _enfileirar_email(
+            "confirmacao_aula_experimental",
             assunto,
-            mensagem.strip(),
-            settings.DEFAULT_FROM_EMAIL,
+            mensagem,
             [precadastro.email],
-            fail_silently=True,
-            html_message=mensagem_html,
+            corpo_html=mensagem_html,
         )
-        logger.info(f"Confirmação de aula experimental enviada para {precadastro.email}")
+        logger.info(f"Confirmação de aula experimental enfileirada para {precadastro.email}")
         return True
     except Exception as e:
         logger.error(f"Erro ao enviar confirmação para {precadastro.email}: {e}")
@@ -599,66 +328,24 @@ Qualquer dúvida, entre em contato conosco.
 
 def enviar_lembrete_aula_experimental(precadastro) -> bool:
     """
-    Envia e-mail de lembrete de aula experimental (24h antes).
+    Enfileira e-mail de lembrete de aula experimental (24h antes).
     """
     if not precadastro.email or precadastro.email == 'pendente':
         return False
     if precadastro.origem != 'aula_experimental' or not precadastro.data_aula_experimental:
         return False
     try:
-        nome = f"{precadastro.first_name} {precadastro.last_name or ''}".strip() or "Visitante"
-        data_str = precadastro.data_aula_experimental.strftime("%d/%m/%Y")
-        turma_info = ""
-        if precadastro.turma:
-            ct = precadastro.turma.ct
-            ct_nome = ct.nome if ct else "CT"
-            horario = precadastro.turma.horario.strftime("%H:%M") if precadastro.turma.horario else ""
-            dias = ", ".join(d.nome for d in precadastro.turma.dias_semana.all()) if precadastro.turma.dias_semana.exists() else ""
-            turma_info = f"\n\n📍 Centro: {ct_nome}\n⏰ Horário: {horario}\n📅 Dias: {dias}"
-        frontend_url = getattr(settings, 'FRONTEND_URL', 'https://ctsupera.com.br')
-        token = gerar_token_reagendamento(precadastro.id)
-        link_reagendar = f"{frontend_url}/agendamento/reagendar?token={quote(token)}"
-
-        assunto = "Lembrete: sua aula experimental amanhã - CT Supera"
-        mensagem = f"""
-Olá {nome}!
-
-Lembrete: sua aula experimental é AMANHÃ! 🎯
-
-📅 Data: {data_str}{turma_info}
-
-Para reagendar (até 24h antes), acesse: {link_reagendar}
-
-Te esperamos!
-"""
-        content_html = f"""
-                    <div style="font-size: 18px; color: #2c3e50; margin-bottom: 20px;">
-                        Olá <strong>{nome}</strong>,
-                    </div>
-                    <p style="color: #555; margin-bottom: 20px; font-size: 17px;"><strong>Lembrete: sua aula experimental é AMANHÃ! 🎯</strong></p>
-                    <div class="info-box">
-                        <h3>📅 Informações</h3>
-                        <p style="margin: 0;"><strong>Data:</strong> {data_str}</p>
-                        {f'<p style="margin: 10px 0 0 0;">{turma_info.replace(chr(10), "<br>")}</p>' if turma_info else ''}
-                    </div>
-                    <p style="margin-top: 20px;">Para reagendar (até 24h antes), acesse:</p>
-                    <p><a href="{link_reagendar}" class="link-fallback">{link_reagendar}</a></p>
-                    <p style="margin-top: 25px; font-size: 16px;">Te esperamos! 🏋️</p>
-        """
-        mensagem_html = _email_wrapper_html(
-            content_html,
-            titulo_header="Lembrete: aula experimental amanhã",
-            subtitulo="Não esqueça da sua aula!"
+        assunto, mensagem, mensagem_html = renderizar_email(
+            "lembrete_aula_experimental", _contexto_aula_experimental(precadastro)
         )
-        send_mail(
+        _enfileirar_email(
+            "lembrete_aula_experimental",
             assunto,
-            mensagem.strip(),
-            settings.DEFAULT_FROM_EMAIL,
+            mensagem,
             [precadastro.email],
-            fail_silently=True,
-            html_message=mensagem_html,
+            corpo_html=mensagem_html,
         )
-        logger.info(f"Lembrete de aula experimental enviado para {precadastro.email}")
+        logger.info(f"Lembrete de aula experimental enfileirado para {precadastro.email}")
         return True
     except Exception as e:
         logger.error(f"Erro ao enviar lembrete para {precadastro.email}: {e}")
@@ -685,13 +372,13 @@ def pode_receber_convite(aluno) -> bool:
 
 def enviar_recuperacao_senha(usuario) -> None:
     """
-    Envia e-mail de recuperação de senha para um usuário ativo.
+    Enfileira e-mail de recuperação de senha para um usuário ativo.
     
     Args:
         usuario: Instância do modelo Usuario (usuário ativo)
     
     Raises:
-        Exception: Se houver erro no envio do e-mail
+        Exception: Se houver erro ao enfileirar o e-mail
         ValueError: Se o usuário não tem e-mail válido ou não está ativo
     """
     # Validações
@@ -712,79 +399,12 @@ def enviar_recuperacao_senha(usuario) -> None:
         frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')
         link_recuperacao = f"{frontend_url}/redefinir-senha/{uidb64}/{token}/"
 
-        # Versão em texto simples (fallback para clientes que não suportam HTML)
-        mensagem_texto = f"""
-        Olá {usuario.first_name}, recebemos sua solicitação de recuperação de senha! 🔐
-
-        Para redefinir sua senha, clique no link abaixo:
-        {link_recuperacao}
-
-        ⚠️ IMPORTANTE:
-        - Este link é válido por 24 horas
-        - Use seu CPF como usuário para fazer login
-        - Defina uma senha segura (mínimo 8 caracteres)
-        - Se não solicitou esta recuperação, ignore este e-mail
-
-        Qualquer dúvida, estamos à disposição. 🤝
-        """
-
-        # Versão HTML com logo e cores CT Supera
-        content_html = f"""
-                    <div style="font-size: 18px; color: #2c3e50; margin-bottom: 20px;">
-                        Olá <strong>{usuario.first_name}</strong>, recebemos sua solicitação! 🔐
-                    </div>
-                    
-                    <div style="color: #555; margin-bottom: 25px; font-size: 16px;">
-                        Para redefinir sua senha e acessar sua conta novamente, 
-                        clique no botão abaixo e siga as instruções.
-                    </div>
-                    
-                    <div style="text-align: center;">
-                        <a href="{link_recuperacao}" class="cta-button">
-                            🔑 REDEFINIR MINHA SENHA
-                        </a>
-                    </div>
-                    
-                    <div style="background-color: #fff3cd; border: 1px solid #ffeaa7; border-radius: 8px; padding: 15px; margin: 20px 0; color: #856404;">
-                        <strong>⚠️ Aviso de Segurança:</strong><br>
-                        Se você não solicitou esta recuperação de senha, 
-                        ignore este e-mail. Sua conta permanece segura.
-                    </div>
-                    
-                    <div class="info-box">
-                        <h3>📋 Informações Importantes</h3>
-                        <ul class="info-list">
-                            <li><strong>Validade:</strong> Este link é válido por 24 horas</li>
-                            <li><strong>Usuário:</strong> Use seu CPF como nome de usuário para fazer login</li>
-                            <li><strong>Senha:</strong> Defina uma senha segura (mínimo 8 caracteres)</li>
-                            <li><strong>Segurança:</strong> Inclua letras maiúsculas, minúsculas, números e caracteres especiais</li>
-                        </ul>
-                    </div>
-                    
-                    <div style="margin-top: 25px; padding: 15px; background-color: #e8f4fd; border-radius: 8px; border-left: 4px solid {EMAIL_COR_PRIMARIA};">
-                        <strong>🔗 Link de Recuperação:</strong><br>
-                        <a href="{link_recuperacao}" class="link-fallback">{link_recuperacao}</a>
-                    </div>
-                    <div style="color: #999; font-size: 12px; margin-top: 15px;">
-                        Se o link não funcionar, copie e cole o endereço acima no seu navegador.
-                    </div>
-        """
-        mensagem_html = _email_wrapper_html(
-            content_html,
-            titulo_header="Recuperação de Senha",
-            subtitulo="Redefina sua senha com segurança"
-        )
-
-        # Envia e-mail com versão HTML e texto simples
-        send_mail(
-            "Recuperação de Senha - Sistema CT Supera",
-            mensagem_texto,
-            settings.DEFAULT_FROM_EMAIL,
-            [usuario.email],
-            fail_silently=False,
-            html_message=mensagem_html
+        # Templates emails/recuperacao_senha.(html|txt): versão HTML e texto simples
+        assunto, mensagem_texto, mensagem_html = renderizar_email(
+            "recuperacao_senha", {"nome": usuario.first_name, "link": link_recuperacao}
         )
-        logger.info(f"E-mail de recuperação de senha enviado para {usuario.email}")
+        _enfileirar_email("recuperacao_senha", assunto, mensagem_texto, [usuario.email], corpo_html=mensagem_html)
+        logger.info(f"E-mail de recuperação de senha enfileirado para {usuario.email}")
         return True
     except Exception as e:
         logger.error(f"Erro ao enviar e-mail de recuperação para {usuario.email}: {str(e)}")
@@ -1,5 +1,5 @@
 from rest_framework.views import APIView
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import status
@@ -14,14 +14,17 @@ from django.contrib.auth.forms import SetPasswordForm
 from usuarios.models import Usuario, PreCadastro
 from turmas.models import DiaSemana, Turma
 from turmas.views import DIASEMANA_WEEKDAY_MAP
-from usuarios.utils import obter_precadastro_por_token
+from usuarios.utils import obter_precadastro_por_token, termos_busca_usuario
+from usuarios.pagination import DiretorioUsuariosPagination
 from usuarios.forms import DefinirSenhaForm
 from usuarios.permissions import IsGerente, IsStaffCT, PodeAcessarUsuario
 from usuarios.serializers import DefinirSenhaSerializer, SolicitarRecuperacaoSenhaSerializer, RedefinirSenhaSerializer
 from financeiro.models import Mensalidade
 from django.utils import timezone
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
-from .serializers import UsuarioSerializer, PreCadastroSerializer, MensalidadeSerializer, SalarioSerializer
+from .serializers import (
+    UsuarioSerializer, UsuarioDiretorioSerializer, PreCadastroSerializer, MensalidadeSerializer, SalarioSerializer,
+)
 from datetime import timedelta
 from django.core.mail import send_mail
 from django.db import transaction, IntegrityError
@@ -29,6 +32,7 @@ from django.db.models import Prefetch
 import logging
 import re
 from app.date_api import format_data_api, parse_data_api
+from app.etag import resposta_condicional
 from app.aula_experimental_datas import (
     data_no_janela_agendamento,
     eh_feriado_nacional_br,
@@ -919,6 +923,27 @@ class AtivarContaAPIView(APIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+def filtrar_usuarios(queryset, params):
+    """Filtros ``?tipo=``, ``?ativo=`` e ``?turma=`` da listagem e do diretório de usuários."""
+    tipo = params.get('tipo', None)
+    if tipo:
+        queryset = queryset.filter(tipo=tipo)
+    # Alunos encerrados (ex-aluno) ficam inativos; por padrão a aba Alunos
+    # lista só ativos. Use ?ativo=todos ou ?ativo=false para ver inativos.
+    if tipo == 'aluno':
+        ativo_param = (params.get('ativo') or '').strip().lower()
+        if ativo_param in ('0', 'false', 'nao', 'não', 'inativo', 'inativos'):
+            queryset = queryset.filter(ativo=False)
+        elif ativo_param in ('todos', 'all'):
+            pass
+        else:
+            queryset = queryset.filter(ativo=True)
+    turma_id = params.get('turma', None)
+    if turma_id:
+        queryset = queryset.filter(turmas_aluno__id=turma_id).distinct()
+    return queryset
+
+
 class ListarCriarUsuariosAPIView(ListCreateAPIView):
     """API para listar e criar usuários.
 
@@ -935,30 +960,8 @@ class ListarCriarUsuariosAPIView(ListCreateAPIView):
         return [IsStaffCT()]
 
     def get_queryset(self):
-        queryset = Usuario.objects.all()
-        tipo = self.request.query_params.get('tipo', None)
-        if tipo:
-            queryset = queryset.filter(tipo=tipo)
-        # Alunos encerrados (ex-aluno) ficam inativos; por padrão a aba Alunos
-        # lista só ativos. Use ?ativo=todos ou ?ativo=false para ver inativos.
-        if tipo == 'aluno':
-            ativo_param = (self.request.query_params.get('ativo') or '').strip().lower()
-            if ativo_param in ('0', 'false', 'nao', 'não', 'inativo', 'inativos'):
-                queryset = queryset.filter(ativo=False)
-            elif ativo_param in ('todos', 'all'):
-                pass
-            else:
-                queryset = queryset.filter(ativo=True)
-        turma_id = self.request.query_params.get('turma', None)
-        if turma_id:
-            queryset = queryset.filter(turmas_aluno__id=turma_id).distinct()
-        queryset = queryset.prefetch_related(
-            Prefetch(
-                'turmas_aluno',
-                queryset=Turma.objects.select_related('ct').prefetch_related('dias_semana'),
-            )
-        )
-        return queryset
+        queryset = filtrar_usuarios(Usuario.objects.all(), self.request.query_params)
+        return UsuarioSerializer.preparar_queryset(queryset)
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -992,6 +995,47 @@ class ListarCriarUsuariosAPIView(ListCreateAPIView):
             )
 
 
+class DiretorioUsuariosAPIView(ListAPIView):
+    """Diretório de usuários para as listas do app/web (equipe do CT).
+
+    Projeção enxuta (``UsuarioDiretorioSerializer``) paginada por cursor, em ordem
+    alfabética. Filtros da listagem (``tipo``, ``ativo``, ``turma``) e busca ``?q=`` por
+    nome, CPF (com ou sem máscara) ou e-mail na coluna normalizada ``busca``; cada termo
+    precisa aparecer. ``?fields=id,nome_completo`` limita os campos (e as colunas lidas).
+
+    A página leva ``ETag``; com ``If-None-Match`` igual, devolve 304 sem corpo.
+    """
+    permission_classes = [IsStaffCT]
+    serializer_class = UsuarioDiretorioSerializer
+    pagination_class = DiretorioUsuariosPagination
+
+    def campos(self):
+        pedidos = [c.strip() for c in (self.request.query_params.get('fields') or '').split(',')]
+        validos = UsuarioDiretorioSerializer.Meta.fields
+        return [c for c in validos if c in pedidos] or list(validos)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['campos'] = self.campos()
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        campos = self.campos()
+        queryset = filtrar_usuarios(Usuario.objects.all(), self.request.query_params)
+        for termo in termos_busca_usuario(self.request.query_params.get('q')):
+            queryset = queryset.filter(busca__contains=termo)
+        queryset = queryset.only(*UsuarioDiretorioSerializer.colunas(campos), 'busca')
+        if 'centros_treinamento' in campos:
+            turmas = Turma.objects.select_related('ct')
+            queryset = queryset.prefetch_related(
+                Prefetch('turmas_aluno', queryset=turmas),
+                Prefetch('turmas', queryset=turmas),
+            )
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        return resposta_condicional(request, super().list(request, *args, **kwargs).data)
+
+
 class EditarExcluirUsuarioAPIView(RetrieveUpdateDestroyAPIView):
     """API para editar, excluir ou visualizar um usuário.
 
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils import timezone
 
 from wellhub.models import (
     CadastroWellhub,
@@ -57,6 +58,26 @@ class WellhubBookingAdmin(admin.ModelAdmin):
 
 @admin.register(WellhubWebhookEvent)
 class WellhubWebhookEventAdmin(admin.ModelAdmin):
-    list_display = ("event_id", "event_type", "processed", "error_message", "criado_em")
-    list_filter = ("processed", "event_type")
-    readonly_fields = ("payload",)
+    list_display = (
+        "event_id",
+        "event_type",
+        "booking_number",
+        "status",
+        "attempts",
+        "criado_em",
+        "processed_at",
+    )
+    list_filter = ("status", "event_type")
+    search_fields = ("event_id", "booking_number")
+    readonly_fields = ("payload", "result", "error_message", "worker", "started_at", "processed_at")
+
+    def reprocessar(self, request, queryset):
+        total = queryset.exclude(status=WellhubWebhookEvent.STATUS_PROCESSING).update(
+            status=WellhubWebhookEvent.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{total} evento(s) devolvido(s) à fila.")
+    reprocessar.short_description = "Reprocessar eventos selecionados"
+
+    actions = [reprocessar]
@@ -1,14 +1,30 @@
-"""Cliente HTTP para a Booking API Wellhub / Gympass."""
+"""
+Cliente HTTP para a Booking API Wellhub / Gympass.
+
+Todas as instâncias do processo compartilham uma requests.Session keep-alive (pool de
+conexões), então criar um WellhubClient por operação não abre conexão nova. Falhas
+transitórias (rede, 429, 5xx) são repetidas com backoff exponencial com jitter,
+respeitando Retry-After. Cada chamada alimenta um histograma de latência por endpoint
+(``request_metrics``), impresso por ``--metricas`` nos comandos de sincronização.
+"""
 
 from __future__ import annotations
 
 import logging
 import os
+import random
+import re
+import threading
 import time
-from typing import Any, Optional
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
 
 import requests
 from django.conf import settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
 from app.env_loader import read_env_file_value, sanitize_secret_value
 
@@ -43,6 +59,121 @@ class WellhubAPIError(Exception):
         return base
 
 
+RETRY_AFTER_MAX = 30  # teto (segundos) para Retry-After / backoff entre tentativas
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Limites superiores (ms) dos buckets do histograma de latência
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+_ENDPOINT_ID_RE = re.compile(r"/(gyms|classes|slots|bookings)/[^/]+")
+
+
+def endpoint_key(method: str, path: str) -> str:
+    """``PATCH /booking/v1/gyms/{id}/classes/{id}/slots/{id}`` (ids trocados por {id})."""
+    return f"{method.upper()} {_ENDPOINT_ID_RE.sub(lambda m: f'/{m.group(1)}/{{id}}', path)}"
+
+
+class RequestMetrics:
+    """Contadores e histograma de latência por endpoint, thread-safe, do processo atual."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: dict[str, dict] = {}
+
+    def record(self, endpoint: str, elapsed_ms: float, *, status: int | None, retries: int) -> None:
+        with self._lock:
+            entry = self._data.setdefault(
+                endpoint,
+                {"count": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0,
+                 "buckets": [0] * len(LATENCY_BUCKETS_MS)},
+            )
+            entry["count"] += 1
+            entry["retries"] += retries
+            if status is None or status >= 400:
+                entry["errors"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["buckets"][bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    @staticmethod
+    def _percentile(buckets: list[int], count: int, fraction: float) -> float:
+        """Limite superior do bucket que contém o percentil (estimativa do histograma)."""
+        target = fraction * count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return LATENCY_BUCKETS_MS[-1]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {k: {**v, "buckets": list(v["buckets"])} for k, v in self._data.items()}
+        for entry in data.values():
+            entry["avg_ms"] = entry["total_ms"] / entry["count"] if entry["count"] else 0.0
+            entry["p50_ms"] = self._percentile(entry["buckets"], entry["count"], 0.5)
+            entry["p95_ms"] = self._percentile(entry["buckets"], entry["count"], 0.95)
+        return data
+
+    def format(self) -> list[str]:
+        lines = []
+        for endpoint, e in sorted(self.snapshot().items()):
+            lines.append(
+                f"{endpoint}: {e['count']} chamada(s), {e['errors']} erro(s), {e['retries']} retentativa(s); "
+                f"média {e['avg_ms']:.0f} ms, p50 ≤{e['p50_ms']:g} ms, p95 ≤{e['p95_ms']:g} ms, máx {e['max_ms']:.0f} ms"
+            )
+            lines.append(
+                "    " + " ".join(
+                    f"≤{b:g}:{n}" if b != float("inf") else f">{LATENCY_BUCKETS_MS[-2]:g}:{n}"
+                    for b, n in zip(LATENCY_BUCKETS_MS, e["buckets"]) if n
+                )
+            )
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def _http_session() -> requests.Session:
+    """
+    Session keep-alive compartilhada pelo processo. Um processo filho (fork) nunca herda
+    as conexões do pai: a sessão é recriada.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                session = requests.Session()
+                pool_maxsize = int(_wellhub_setting("WELLHUB_HTTP_POOL_MAXSIZE", 10) or 10)
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_maxsize, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def _retry_after_seconds(response: requests.Response | None) -> float | None:
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return (parsedate_to_datetime(value) - timezone.now()).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
 class WellhubClient:
     """Wrapper mínimo da Booking API (partners)."""
 
@@ -61,6 +192,8 @@ class WellhubClient:
         self.product_id = int(_wellhub_setting("WELLHUB_PRODUCT_ID", 1) or 1)
         self.timeout = int(_wellhub_setting("WELLHUB_HTTP_TIMEOUT", 30) or 30)
         self.max_retries = int(_wellhub_setting("WELLHUB_HTTP_MAX_RETRIES", 2) or 2)
+        self.retry_backoff = float(_wellhub_setting("WELLHUB_HTTP_RETRY_BACKOFF", 0.5) or 0.5)
+        self.max_workers = int(_wellhub_setting("WELLHUB_SYNC_WORKERS", 4) or 4)
 
     @property
     def configured(self) -> bool:
@@ -89,44 +222,78 @@ class WellhubClient:
         headers = self._headers()
         if extra_headers:
             headers.update(extra_headers)
-        last_exc: Optional[Exception] = None
+        endpoint = endpoint_key(method, path)
+        session = _http_session()
+        started = time.monotonic()
+        status = None
+        attempt = 0
 
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = requests.request(
-                    method,
-                    url,
-                    headers=headers,
-                    json=json_body,
-                    params=params,
-                    timeout=self.timeout,
-                )
-                if response.status_code >= 500 and attempt < self.max_retries:
-                    time.sleep(0.5 * (attempt + 1))
-                    continue
-                if response.status_code >= 400:
-                    try:
-                        body = response.json()
-                    except ValueError:
-                        body = response.text
-                    raise WellhubAPIError(
-                        f"Wellhub API {method} {path} → HTTP {response.status_code}",
-                        status_code=response.status_code,
-                        body=body,
+        try:
+            while True:
+                response = None
+                try:
+                    response = session.request(
+                        method,
+                        url,
+                        headers=headers,
+                        json=json_body,
+                        params=params,
+                        timeout=self.timeout,
                     )
-                if response.status_code == 204 or not response.content:
-                    return {}
-                return response.json()
-            except WellhubAPIError:
-                raise
-            except requests.RequestException as exc:
-                last_exc = exc
-                if attempt < self.max_retries:
-                    time.sleep(0.5 * (attempt + 1))
-                    continue
-                raise WellhubAPIError(f"Erro de rede Wellhub: {exc}") from exc
-
-        raise WellhubAPIError(f"Erro de rede Wellhub: {last_exc}")
+                    status = response.status_code
+                except requests.RequestException as exc:
+                    status = None
+                    if attempt >= self.max_retries:
+                        raise WellhubAPIError(f"Erro de rede Wellhub: {exc}") from exc
+                else:
+                    if status not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                        break
+                time.sleep(self._retry_delay(attempt, response))
+                attempt += 1
+        finally:
+            request_metrics.record(
+                endpoint, (time.monotonic() - started) * 1000, status=status, retries=attempt
+            )
+
+        if response.status_code >= 400:
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            raise WellhubAPIError(
+                f"Wellhub API {method} {path} → HTTP {response.status_code}",
+                status_code=response.status_code,
+                body=body,
+            )
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    def _retry_delay(self, attempt: int, response: requests.Response | None) -> float:
+        """Retry-After quando a API informa; senão backoff exponencial com jitter (full jitter)."""
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = random.uniform(0, self.retry_backoff * (2 ** attempt))
+        return max(0.0, min(delay, RETRY_AFTER_MAX))
+
+    def map_concurrently(self, fn: Callable, calls: list[tuple], *, workers: int | None = None) -> list:
+        """
+        Executa ``fn(*args)`` para cada tupla de ``calls`` num pool limitado de threads.
+        Retorna os resultados na ordem de ``calls``; uma chamada que falhou com
+        WellhubAPIError devolve a exceção no lugar do resultado (as demais seguem).
+        """
+
+        def run(args):
+            try:
+                return fn(*args)
+            except WellhubAPIError as exc:
+                return exc
+
+        workers = max(1, min(workers or self.max_workers, len(calls) or 1))
+        if workers == 1:
+            return [run(args) for args in calls]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wellhub-http") as pool:
+            return list(pool.map(run, calls))
 
     def create_class(self, payload: dict) -> dict:
         """POST create exige corpo {"classes": [ {...} ]} (Booking API Gympass)."""
@@ -186,6 +353,18 @@ class WellhubClient:
             last = items
         return last
 
+    def list_slots_many(self, windows: list[tuple[str, str, str]], *, workers: int | None = None) -> list:
+        """list_slots para cada (class_id, from_dt, to_dt), em paralelo. Ver map_concurrently."""
+        return self.map_concurrently(
+            lambda class_id, from_dt, to_dt: self.list_slots(class_id, from_dt=from_dt, to_dt=to_dt),
+            windows,
+            workers=workers,
+        )
+
+    def get_slots_many(self, ids: list[tuple[str, str]], *, workers: int | None = None) -> list:
+        """get_slot para cada (class_id, slot_id), em paralelo. Ver map_concurrently."""
+        return self.map_concurrently(self.get_slot, ids, workers=workers)
+
     def get_slot(self, class_id: str, slot_id: str) -> dict:
         gym_id = self.gym_id
         resp = self._request(
@@ -210,6 +389,10 @@ class WellhubClient:
             json_body=payload,
         )
 
+    def patch_slots_many(self, patches: list[tuple[str, str, dict]], *, workers: int | None = None) -> list:
+        """patch_slot para cada (class_id, slot_id, payload), em paralelo. Ver map_concurrently."""
+        return self.map_concurrently(self.patch_slot, patches, workers=workers)
+
     def patch_booking(self, booking_number: str, payload: dict) -> dict:
         gym_id = self.gym_id
         return self._request(
@@ -14,6 +14,7 @@ from wellhub.models import (
     WellhubTurmaConfig,
     WellhubWebhookEvent,
 )
+from wellhub.services.webhook_events import queue_metrics
 
 
 class Command(BaseCommand):
@@ -114,16 +115,23 @@ class Command(BaseCommand):
                 "  Se você fez reserva no app, confira URL + secret no portal Wellhub."
             )
         for ev in events:
-            if ev.processed and not ev.error_message:
+            if ev.status == WellhubWebhookEvent.STATUS_DONE:
                 label = self.style.SUCCESS("OK")
+            elif ev.status == WellhubWebhookEvent.STATUS_DEAD:
+                label = self.style.ERROR(f"ERRO: {ev.error_message.strip()[-120:]}")
             elif ev.error_message:
-                label = self.style.ERROR(f"ERRO: {ev.error_message[:120]}")
+                label = self.style.WARNING(f"nova tentativa às {ev.next_attempt_at:%H:%M:%S}")
             else:
-                label = self.style.WARNING("pendente")
+                label = self.style.WARNING(ev.get_status_display().lower())
             self.stdout.write(
                 f"  [{ev.criado_em:%Y-%m-%d %H:%M}] {ev.event_type or '?'} "
-                f"processed={ev.processed} — {label}"
+                f"status={ev.status} tentativas={ev.attempts} — {label}"
             )
+        metrics = queue_metrics()
+        self.stdout.write(
+            f"  Fila: {metrics['by_status']}; pendente mais antigo há "
+            f"{metrics['oldest_pending_age_seconds']:.0f}s"
+        )
 
         bookings = WellhubBooking.objects.select_related(
             "slot", "slot__turma", "cadastro"
@@ -0,0 +1,65 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from wellhub.services.slot_counters import push_pending_slot_counts
+from wellhub.services.webhook_events import process_pending_events, queue_metrics, worker_id
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker da fila de webhooks Wellhub (WellhubWebhookEvent). Fica em laço consultando "
+        "a fila; rode um processo por worker (systemd). Use --uma-vez para drenar a fila e sair."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--uma-vez", action="store_true", help="Drena a fila uma vez e sai.")
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=1.0,
+            help="Segundos de espera entre consultas quando a fila está vazia (default: 1).",
+        )
+        parser.add_argument(
+            "--metricas",
+            action="store_true",
+            help="Só mostra tamanho e atraso da fila e sai.",
+        )
+
+    def handle(self, *args, **options):
+        if options["metricas"]:
+            self.stdout.write(str(queue_metrics()))
+            return
+
+        worker = worker_id()
+        if options["uma_vez"]:
+            total = process_pending_events(worker)
+            self.stdout.write(self.style.SUCCESS(f"{total} evento(s) processado(s)."))
+            self._report_pushes(push_pending_slot_counts(window=0))
+            return
+
+        parar = []
+        signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+        self.stdout.write(f"Worker {worker} aguardando webhooks Wellhub...")
+        totals = {"pushed": 0, "changes": 0, "saved": 0}
+        try:
+            while not parar:
+                processed = process_pending_events(worker, limit=100)
+                # Cotas agrupadas por slot (WELLHUB_SLOT_PUSH_WINDOW), fora do request
+                pushes = push_pending_slot_counts()
+                for key in totals:
+                    totals[key] += pushes[key]
+                if not processed:
+                    time.sleep(options["intervalo"])
+        except KeyboardInterrupt:
+            pass
+        self._report_pushes(totals)
+        self.stdout.write(f"Worker {worker} encerrado.")
+
+    def _report_pushes(self, stats):
+        if stats["pushed"]:
+            self.stdout.write(
+                f"Cotas: {stats['pushed']} PATCH para {stats['changes']} alteração(ões) "
+                f"({stats['saved']} envio(s) economizado(s))."
+            )
@@ -1,7 +1,8 @@
 from django.core.management.base import BaseCommand
 
-from wellhub.client import WellhubClient
+from wellhub.client import WellhubClient, request_metrics
 from wellhub.config_check import format_wellhub_config_hint
+from wellhub.services.slot_plan import build_plan
 from wellhub.services.sync_slots import sync_all_published_slots
 
 
@@ -14,6 +15,22 @@ class Command(BaseCommand):
             action="store_true",
             help="Atualiza apenas registros locais.",
         )
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Só mostra o diff (create/link/patch) sem gravar nada nem alterar slots na Wellhub.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Chamadas simultâneas à API (default: WELLHUB_SYNC_WORKERS).",
+        )
+        parser.add_argument(
+            "--metricas",
+            action="store_true",
+            help="Ao final, mostra latência por endpoint das chamadas à API.",
+        )
 
     def handle(self, *args, **options):
         client = WellhubClient()
@@ -23,5 +40,18 @@ class Command(BaseCommand):
                 self.style.WARNING("API Wellhub não chamada (credenciais ausentes).")
             )
             self.stdout.write(format_wellhub_config_hint(client))
-        stats = sync_all_published_slots(client=client, call_api=call_api)
-        self.stdout.write(self.style.SUCCESS(str(stats)))
+
+        if options["plan"]:
+            plan = build_plan(client, fetch_remote=call_api)
+            for line in plan.lines():
+                self.stdout.write(f"  {line}")
+            for error in plan.list_errors:
+                self.stdout.write(self.style.WARNING(f"  listagem falhou: {error}"))
+            self.stdout.write(self.style.SUCCESS(f"Plano: {plan.counts()}"))
+        else:
+            stats = sync_all_published_slots(client=client, call_api=call_api, workers=options["workers"])
+            self.stdout.write(self.style.SUCCESS(str(stats)))
+
+        if options["metricas"]:
+            for line in request_metrics.format():
+                self.stdout.write(f"  {line}")
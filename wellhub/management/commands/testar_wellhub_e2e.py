@@ -22,6 +22,8 @@ from turmas.models import DiaSemana, Turma
 from wellhub.constants import CT_NOME_PILOTO, HORARIOS_PILOTO
 from wellhub.models import CadastroWellhub, WellhubBooking, WellhubSlot, WellhubTurmaConfig
 from wellhub.services.sync_slots import sync_all_published_slots, upsert_local_slot
+from wellhub.services.slot_counters import push_pending_slot_counts
+from wellhub.services.webhook_events import process_pending_events
 from wellhub.views import WellhubWebhookAPIView
 
 
@@ -157,6 +159,9 @@ class Command(BaseCommand):
         )
         resp = view(req)
         self.stdout.write(f"Webhook requested: HTTP {resp.status_code} {resp.content.decode()[:300]}")
+        # O webhook só enfileira (202); processa aqui o que o worker processaria
+        process_pending_events("e2e")
+        push_pending_slot_counts(window=0)
 
         booking = WellhubBooking.objects.filter(wellhub_booking_id=booking_number).first()
         cadastro = CadastroWellhub.objects.filter(wellhub_user_id="1000000000003").first()
@@ -200,6 +205,8 @@ class Command(BaseCommand):
         )
         resp2 = view(req2)
         self.stdout.write(f"Webhook cancel: HTTP {resp2.status_code} {resp2.content.decode()[:200]}")
+        process_pending_events("e2e")
+        push_pending_slot_counts(window=0)
         if booking:
             booking.refresh_from_db()
             self.stdout.write(f"Booking após cancel: {booking.status}")
@@ -0,0 +1,44 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from wellhub.services.slot_counters import push_pending_slot_counts, verify_slot_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Confere total_booked dos slots Wellhub com as reservas confirmadas, corrige a "
+        "diferença e envia à Wellhub as cotas pendentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--desde",
+            type=date.fromisoformat,
+            default=None,
+            help="Conferir slots a partir desta data (AAAA-MM-DD; default: hoje).",
+        )
+        parser.add_argument(
+            "--apenas-relatorio",
+            action="store_true",
+            help="Só lista as diferenças, sem corrigir nem enviar.",
+        )
+
+    def handle(self, *args, **options):
+        repair = not options["apenas_relatorio"]
+        drifted = verify_slot_counters(since=options["desde"], repair=repair)
+        for entry in drifted:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"  slot {entry['slot']} (turma {entry['turma']}, {entry['data_aula']}): "
+                    f"contador {entry['counter']}, confirmadas {entry['confirmed']}"
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(drifted)} slot(s) com diferença" + (" corrigido(s)." if repair and drifted else ".")
+            )
+        )
+        if repair:
+            pushes = push_pending_slot_counts(window=0)
+            self.stdout.write(f"Cotas enviadas à Wellhub: {pushes['pushed']} slot(s), {pushes['failed']} falha(s).")
@@ -5,7 +5,7 @@ from __future__ import annotations
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from wellhub.client import WellhubAPIError, WellhubClient
+from wellhub.client import WellhubAPIError, WellhubClient, request_metrics
 from wellhub.models import WellhubSlot, WellhubTurmaConfig
 from wellhub.services.sync_slots import (
     _parse_remote_occur,
@@ -51,6 +51,11 @@ class Command(BaseCommand):
             dest="scan_range",
             help="Raio do scan (±N) com --scan-near (padrão 150).",
         )
+        parser.add_argument(
+            "--metricas",
+            action="store_true",
+            help="Ao final, mostra latência por endpoint das chamadas à API.",
+        )
 
     def handle(self, *args, **options):
         client = WellhubClient()
@@ -126,6 +131,9 @@ class Command(BaseCommand):
                 f"janelas PATCH: {patched}"
             )
         )
+        if options["metricas"]:
+            for line in request_metrics.format():
+                self.stdout.write(f"  {line}")
 
     def _patch_janela_vinculados(self, client: WellhubClient) -> int:
         qs = (
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def classificar_eventos_existentes(apps, schema_editor):
+    """
+    Eventos anteriores à fila já foram tratados no próprio request: os processados viram
+    done; os que falharam viram dead (não são reprocessados sem revisão no admin).
+    """
+    Event = apps.get_model("wellhub", "WellhubWebhookEvent")
+    Event.objects.filter(processed=True).update(status="done", processed_at=models.F("criado_em"))
+    Event.objects.filter(processed=False).update(status="dead")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellhub', '0003_wellhubbooking_checkin_validado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='booking_number',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendente'), ('processing', 'Processando'), ('done', 'Processado'), ('dead', 'Falhou (dead-letter)')], default='pending', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='wellhubwebhookevent',
+            name='worker',
+            field=models.CharField(blank=True, default='', max_length=120),
+        ),
+        migrations.AddIndex(
+            model_name='wellhubwebhookevent',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='wh_evt_status_next_idx'),
+        ),
+        migrations.RunPython(classificar_eventos_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:32
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def recontar_reservas(apps, schema_editor):
+    """Ponto de partida do contador: total_booked = reservas confirmadas de cada slot."""
+    WellhubSlot = apps.get_model("wellhub", "WellhubSlot")
+    slots = WellhubSlot.objects.annotate(
+        confirmed=Count("bookings", filter=Q(bookings__status="confirmed"))
+    ).exclude(total_booked=models.F("confirmed"))
+    for slot in slots:
+        WellhubSlot.objects.filter(pk=slot.pk).update(total_booked=slot.confirmed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellhub', '0004_webhook_event_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wellhubslot',
+            name='counts_dirty_since',
+            field=models.DateTimeField(blank=True, help_text='Cotas alteradas e ainda não enviadas à Wellhub desde este instante.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='wellhubslot',
+            name='total_booked',
+            field=models.PositiveIntegerField(default=0, help_text='Reservas confirmadas (contador mantido pelas reservas; ver services.slot_counters).'),
+        ),
+        migrations.RunPython(recontar_reservas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellhub', '0005_slot_booking_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wellhubslot',
+            name='counts_pending_changes',
+            field=models.PositiveIntegerField(default=0, help_text='Alterações de total_booked acumuladas para o próximo PATCH de cotas.'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wellhub', '0006_slot_push_coalescing'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cadastrowellhub',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='wellhub_cadastro_email_idx'),
+        ),
+    ]
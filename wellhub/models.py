@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class WellhubGymConfig(models.Model):
@@ -62,7 +64,19 @@ class WellhubSlot(models.Model):
     occur_date = models.DateTimeField()
     wellhub_slot_id = models.CharField(max_length=64, blank=True, default="")
     total_capacity = models.PositiveIntegerField(default=5)
-    total_booked = models.PositiveIntegerField(default=0)
+    total_booked = models.PositiveIntegerField(
+        default=0,
+        help_text="Reservas confirmadas (contador mantido pelas reservas; ver services.slot_counters).",
+    )
+    counts_dirty_since = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Cotas alteradas e ainda não enviadas à Wellhub desde este instante.",
+    )
+    counts_pending_changes = models.PositiveIntegerField(
+        default=0,
+        help_text="Alterações de total_booked acumuladas para o próximo PATCH de cotas.",
+    )
     opens_at = models.DateTimeField()
     closes_at = models.DateTimeField()
     sync_status = models.CharField(
@@ -103,6 +117,10 @@ class CadastroWellhub(models.Model):
         verbose_name = "Cadastro Wellhub"
         verbose_name_plural = "Cadastros Wellhub"
         ordering = ["-atualizado_em"]
+        indexes = [
+            # Casamento por e-mail com alunos do app (segmento "wellhub" do push)
+            models.Index(Lower("email"), name="wellhub_cadastro_email_idx"),
+        ]
 
     def __str__(self):
         nome = f"{self.first_name} {self.last_name}".strip()
@@ -171,12 +189,37 @@ class WellhubBooking(models.Model):
 
 
 class WellhubWebhookEvent(models.Model):
-    """Auditoria e idempotência de webhooks Wellhub."""
+    """
+    Auditoria, idempotência e fila de processamento de webhooks Wellhub.
+
+    O webhook só grava o evento (status pending) e responde 202; o worker
+    (`manage.py processar_webhooks_wellhub`) processa em ordem de chegada por
+    booking_number, com novas tentativas e estado final dead (dead-letter).
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+    STATUS_DEAD = "dead"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pendente"),
+        (STATUS_PROCESSING, "Processando"),
+        (STATUS_DONE, "Processado"),
+        (STATUS_DEAD, "Falhou (dead-letter)"),
+    ]
 
     event_id = models.CharField(max_length=128, unique=True)
     event_type = models.CharField(max_length=64, blank=True, default="")
+    booking_number = models.CharField(max_length=64, blank=True, default="", db_index=True)
     payload = models.JSONField(default=dict, blank=True)
     processed = models.BooleanField(default=False)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=120, blank=True, default="")
+    result = models.JSONField(null=True, blank=True)
     error_message = models.TextField(blank=True, default="")
     criado_em = models.DateTimeField(auto_now_add=True)
 
@@ -184,6 +227,9 @@ class WellhubWebhookEvent(models.Model):
         verbose_name = "Evento webhook Wellhub"
         verbose_name_plural = "Eventos webhook Wellhub"
         ordering = ["-criado_em"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="wh_evt_status_next_idx"),
+        ]
 
     def __str__(self):
         return f"{self.event_type or 'event'} ({self.event_id})"
@@ -20,12 +20,8 @@ from wellhub.constants import (
     BOOKING_STATUS_RESERVED,
 )
 from wellhub.models import CadastroWellhub, WellhubBooking, WellhubSlot, WellhubTurmaConfig
-from wellhub.services.sync_slots import (
-    build_slot_patch_payload,
-    count_confirmed_bookings,
-    find_slot_by_wellhub_id,
-    is_slot_eligible,
-)
+from wellhub.services.slot_counters import apply_booking_delta, lock_slot
+from wellhub.services.sync_slots import find_slot_by_wellhub_id, is_slot_eligible
 from wellhub.webhooks import extract_booking_number, extract_slot_id, extract_user_data
 
 logger = logging.getLogger(__name__)
@@ -244,25 +240,6 @@ def _patch_booking_remote(
     client.patch_booking(booking_number, body)
 
 
-def _push_slot_counts(slot: WellhubSlot, client: WellhubClient) -> None:
-    if not client.configured:
-        return
-    turma_config = WellhubTurmaConfig.objects.filter(turma=slot.turma).first()
-    if not turma_config or not turma_config.wellhub_class_id or not slot.wellhub_slot_id:
-        return
-    slot.total_booked = count_confirmed_bookings(slot)
-    slot.save(update_fields=["total_booked"])
-    payload = build_slot_patch_payload(slot, total_booked=slot.total_booked)
-    try:
-        client.patch_slot(
-            turma_config.wellhub_class_id,
-            slot.wellhub_slot_id,
-            payload,
-        )
-    except WellhubAPIError as exc:
-        logger.error("Falha PATCH slot após booking: %s", exc)
-
-
 @transaction.atomic
 def handle_booking_requested(payload: dict) -> Tuple[str, str]:
     booking_number = extract_booking_number(payload)
@@ -276,12 +253,16 @@ def handle_booking_requested(payload: dict) -> Tuple[str, str]:
     slot = _resolve_slot(payload)
     if not slot:
         raise ValueError("Slot não encontrado para a reserva.")
+    # Reservas do mesmo slot são serializadas aqui; status e total_booked relidos com a trava
+    slot = lock_slot(slot.pk)
+    existing = WellhubBooking.objects.filter(wellhub_booking_id=booking_number).first()
+    if existing and existing.status == BOOKING_STATUS_CONFIRMED:
+        return "already_confirmed", booking_number
 
     user_data = extract_user_data(payload)
     cadastro = get_or_create_cadastro(user_data)
     client = WellhubClient()
 
-    slot.total_booked = count_confirmed_bookings(slot)
     eligible, motivo = is_slot_eligible(slot)
     booking, _ = WellhubBooking.objects.update_or_create(
         wellhub_booking_id=booking_number,
@@ -304,12 +285,11 @@ def handle_booking_requested(payload: dict) -> Tuple[str, str]:
 
     booking.status = BOOKING_STATUS_CONFIRMED
     booking.save(update_fields=["status", "atualizado_em"])
-    slot.total_booked = count_confirmed_bookings(slot)
-    slot.save(update_fields=["total_booked"])
+    # Cotas vão à Wellhub num PATCH agrupado (slot_counters.push_pending_slot_counts)
+    apply_booking_delta(slot, +1)
 
     try:
         _patch_booking_remote(client, booking_number, BOOKING_STATUS_RESERVED)
-        _push_slot_counts(slot, client)
     except WellhubAPIError as exc:
         logger.error("Confirmação remota falhou: %s", exc)
 
@@ -322,11 +302,21 @@ def handle_booking_cancel(payload: dict, *, late: bool = False) -> Tuple[str, st
     if not booking_number:
         raise ValueError("booking_number ausente no payload")
 
-    booking = WellhubBooking.objects.filter(wellhub_booking_id=booking_number).select_related("slot").first()
-    if not booking:
+    booking = WellhubBooking.objects.filter(wellhub_booking_id=booking_number).first()
+    if booking:
+        lock_slot(booking.slot_id)
+        booking.refresh_from_db()
+        was_confirmed = booking.status == BOOKING_STATUS_CONFIRMED
+        booking.status = BOOKING_STATUS_LATE_CANCELLED if late else BOOKING_STATUS_CANCELLED
+        booking.late_cancel = late
+        booking.payload = payload
+        booking.save(update_fields=["status", "late_cancel", "payload", "atualizado_em"])
+    else:
         slot = _resolve_slot(payload)
         if not slot:
             raise ValueError("Reserva/slot não encontrados para cancelamento.")
+        lock_slot(slot.pk)
+        was_confirmed = False
         user_data = extract_user_data(payload)
         cadastro = get_or_create_cadastro(user_data)
         booking = WellhubBooking.objects.create(
@@ -337,20 +327,8 @@ def handle_booking_cancel(payload: dict, *, late: bool = False) -> Tuple[str, st
             late_cancel=late,
             payload=payload,
         )
-    else:
-        booking.status = BOOKING_STATUS_LATE_CANCELLED if late else BOOKING_STATUS_CANCELLED
-        booking.late_cancel = late
-        booking.payload = payload
-        booking.save(update_fields=["status", "late_cancel", "payload", "atualizado_em"])
-
-    slot = booking.slot
-    slot.total_booked = count_confirmed_bookings(slot)
-    slot.save(update_fields=["total_booked"])
 
-    client = WellhubClient()
-    try:
-        _push_slot_counts(slot, client)
-    except WellhubAPIError as exc:
-        logger.error("PATCH slot após cancelamento falhou: %s", exc)
+    if was_confirmed:
+        apply_booking_delta(booking.slot, -1)
 
     return "cancelled", booking_number
@@ -0,0 +1,158 @@
+"""
+Contador de reservas confirmadas por slot (WellhubSlot.total_booked).
+
+As reservas e cancelamentos não recontam ``slot.bookings``: com a linha do slot travada
+(select_for_update) somam ou subtraem 1 via F(), marcam ``counts_dirty_since`` e contam a
+alteração em ``counts_pending_changes``.
+
+O envio das cotas à Wellhub é agrupado por slot: push_pending_slot_counts só envia slots
+cuja primeira alteração pendente tem mais de WELLHUB_SLOT_PUSH_WINDOW segundos, e manda um
+único PATCH com o valor atual do contador, não importa quantas reservas chegaram na
+janela. Roda no worker de webhooks (fora do request), a cada volta do laço; o retorno diz
+quantos PATCH foram evitados (``saved``).
+
+verify_slot_counters compara o contador com um COUNT das reservas confirmadas e corrige
+a diferença (drift) — comando ``verificar_contadores_wellhub`` no cron.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from wellhub.client import WellhubAPIError, WellhubClient
+from wellhub.models import WellhubSlot, WellhubTurmaConfig
+from wellhub.services.sync_slots import build_slot_patch_payload, count_confirmed_bookings
+
+logger = logging.getLogger(__name__)
+
+
+def _mark_dirty() -> Coalesce:
+    """Mantém o instante da primeira alteração ainda não enviada."""
+    return Coalesce(F("counts_dirty_since"), Value(timezone.now()))
+
+
+def lock_slot(slot_pk: int) -> WellhubSlot:
+    """Trava a linha do slot até o fim da transação (reservas do mesmo slot em fila)."""
+    return WellhubSlot.objects.select_for_update().select_related("turma").get(pk=slot_pk)
+
+
+def apply_booking_delta(slot: WellhubSlot, delta: int) -> None:
+    """Soma `delta` ao contador do slot (nunca abaixo de zero) e o marca para envio."""
+    WellhubSlot.objects.filter(pk=slot.pk).update(
+        total_booked=Greatest(F("total_booked") + delta, Value(0)),
+        counts_dirty_since=_mark_dirty(),
+        counts_pending_changes=F("counts_pending_changes") + 1,
+    )
+    slot.refresh_from_db(fields=["total_booked", "counts_dirty_since", "counts_pending_changes"])
+
+
+def push_window() -> float:
+    return float(getattr(settings, "WELLHUB_SLOT_PUSH_WINDOW", 2) or 0)
+
+
+def push_pending_slot_counts(
+    client: WellhubClient | None = None,
+    *,
+    window: float | None = None,
+    limit: int | None = None,
+) -> dict:
+    """
+    Envia as cotas dos slots marcados há mais de `window` segundos (padrão
+    WELLHUB_SLOT_PUSH_WINDOW; 0 envia tudo): um PATCH por slot. A marca é limpa com o
+    slot travado antes do envio, então uma reserva que chega durante o PATCH marca o slot
+    de novo e vai no próximo envio; uma falha devolve a marca.
+
+    Retorna {'pushed', 'failed', 'changes', 'saved'}: PATCH feitos, falhos, alterações
+    cobertas por eles e PATCH economizados (alterações agrupadas além da primeira).
+    """
+    stats = {"pushed": 0, "failed": 0, "changes": 0, "saved": 0}
+    window = push_window() if window is None else window
+    due = list(
+        WellhubSlot.objects.filter(counts_dirty_since__lte=timezone.now() - timedelta(seconds=window))
+        .order_by("counts_dirty_since")
+        .values_list("pk", flat=True)[:limit]
+    )
+    if not due:
+        return stats
+    client = client or WellhubClient()
+    if not client.configured:
+        return stats
+
+    with transaction.atomic():
+        slots = list(
+            WellhubSlot.objects.select_for_update().filter(pk__in=due, counts_dirty_since__isnull=False)
+        )
+        WellhubSlot.objects.filter(pk__in=[s.pk for s in slots]).update(
+            counts_dirty_since=None, counts_pending_changes=0
+        )
+    slots = [s for s in slots if s.wellhub_slot_id]
+    class_ids = dict(
+        WellhubTurmaConfig.objects.filter(turma_id__in={s.turma_id for s in slots})
+        .exclude(wellhub_class_id="")
+        .values_list("turma_id", "wellhub_class_id")
+    )
+    slots = [s for s in slots if s.turma_id in class_ids]
+    results = client.patch_slots_many(
+        [(class_ids[s.turma_id], s.wellhub_slot_id, build_slot_patch_payload(s)) for s in slots]
+    )
+
+    for slot, result in zip(slots, results):
+        if isinstance(result, WellhubAPIError):
+            logger.error("Falha PATCH cotas do slot %s: %s", slot.pk, result)
+            WellhubSlot.objects.filter(pk=slot.pk).update(
+                counts_dirty_since=_mark_dirty(),
+                counts_pending_changes=F("counts_pending_changes") + slot.counts_pending_changes,
+            )
+            stats["failed"] += 1
+        else:
+            stats["pushed"] += 1
+            stats["changes"] += slot.counts_pending_changes
+            stats["saved"] += max(slot.counts_pending_changes - 1, 0)
+    if stats["pushed"]:
+        logger.info(
+            "Cotas Wellhub: %s PATCH para %s alteração(ões), %s economizado(s).",
+            stats["pushed"], stats["changes"], stats["saved"],
+        )
+    return stats
+
+
+def verify_slot_counters(*, since: date | None = None, repair: bool = True) -> list[dict]:
+    """
+    Slots (data_aula >= `since`, padrão hoje) cujo total_booked difere do COUNT das
+    reservas confirmadas. Com `repair`, recontados sob trava e marcados para envio.
+    """
+    since = since or timezone.localdate()
+    drifted = (
+        WellhubSlot.objects.filter(data_aula__gte=since)
+        .annotate(confirmed=Count("bookings", filter=Q(bookings__status="confirmed")))
+        .exclude(total_booked=F("confirmed"))
+        .order_by("data_aula")
+    )
+    report = []
+    for slot in drifted:
+        entry = {
+            "slot": slot.pk,
+            "turma": slot.turma_id,
+            "data_aula": slot.data_aula,
+            "counter": slot.total_booked,
+            "confirmed": slot.confirmed,
+        }
+        if repair:
+            with transaction.atomic():
+                locked = lock_slot(slot.pk)
+                entry["confirmed"] = count_confirmed_bookings(locked)
+                WellhubSlot.objects.filter(pk=slot.pk).update(
+                    total_booked=entry["confirmed"], counts_dirty_since=_mark_dirty()
+                )
+            logger.warning(
+                "Contador do slot %s corrigido: %s → %s", slot.pk, entry["counter"], entry["confirmed"]
+            )
+        report.append(entry)
+    return report
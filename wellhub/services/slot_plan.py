@@ -0,0 +1,384 @@
+"""
+Planejador da sincronização de slots Wellhub (diff local × remoto).
+
+Em vez de um upsert (com COUNT próprio) e um sync na API para cada (turma, data):
+
+1. estado desejado: turmas publicadas × iter_slot_dates, calculado em memória;
+2. estado local: slots numa única consulta (total_booked é o contador mantido pelas reservas);
+3. estado remoto: uma listagem (GET slots) por class_id e mês, indexada por id e data/hora;
+4. diff mínimo por slot: create, link (existe na Wellhub sem vínculo local),
+   patch_capacity, patch_window, noop ou skip (aula passada sem slot remoto).
+
+execute_plan grava o lado local em lote e executa na API só as mudanças, em paralelo
+(pool limitado a WELLHUB_SYNC_WORKERS). As threads só fazem HTTP; o resultado de cada
+mudança é gravado na thread principal. build_plan sozinho é o modo ``--plan`` do comando
+sincronizar_wellhub_slots: não grava nada e só faz as listagens (GET) na Wellhub.
+"""
+
+from __future__ import annotations
+
+import calendar
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from wellhub.client import WellhubAPIError, WellhubClient
+from wellhub.constants import COTA_PADRAO
+from wellhub.models import WellhubSlot, WellhubTurmaConfig
+from wellhub.services.sync_slots import (
+    _apply_slot_patch,
+    _format_iso,
+    _parse_remote_occur,
+    _slot_id_from_item,
+    _slot_id_from_response,
+    build_slot_patch_payload,
+    build_slot_payload,
+    find_remote_slot_id,
+    iter_slot_dates,
+    slot_datetimes,
+)
+
+logger = logging.getLogger(__name__)
+
+ACTION_CREATE = "create"
+ACTION_LINK = "link"
+ACTION_PATCH_CAPACITY = "patch_capacity"
+ACTION_PATCH_WINDOW = "patch_window"
+ACTION_NOOP = "noop"
+ACTION_SKIP = "skip"
+API_ACTIONS = (ACTION_CREATE, ACTION_LINK, ACTION_PATCH_CAPACITY, ACTION_PATCH_WINDOW)
+
+# Campos locais que o plano pode alterar (bulk_update)
+# (total_booked fica de fora: só as reservas alteram o contador, ver slot_counters)
+LOCAL_FIELDS = ("occur_date", "opens_at", "closes_at", "total_capacity")
+
+
+class SlotChange:
+    """Uma linha do plano: o slot local (existente ou a criar) e a ação na Wellhub."""
+
+    def __init__(self, turma_config, slot, *, local_fields, action, reason="", remote_id=""):
+        self.turma_config = turma_config
+        self.slot = slot
+        self.local_fields = local_fields
+        self.action = action
+        self.reason = reason
+        self.remote_id = remote_id
+
+    @property
+    def is_new(self) -> bool:
+        return self.slot.pk is None
+
+    def describe(self) -> str:
+        slot = self.slot
+        local = "novo local" if self.is_new else (
+            f"local: {', '.join(self.local_fields)}" if self.local_fields else "local ok"
+        )
+        remote = slot.wellhub_slot_id or self.remote_id or "-"
+        detail = f" — {self.reason}" if self.reason else ""
+        return (
+            f"{self.action:<14} {slot.data_aula} {slot.turma.horario:%H:%M} "
+            f"(turma {slot.turma_id}, slot {remote}, {slot.total_booked}/{slot.total_capacity}; {local}){detail}"
+        )
+
+
+class SlotSyncPlan:
+    def __init__(self, changes: list[SlotChange], *, skipped_inactive: int = 0, list_errors=None):
+        self.changes = changes
+        self.skipped_inactive = skipped_inactive
+        self.list_errors = list_errors or []
+
+    def counts(self) -> dict:
+        return dict(Counter(c.action for c in self.changes))
+
+    def lines(self, *, include_noop: bool = False) -> list[str]:
+        return [c.describe() for c in self.changes if include_noop or c.action != ACTION_NOOP]
+
+
+def _month_bounds(year: int, month: int, tz) -> tuple[datetime, datetime]:
+    last = calendar.monthrange(year, month)[1]
+    start = timezone.make_aware(datetime(year, month, 1), tz)
+    end = timezone.make_aware(datetime(year, month, last, 23, 59, 59), tz)
+    return start, end
+
+
+def fetch_remote_slots(client: WellhubClient, configs, months) -> tuple[dict, list[str]]:
+    """
+    Uma listagem por (class_id, mês), em paralelo (list_slots_many). Retorna
+    ({class_id: {"months", "by_id", "by_occur"}}, erros); um mês que falhou fica fora de
+    "months" e seus slots são tratados como desconhecidos (sem diff remoto).
+    """
+    tz = timezone.get_current_timezone()
+    remote: dict[str, dict] = {}
+    errors: list[str] = []
+    windows = []
+    for class_id in sorted({c.wellhub_class_id for c in configs if c.wellhub_class_id}):
+        remote[class_id] = {"months": set(), "by_id": {}, "by_occur": {}}
+        for year, month in sorted(months):
+            start, end = _month_bounds(year, month, tz)
+            windows.append((class_id, _format_iso(start), _format_iso(end), (year, month)))
+
+    results = client.list_slots_many([w[:3] for w in windows])
+    for (class_id, _, _, (year, month)), items in zip(windows, results):
+        if isinstance(items, WellhubAPIError):
+            errors.append(f"class {class_id} {year}-{month:02d}: {items}")
+            logger.warning("Listagem de slots Wellhub falhou (class=%s, %s-%s): %s", class_id, year, month, items)
+            continue
+        state = remote[class_id]
+        state["months"].add((year, month))
+        for item in items:
+            slot_id = _slot_id_from_item(item)
+            if slot_id:
+                state["by_id"][slot_id] = item
+            occur = item.get("occur_date") or item.get("occurDate")
+            parsed = _parse_remote_occur(str(occur)) if occur else None
+            if parsed is not None:
+                state["by_occur"].setdefault((parsed.date(), parsed.hour, parsed.minute), item)
+    return remote, errors
+
+
+def _remote_window(item: dict) -> tuple[datetime | None, datetime | None]:
+    window = item.get("booking_window") or item.get("bookingWindow") or {}
+    opens = window.get("opens_at") or window.get("opensAt")
+    closes = window.get("closes_at") or window.get("closesAt")
+    return (
+        _parse_remote_occur(str(opens)) if opens else None,
+        _parse_remote_occur(str(closes)) if closes else None,
+    )
+
+
+def _remote_int(item: dict, *keys: str) -> int | None:
+    for key in keys:
+        value = item.get(key)
+        if value is not None:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def _diff_remote(slot: WellhubSlot, item: dict | None, *, past: bool) -> tuple[str, str]:
+    if item is None:
+        # Sem listagem confiável: mantém o comportamento antigo (PATCH completo)
+        if past:
+            return ACTION_PATCH_CAPACITY, "não listado na Wellhub"
+        return ACTION_PATCH_WINDOW, "não listado na Wellhub"
+    if not past:
+        opens, closes = _remote_window(item)
+        if opens != slot.opens_at or closes != slot.closes_at:
+            return ACTION_PATCH_WINDOW, "janela de reserva diferente"
+    capacity = _remote_int(item, "total_capacity", "totalCapacity")
+    booked = _remote_int(item, "total_booked", "totalBooked")
+    if capacity != slot.total_capacity or booked != slot.total_booked:
+        return ACTION_PATCH_CAPACITY, f"remoto {booked}/{capacity}"
+    return ACTION_NOOP, ""
+
+
+def build_plan(
+    client: WellhubClient | None = None,
+    *,
+    hoje: date | None = None,
+    fetch_remote: bool = True,
+) -> SlotSyncPlan:
+    """Calcula o diff sem gravar nada (só faz as listagens GET na Wellhub)."""
+    hoje = hoje or timezone.localdate()
+    client = client or WellhubClient()
+    tz = timezone.get_current_timezone()
+    agora = timezone.now()
+
+    configs = list(
+        WellhubTurmaConfig.objects.filter(publicar_wellhub=True).select_related("turma", "turma__ct")
+    )
+    active = [c for c in configs if c.turma.ativo]
+    dates = list(iter_slot_dates(hoje))
+    if not active or not dates:
+        return SlotSyncPlan([], skipped_inactive=len(configs) - len(active))
+
+    local = {
+        (s.turma_id, s.data_aula): s
+        for s in WellhubSlot.objects.filter(
+            turma_id__in=[c.turma_id for c in active], data_aula__in=dates
+        )
+        .select_related("turma")
+    }
+
+    remote, list_errors = {}, []
+    if fetch_remote and client.configured:
+        remote, list_errors = fetch_remote_slots(client, active, {(d.year, d.month) for d in dates})
+
+    changes = []
+    for cfg in active:
+        turma = cfg.turma
+        cota = cfg.cota_wellhub or COTA_PADRAO
+        state = remote.get(cfg.wellhub_class_id)
+        for data_aula in dates:
+            occur, opens, closes = slot_datetimes(data_aula, turma.horario, tz)
+            slot = local.get((turma.id, data_aula))
+            if slot is None:
+                slot = WellhubSlot(
+                    turma=turma,
+                    data_aula=data_aula,
+                    occur_date=occur,
+                    opens_at=opens,
+                    closes_at=closes,
+                    total_capacity=cota,
+                    total_booked=0,
+                )
+                local_fields = list(LOCAL_FIELDS)
+            else:
+                desired = {
+                    "occur_date": occur,
+                    "opens_at": opens,
+                    "closes_at": closes,
+                    "total_capacity": cota,
+                }
+                local_fields = [f for f, v in desired.items() if getattr(slot, f) != v]
+                for field in local_fields:
+                    setattr(slot, field, desired[field])
+
+            past = occur <= agora
+            known = state is not None and (data_aula.year, data_aula.month) in state["months"]
+            remote_id = ""
+            if not cfg.wellhub_class_id:
+                action, reason = ACTION_SKIP, "wellhub_class_id ausente"
+            elif slot.wellhub_slot_id:
+                item = state["by_id"].get(slot.wellhub_slot_id) if known else None
+                action, reason = _diff_remote(slot, item, past=past)
+            else:
+                item = state["by_occur"].get((data_aula, turma.horario.hour, turma.horario.minute)) if known else None
+                if past:
+                    action, reason = ACTION_SKIP, "aula já passou"
+                elif item is not None:
+                    action, reason = ACTION_LINK, "já existe na Wellhub"
+                    remote_id = _slot_id_from_item(item) or ""
+                else:
+                    action, reason = ACTION_CREATE, ""
+            changes.append(
+                SlotChange(cfg, slot, local_fields=local_fields, action=action, reason=reason, remote_id=remote_id)
+            )
+
+    return SlotSyncPlan(changes, skipped_inactive=len(configs) - len(active), list_errors=list_errors)
+
+
+def _create_remote(change: SlotChange, client: WellhubClient, product_id: int) -> dict:
+    slot, cfg = change.slot, change.turma_config
+    slot_id = None
+    try:
+        resp = client.create_slot(cfg.wellhub_class_id, build_slot_payload(slot, product_id))
+        slot_id = _slot_id_from_response(resp)
+    except WellhubAPIError as exc:
+        if exc.status_code != 409:
+            raise
+        # 409: slot já existe. Tenta id no body da resposta; senão lista.
+        slot_id = _slot_id_from_response(exc.body) if exc.body else None
+        if not slot_id:
+            slot_id = find_remote_slot_id(client, cfg.wellhub_class_id, slot)
+        if not slot_id:
+            return {"pending": "Existe na Wellhub; vínculo pendente (ainda não listável)."}
+        slot.wellhub_slot_id = slot_id
+        _apply_slot_patch(slot, cfg, client, product_id)
+        return {"slot_id": slot_id}
+
+    if not slot_id:
+        slot_id = find_remote_slot_id(client, cfg.wellhub_class_id, slot)
+        if slot_id:
+            slot.wellhub_slot_id = slot_id
+            _apply_slot_patch(slot, cfg, client, product_id)
+    if not slot_id:
+        raise WellhubAPIError("Slot criado na Wellhub sem id retornado.")
+    return {"slot_id": slot_id}
+
+
+def _run_change(change: SlotChange, client: WellhubClient, product_id: int) -> dict:
+    """Só HTTP (roda nas threads do pool); não toca no banco."""
+    slot, cfg = change.slot, change.turma_config
+    if change.action == ACTION_CREATE:
+        return _create_remote(change, client, product_id)
+    if change.action == ACTION_LINK:
+        slot.wellhub_slot_id = change.remote_id
+        _apply_slot_patch(slot, cfg, client, product_id)
+    elif change.action == ACTION_PATCH_WINDOW:
+        _apply_slot_patch(slot, cfg, client, product_id)
+    elif change.action == ACTION_PATCH_CAPACITY:
+        client.patch_slot(cfg.wellhub_class_id, slot.wellhub_slot_id, build_slot_patch_payload(slot))
+    return {"slot_id": slot.wellhub_slot_id}
+
+
+def _save_local(plan: SlotSyncPlan) -> None:
+    new = [c.slot for c in plan.changes if c.is_new]
+    changed = [c.slot for c in plan.changes if not c.is_new and c.local_fields]
+    with transaction.atomic():
+        WellhubSlot.objects.bulk_create(new)
+        if changed:
+            WellhubSlot.objects.bulk_update(changed, LOCAL_FIELDS)
+
+
+def execute_plan(
+    plan: SlotSyncPlan,
+    client: WellhubClient | None = None,
+    *,
+    call_api: bool = True,
+    workers: int | None = None,
+) -> dict:
+    """Grava o lado local em lote e aplica as mudanças na Wellhub. Retorna as estatísticas."""
+    client = client or WellhubClient()
+    stats = {
+        "created": len(plan.changes),
+        "synced": 0,
+        "errors": 0,
+        "skipped": plan.skipped_inactive,
+        "pending": 0,
+        "plan": plan.counts(),
+    }
+    _save_local(plan)
+    if not call_api or not client.configured:
+        return stats
+
+    to_run = []
+    for change in plan.changes:
+        slot = change.slot
+        if change.action in API_ACTIONS:
+            to_run.append(change)
+        elif change.action == ACTION_NOOP:
+            stats["synced"] += 1
+            if slot.sync_status != WellhubSlot.SYNC_OK or slot.sync_error:
+                slot.sync_status, slot.sync_error = WellhubSlot.SYNC_OK, ""
+                slot.save(update_fields=["sync_status", "sync_error"])
+        elif not change.turma_config.wellhub_class_id:
+            stats["errors"] += 1
+            slot.sync_status, slot.sync_error = WellhubSlot.SYNC_ERROR, change.reason
+            slot.save(update_fields=["sync_status", "sync_error"])
+        else:
+            stats["skipped"] += 1
+
+    if not to_run:
+        return stats
+
+    workers = max(1, workers or int(getattr(settings, "WELLHUB_SYNC_WORKERS", 4) or 4))
+    product_id = client.product_id
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wellhub-slots") as pool:
+        futures = {pool.submit(_run_change, c, client, product_id): c for c in to_run}
+        for future in as_completed(futures):
+            change = futures[future]
+            slot = change.slot
+            try:
+                outcome = future.result()
+            except WellhubAPIError as exc:
+                logger.warning("Erro sync slot %s (%s): %s", slot.pk, change.action, exc)
+                slot.sync_status, slot.sync_error = WellhubSlot.SYNC_ERROR, str(exc)[:2000]
+                stats["errors"] += 1
+            else:
+                if "pending" in outcome:
+                    slot.sync_status, slot.sync_error = WellhubSlot.SYNC_PENDING, outcome["pending"]
+                    stats["pending"] += 1
+                else:
+                    slot.wellhub_slot_id = outcome["slot_id"]
+                    slot.sync_status, slot.sync_error = WellhubSlot.SYNC_OK, ""
+                    stats["synced"] += 1
+            slot.save(update_fields=["wellhub_slot_id", "sync_status", "sync_error"])
+    return stats
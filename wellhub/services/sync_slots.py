@@ -86,6 +86,7 @@ def _format_iso(dt: datetime) -> str:
 
 
 def count_confirmed_bookings(slot: WellhubSlot) -> int:
+    """COUNT das reservas confirmadas; só para conferir o contador total_booked (slot_counters)."""
     return slot.bookings.filter(status="confirmed").count()
 
 
@@ -163,14 +164,12 @@ def upsert_local_slot(turma_config: WellhubTurmaConfig, data_aula: date) -> Well
         slot.opens_at = opens_at
         slot.closes_at = closes_at
         slot.total_capacity = cota
-        slot.total_booked = count_confirmed_bookings(slot)
         slot.save(
             update_fields=[
                 "occur_date",
                 "opens_at",
                 "closes_at",
                 "total_capacity",
-                "total_booked",
             ]
         )
     return slot
@@ -413,14 +412,11 @@ def sync_slot_to_api(
     agora = timezone.now()
     if slot.occur_date <= agora:
         if slot.wellhub_slot_id:
-            slot.total_booked = count_confirmed_bookings(slot)
             try:
                 _apply_slot_patch(slot, turma_config, client, product_id)
                 slot.sync_status = WellhubSlot.SYNC_OK
                 slot.sync_error = ""
-                slot.save(
-                    update_fields=["total_booked", "sync_status", "sync_error"]
-                )
+                slot.save(update_fields=["sync_status", "sync_error"])
             except WellhubAPIError as exc:
                 slot.sync_status = WellhubSlot.SYNC_ERROR
                 slot.sync_error = str(exc)[:2000]
@@ -436,7 +432,6 @@ def sync_slot_to_api(
             )
         return slot
 
-    slot.total_booked = count_confirmed_bookings(slot)
     create_payload = build_slot_payload(slot, product_id, total_booked=slot.total_booked)
 
     try:
@@ -493,7 +488,7 @@ def sync_slot_to_api(
         slot.sync_status = WellhubSlot.SYNC_OK
         slot.sync_error = ""
         slot.save(
-            update_fields=["wellhub_slot_id", "total_booked", "sync_status", "sync_error"]
+            update_fields=["wellhub_slot_id", "sync_status", "sync_error"]
         )
     except WellhubAPIError as exc:
         slot.sync_status = WellhubSlot.SYNC_ERROR
@@ -509,43 +504,17 @@ def sync_all_published_slots(
     client: WellhubClient | None = None,
     call_api: bool = True,
     hoje: date | None = None,
+    workers: int | None = None,
 ) -> dict:
-    hoje = hoje or timezone.localdate()
-    client = client or WellhubClient()
-    product_id = client.product_id
-
-    configs = (
-        WellhubTurmaConfig.objects.filter(publicar_wellhub=True)
-        .select_related("turma", "turma__ct")
-        .prefetch_related("turma__dias_semana")
-    )
-
-    stats = {"created": 0, "synced": 0, "errors": 0, "skipped": 0, "pending": 0}
-
-    for turma_config in configs:
-        turma = turma_config.turma
-        if not turma.ativo:
-            stats["skipped"] += 1
-            continue
-
-        for data_aula in iter_slot_dates(hoje):
-            if not _is_wellhub_day(data_aula):
-                continue
-            slot = upsert_local_slot(turma_config, data_aula)
-            stats["created"] += 1
-            if call_api and client.configured:
-                if slot.occur_date <= timezone.now() and not slot.wellhub_slot_id:
-                    stats["skipped"] += 1
-                    continue
-                sync_slot_to_api(slot, turma_config, client, product_id)
-                if slot.sync_status == WellhubSlot.SYNC_OK:
-                    stats["synced"] += 1
-                elif slot.sync_status == WellhubSlot.SYNC_ERROR:
-                    stats["errors"] += 1
-                elif slot.sync_status == WellhubSlot.SYNC_PENDING:
-                    stats["pending"] += 1
+    """
+    Sincroniza os slots do mês: calcula o diff local × Wellhub e aplica só as mudanças
+    (ver wellhub.services.slot_plan).
+    """
+    from wellhub.services.slot_plan import build_plan, execute_plan
 
-    return stats
+    client = client or WellhubClient()
+    plan = build_plan(client, hoje=hoje, fetch_remote=call_api)
+    return execute_plan(plan, client, call_api=call_api, workers=workers)
 
 
 def find_slot_by_wellhub_id(slot_id: str) -> WellhubSlot | None:
@@ -564,10 +533,7 @@ def bind_slot_id_and_patch(
     slot.wellhub_slot_id = str(slot_id)
     slot.sync_status = WellhubSlot.SYNC_OK
     slot.sync_error = ""
-    slot.total_booked = count_confirmed_bookings(slot)
-    slot.save(
-        update_fields=["wellhub_slot_id", "sync_status", "sync_error", "total_booked"]
-    )
+    slot.save(update_fields=["wellhub_slot_id", "sync_status", "sync_error"])
     try:
         _apply_slot_patch(
             slot,
@@ -625,46 +591,52 @@ def discover_slots_near_id(
 
     linked: list[tuple[WellhubSlot, str]] = []
     already: set[str] = set()
-
-    for delta in range(-radius, radius + 1):
-        sid = str(center + delta)
-        if sid in already:
-            continue
-        for cfg in configs:
-            try:
-                remote = client.get_slot(cfg.wellhub_class_id, sid)
-            except WellhubAPIError as exc:
-                if exc.status_code not in (404, 400):
-                    logger.debug(
-                        "GET slot scan %s class=%s: %s",
-                        sid,
-                        cfg.wellhub_class_id,
-                        exc,
-                    )
-                continue
-            if not isinstance(remote, dict) or not remote:
-                continue
-            occur = (
-                remote.get("occur_date")
-                or remote.get("occurDate")
-                or (remote.get("slot") or {}).get("occur_date")
-                or (remote.get("slot") or {}).get("occurDate")
-                or (remote.get("data") or {}).get("occur_date")
-            )
-            if not occur:
-                continue
-            dt = _parse_remote_occur(str(occur))
-            if not dt:
-                continue
-            local = pending_by_key.get((cfg.turma_id, dt.date()))
-            if not local:
-                continue
-            rid = _slot_id_from_item(remote) or sid
-            bind_slot_id_and_patch(local, cfg, client, rid)
-            already.add(rid)
-            pending_by_key.pop((cfg.turma_id, dt.date()), None)
-            linked.append((local, rid))
-            break
+    ids = [str(center + delta) for delta in range(-radius, radius + 1)]
+    # Ids em lotes consultados em paralelo (get_slots_many); a varredura para assim
+    # que todos os slots pendentes foram vinculados.
+    chunk = max(1, client.max_workers * 2)
+
+    for start in range(0, len(ids), chunk):
+        batch = ids[start:start + chunk]
+        calls = [(cfg.wellhub_class_id, sid) for sid in batch for cfg in configs]
+        results = iter(client.get_slots_many(calls))
+        for sid in batch:
+            for cfg in configs:
+                remote = next(results)
+                if sid in already:
+                    continue
+                if isinstance(remote, WellhubAPIError):
+                    if remote.status_code not in (404, 400):
+                        logger.debug(
+                            "GET slot scan %s class=%s: %s",
+                            sid,
+                            cfg.wellhub_class_id,
+                            remote,
+                        )
+                    continue
+                if not isinstance(remote, dict) or not remote:
+                    continue
+                occur = (
+                    remote.get("occur_date")
+                    or remote.get("occurDate")
+                    or (remote.get("slot") or {}).get("occur_date")
+                    or (remote.get("slot") or {}).get("occurDate")
+                    or (remote.get("data") or {}).get("occur_date")
+                )
+                if not occur:
+                    continue
+                dt = _parse_remote_occur(str(occur))
+                if not dt:
+                    continue
+                local = pending_by_key.get((cfg.turma_id, dt.date()))
+                if not local:
+                    continue
+                rid = _slot_id_from_item(remote) or sid
+                bind_slot_id_and_patch(local, cfg, client, rid)
+                already.add(rid)
+                already.add(sid)
+                pending_by_key.pop((cfg.turma_id, dt.date()), None)
+                linked.append((local, rid))
         if not pending_by_key:
             break
 
@@ -0,0 +1,222 @@
+"""
+Fila de eventos de webhook Wellhub (tabela WellhubWebhookEvent).
+
+O webhook só valida a assinatura, grava o evento e responde 202; os handlers (que podem
+chamar a API Wellhub: resolução de slot, PATCH de booking, contagem de vagas) rodam no
+worker `manage.py processar_webhooks_wellhub`.
+
+Ordem: eventos do mesmo booking_number são processados na ordem de chegada (id); um
+evento só é reservado quando nenhum anterior do mesmo booking está pendente ou em
+processamento, então um cancelamento nunca passa à frente da reserva. Eventos sem
+booking_number (ex.: check-in) não têm essa restrição. A reserva é um UPDATE condicional
+(pending → processing), portanto vários workers podem drenar a fila juntos.
+
+Falha: nova tentativa com backoff exponencial; após MAX_ATTEMPTS o evento vai para dead
+(dead-letter) e deixa de segurar a fila do booking; reprocessar pelo admin.
+
+Cotas: os handlers só alteram o contador total_booked; o worker envia as cotas dos slots
+alterados num PATCH por slot, agrupando a janela WELLHUB_SLOT_PUSH_WINDOW (ver slot_counters).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.db.models import Avg, Count, DurationField, Exists, ExpressionWrapper, F, Max, Min, OuterRef
+from django.utils import timezone
+
+from wellhub.models import WellhubSlot, WellhubWebhookEvent
+from wellhub.services.bookings import handle_booking_cancel, handle_booking_requested
+from wellhub.services.checkins import handle_checkin_occurred
+from wellhub.webhooks import (
+    extract_booking_number,
+    is_cancel_event,
+    is_checkin_event,
+    is_late_cancel_event,
+    is_requested_event,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 15 * 60
+# Evento "processing" há mais que isso é considerado órfão (worker morto) e volta à fila
+PROCESSING_TIMEOUT = timedelta(minutes=10)
+
+_ABERTOS = (WellhubWebhookEvent.STATUS_PENDING, WellhubWebhookEvent.STATUS_PROCESSING)
+
+
+def dispatch_event(event_type: str, payload: dict) -> dict:
+    """Executa o handler do tipo de evento. Exceções sobem para o controle de tentativas."""
+    if is_requested_event(event_type):
+        action, detail = handle_booking_requested(payload)
+        return {"handler": "booking_requested", "action": action, "detail": detail}
+    if is_late_cancel_event(event_type):
+        action, detail = handle_booking_cancel(payload, late=True)
+        return {"handler": "late_cancel", "action": action, "detail": detail}
+    if is_cancel_event(event_type):
+        action, detail = handle_booking_cancel(payload, late=False)
+        return {"handler": "cancel", "action": action, "detail": detail}
+    if is_checkin_event(event_type):
+        action, detail = handle_checkin_occurred(payload)
+        return {"handler": "checkin", "action": action, "detail": detail}
+    logger.info("Webhook Wellhub ignorado (tipo=%s)", event_type)
+    return {"handler": "ignored", "event_type": event_type}
+
+
+def enqueue_event(event_id: str, event_type: str, payload: dict) -> tuple[WellhubWebhookEvent, bool]:
+    """
+    Grava o evento para o worker. Retorna (evento, duplicado).
+
+    Reenvio de um evento já processado é duplicado (nada muda). Reenvio de um evento
+    ainda aberto só atualiza o payload; de um evento em dead, volta para a fila.
+    """
+    event, created = WellhubWebhookEvent.objects.get_or_create(
+        event_id=event_id,
+        defaults={
+            "event_type": event_type,
+            "payload": payload,
+            "booking_number": (extract_booking_number(payload) or "")[:64],
+        },
+    )
+    if created:
+        return event, False
+    if event.status == WellhubWebhookEvent.STATUS_DONE:
+        return event, True
+
+    event.event_type = event_type or event.event_type
+    event.payload = payload
+    fields = ["event_type", "payload"]
+    if event.status == WellhubWebhookEvent.STATUS_DEAD:
+        event.status = WellhubWebhookEvent.STATUS_PENDING
+        event.attempts = 0
+        event.next_attempt_at = timezone.now()
+        fields += ["status", "attempts", "next_attempt_at"]
+    event.save(update_fields=fields)
+    return event, False
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, BACKOFF_MAX_SECONDS))
+
+
+def recover_orphans() -> int:
+    """Devolve à fila eventos presos em processing por um worker que morreu."""
+    return WellhubWebhookEvent.objects.filter(
+        status=WellhubWebhookEvent.STATUS_PROCESSING,
+        started_at__lt=timezone.now() - PROCESSING_TIMEOUT,
+    ).update(status=WellhubWebhookEvent.STATUS_PENDING, next_attempt_at=timezone.now())
+
+
+def claim_next_event(worker: str) -> WellhubWebhookEvent | None:
+    """Reserva o próximo evento elegível (ou None se não há nenhum)."""
+    now = timezone.now()
+    anterior_aberto = WellhubWebhookEvent.objects.filter(
+        booking_number=OuterRef("booking_number"),
+        id__lt=OuterRef("id"),
+        status__in=_ABERTOS,
+    ).exclude(booking_number="")
+    candidates = list(
+        WellhubWebhookEvent.objects.filter(
+            status=WellhubWebhookEvent.STATUS_PENDING,
+            next_attempt_at__lte=now,
+        )
+        .exclude(Exists(anterior_aberto))
+        .order_by("id")
+        .values_list("pk", flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = WellhubWebhookEvent.objects.filter(
+            pk=pk, status=WellhubWebhookEvent.STATUS_PENDING
+        ).update(
+            status=WellhubWebhookEvent.STATUS_PROCESSING,
+            attempts=F("attempts") + 1,
+            started_at=now,
+            worker=worker,
+        )
+        if claimed:
+            return WellhubWebhookEvent.objects.get(pk=pk)
+    return None
+
+
+def process_event(event: WellhubWebhookEvent) -> None:
+    """Processa um evento já reservado e registra sucesso, nova tentativa ou dead-letter."""
+    try:
+        result = dispatch_event(event.event_type, event.payload)
+    except Exception as exc:
+        final = event.attempts >= MAX_ATTEMPTS
+        logger.exception(
+            "Webhook Wellhub %s falhou (tentativa %s/%s): %s",
+            event.event_id, event.attempts, MAX_ATTEMPTS, exc,
+        )
+        event.error_message = traceback.format_exc()[-2000:]
+        if final:
+            event.status = WellhubWebhookEvent.STATUS_DEAD
+            event.processed_at = timezone.now()
+        else:
+            event.status = WellhubWebhookEvent.STATUS_PENDING
+            event.next_attempt_at = timezone.now() + _backoff(event.attempts)
+        event.save(update_fields=["error_message", "status", "processed_at", "next_attempt_at"])
+        return
+
+    event.status = WellhubWebhookEvent.STATUS_DONE
+    event.processed = True
+    event.result = result
+    event.error_message = ""
+    event.processed_at = timezone.now()
+    event.save(update_fields=["status", "processed", "result", "error_message", "processed_at"])
+
+
+def process_pending_events(worker: str | None = None, limit: int | None = None) -> int:
+    """Drena a fila até esvaziar (ou até `limit` eventos). Retorna quantos foram processados."""
+    worker = worker or worker_id()
+    recover_orphans()
+    processed = 0
+    while limit is None or processed < limit:
+        event = claim_next_event(worker)
+        if event is None:
+            break
+        process_event(event)
+        processed += 1
+    return processed
+
+
+def queue_metrics(window: timedelta = timedelta(hours=1)) -> dict:
+    """
+    Tamanho da fila por status e atraso (lag): idade do evento pendente mais antigo e
+    tempo médio/máximo entre o recebimento e o fim do processamento na janela. Inclui os
+    slots com cotas ainda não enviadas à Wellhub.
+    """
+    now = timezone.now()
+    by_status = dict(
+        WellhubWebhookEvent.objects.values_list("status").annotate(n=Count("id")).order_by()
+    )
+    oldest_pending = WellhubWebhookEvent.objects.filter(
+        status=WellhubWebhookEvent.STATUS_PENDING
+    ).aggregate(m=Min("criado_em"))["m"]
+    lag = ExpressionWrapper(F("processed_at") - F("criado_em"), output_field=DurationField())
+    recent = WellhubWebhookEvent.objects.filter(
+        status=WellhubWebhookEvent.STATUS_DONE, processed_at__gte=now - window
+    ).aggregate(avg=Avg(lag), max=Max(lag), n=Count("id"))
+    pushes = WellhubSlot.objects.filter(counts_dirty_since__isnull=False).aggregate(
+        n=Count("id"), oldest=Min("counts_dirty_since")
+    )
+    return {
+        "by_status": {s: by_status.get(s, 0) for s, _ in WellhubWebhookEvent.STATUS_CHOICES},
+        "oldest_pending_age_seconds": (now - oldest_pending).total_seconds() if oldest_pending else 0.0,
+        "window_seconds": window.total_seconds(),
+        "processed_in_window": recent["n"],
+        "avg_lag_seconds": recent["avg"].total_seconds() if recent["avg"] is not None else None,
+        "max_lag_seconds": recent["max"].total_seconds() if recent["max"] is not None else None,
+        "slot_pushes_pending": pushes["n"],
+        "oldest_slot_push_age_seconds": (now - pushes["oldest"]).total_seconds() if pushes["oldest"] else 0.0,
+    }
@@ -7,8 +7,15 @@ from django.utils import timezone
 
 from ct.models import CentroDeTreinamento
 from turmas.models import DiaSemana, Turma
-from wellhub.models import CadastroWellhub, WellhubBooking, WellhubSlot, WellhubTurmaConfig
+from wellhub.models import (
+    CadastroWellhub,
+    WellhubBooking,
+    WellhubSlot,
+    WellhubTurmaConfig,
+    WellhubWebhookEvent,
+)
 from wellhub.services.checkins import handle_checkin_occurred
+from wellhub.services.webhook_events import process_pending_events
 from wellhub.views import WellhubWebhookAPIView
 from wellhub.webhooks import extract_gympass_id, is_checkin_event
 
@@ -114,7 +121,7 @@ class WellhubCheckinValidateTests(TestCase):
             "1000000000003",
         )
 
-    @patch("wellhub.views.handle_checkin_occurred")
+    @patch("wellhub.services.webhook_events.handle_checkin_occurred")
     def test_webhook_dispatches_checkin_event(self, mock_handler):
         mock_handler.return_value = ("validated", "1000000000003")
         payload = {
@@ -137,7 +144,11 @@ class WellhubCheckinValidateTests(TestCase):
             HTTP_X_GYMPASS_SIGNATURE=sig,
         )
         resp = WellhubWebhookAPIView.as_view()(req)
-        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.status_code, 202)
+        mock_handler.assert_not_called()
+
+        self.assertEqual(process_pending_events("teste"), 1)
         mock_handler.assert_called_once()
-        data = json.loads(resp.content)
-        self.assertEqual(data["result"]["handler"], "checkin")
+        event = WellhubWebhookEvent.objects.get(event_id="evt-checkin-1")
+        self.assertEqual(event.status, WellhubWebhookEvent.STATUS_DONE)
+        self.assertEqual(event.result["handler"], "checkin")
@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from wellhub.client import WellhubAPIError, WellhubClient, endpoint_key, request_metrics
+
+
+def _response(status, body=b'{"ok": true}', headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.content = body
+    response.json.return_value = {"ok": True} if status < 400 else {"error": "x"}
+    return response
+
+
+@override_settings(WELLHUB_API_KEY="k", WELLHUB_GYM_ID=438, WELLHUB_HTTP_MAX_RETRIES=2)
+class WellhubClientTests(SimpleTestCase):
+    def setUp(self):
+        request_metrics.reset()
+        self.session = MagicMock()
+        patcher = patch("wellhub.client._http_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("wellhub.client.time.sleep")
+    def test_429_respeita_retry_after_e_registra_metricas(self, sleep):
+        self.session.request.side_effect = [_response(429, headers={"Retry-After": "3"}), _response(200)]
+
+        self.assertEqual(WellhubClient().get_slot("55", "999"), {"ok": True})
+        sleep.assert_called_once_with(3.0)
+        metrics = request_metrics.snapshot()["GET /booking/v1/gyms/{id}/classes/{id}/slots/{id}"]
+        self.assertEqual((metrics["count"], metrics["retries"], metrics["errors"]), (1, 1, 0))
+
+    @patch("wellhub.client.time.sleep")
+    def test_desiste_apos_max_retries(self, sleep):
+        self.session.request.return_value = _response(503)
+
+        with self.assertRaises(WellhubAPIError) as ctx:
+            WellhubClient().get_slot("55", "999")
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(self.session.request.call_count, 3)
+        # Sem Retry-After: backoff com jitter, nunca acima do teto
+        self.assertTrue(all(0 <= c.args[0] <= 30 for c in sleep.call_args_list))
+
+    def test_map_concurrently_preserva_ordem_e_devolve_erros(self):
+        def fn(n):
+            if n == 2:
+                raise WellhubAPIError("falhou", status_code=404)
+            return n * 10
+
+        results = WellhubClient().map_concurrently(fn, [(1,), (2,), (3,)], workers=3)
+        self.assertEqual(results[0], 10)
+        self.assertIsInstance(results[1], WellhubAPIError)
+        self.assertEqual(results[2], 30)
+
+    def test_endpoint_key_agrupa_ids(self):
+        self.assertEqual(
+            endpoint_key("patch", "/booking/v1/gyms/438/bookings/BK-1"),
+            "PATCH /booking/v1/gyms/{id}/bookings/{id}",
+        )
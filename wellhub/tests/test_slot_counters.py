@@ -0,0 +1,108 @@
+from datetime import time, timedelta
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ct.models import CentroDeTreinamento
+from turmas.models import DiaSemana, Turma
+from wellhub.client import WellhubAPIError
+from wellhub.models import WellhubBooking, WellhubSlot, WellhubTurmaConfig
+from wellhub.services.bookings import handle_booking_cancel, handle_booking_requested
+from wellhub.services.slot_counters import push_pending_slot_counts, verify_slot_counters
+
+
+def _payload(booking_number):
+    return {
+        "booking_number": booking_number,
+        "slot_id": "slot-99",
+        "user": {"first_name": "Ana", "email": f"{booking_number}@test.com", "gpw-id": booking_number},
+    }
+
+
+@patch("wellhub.services.bookings.WellhubClient")
+class SlotCounterTests(TestCase):
+    def setUp(self):
+        ct = CentroDeTreinamento.objects.create(nome="Praia de Itaipuaçu")
+        seg, _ = DiaSemana.objects.get_or_create(nome="Segunda-feira")
+        turma = Turma.objects.create(ct=ct, horario=time(19, 0), capacidade_maxima=20, ativo=True)
+        turma.dias_semana.set([seg])
+        WellhubTurmaConfig.objects.create(
+            turma=turma, wellhub_class_id="class-1", publicar_wellhub=True, cota_wellhub=5
+        )
+        data_aula = (timezone.now() + timedelta(days=3)).date()
+        while data_aula.weekday() != 0:
+            data_aula += timedelta(days=1)
+        occur = timezone.make_aware(timezone.datetime.combine(data_aula, time(19, 0)))
+        self.slot = WellhubSlot.objects.create(
+            turma=turma,
+            data_aula=data_aula,
+            occur_date=occur,
+            wellhub_slot_id="slot-99",
+            total_capacity=5,
+            opens_at=occur - timedelta(days=2),
+            closes_at=occur - timedelta(minutes=10),
+        )
+        now_patcher = patch(
+            "wellhub.services.sync_slots.timezone.now", return_value=self.slot.opens_at + timedelta(hours=1)
+        )
+        now_patcher.start()
+        self.addCleanup(now_patcher.stop)
+
+    def test_reservas_e_cancelamentos_alteram_contador_e_geram_um_patch(self, client_cls):
+        client_cls.return_value.configured = False
+        for n in ("bk-1", "bk-2", "bk-3"):
+            handle_booking_requested(_payload(n))
+        handle_booking_cancel(_payload("bk-2"))
+        # Cancelamento repetido não desconta de novo
+        handle_booking_cancel(_payload("bk-2"))
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.total_booked, 2)
+        self.assertIsNotNone(self.slot.counts_dirty_since)
+        self.assertEqual(self.slot.counts_pending_changes, 4)
+
+        api = MagicMock(configured=True)
+        api.patch_slots_many.return_value = [{}]
+        # Ainda dentro da janela: nada é enviado
+        self.assertEqual(push_pending_slot_counts(api, window=60)["pushed"], 0)
+        api.patch_slots_many.assert_not_called()
+
+        stats = push_pending_slot_counts(api, window=0)
+        self.assertEqual(stats, {"pushed": 1, "failed": 0, "changes": 4, "saved": 3})
+        api.patch_slots_many.assert_called_once_with(
+            [("class-1", "slot-99", {"total_capacity": 5, "total_booked": 2})]
+        )
+        self.slot.refresh_from_db()
+        self.assertEqual((self.slot.counts_dirty_since, self.slot.counts_pending_changes), (None, 0))
+        self.assertEqual(push_pending_slot_counts(api, window=0)["pushed"], 0)
+
+    def test_falha_no_patch_devolve_alteracoes_para_o_proximo_envio(self, client_cls):
+        client_cls.return_value.configured = False
+        handle_booking_requested(_payload("bk-1"))
+        handle_booking_requested(_payload("bk-2"))
+
+        api = MagicMock(configured=True)
+        api.patch_slots_many.return_value = [WellhubAPIError("fora", status_code=503)]
+        self.assertEqual(push_pending_slot_counts(api, window=0)["failed"], 1)
+        handle_booking_requested(_payload("bk-3"))
+
+        api.patch_slots_many.return_value = [{}]
+        self.assertEqual(
+            push_pending_slot_counts(api, window=0), {"pushed": 1, "failed": 0, "changes": 3, "saved": 2}
+        )
+        self.assertEqual(api.patch_slots_many.call_args.args[0][0][2]["total_booked"], 3)
+
+    def test_verificador_corrige_drift(self, client_cls):
+        WellhubBooking.objects.create(wellhub_booking_id="bk-x", slot=self.slot, status="confirmed")
+        WellhubSlot.objects.filter(pk=self.slot.pk).update(total_booked=4)
+
+        report = verify_slot_counters(repair=False)
+        self.assertEqual([(r["counter"], r["confirmed"]) for r in report], [(4, 1)])
+        self.assertEqual(WellhubSlot.objects.get(pk=self.slot.pk).total_booked, 4)
+
+        verify_slot_counters()
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.total_booked, 1)
+        self.assertIsNotNone(self.slot.counts_dirty_since)
+        self.assertEqual(verify_slot_counters(), [])
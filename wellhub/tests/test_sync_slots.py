@@ -1,5 +1,9 @@
 from datetime import date, datetime, time, timedelta
+from io import StringIO
+from itertools import count
+from unittest.mock import MagicMock, patch
 
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
@@ -7,13 +11,16 @@ from ct.models import CentroDeTreinamento
 from turmas.models import DiaSemana, Turma
 from wellhub.constants import CT_NOME_PILOTO
 from wellhub.models import WellhubSlot, WellhubTurmaConfig
+from wellhub.services.slot_plan import build_plan
 from wellhub.services.sync_slots import (
     _normalize_wellhub_datetime,
     _parse_remote_occur,
     _slot_matches_local,
     _slot_id_from_response,
+    build_slot_payload,
     iter_slot_dates,
     _is_wellhub_day,
+    sync_all_published_slots,
     upsert_local_slot,
 )
 
@@ -124,3 +131,58 @@ class UpsertLocalSlotTests(TestCase):
         self.assertEqual(timezone.localtime(slot.opens_at).date(), date(2026, 5, 1))
         self.assertEqual(timezone.localtime(slot.opens_at).hour, 0)
         self.assertEqual(timezone.localtime(slot.opens_at).minute, 0)
+
+
+class SlotSyncPlanTests(TestCase):
+    HOJE = date(2030, 7, 1)  # segunda; julho/2030 tem 10 aulas seg/qua a partir daqui
+
+    def setUp(self):
+        ct = CentroDeTreinamento.objects.create(nome=CT_NOME_PILOTO)
+        self.turma = Turma.objects.create(ct=ct, horario=time(7, 0), capacidade_maxima=20, ativo=True)
+        self.turma_config = WellhubTurmaConfig.objects.create(
+            turma=self.turma, wellhub_class_id="class-1", publicar_wellhub=True, cota_wellhub=5
+        )
+        remote = []
+        for data_aula, slot_id, capacity in (
+            (date(2030, 7, 1), "101", 5),  # igual ao local → noop
+            (date(2030, 7, 3), "102", 3),  # cota diferente → patch_capacity
+            (date(2030, 7, 8), "103", 5),  # só existe na Wellhub → link
+        ):
+            slot = upsert_local_slot(self.turma_config, data_aula)
+            remote.append({**build_slot_payload(slot, 1), "id": slot_id, "total_capacity": capacity})
+            if slot_id == "103":
+                slot.delete()
+            else:
+                WellhubSlot.objects.filter(pk=slot.pk).update(wellhub_slot_id=slot_id)
+
+        ids = count(500)
+        self.client = MagicMock(configured=True, product_id=1)
+        self.client.list_slots_many.side_effect = lambda windows, **kwargs: [remote for _ in windows]
+        self.client.create_slot.side_effect = lambda class_id, payload: {"id": next(ids)}
+
+    def test_plano_so_lista_uma_vez_e_nao_grava(self):
+        plan = build_plan(self.client, hoje=self.HOJE)
+        self.assertEqual(plan.counts(), {"noop": 1, "patch_capacity": 1, "link": 1, "create": 7})
+        self.assertEqual(len(self.client.list_slots_many.call_args.args[0]), 1)
+        self.client.create_slot.assert_not_called()
+        self.client.patch_slot.assert_not_called()
+        self.assertEqual(WellhubSlot.objects.count(), 2)
+
+    def test_executa_so_as_mudancas(self):
+        stats = sync_all_published_slots(client=self.client, hoje=self.HOJE, workers=3)
+
+        self.assertEqual((stats["synced"], stats["errors"]), (10, 0))
+        self.assertEqual(self.client.create_slot.call_count, 7)
+        # patch_capacity + link (vínculo aplica cotas e janela)
+        self.assertEqual(self.client.patch_slot.call_count, 2)
+        self.assertEqual(WellhubSlot.objects.filter(sync_status=WellhubSlot.SYNC_OK).count(), 10)
+        self.assertEqual(WellhubSlot.objects.get(data_aula=date(2030, 7, 8)).wellhub_slot_id, "103")
+
+    def test_comando_plan_mostra_o_diff(self):
+        out = StringIO()
+        with patch("wellhub.management.commands.sincronizar_wellhub_slots.build_plan") as build:
+            build.return_value = build_plan(self.client, hoje=self.HOJE)
+            call_command("sincronizar_wellhub_slots", "--plan", "--skip-api", stdout=out)
+        self.assertIn("patch_capacity", out.getvalue())
+        self.assertNotIn("noop", out.getvalue().split("Plano:")[0])
+        self.assertEqual(WellhubSlot.objects.count(), 2)
@@ -0,0 +1,116 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from wellhub.models import WellhubWebhookEvent
+from wellhub.services.webhook_events import (
+    MAX_ATTEMPTS,
+    claim_next_event,
+    process_pending_events,
+    queue_metrics,
+)
+from wellhub.views import WellhubWebhookAPIView
+
+
+def _post(payload):
+    body = json.dumps(payload).encode("utf-8")
+    sig = hmac.new(b"test-secret", body, hashlib.sha1).hexdigest()
+    req = RequestFactory().post(
+        "/api/wellhub/webhook/",
+        data=body,
+        content_type="application/json",
+        HTTP_X_GYMPASS_SIGNATURE=sig,
+    )
+    return WellhubWebhookAPIView.as_view()(req)
+
+
+def _booking_event(event_id, event_type, booking_number):
+    return {
+        "event_type": event_type,
+        "event_id": event_id,
+        "event_data": {"slot": {"id": 1, "booking_number": booking_number}},
+    }
+
+
+@override_settings(WELLHUB_WEBHOOK_SECRET="test-secret")
+class WebhookQueueTests(TestCase):
+    @patch("wellhub.services.webhook_events.handle_booking_cancel")
+    @patch("wellhub.services.webhook_events.handle_booking_requested")
+    def test_webhook_enfileira_e_worker_processa_em_ordem(self, requested, cancel):
+        calls = []
+        requested.side_effect = lambda p: calls.append("requested") or ("confirmed", "ok")
+        cancel.side_effect = lambda p, late: calls.append("cancel") or ("cancelled", "ok")
+
+        resp = _post(_booking_event("evt-1", "booking.requested", "bk-1"))
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(json.loads(resp.content)["status"], "accepted")
+        _post(_booking_event("evt-2", "booking.cancelation", "bk-1"))
+        requested.assert_not_called()
+
+        # Enquanto a reserva está em processamento, o cancelamento do mesmo booking espera
+        first = claim_next_event("w1")
+        self.assertEqual(first.event_id, "evt-1")
+        self.assertIsNone(claim_next_event("w2"))
+        WellhubWebhookEvent.objects.filter(pk=first.pk).update(status=WellhubWebhookEvent.STATUS_PENDING)
+
+        self.assertEqual(process_pending_events("teste"), 2)
+        self.assertEqual(calls, ["requested", "cancel"])
+        self.assertEqual(
+            set(WellhubWebhookEvent.objects.values_list("status", flat=True)),
+            {WellhubWebhookEvent.STATUS_DONE},
+        )
+
+        duplicate = _post(_booking_event("evt-1", "booking.requested", "bk-1"))
+        self.assertEqual(duplicate.status_code, 200)
+        self.assertEqual(json.loads(duplicate.content)["status"], "duplicate")
+
+    @patch("wellhub.services.webhook_events.handle_booking_requested", side_effect=RuntimeError("api fora"))
+    def test_falha_reagenda_com_backoff_ate_dead(self, requested):
+        _post(_booking_event("evt-1", "booking.requested", "bk-1"))
+        self.assertEqual(process_pending_events("teste"), 1)
+
+        event = WellhubWebhookEvent.objects.get(event_id="evt-1")
+        self.assertEqual((event.status, event.attempts), (WellhubWebhookEvent.STATUS_PENDING, 1))
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        self.assertIn("api fora", event.error_message)
+        # Ainda no backoff: nada a processar
+        self.assertEqual(process_pending_events("teste"), 0)
+
+        for _ in range(MAX_ATTEMPTS - 1):
+            WellhubWebhookEvent.objects.filter(pk=event.pk).update(next_attempt_at=timezone.now())
+            process_pending_events("teste")
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (WellhubWebhookEvent.STATUS_DEAD, MAX_ATTEMPTS))
+        self.assertEqual(requested.call_count, MAX_ATTEMPTS)
+
+        # Reenvio pela Wellhub devolve o evento dead para a fila
+        self.assertEqual(_post(_booking_event("evt-1", "booking.requested", "bk-1")).status_code, 202)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (WellhubWebhookEvent.STATUS_PENDING, 0))
+
+    def test_metricas_e_recuperacao_de_orfaos(self):
+        now = timezone.now()
+        WellhubWebhookEvent.objects.create(
+            event_id="orfao",
+            status=WellhubWebhookEvent.STATUS_PROCESSING,
+            started_at=now - timedelta(hours=1),
+        )
+        done = WellhubWebhookEvent.objects.create(event_id="feito", status=WellhubWebhookEvent.STATUS_DONE)
+        WellhubWebhookEvent.objects.filter(pk=done.pk).update(
+            criado_em=now - timedelta(seconds=30), processed_at=now
+        )
+
+        metrics = queue_metrics()
+        self.assertEqual(metrics["by_status"]["processing"], 1)
+        self.assertEqual(metrics["processed_in_window"], 1)
+        self.assertAlmostEqual(metrics["avg_lag_seconds"], 30, delta=1)
+
+        self.assertEqual(process_pending_events("teste"), 1)
+        self.assertEqual(
+            WellhubWebhookEvent.objects.get(event_id="orfao").result, {"handler": "ignored", "event_type": ""}
+        )
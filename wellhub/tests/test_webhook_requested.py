@@ -135,6 +135,7 @@ class BookingRequestedTests(TestCase):
                 slot=self.slot,
                 status="confirmed",
             )
+        WellhubSlot.objects.filter(pk=self.slot.pk).update(total_booked=5)
         with patch(
             "wellhub.services.sync_slots.timezone.now",
             return_value=self.slot.opens_at + timedelta(hours=1),
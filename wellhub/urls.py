@@ -8,12 +8,14 @@ from wellhub.views import (
     WellhubSyncSlotsAPIView,
     WellhubTurmasOpcoesAPIView,
     WellhubWebhookAPIView,
+    WellhubWebhookMetricsAPIView,
 )
 
 app_name = "wellhub"
 
 urlpatterns = [
     path("webhook/", WellhubWebhookAPIView.as_view(), name="webhook"),
+    path("webhook/metricas/", WellhubWebhookMetricsAPIView.as_view(), name="webhook_metricas"),
     path("turmas-opcoes/", WellhubTurmasOpcoesAPIView.as_view(), name="turmas_opcoes"),
     path("cadastros/", CadastroWellhubListAPIView.as_view(), name="cadastros_list"),
     path("cadastros/<int:pk>/", CadastroWellhubDetailAPIView.as_view(), name="cadastros_detail"),
@@ -22,7 +22,6 @@ from wellhub.models import (
     CadastroWellhub,
     WellhubBooking,
     WellhubTurmaConfig,
-    WellhubWebhookEvent,
 )
 from wellhub.permissions import IsGerente
 from wellhub.serializers import (
@@ -30,16 +29,11 @@ from wellhub.serializers import (
     CadastroWellhubSerializer,
     WellhubBookingListSerializer,
 )
-from wellhub.services.bookings import handle_booking_cancel, handle_booking_requested
-from wellhub.services.checkins import handle_checkin_occurred
 from wellhub.services.sync_slots import sync_all_published_slots
+from wellhub.services.webhook_events import enqueue_event, queue_metrics
 from wellhub.webhooks import (
     extract_event_id,
     extract_event_type,
-    is_cancel_event,
-    is_checkin_event,
-    is_late_cancel_event,
-    is_requested_event,
     verify_gympass_signature,
 )
 
@@ -51,6 +45,8 @@ class WellhubWebhookAPIView(APIView):
     """
     Webhook único Wellhub (booking + demais eventos).
     URL: POST /api/wellhub/webhook/
+
+    Valida a assinatura, grava o evento na fila e responde 202.
     """
 
     permission_classes = []
@@ -77,50 +73,24 @@ class WellhubWebhookAPIView(APIView):
         event_type = extract_event_type(payload)
         event_id = extract_event_id(payload, raw_body)
 
-        if WellhubWebhookEvent.objects.filter(event_id=event_id, processed=True).exists():
+        # Só persiste: o processamento (que pode chamar a API Wellhub) fica no worker
+        # processar_webhooks_wellhub, para responder rápido e não perder eventos.
+        event, duplicate = enqueue_event(event_id, event_type, payload)
+        if duplicate:
             return JsonResponse({"status": "duplicate", "event_id": event_id})
+        return JsonResponse({"status": "accepted", "event_id": event_id}, status=202)
 
-        event, created = WellhubWebhookEvent.objects.get_or_create(
-            event_id=event_id,
-            defaults={"event_type": event_type, "payload": payload},
-        )
-        if not created and event.processed:
-            return JsonResponse({"status": "duplicate", "event_id": event_id})
 
-        event.event_type = event_type or event.event_type
-        event.payload = payload
-        event.save(update_fields=["event_type", "payload"])
+class WellhubWebhookMetricsAPIView(APIView):
+    """
+    Tamanho e atraso da fila de webhooks (gerente).
+    URL: GET /api/wellhub/webhook/metricas/
+    """
 
-        try:
-            result = self._dispatch(event_type, payload)
-            event.processed = True
-            event.error_message = ""
-            event.save(update_fields=["processed", "error_message"])
-            return JsonResponse({"status": "ok", "result": result, "event_id": event_id})
-        except Exception as exc:
-            logger.exception("Erro processando webhook Wellhub: %s", exc)
-            event.error_message = str(exc)[:2000]
-            event.save(update_fields=["error_message"])
-            return JsonResponse(
-                {"status": "error", "message": str(exc), "event_id": event_id},
-                status=200,
-            )
+    permission_classes = [IsAuthenticated, IsGerente]
 
-    def _dispatch(self, event_type: str, payload: dict) -> dict:
-        if is_requested_event(event_type):
-            action, detail = handle_booking_requested(payload)
-            return {"handler": "booking_requested", "action": action, "detail": detail}
-        if is_late_cancel_event(event_type):
-            action, detail = handle_booking_cancel(payload, late=True)
-            return {"handler": "late_cancel", "action": action, "detail": detail}
-        if is_cancel_event(event_type):
-            action, detail = handle_booking_cancel(payload, late=False)
-            return {"handler": "cancel", "action": action, "detail": detail}
-        if is_checkin_event(event_type):
-            action, detail = handle_checkin_occurred(payload)
-            return {"handler": "checkin", "action": action, "detail": detail}
-        logger.info("Webhook Wellhub ignorado (tipo=%s)", event_type)
-        return {"handler": "ignored", "event_type": event_type}
+    def get(self, request):
+        return Response(queue_metrics())
 
 
 class WellhubCadastroFilterMixin: